@@ -0,0 +1,267 @@
+# ------------------------------------------------------------------------------------------------------------------------------------
+# decode_benchmark.py
+#
+# Benchmark und Parameter-Sweep für die Whisper-Dekodierparameter aus transcribe.py
+# (beam_size, VAD-Filter samt min_silence_duration_ms/threshold, condition_on_previous_text, compute_type, beam/adaptive)
+# über einen Referenz-Audiosatz.
+#
+# Referenzsatz: Verzeichnis mit Paaren <name>.mp3 (oder .wav/.m4a/.flac) + <name>.ref.txt (Referenz-Transkript,
+# Fließtext oder im Format von transcribe.py mit [hh:mm:ss]-Zeilen).
+#
+# Je Konfiguration läuft ein eigener Worker-Prozess (saubere Peak-RSS-/VRAM-Werte, kein Speicher-Übertrag):
+#   - RTF:  Dekodierzeit / Audiodauer (ohne Modell-Ladezeit, die separat ausgewiesen wird)
+#   - WER:  Wortfehlerrate gegen die Referenz (Korpus-WER: Summe Fehler / Summe Referenzwörter)
+#   - Peak-RSS und Peak-CUDA-Speicher aus dem Run-Report (instrumentation.py)
+# Ausgabe: Tabelle mit markierter Pareto-Front (keine andere Konfiguration ist schneller UND genauer)
+# und decode_benchmark_<datum>.json im Temp-Verzeichnis (oder --output).
+#
+# Läuft auch auf der CPU mit einem kleinen Modell (Default ohne GPU: "small", int8):
+#   python decode_benchmark.py --audio-dir ./benchmark --device cpu --model small --beam 1,5 --vad on,off
+#   python decode_benchmark.py --beam 7 --vad on --vad-silence 100,500,2000 --vad-threshold 0.35,0.5,0.65
+# ------------------------------------------------------------------------------------------------------------------------------------
+
+import os
+import sys
+import re
+import json
+import argparse
+import tempfile
+import itertools
+import subprocess
+from array import array
+from datetime import datetime
+
+from transcribe import (AUDIO_DIR, MODEL_NAME, BEAM_SIZE, USE_VAD, VAD_PARAMS, CONDITION_ON_PREV, COMPUTE_TYPE, DECODE_MODE, STREAM_PREFIX,
+                        print_header, print_info, print_error, print_success, get_mp3_details, load_model_fast_whisper,
+                        transcribe_audio, correct_transcription, emit_stream_message)
+from transcript_store import TranscriptStore
+from instrumentation import RunRecorder
+
+AUDIO_EXTENSIONS = (".mp3", ".wav", ".m4a", ".flac")
+REFERENCE_SUFFIX = ".ref.txt"
+CPU_MODEL = "small"                      # Kleines Modell für CPU-Läufe (wird von faster-whisper geladen)
+WORD_RE = re.compile(r"\w+", re.UNICODE)
+VAD_THRESHOLD = VAD_PARAMS.get("threshold", 0.5)    # Silero-Schwelle; VAD_PARAMS setzt sie nicht → faster-whisper-Default
+VAD_SILENCE_MS = VAD_PARAMS["min_silence_duration_ms"]
+
+# -----------------------------------------------------------------------------------------------------------
+# WER: Levenshtein-Distanz auf Wortebene (zwei Zeilen, O(n) Speicher)
+# -----------------------------------------------------------------------------------------------------------
+def normalize_words(text):
+    return WORD_RE.findall(text.lower())
+
+def word_errors(reference, hypothesis):
+    """(Fehler = Ersetzungen + Löschungen + Einfügungen, Anzahl Referenzwörter)"""
+    ref, hyp = normalize_words(reference), normalize_words(hypothesis)
+    previous = array("I", range(len(hyp) + 1))
+    for i, ref_word in enumerate(ref, 1):
+        current = array("I", [i]) * (len(hyp) + 1)
+        for j, hyp_word in enumerate(hyp, 1):
+            current[j] = min(previous[j] + 1, current[j - 1] + 1, previous[j - 1] + (ref_word != hyp_word))
+        previous = current
+    return previous[len(hyp)], len(ref)
+
+def load_reference(path):
+    with open(path, "r", encoding="utf-8") as f:
+        text = f.read()
+    store = TranscriptStore.from_text(text)
+    return " ".join(store.texts(0, len(store))) if len(store) else text
+
+def find_reference_set(audio_dir):
+    pairs = []
+    for filename in sorted(os.listdir(audio_dir)):
+        stem, ext = os.path.splitext(filename)
+        reference = os.path.join(audio_dir, stem + REFERENCE_SUFFIX)
+        if ext.lower() in AUDIO_EXTENSIONS and os.path.isfile(reference):
+            pairs.append((os.path.join(audio_dir, filename), reference))
+    return pairs
+
+# -----------------------------------------------------------------------------------------------------------
+# Worker: eine Konfiguration über alle Referenzdateien (eigener Prozess)
+# -----------------------------------------------------------------------------------------------------------
+def run_worker(config):
+    recorder = RunRecorder("decode_benchmark", **config)
+    with recorder.stage("load"):
+        model = load_model_fast_whisper(config["model"], config["device"], config["computeType"])
+    vad_parameters = {**VAD_PARAMS, "min_silence_duration_ms": config["vadSilenceMs"], "threshold": config["vadThreshold"]}
+    decode_options = dict(beam_size=config["beam"], vad_filter=config["vad"], vad_parameters=vad_parameters,
+                          condition_on_previous_text=config["condition"])
+
+    files = []
+    for audio_path, reference_path in config["files"]:
+        duration = get_mp3_details(audio_path)
+        decode_stats = {}
+        with recorder.stage("decode"):
+            segments, _ = transcribe_audio(model, audio_path, duration, decode_options=decode_options,
+                                           decode_mode=config["decode"], decode_stats=decode_stats)
+        hypothesis = correct_transcription(" ".join(segment.text.strip() for segment in segments))
+        errors, ref_words = word_errors(load_reference(reference_path), hypothesis)
+        if not duration and segments:
+            duration = segments[-1].end
+        files.append({"file": os.path.basename(audio_path), "audioSeconds": duration,
+                      "decodeSeconds": recorder.stages[-1]["wallSeconds"], "errors": errors, "refWords": ref_words,
+                      "beamSeconds": decode_stats.get("beamSeconds", duration)})
+
+    report = recorder.report()
+    emit_stream_message("RESULT", {
+        "files": files,
+        "loadSeconds": recorder.stages[0]["wallSeconds"],
+        "peakRssMb": report["total"]["peakRssMb"],
+        "peakCudaMb": report["total"]["peakCudaMb"],
+    })
+
+def run_config(config):
+    result = subprocess.run(
+        [sys.executable, os.path.abspath(__file__), "--worker", json.dumps(config)],
+        capture_output=True, text=True, encoding="utf-8", errors="replace"
+    )
+    for line in result.stdout.splitlines():
+        if line.startswith(f"{STREAM_PREFIX}RESULT "):
+            return json.loads(line[len(STREAM_PREFIX) + len("RESULT "):])
+    raise RuntimeError(f"Worker fehlgeschlagen (Exit-Code {result.returncode}):\n{result.stderr.strip()[-2000:]}")
+
+# -----------------------------------------------------------------------------------------------------------
+# Auswertung: Korpus-RTF/WER je Konfiguration, Pareto-Front (RTF ↓, WER ↓)
+# -----------------------------------------------------------------------------------------------------------
+def summarize_result(config, result):
+    audio = sum(f["audioSeconds"] for f in result["files"]) or 1
+    ref_words = sum(f["refWords"] for f in result["files"]) or 1
+    return {
+        "beam": config["beam"], "vad": config["vad"], "vadSilenceMs": config["vadSilenceMs"], "vadThreshold": config["vadThreshold"],
+        "condition": config["condition"], "computeType": config["computeType"],
+        "decode": config["decode"],
+        "rtf": sum(f["decodeSeconds"] for f in result["files"]) / audio,
+        "beamShare": sum(f["beamSeconds"] for f in result["files"]) / audio,
+        "wer": sum(f["errors"] for f in result["files"]) / ref_words,
+        "peakRssMb": result["peakRssMb"], "peakCudaMb": result["peakCudaMb"], "loadSeconds": result["loadSeconds"],
+        "files": result["files"],
+    }
+
+def mark_pareto(rows):
+    best_wer = None
+    for row in sorted(rows, key=lambda r: (r["rtf"], r["wer"])):
+        row["pareto"] = best_wer is None or row["wer"] < best_wer
+        if row["pareto"]:
+            best_wer = row["wer"]
+
+def print_table(rows, current):
+    print(f"\n  {'':2}{'modus':>9} {'beam':>5} {'vad':>5} {'stille':>7} {'schw.':>5} {'cond':>5} {'compute':>14} {'RTF':>8} "
+          f"{'WER %':>8} {'Beam %':>7} {'Peak RSS':>10} {'Peak CUDA':>10} {'Laden':>8}")
+    print("  " + "─" * 118)
+    for row in sorted(rows, key=lambda r: (r["rtf"], r["wer"])):
+        key = (row["decode"], row["beam"], row["vad"], row["vadSilenceMs"], row["vadThreshold"], row["condition"],
+               row["computeType"])
+        silence = f"{row['vadSilenceMs']}ms" if row["vad"] else "–"
+        threshold = f"{row['vadThreshold']:.2f}" if row["vad"] else "–"
+        cuda = f"{row['peakCudaMb']:.0f} MB" if row["peakCudaMb"] is not None else "–"
+        rss = f"{row['peakRssMb']:.0f} MB" if row["peakRssMb"] is not None else "–"
+        print(f"  {'★' if row['pareto'] else ' ':2}{row['decode']:>9} {row['beam']:>5} {'an' if row['vad'] else 'aus':>5} "
+              f"{silence:>7} {threshold:>5} {'an' if row['condition'] else 'aus':>5} {row['computeType']:>14} {row['rtf']:8.3f} {row['wer'] * 100:8.2f} "
+              f"{row['beamShare'] * 100:7.1f} "
+              f"{rss:>10} {cuda:>10} {row['loadSeconds']:7.1f}s{'  ← aktuell' if key == current else ''}")
+    print("\n  ★ = Pareto-Front (keine andere Konfiguration ist schneller und genauer)\n")
+
+# -----------------------------------------------------------------------------------------------------------
+# Kommandozeile
+# -----------------------------------------------------------------------------------------------------------
+def parse_list(value, convert):
+    return [convert(item.strip()) for item in value.split(",") if item.strip()]
+
+def parse_switch(value):
+    if value.lower() in ("on", "an", "1", "true", "ja"):
+        return True
+    if value.lower() in ("off", "aus", "0", "false", "nein"):
+        return False
+    raise argparse.ArgumentTypeError(f"Ungültiger Schalter: {value} (on/off)")
+
+def detect_device():
+    import ctranslate2
+    return "cuda" if ctranslate2.get_cuda_device_count() > 0 else "cpu"
+
+def main():
+    parser = argparse.ArgumentParser(description="Parameter-Sweep der Whisper-Dekodierung (RTF, Speicher, WER, Pareto-Front).")
+    parser.add_argument('--audio-dir', default=os.path.join(AUDIO_DIR, "benchmark"),
+                        help=f"Referenzsatz: <name>.mp3 + <name>{REFERENCE_SUFFIX} (default: AUDIO_DIR/benchmark)")
+    parser.add_argument('--device', choices=["auto", "cuda", "cpu"], default="auto", help="Gerät (default: auto)")
+    parser.add_argument('--model', default=None,
+                        help=f"Modellname oder -pfad (default: GPU {os.path.basename(MODEL_NAME)}, CPU {CPU_MODEL})")
+    parser.add_argument('--beam', default=None, help=f"beam_size-Werte, kommagetrennt (default: 1,5,{BEAM_SIZE})")
+    parser.add_argument('--vad', default="on,off", help="VAD-Filter an/aus, kommagetrennt (default: on,off)")
+    parser.add_argument('--vad-silence', default=f"{VAD_SILENCE_MS},2000",
+                        help=f"VAD min_silence_duration_ms-Werte, kommagetrennt; nur mit VAD an "
+                             f"(default: {VAD_SILENCE_MS},2000 = aktuell und faster-whisper-Default)")
+    parser.add_argument('--vad-threshold', default=f"{VAD_THRESHOLD}",
+                        help=f"VAD threshold-Werte (Sprachwahrscheinlichkeit), kommagetrennt; nur mit VAD an "
+                             f"(default: {VAD_THRESHOLD}, z. B. 0.35,0.5,0.65)")
+    parser.add_argument('--condition', default="off,on", help="condition_on_previous_text, kommagetrennt (default: off,on)")
+    parser.add_argument('--compute-type', default=None,
+                        help=f"CT2 compute_type-Werte, kommagetrennt (default: GPU {COMPUTE_TYPE},float16 – CPU int8)")
+    parser.add_argument('--decode', default="beam,adaptive",
+                        help="Dekodier-Modi, kommagetrennt: beam, adaptive (default: beam,adaptive; adaptive nur mit beam > 1)")
+    parser.add_argument('--output', default=None,
+                        help="Ergebnis-JSON (default: decode_benchmark_<datum>.json im Temp-Verzeichnis des Systems)")
+    parser.add_argument('--worker', help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    if args.worker:
+        run_worker(json.loads(args.worker))
+        return
+
+    print("")
+    print_header("Benchmark der Whisper-Dekodierparameter")
+
+    if not os.path.isdir(args.audio_dir):
+        print_error(f"Referenzverzeichnis nicht gefunden: {args.audio_dir}")
+        sys.exit(1)
+    files = find_reference_set(args.audio_dir)
+    if not files:
+        print_error(f"Keine Referenzpaare (<name>.mp3 + <name>{REFERENCE_SUFFIX}) in {args.audio_dir}")
+        sys.exit(1)
+
+    device = detect_device() if args.device == "auto" else args.device
+    model = args.model or (MODEL_NAME if device == "cuda" else CPU_MODEL)
+    beams = parse_list(args.beam or f"1,5,{BEAM_SIZE}", int)
+    vads = parse_list(args.vad, parse_switch)
+    vad_silences = parse_list(args.vad_silence, int)
+    vad_thresholds = parse_list(args.vad_threshold, float)
+    conditions = parse_list(args.condition, parse_switch)
+    compute_types = parse_list(args.compute_type or (f"{COMPUTE_TYPE},float16" if device == "cuda" else "int8"), str)
+    decode_modes = parse_list(args.decode, str)
+    # adaptive mit beam 1 wäre identisch mit greedy → auslassen; ohne VAD wirken dessen Parameter nicht → nur einmal
+    grid = [combo for combo in itertools.product(decode_modes, beams, vads, vad_silences, vad_thresholds, conditions,
+                                                 compute_types)
+            if not (combo[0] == "adaptive" and combo[1] == 1)
+            and (combo[2] or (combo[3], combo[4]) == (vad_silences[0], vad_thresholds[0]))]
+
+    print_info(f"Referenzdateien: {len(files)}, Konfigurationen: {len(grid)}, Gerät: {device}, Modell: {model}")
+
+    rows = []
+    for n, (decode, beam, vad, vad_silence, vad_threshold, condition, compute_type) in enumerate(grid, 1):
+        config = dict(model=model, device=device, computeType=compute_type, decode=decode, beam=beam, vad=vad,
+                      vadSilenceMs=vad_silence, vadThreshold=vad_threshold, condition=condition, files=files)
+        vad_text = f"{vad} (stille={vad_silence} ms, threshold={vad_threshold})" if vad else f"{vad}"
+        print_info(f"[{n}/{len(grid)}] decode={decode} beam={beam} vad={vad_text} condition={condition} "
+                   f"compute_type={compute_type}")
+        try:
+            row = summarize_result(config, run_config(config))
+        except RuntimeError as e:
+            print_error(str(e))
+            continue
+        print_info(f"    .. RTF {row['rtf']:.3f}, WER {row['wer'] * 100:.2f} %, Peak RSS {row['peakRssMb']} MB")
+        rows.append(row)
+
+    if not rows:
+        print_error("Keine Konfiguration erfolgreich.")
+        sys.exit(1)
+
+    mark_pareto(rows)
+    print_table(rows, current=(DECODE_MODE, BEAM_SIZE, USE_VAD, VAD_SILENCE_MS, VAD_THRESHOLD, CONDITION_ON_PREV, COMPUTE_TYPE))
+
+    output_path = args.output or os.path.join(tempfile.gettempdir(), f"decode_benchmark_{datetime.now():%Y%m%d_%H%M%S}.json")
+    with open(output_path, "w", encoding="utf-8") as f:
+        json.dump({"device": device, "model": model, "files": [os.path.basename(a) for a, _ in files], "results": rows},
+                  f, ensure_ascii=False, indent=2)
+    print_success(f"Ergebnisse gespeichert: {output_path}")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,207 @@
+# ------------------------------------------------------------------------------------------------------------------------------------
+# instrumentation.py
+#
+# Speicher- und Zeitmessung je Pipeline-Stufe für transcribe.py und summarize.py
+#   - Wandzeit und CPU-Zeit je Stufe (load, decode, format, generate, save, ...)
+#   - RSS am Ende der Stufe und Peak-RSS des Prozesses bis dahin (ru_maxrss ist monoton –
+#     die Stufe, in der der Wert springt, hat den Peak verursacht)
+#   - CUDA-Speicher: über torch, falls es ohnehin geladen ist (allocated/reserved), sonst über nvidia-smi
+#     (vom Prozess belegter VRAM = Pool von CTranslate2, Geräteauslastung gesamt)
+# Ergebnis ist ein maschinenlesbarer Run-Report (<name>_run.json neben der Ausgabe bzw. @@REPORT im Stream-Modus),
+# den main.py an die Clients weiterreicht – zur Dimensionierung von Hosts und zum Erkennen von Speicher-Regressionen.
+#
+# Muss wie transcript_store.py neben den Skripten liegen (WSL: /home/tom/instrumentation.py).
+# ------------------------------------------------------------------------------------------------------------------------------------
+
+import os
+import sys
+import json
+import time
+import platform
+import subprocess
+from contextlib import contextmanager
+from datetime import datetime
+
+from tracing import span as trace_span  # Jede Stufe ist zugleich eine Span, wenn ein Tracer aktiv ist (--trace-id)
+
+try:
+    import resource                      # Nur Unix (WSL); unter Windows gibt es kein Peak-RSS
+except ImportError:
+    resource = None
+
+REPORT_VERSION = 1
+REPORT_SUFFIX = "_run.json"              # <name>.txt → <name>_run.json, <name>_s.txt → <name>_s_run.json
+_nvidia_smi_available = True             # Wird beim ersten fehlgeschlagenen Aufruf abgeschaltet
+
+
+def _mb(value_bytes):
+    return round(value_bytes / 1024 / 1024, 1)
+
+
+def current_rss_mb():
+    """Aktueller Resident Set Size des Prozesses in MB (Linux: /proc/self/statm), sonst None"""
+    try:
+        with open("/proc/self/statm") as f:
+            resident_pages = int(f.read().split()[1])
+        return _mb(resident_pages * os.sysconf("SC_PAGE_SIZE"))
+    except (OSError, ValueError, IndexError, AttributeError):
+        return None
+
+
+def peak_rss_mb():
+    """Höchster RSS des Prozesses seit Start in MB (ru_maxrss ist unter Linux in KB)"""
+    if resource is None:
+        return None
+    return round(resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024, 1)
+
+
+def query_nvidia_smi(query, fields):
+    """nvidia-smi --query-<query>=<fields> → Liste von Zeilen (je eine Liste von Strings); [] wenn nicht verfügbar"""
+    global _nvidia_smi_available
+    if not _nvidia_smi_available:
+        return []
+    try:
+        result = subprocess.run(
+            ["nvidia-smi", f"--query-{query}={fields}", "--format=csv,noheader,nounits"],
+            capture_output=True, text=True, timeout=5
+        )
+    except (OSError, subprocess.TimeoutExpired):
+        _nvidia_smi_available = False
+        return []
+    if result.returncode != 0:
+        return []
+    return [[value.strip() for value in line.split(",")] for line in result.stdout.splitlines() if line.strip()]
+
+
+def cuda_memory():
+    """CUDA-Speicher in MB; None, wenn keine GPU erreichbar ist"""
+    torch = sys.modules.get("torch")
+    if torch is not None and torch.cuda.is_available():
+        return {
+            "source": "torch",
+            "allocatedMb": _mb(torch.cuda.memory_allocated()),
+            "reservedMb": _mb(torch.cuda.memory_reserved()),
+            "peakAllocatedMb": _mb(torch.cuda.max_memory_allocated()),
+        }
+
+    devices = query_nvidia_smi("gpu", "memory.used,memory.total")
+    if not devices:
+        return None
+    try:
+        process_mb = None
+        for pid, used in query_nvidia_smi("compute-apps", "pid,used_memory"):
+            if int(pid) == os.getpid():
+                process_mb = float(used)
+        return {
+            "source": "nvidia-smi",
+            "allocatedMb": None,
+            "reservedMb": process_mb,        # Unter WSL oft nicht pro Prozess sichtbar → None
+            "deviceUsedMb": float(devices[0][0]),
+            "deviceTotalMb": float(devices[0][1]),
+        }
+    except (ValueError, IndexError):
+        return None
+
+
+def describe_cuda_memory(cuda):
+    if not cuda:
+        return "keine CUDA-GPU"
+    if cuda["source"] == "torch":
+        return f"allocated {cuda['allocatedMb']} MB, reserved {cuda['reservedMb']} MB"
+    process = f"Prozess {cuda['reservedMb']} MB, " if cuda["reservedMb"] is not None else ""
+    return f"{process}Gerät {cuda['deviceUsedMb']:.0f}/{cuda['deviceTotalMb']:.0f} MB"
+
+
+def report_path(output_path):
+    """Pfad des Run-Reports zu einer Ausgabedatei"""
+    return os.path.splitext(output_path)[0] + REPORT_SUFFIX
+
+
+class RunRecorder:
+    """
+    Sammelt Messwerte je Stufe eines Laufs:
+
+        recorder = RunRecorder("transcribe", file="aufnahme.mp3")
+        with recorder.stage("load"):
+            model = load_model()
+        recorder.save(output_path)      # → aufnahme_run.json
+
+    Mit profiler=StageProfiler() (profiling.py, --profile) wird jede Stufe zusätzlich profiliert.
+    """
+
+    def __init__(self, script, profiler=None, **meta):
+        self.script = script
+        self.profiler = profiler
+        self.meta = dict(meta)
+        self.stages = []
+        self.started = datetime.now()
+        self._wall_start = time.perf_counter()
+        self._cpu_start = time.process_time()
+
+    @contextmanager
+    def stage(self, name):
+        wall_start, cpu_start = time.perf_counter(), time.process_time()
+        try:
+            with trace_span(name):
+                if self.profiler is not None:
+                    with self.profiler.stage(name):
+                        yield
+                else:
+                    yield
+        finally:
+            self.stages.append({
+                "name": name,
+                "wallSeconds": round(time.perf_counter() - wall_start, 3),
+                "cpuSeconds": round(time.process_time() - cpu_start, 3),
+                "rssMb": current_rss_mb(),
+                "peakRssMb": peak_rss_mb(),
+                "cuda": cuda_memory(),
+            })
+
+    def report(self):
+        cuda_values = [
+            (stage["cuda"].get("reservedMb") or stage["cuda"].get("deviceUsedMb"))
+            for stage in self.stages if stage["cuda"]
+        ]
+        cuda_values = [value for value in cuda_values if value is not None]
+        report = {
+            "version": REPORT_VERSION,
+            "script": self.script,
+            "started": self.started.isoformat(timespec="seconds"),
+            "host": {
+                "hostname": platform.node(),
+                "platform": platform.platform(),
+                "python": platform.python_version(),
+                "cpuCount": os.cpu_count(),
+            },
+            "meta": self.meta,
+            "stages": self.stages,
+            "total": {
+                "wallSeconds": round(time.perf_counter() - self._wall_start, 3),
+                "cpuSeconds": round(time.process_time() - self._cpu_start, 3),
+                "peakRssMb": peak_rss_mb(),
+                "peakCudaMb": max(cuda_values) if cuda_values else None,
+            },
+        }
+        if self.profiler is not None:
+            report["profile"] = self.profiler.report()
+        return report
+
+    def summary_lines(self):
+        lines = []
+        for stage in self.stages:
+            lines.append(
+                f"{stage['name']:<10} {stage['wallSeconds']:9.2f} s Wand {stage['cpuSeconds']:9.2f} s CPU   "
+                f"RSS {stage['rssMb']} MB (Peak {stage['peakRssMb']} MB)   CUDA: {describe_cuda_memory(stage['cuda'])}"
+            )
+        return lines
+
+    def save(self, output_path):
+        """Schreibt den Report neben die Ausgabedatei und gibt den Pfad zurück (None bei Fehler)"""
+        path = report_path(output_path)
+        try:
+            with open(path, "w", encoding="utf-8") as f:
+                json.dump(self.report(), f, ensure_ascii=False, indent=2)
+            return path
+        except OSError:
+            return None
@@ -0,0 +1,393 @@
+# ------------------------------------------------------------------------------------------------------------------------------------
+# model_host.py
+#
+# Langlebiger Modell-Host für transcribe.py und summarize.py (WSL)
+# Bisher startet main.py je Auftrag einen neuen Python-Prozess, der sein Modell lädt und am Ende wieder freigibt – ein
+# transcribe→summarize-Paar zahlt so jedes Mal das volle Laden von large-v3 und Llama. Der Host führt die Skripte stattdessen
+# in einem Prozess aus und hält die Modelle über model_residency.ResidencyManager im VRAM-Budget geladen bzw. im RAM ausgelagert.
+#
+#   python model_host.py serve [--port 8790] [--budget-mb N]     Host starten (main.py: MODEL_HOST=1 startet ihn selbst)
+#   python model_host.py run /home/tom/transcribe.py ARGS...      Auftrag über den Host ausführen; stdin/stdout/Exit-Code wie beim
+#                                                                 direkten Aufruf – ist kein Host erreichbar, läuft das Skript direkt
+#   python model_host.py status                                   Residenz-Zähler als JSON (Modelle, Belegung, Swaps, Ladezeiten)
+#
+# Protokoll (TCP, nur 127.0.0.1): eine JSON-Kopfzeile {"command": "run", "script": "transcribe", "argv": [...]}, danach die
+# stdin-Bytes des Auftrags als Blöcke (4 Byte Länge + Daten, Länge 0 = EOF). Zurück kommt die Ausgabe des Skripts,
+# abgeschlossen mit @@EXIT {"code": n}. Schließt der Client die Verbindung (main.py beendet den WSL-Prozess), wird der
+# Auftrag abgebrochen – dank der Blöcke ist das vom normalen stdin-Ende unterscheidbar.
+# Je Skript läuft ein Auftrag gleichzeitig (Modul-Zustand), transcribe und summarize aber parallel wie bei /process.
+# Die Ausgabe folgt dem Auftrag, nicht dem Thread: Threads, die ein Auftrag startet (z. B. ThreadPoolExecutor im
+# progressiven Modus), schreiben ebenfalls auf dessen Verbindung.
+#
+# Muss neben transcribe.py liegen (WSL: /home/tom/model_host.py).
+# ------------------------------------------------------------------------------------------------------------------------------------
+
+import io
+import os
+import sys
+import json
+import time
+import queue
+import ctypes
+import socket
+import struct
+import argparse
+import threading
+import importlib
+import traceback
+import contextvars
+import socketserver
+
+from model_residency import (ResidencyManager, activate, CPU_BUDGET_MB, IDLE_OFFLOAD_SEC, IDLE_UNLOAD_SEC,
+                             VRAM_RESERVE_MB)
+
+HOST = "127.0.0.1"
+PORT = int(os.environ.get("MODEL_HOST_PORT", "8790"))
+SWEEP_INTERVAL_SEC = 30                  # So oft werden die Leerlauf-Regeln geprüft
+EXIT_PREFIX = b"@@EXIT "
+FRAME = struct.Struct(">I")              # Länge eines stdin-Blocks
+CHUNK_SIZE = 65536
+SCRIPTS = {                              # Skript → Modell-Art (Warteschlangen-Mix für die Verdrängung)
+    "transcribe": "whisper",
+    "summarize": "llama",
+}
+
+
+def log(text):
+    print(f"[MODEL-HOST] {text}", file=sys.stderr, flush=True)
+
+
+# -----------------------------------------------------------------------------------------------------------
+# Auftrags-Kontext: Verbindung (stdin/stdout) und Abbruch eines Auftrags
+#   Der Kontext hängt an einer ContextVar statt am Thread; inherit_job_context() gibt ihn an alle Threads weiter,
+#   die innerhalb des Auftrags gestartet werden (Host-Threads ohne Auftrag: echter Strom)
+# -----------------------------------------------------------------------------------------------------------
+class JobCancelled(BaseException):
+    """Client hat die Verbindung getrennt – BaseException, damit `except Exception` in den Skripten sie nicht schluckt"""
+
+
+_current_job = contextvars.ContextVar("model_host_job", default=None)
+
+
+def _set_async_exc(thread_id, exc):
+    return ctypes.pythonapi.PyThreadState_SetAsyncExc(ctypes.c_ulong(thread_id),
+                                                      ctypes.py_object(exc) if exc else None)
+
+
+class Job:
+    def __init__(self, stdin, stdout):
+        self.stdin = stdin
+        self.stdout = stdout
+        self.thread_id = threading.get_ident()
+        self.cancelled = threading.Event()
+        self._lock = threading.Lock()
+        self._active = True
+
+    def cancel(self):
+        """Auftrag abbrechen: JobCancelled im Auftrags-Thread auslösen (wirkt beim nächsten Python-Schritt,
+        also nach einem laufenden CT2-Aufruf); Schreiben aus dem Auftrag löst sie ab jetzt ebenfalls aus"""
+        with self._lock:
+            if not self._active or self.cancelled.is_set():
+                return
+            self.cancelled.set()
+            _set_async_exc(self.thread_id, JobCancelled)
+
+    def finish(self):
+        """Auftrag beendet: ein noch nicht ausgelöster Abbruch darf das Aufräumen nicht mehr treffen"""
+        while True:
+            try:
+                with self._lock:
+                    self._active = False
+                    _set_async_exc(self.thread_id, None)
+                return
+            except JobCancelled:
+                continue
+
+
+class JobStream:
+    """sys.stdin/sys.stdout: Strom des aktuellen Auftrags (ContextVar), außerhalb eines Auftrags der echte Strom"""
+
+    def __init__(self, default, name):
+        self._default = default
+        self._name = name
+
+    def _current(self):
+        job = _current_job.get()
+        if job is None:
+            return self._default
+        if job.cancelled.is_set():
+            raise JobCancelled()
+        return getattr(job, self._name)
+
+    def write(self, text):
+        job = _current_job.get()
+        try:
+            return self._current().write(text)
+        except (OSError, ValueError):
+            if job is None:
+                raise
+            job.cancel()         # Verbindung weg → Auftrag abbrechen
+            raise JobCancelled()
+
+    def __getattr__(self, name):
+        return getattr(self._current(), name)
+
+    def __iter__(self):
+        return iter(self._current())
+
+
+def inherit_job_context():
+    """Threads laufen im Kontext des startenden Threads (wie ab Python 3.14 mit thread_inherit_context)"""
+    start = threading.Thread.start
+
+    def start_in_context(thread):
+        if _current_job.get() is not None:
+            context = contextvars.copy_context()
+            run = thread.run
+            thread.run = lambda: context.run(run)
+        start(thread)
+
+    threading.Thread.start = start_in_context
+
+
+class FrameReader(io.RawIOBase):
+    """stdin eines Auftrags: ein Thread liest die Blöcke von der Verbindung in eine Queue; endet die Verbindung
+    vor dem EOF-Block oder danach, solange der Auftrag läuft, wird er abgebrochen"""
+
+    def __init__(self, rfile):
+        self._rfile = rfile
+        self._chunks = queue.Queue()
+        self._buffer = b""
+        self._eof = False
+        self.job = None
+
+    def pump(self):
+        try:
+            while True:
+                size = self._rfile.read(FRAME.size)
+                if len(size) < FRAME.size:
+                    break
+                (length,) = FRAME.unpack(size)
+                if length == 0:
+                    self._chunks.put(b"")
+                    continue             # Weiterlesen: das nächste Ende der Verbindung ist ein Abbruch
+                data = self._rfile.read(length)
+                if len(data) < length:
+                    break
+                self._chunks.put(data)
+        except (OSError, ValueError):
+            pass
+        self._chunks.put(b"")
+        if self.job is not None:
+            self.job.cancel()
+
+    def readable(self):
+        return True
+
+    def readinto(self, buffer):
+        if not self._buffer and not self._eof:
+            self._buffer = self._chunks.get()
+            self._eof = not self._buffer
+        n = min(len(buffer), len(self._buffer))
+        buffer[:n] = self._buffer[:n]
+        self._buffer = self._buffer[n:]
+        return n
+
+
+# -----------------------------------------------------------------------------------------------------------
+# Host
+# -----------------------------------------------------------------------------------------------------------
+class JobHandler(socketserver.StreamRequestHandler):
+    def handle(self):
+        header = json.loads(self.rfile.readline().decode("utf-8"))
+        if header.get("command") == "status":
+            self.wfile.write(json.dumps(self.server.manager.report()).encode("utf-8") + b"\n")
+            return
+        script = header.get("script")
+        if script not in SCRIPTS:
+            self.wfile.write(f"Unbekanntes Skript: {script}\n".encode("utf-8") + EXIT_PREFIX + b'{"code": 2}\n')
+            return
+        stdin = FrameReader(self.rfile)
+        threading.Thread(target=stdin.pump, daemon=True).start()
+        code = self.server.run(script, header.get("argv", []), stdin, self.wfile)
+        try:
+            self.wfile.write(EXIT_PREFIX + json.dumps({"code": code}).encode("utf-8") + b"\n")
+            self.wfile.flush()
+        except OSError:
+            pass
+        # Lesen beenden, damit der Block-Thread rfile freigibt (finish() schließt es)
+        try:
+            self.request.shutdown(socket.SHUT_RD)
+        except OSError:
+            pass
+
+
+class ModelHost(socketserver.ThreadingTCPServer):
+    daemon_threads = True
+    allow_reuse_address = True
+
+    def __init__(self, port, manager):
+        super().__init__((HOST, port), JobHandler)
+        self.manager = manager
+        self.slots = {script: threading.Lock() for script in SCRIPTS}
+        self.jobs = 0
+
+    def run(self, script, argv, reader, wfile):
+        kind = SCRIPTS[script]
+        self.manager.expect(kind, +1)
+        with self.slots[script]:
+            self.manager.expect(kind, -1)
+            self.jobs += 1
+            number = self.jobs
+            started = time.perf_counter()
+            log(f"Auftrag {number}: {script} {' '.join(argv)}")
+            stdout = io.TextIOWrapper(wfile, encoding="utf-8", line_buffering=True)
+            stdin = io.TextIOWrapper(io.BufferedReader(reader), encoding="utf-8")
+            job = Job(stdin, stdout)
+            context = contextvars.copy_context()
+            context.run(_current_job.set, job)
+            reader.job = job
+            code = context.run(self._execute, job, script, argv)
+            log(f"Auftrag {number} {'abgebrochen' if job.cancelled.is_set() else 'beendet'} "
+                f"(Exit {code}, {time.perf_counter() - started:.1f} s)")
+            return code
+
+    def _execute(self, job, script, argv):
+        code = 0
+        try:
+            try:
+                if job.cancelled.is_set():
+                    raise JobCancelled()  # Client schon vor dem Start des Auftrags weg
+                importlib.import_module(script).main(argv)
+            finally:
+                job.finish()
+        except SystemExit as e:
+            code = e.code if isinstance(e.code, int) else (0 if e.code is None else 1)
+        except JobCancelled:
+            code = 1
+        except Exception:
+            traceback.print_exc(file=job.stdout)
+            code = 1
+        finally:
+            self.manager.release_owner(script)
+            try:
+                job.stdout.detach()       # Schreibt den Rest und gibt die Verbindung für @@EXIT frei
+            except (OSError, ValueError):
+                code = code or 1          # Client hat die Verbindung getrennt
+            job.stdin.detach()
+        return code
+
+
+def sweep(manager):
+    while True:
+        time.sleep(SWEEP_INTERVAL_SEC)
+        manager.sweep()
+
+
+def serve(args):
+    manager = ResidencyManager(budget_mb=args.budget_mb, cpu_budget_mb=args.cpu_budget_mb,
+                               idle_offload_sec=args.idle_offload, idle_unload_sec=args.idle_unload,
+                               reserve_mb=args.reserve_mb)
+    activate(manager)
+    sys.stdout = JobStream(sys.stdout, "stdout")
+    sys.stdin = JobStream(sys.stdin, "stdin")
+    inherit_job_context()
+    threading.Thread(target=sweep, args=(manager,), daemon=True).start()
+
+    with ModelHost(args.port, manager) as server:
+        budget = "unbegrenzt (keine GPU)" if manager.budget_mb == float("inf") else f"{manager.budget_mb:.0f} MB"
+        log(f"Bereit auf {HOST}:{args.port}, VRAM-Budget {budget}")
+        server.serve_forever()
+
+
+# -----------------------------------------------------------------------------------------------------------
+# Client
+# -----------------------------------------------------------------------------------------------------------
+def connect(port):
+    return socket.create_connection((HOST, port), timeout=5)
+
+
+def run(args):
+    script_path = os.path.expanduser(args.script)
+    script = os.path.splitext(os.path.basename(script_path))[0]
+    try:
+        if script not in SCRIPTS:
+            raise ConnectionRefusedError(f"{script} wird nicht gehostet")
+        conn = connect(args.port)
+    except OSError as e:
+        # Kein Host (oder nicht gehostetes Skript) → wie bisher direkt ausführen
+        log(f"Kein Modell-Host erreichbar ({e}) – starte {script_path} direkt")
+        os.execv(sys.executable, [sys.executable, script_path, *args.argv])
+    conn.settimeout(None)
+    conn.sendall(json.dumps({"command": "run", "script": script, "argv": args.argv}).encode("utf-8") + b"\n")
+
+    def forward_stdin():
+        # Blöcke statt Halbschließen: so bleibt das Verbindungsende dem Abbruch vorbehalten
+        try:
+            source = sys.stdin.buffer
+            while True:
+                data = source.read1(CHUNK_SIZE)
+                conn.sendall(FRAME.pack(len(data)) + data)
+                if not data:
+                    break
+        except OSError:
+            pass
+
+    threading.Thread(target=forward_stdin, daemon=True).start()
+
+    code = 1                             # Verbindung ohne @@EXIT beendet = Host abgestürzt
+    output = sys.stdout.buffer
+    for line in conn.makefile("rb"):
+        if line.startswith(EXIT_PREFIX):
+            code = json.loads(line[len(EXIT_PREFIX):])["code"]
+            break
+        output.write(line)
+        output.flush()
+    sys.exit(code)
+
+
+def status(args):
+    try:
+        with connect(args.port) as conn:
+            conn.sendall(json.dumps({"command": "status"}).encode("utf-8") + b"\n")
+            print(conn.makefile("rb").readline().decode("utf-8").strip())
+    except OSError as e:
+        log(f"Kein Modell-Host erreichbar: {e}")
+        sys.exit(1)
+
+
+# ────────────────────────────────────────────────
+# Starte Hauptprogramm
+# ────────────────────────────────────────────────
+def main():
+    parser = argparse.ArgumentParser(description="Modell-Host: transcribe.py/summarize.py mit geladen bleibenden Modellen.")
+    parser.add_argument('--port', type=int, default=PORT, help=f"TCP-Port auf 127.0.0.1 (default: MODEL_HOST_PORT bzw. {PORT})")
+    commands = parser.add_subparsers(dest="command", required=True)
+
+    serve_parser = commands.add_parser("serve", help="Host starten")
+    serve_parser.add_argument('--budget-mb', type=float, default=None,
+                              help=f"VRAM-Budget für Modelle in MB (default: Gerätespeicher − {VRAM_RESERVE_MB} MB)")
+    serve_parser.add_argument('--reserve-mb', type=float, default=VRAM_RESERVE_MB,
+                              help=f"Ohne --budget-mb: frei gehaltener VRAM in MB (default: {VRAM_RESERVE_MB})")
+    serve_parser.add_argument('--cpu-budget-mb', type=float, default=CPU_BUDGET_MB,
+                              help=f"Höchstens so viel ausgelagerte Gewichte im RAM (default: {CPU_BUDGET_MB})")
+    serve_parser.add_argument('--idle-offload', type=float, default=IDLE_OFFLOAD_SEC,
+                              help=f"Sekunden Leerlauf bis zum Auslagern in den RAM, 0 = nie (default: {IDLE_OFFLOAD_SEC})")
+    serve_parser.add_argument('--idle-unload', type=float, default=IDLE_UNLOAD_SEC,
+                              help=f"Sekunden Leerlauf bis zum Entladen, 0 = nie (default: {IDLE_UNLOAD_SEC})")
+
+    run_parser = commands.add_parser("run", help="Skript über den Host ausführen")
+    run_parser.add_argument('script', help="Pfad des Skripts (transcribe.py oder summarize.py)")
+    run_parser.add_argument('argv', nargs=argparse.REMAINDER, help="Argumente des Skripts")
+
+    commands.add_parser("status", help="Residenz-Zähler als JSON ausgeben")
+
+    args = parser.parse_args()
+    {"serve": serve, "run": run, "status": status}[args.command](args)
+
+
+if __name__ == "__main__":
+    try:
+        main()
+    except KeyboardInterrupt:
+        sys.exit(130)
@@ -0,0 +1,274 @@
+# ------------------------------------------------------------------------------------------------------------------------------------
+# model_residency.py
+#
+# VRAM-bewusste Modell-Residenz für den Modell-Host (model_host.py)
+# large-v3 (int8_float16) und Llama-3.1-8B-CT2 passen nicht zuverlässig gleichzeitig in den VRAM. Statt pro Lauf zu laden
+# und wieder freizugeben, hält der Manager die Modelle in einem langlebigen Prozess und verdrängt nur bei Bedarf:
+#   - Budget:    Summe der VRAM-Belegung aller Modelle auf der GPU (gemessen beim Laden über nvidia-smi, sonst Schätzung)
+#   - Verdrängen: nur Modelle, die gerade kein Auftrag benutzt; zuerst die, für die keine Aufträge warten
+#                (Warteschlangen-Mix), dann die am längsten unbenutzten
+#   - Auslagern: CTranslate2 kann die Gewichte in den RAM verschieben (unload_model(to_cpu=True)) und später ohne
+#                Neuladen von der Platte zurückholen (load_model()) – vollständig entladen nur, wenn das RAM-Budget
+#                nicht reicht oder das Modell sehr lange unbenutzt ist
+#   - Parallel:  Laden/Zurückholen läuft außerhalb der Manager-Sperre; unter der Sperre wird nur der Platz reserviert
+#                (Zustand "loading") und danach das Ergebnis eingetragen. Weitere Anfragen für dasselbe Modell warten auf
+#                dessen Ladevorgang, verschiedene Modelle laden gleichzeitig (z. B. Entwurfsmodell und large-v3)
+#   - Messwerte: Laden, Zurückholen, Auslagern und Entladen je Modell (Anzahl und Sekunden) → report()
+#
+# Ohne aktiven Manager (normaler Skript-Aufruf) ändert sich nichts: transcribe.py und summarize.py laden wie bisher selbst.
+# Muss wie instrumentation.py neben den Skripten liegen (WSL: /home/tom/model_residency.py).
+# ------------------------------------------------------------------------------------------------------------------------------------
+
+import gc
+import sys
+import time
+import threading
+
+from instrumentation import cuda_memory
+
+VRAM_RESERVE_MB = 1024                   # Bleibt frei für Aktivierungen, Beam-Puffer und andere Prozesse
+CPU_BUDGET_MB = 16384                    # Höchstens so viel ausgelagerte Gewichte im RAM
+IDLE_OFFLOAD_SEC = 300                   # Unbenutzt seit … → in den RAM auslagern (0 = nie)
+IDLE_UNLOAD_SEC = 1800                   # Unbenutzt seit … → vollständig entladen (0 = nie)
+
+_active = None
+
+
+def activate(manager):
+    """Setzt den Manager, den load_model_fast_whisper()/load_summarizer() verwenden (nur im Modell-Host)"""
+    global _active
+    _active = manager
+
+
+def active_manager():
+    return _active
+
+
+def device_used_mb():
+    cuda = cuda_memory()
+    return cuda.get("deviceUsedMb") if cuda else None
+
+
+class ResidentModel:
+    """Ein verwaltetes Modell: handle = das, was der Lader liefert; ct2 = das CTranslate2-Objekt darin"""
+    __slots__ = ('key', 'kind', 'handle', 'ct2', 'vram_mb', 'state', 'ready', 'owners', 'last_used',
+                 'loads', 'load_seconds', 'restores', 'restore_seconds', 'offloads', 'unloads', 'hits')
+
+    def __init__(self, key, kind):
+        self.key = key
+        self.kind = kind
+        self.handle = None
+        self.ct2 = None
+        self.vram_mb = 0.0
+        self.state = "unloaded"              # "gpu" | "loading" | "cpu" (ausgelagert) | "unloaded"
+        self.ready = None                    # Event, solange state == "loading"
+        self.owners = set()                  # Skripte, die das Modell gerade benutzen
+        self.last_used = time.time()
+        self.loads = 0
+        self.load_seconds = 0.0
+        self.restores = 0
+        self.restore_seconds = 0.0
+        self.offloads = 0
+        self.unloads = 0
+        self.hits = 0
+
+    def idle_seconds(self):
+        return 0.0 if self.owners else time.time() - self.last_used
+
+    def to_dict(self):
+        return {
+            "key": self.key, "kind": self.kind, "state": self.state, "vramMb": round(self.vram_mb, 1),
+            "inUse": sorted(self.owners), "idleSeconds": round(self.idle_seconds(), 1),
+            "loads": self.loads, "loadSeconds": round(self.load_seconds, 2),
+            "restores": self.restores, "restoreSeconds": round(self.restore_seconds, 2),
+            "offloads": self.offloads, "unloads": self.unloads, "hits": self.hits,
+        }
+
+
+class ResidencyManager:
+    """Hält Modelle geladen, solange das VRAM-Budget reicht, und verdrängt nach Leerlauf und Warteschlange"""
+
+    def __init__(self, budget_mb=None, cpu_budget_mb=CPU_BUDGET_MB, idle_offload_sec=IDLE_OFFLOAD_SEC,
+                 idle_unload_sec=IDLE_UNLOAD_SEC, reserve_mb=VRAM_RESERVE_MB):
+        if budget_mb is None:
+            cuda = cuda_memory()
+            total = cuda.get("deviceTotalMb") if cuda else None
+            budget_mb = total - reserve_mb if total else float("inf")
+        self.budget_mb = budget_mb
+        self.cpu_budget_mb = cpu_budget_mb
+        self.idle_offload_sec = idle_offload_sec
+        self.idle_unload_sec = idle_unload_sec
+        self.lock = threading.RLock()
+        self.models = {}                     # key → ResidentModel (auch entladene, damit die Zähler erhalten bleiben)
+        self.pending = {}                    # kind → Anzahl wartender Aufträge
+        self.loading = 0                     # Laufende Ladevorgänge (für die VRAM-Messung)
+        self.load_seq = 0
+
+    # -------------------------------------------------------------------------
+    # Belegung
+    # -------------------------------------------------------------------------
+    def gpu_mb(self):
+        # Ladende Modelle zählen mit ihrer Reservierung, damit parallele Ladevorgänge das Budget nicht doppelt vergeben
+        return sum(model.vram_mb for model in self.models.values() if model.state in ("gpu", "loading"))
+
+    def cpu_mb(self):
+        return sum(model.vram_mb for model in self.models.values() if model.state == "cpu")
+
+    def expect(self, kind, delta):
+        """Warteschlangen-Mix: delta = +1, wenn ein Auftrag für dieses Modell wartet, -1, wenn er startet"""
+        with self.lock:
+            self.pending[kind] = max(0, self.pending.get(kind, 0) + delta)
+
+    # -------------------------------------------------------------------------
+    # Benutzen und freigeben
+    # -------------------------------------------------------------------------
+    def acquire(self, key, loader, owner, kind=None, estimate_mb=0.0, ct2=lambda handle: handle):
+        """
+        Liefert das Modell zu key – von der GPU (Treffer), aus dem RAM zurückgeholt oder über loader() neu geladen.
+        Vorher wird im Budget Platz gemacht. Das Modell bleibt bis release()/release_owner() vor Verdrängung geschützt.
+        Laden und Zurückholen laufen ohne Manager-Sperre; wer dasselbe Modell gleichzeitig anfordert, wartet darauf.
+        """
+        while True:
+            with self.lock:
+                model = self.models.get(key)
+                if model is None:
+                    model = self.models[key] = ResidentModel(key, kind or key)
+
+                if model.state == "gpu":
+                    model.hits += 1
+                    model.owners.add(owner)
+                    model.last_used = time.time()
+                    return model.handle
+                if model.state != "loading":
+                    # Reservieren: Platz machen, Zustand "loading" – ab hier verdrängt und lädt niemand sonst dieses Modell
+                    self._make_room(model.vram_mb or estimate_mb, exclude=model)
+                    restore = model.state == "cpu"
+                    model.vram_mb = model.vram_mb or estimate_mb
+                    model.state = "loading"
+                    model.ready = ready = threading.Event()
+                    model.owners.add(owner)
+                    self.loading += 1
+                    self.load_seq += 1
+                    seq = self.load_seq
+                    overlapped = self.loading > 1
+                    break
+                ready = model.ready
+            ready.wait()
+
+        started = time.perf_counter()
+        try:
+            if restore:
+                model.ct2.load_model()
+            else:
+                used_before = device_used_mb()
+                handle = loader()
+                handle_ct2 = ct2(handle)
+                used_after = device_used_mb()
+        except BaseException:
+            with self.lock:
+                model.state = "cpu" if restore else "unloaded"
+                model.owners.discard(owner)
+                model.ready = None
+                self.loading -= 1
+            ready.set()
+            raise
+
+        seconds = time.perf_counter() - started
+        with self.lock:
+            if restore:
+                model.restores += 1
+                model.restore_seconds += seconds
+                print(f"[RESIDENCY] {key} aus dem RAM zurückgeholt ({seconds:.1f} s)", file=sys.stderr)
+            else:
+                model.handle = handle
+                model.ct2 = handle_ct2
+                # Geräte-Differenz ist nur aussagekräftig, wenn währenddessen nichts anderes geladen wurde
+                overlapped = overlapped or self.load_seq != seq
+                if used_before is not None and used_after is not None and not overlapped:
+                    model.vram_mb = max(0.0, used_after - used_before)
+                model.loads += 1
+                model.load_seconds += seconds
+                print(f"[RESIDENCY] {key} geladen ({seconds:.1f} s, {model.vram_mb:.0f} MB)", file=sys.stderr)
+            model.state = "gpu"
+            model.ready = None
+            model.last_used = time.time()
+            self.loading -= 1
+        ready.set()
+        return model.handle
+
+    def release(self, handle, owner):
+        """Modell bleibt geladen, ist aber ab jetzt verdrängbar; False, wenn handle nicht verwaltet wird"""
+        with self.lock:
+            for model in self.models.values():
+                if model.handle is handle:
+                    model.owners.discard(owner)
+                    model.last_used = time.time()
+                    return True
+        return False
+
+    def release_owner(self, owner):
+        """Nach Ende eines Auftrags: alles freigeben, was das Skript nicht selbst freigegeben hat"""
+        with self.lock:
+            for model in self.models.values():
+                if owner in model.owners:
+                    model.owners.discard(owner)
+                    model.last_used = time.time()
+
+    # -------------------------------------------------------------------------
+    # Verdrängen
+    # -------------------------------------------------------------------------
+    def _make_room(self, needed_mb, exclude=None):
+        while self.gpu_mb() + needed_mb > self.budget_mb:
+            candidates = [model for model in self.models.values()
+                          if model.state == "gpu" and not model.owners and model is not exclude and model.vram_mb > 0]
+            if not candidates:
+                print(f"[RESIDENCY] ⚠️ VRAM-Budget {self.budget_mb:.0f} MB überschritten – alle Modelle in Benutzung",
+                      file=sys.stderr)
+                return
+            # Zuerst Modelle ohne wartende Aufträge, unter diesen das am längsten unbenutzte
+            victim = min(candidates, key=lambda model: (self.pending.get(model.kind, 0), model.last_used))
+            self._evict(victim)
+
+    def _evict(self, model, unload=False):
+        if model.state == "gpu" and not unload and self.cpu_mb() + model.vram_mb <= self.cpu_budget_mb:
+            model.ct2.unload_model(to_cpu=True)
+            model.state = "cpu"
+            model.offloads += 1
+            print(f"[RESIDENCY] {model.key} in den RAM ausgelagert", file=sys.stderr)
+            return
+        if hasattr(model.ct2, "unload_model"):
+            model.ct2.unload_model()
+        model.handle = model.ct2 = None
+        model.state = "unloaded"
+        model.unloads += 1
+        gc.collect()
+        print(f"[RESIDENCY] {model.key} entladen", file=sys.stderr)
+
+    def sweep(self):
+        """Leerlauf-Regeln; wird vom Modell-Host periodisch aufgerufen"""
+        with self.lock:
+            for model in self.models.values():
+                if model.owners or model.state in ("unloaded", "loading") or self.pending.get(model.kind, 0):
+                    continue
+                idle = model.idle_seconds()
+                if self.idle_unload_sec and idle >= self.idle_unload_sec:
+                    self._evict(model, unload=True)
+                elif self.idle_offload_sec and idle >= self.idle_offload_sec and model.state == "gpu":
+                    self._evict(model)
+
+    # -------------------------------------------------------------------------
+    # Messwerte
+    # -------------------------------------------------------------------------
+    def report(self):
+        with self.lock:
+            models = [model.to_dict() for model in self.models.values()]
+            return {
+                "budgetMb": None if self.budget_mb == float("inf") else round(self.budget_mb, 1),
+                "gpuMb": round(self.gpu_mb(), 1),
+                "cpuMb": round(self.cpu_mb(), 1),
+                "pending": dict(self.pending),
+                "swaps": sum(model["restores"] + model["offloads"] + model["unloads"] + max(0, model["loads"] - 1)
+                             for model in models),
+                "loadSeconds": round(sum(model["loadSeconds"] + model["restoreSeconds"] for model in models), 2),
+                "models": models,
+            }
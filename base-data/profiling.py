@@ -0,0 +1,132 @@
+# ------------------------------------------------------------------------------------------------------------------------------------
+# profiling.py
+#
+# Profiling-Modus (--profile) für transcribe.py und summarize.py
+# Je Pipeline-Stufe (load, decode, format, generate, save, ...) laufen zwei Profiler parallel:
+#   - Sampling: ein Hintergrund-Thread liest alle SAMPLE_INTERVAL Sekunden den Stack des Haupt-Threads
+#     (sys._current_frames) → Wandzeit inkl. C-Aufrufen (CT2-Dekodierung, VAD, Datei-I/O auf /mnt/d)
+#     → <name>_profile.collapsed im Collapsed-Stack-Format (flamegraph.pl, speedscope, inferno)
+#   - cProfile: exakte Aufrufzahlen und Eigenzeiten der Python-Funktionen (z. B. wrap_text)
+#     → Top-N-Hotspots je Stufe in <name>_profile.txt
+# cProfile kostet bei vielen kleinen Python-Aufrufen spürbar Laufzeit – nur für die Fehlersuche einschalten.
+#
+# Wird über RunRecorder(profiler=StageProfiler()) aktiviert; muss neben den Skripten liegen (WSL: /home/tom/profiling.py).
+# ------------------------------------------------------------------------------------------------------------------------------------
+
+import os
+import sys
+import cProfile
+import pstats
+import threading
+from collections import Counter
+from contextlib import contextmanager
+
+SAMPLE_INTERVAL = 0.005                  # Sekunden zwischen zwei Stack-Samples (200 Hz)
+TOP_N = 15                               # Anzahl Hotspots je Stufe
+COLLAPSED_SUFFIX = "_profile.collapsed"  # <name>.txt → <name>_profile.collapsed
+SUMMARY_SUFFIX = "_profile.txt"          # <name>.txt → <name>_profile.txt
+PROFILE_SUFFIXES = (COLLAPSED_SUFFIX, SUMMARY_SUFFIX)
+
+
+def _frame_label(code):
+    # ";" trennt im Collapsed-Format die Stack-Ebenen und darf im Namen nicht vorkommen
+    return f"{code.co_name} ({os.path.basename(code.co_filename)}:{code.co_firstlineno})".replace(";", ":")
+
+
+def profile_paths(output_path):
+    """(collapsed, summary) zu einer Ausgabedatei"""
+    stem = os.path.splitext(output_path)[0]
+    return stem + COLLAPSED_SUFFIX, stem + SUMMARY_SUFFIX
+
+
+class StageProfiler:
+    """Sampling- und cProfile-Messung je Stufe; stage() wird von RunRecorder.stage() aufgerufen"""
+
+    def __init__(self, interval=SAMPLE_INTERVAL, top=TOP_N):
+        self.interval = interval
+        self.top = top
+        self.stacks = Counter()          # "stufe;äußerer;...;innerer Frame" → Anzahl Samples
+        self.stats = {}                  # stufe → pstats.Stats
+
+    @contextmanager
+    def stage(self, name):
+        thread_id = threading.get_ident()
+        stop = threading.Event()
+        sampler = threading.Thread(target=self._sample, args=(name, thread_id, stop), daemon=True)
+        profile = cProfile.Profile()
+        sampler.start()
+        profile.enable()
+        try:
+            yield
+        finally:
+            profile.disable()
+            stop.set()
+            sampler.join()
+            stats = pstats.Stats(profile)
+            if name in self.stats:
+                self.stats[name].add(stats)
+            else:
+                self.stats[name] = stats
+
+    def _sample(self, stage, thread_id, stop):
+        while not stop.wait(self.interval):
+            frame = sys._current_frames().get(thread_id)
+            stack = []
+            while frame is not None:
+                stack.append(_frame_label(frame.f_code))
+                frame = frame.f_back
+            if stack:
+                self.stacks[";".join([stage] + stack[::-1])] += 1
+
+    # -------------------------------------------------------------------------
+    # Auswertung
+    # -------------------------------------------------------------------------
+    def hotspots(self):
+        """stufe → Top-N Funktionen nach Eigenzeit (tottime) aus cProfile"""
+        result = {}
+        for stage, stats in self.stats.items():
+            entries = sorted(stats.stats.items(), key=lambda item: -item[1][2])[:self.top]
+            result[stage] = [
+                {"function": f"{func} ({os.path.basename(filename)}:{line})", "calls": calls,
+                 "tottime": round(tottime, 4), "cumtime": round(cumtime, 4)}
+                for (filename, line, func), (_, calls, tottime, cumtime, _) in entries
+            ]
+        return result
+
+    def samples_per_stage(self):
+        counts = Counter()
+        for stack, count in self.stacks.items():
+            counts[stack.split(";", 1)[0]] += count
+        return dict(counts)
+
+    def collapsed(self):
+        return "".join(f"{stack} {count}\n" for stack, count in sorted(self.stacks.items()))
+
+    def summary_text(self):
+        samples = self.samples_per_stage()
+        total_samples = sum(samples.values()) or 1
+        lines = [f"Sampling-Intervall: {self.interval * 1000:.1f} ms, {sum(samples.values())} Samples", ""]
+        for stage, entries in self.hotspots().items():
+            share = samples.get(stage, 0) / total_samples * 100
+            lines.append(f"═══ {stage}  ({samples.get(stage, 0)} Samples, {share:.1f} % der Wandzeit)")
+            lines.append(f"{'tottime':>10} {'cumtime':>10} {'calls':>10}  Funktion")
+            for entry in entries:
+                lines.append(f"{entry['tottime']:10.4f} {entry['cumtime']:10.4f} {entry['calls']:10d}  {entry['function']}")
+            lines.append("")
+        return "\n".join(lines)
+
+    def report(self):
+        """Kompakter Auszug für den Run-Report (ohne Stacks)"""
+        return {"intervalMs": self.interval * 1000, "samples": self.samples_per_stage(), "hotspots": self.hotspots()}
+
+    def save(self, output_path):
+        """Schreibt <name>_profile.collapsed und <name>_profile.txt neben die Ausgabe; gibt die Pfade zurück"""
+        collapsed_path, summary_path = profile_paths(output_path)
+        try:
+            with open(collapsed_path, "w", encoding="utf-8") as f:
+                f.write(self.collapsed())
+            with open(summary_path, "w", encoding="utf-8") as f:
+                f.write(self.summary_text())
+            return collapsed_path, summary_path
+        except OSError:
+            return None
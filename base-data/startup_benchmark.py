@@ -0,0 +1,123 @@
+# ------------------------------------------------------------------------------------------------------------------------------------
+# startup_benchmark.py
+#
+# Startzeit-Benchmark für transcribe.py und summarize.py
+# Misst mit "python -X importtime" die Importzeit beider Skripte und die Laufzeit von "--help".
+# Prüft, dass die schweren Abhängigkeiten (torch, transformers, ctranslate2, faster_whisper) beim Laden
+# NICHT importiert werden – sie gehören erst in den Inferenz-Pfad (load_model_fast_whisper / load_summarizer).
+# Exit-Code 1, wenn ein Budget überschritten oder ein schweres Modul geladen wurde.
+#
+# Aufruf: python startup_benchmark.py [--budget-ms 300] [--help-budget-ms 800] [--runs 5] [--top 10]
+# ------------------------------------------------------------------------------------------------------------------------------------
+
+import os
+import sys
+import re
+import argparse
+import subprocess
+import time
+
+SCRIPT_DIR = os.path.dirname(os.path.abspath(__file__))
+SCRIPTS = ("transcribe", "summarize")
+HEAVY_MODULES = ("torch", "transformers", "ctranslate2", "faster_whisper")
+IMPORT_BUDGET_MS = 300           # Budget für "import <skript>" (kumulativ, laut -X importtime)
+HELP_BUDGET_MS = 800             # Budget für "python <skript>.py --help" (Wandzeit inkl. Interpreter-Start)
+# Zeile von -X importtime: "import time:      self [us] |  cumulative | imported package"
+IMPORTTIME_RE = re.compile(r"^import time:\s+(\d+)\s+\|\s+(\d+)\s+\|(\s*)(\S+)$")
+
+def print_header(text):
+    print("\033[1;34m" + "═" * 120)
+    print("  " + text.center(76) + "  ")
+    print("═" * 120 + "\033[0m")
+
+def print_info(text):
+    print("\033[1;32m" + "→ " + text + "\033[0m")
+
+def print_error(text):
+    print("\033[1;31m" + "✖ " + text + "\033[0m")
+
+def print_success(text):
+    print("\033[1;32m" + "✔ " + text + "\033[0m")
+
+# -----------------------------------------------------------------------------------------------------------
+# "import <skript>" mit -X importtime ausführen → Liste (modul, self_us, cumulative_us, tiefe)
+# -----------------------------------------------------------------------------------------------------------
+def measure_imports(script):
+    result = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", f"import {script}"],
+        cwd=SCRIPT_DIR, capture_output=True, text=True
+    )
+    if result.returncode != 0:
+        raise RuntimeError(f"import {script} fehlgeschlagen:\n{result.stderr.strip()}")
+    entries = []
+    for line in result.stderr.splitlines():
+        match = IMPORTTIME_RE.match(line)
+        if match:
+            self_us, cumulative_us, indent, module = match.groups()
+            entries.append((module, int(self_us), int(cumulative_us), len(indent) // 2))
+    return entries
+
+# -----------------------------------------------------------------------------------------------------------
+# "python <skript>.py --help" mehrfach starten, beste Wandzeit in ms
+# -----------------------------------------------------------------------------------------------------------
+def measure_help(script, runs):
+    best = None
+    for _ in range(runs):
+        start = time.perf_counter()
+        subprocess.run([sys.executable, f"{script}.py", "--help"], cwd=SCRIPT_DIR,
+                       stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL)
+        elapsed = (time.perf_counter() - start) * 1000
+        best = elapsed if best is None else min(best, elapsed)
+    return best
+
+def report_script(script, args):
+    print_info(f"{script}.py")
+    entries = measure_imports(script)
+    own = next((e for e in entries if e[0] == script), None)
+    import_ms = own[2] / 1000 if own else 0.0
+    heavy = sorted({e[0].split(".")[0] for e in entries} & set(HEAVY_MODULES))
+
+    print_info(f"    .. import {script}:  {import_ms:8.1f} ms  (Budget {args.budget_ms} ms)")
+    print_info(f"    .. Top {args.top} Importe nach Eigenzeit:")
+    for module, self_us, cumulative_us, depth in sorted(entries, key=lambda e: -e[1])[:args.top]:
+        print(f"       {self_us / 1000:8.1f} ms self  {cumulative_us / 1000:8.1f} ms kumulativ  {module}")
+
+    help_ms = measure_help(script, args.runs)
+    print_info(f"    .. {script}.py --help: {help_ms:8.1f} ms  (Budget {args.help_budget_ms} ms, bester von {args.runs})")
+
+    ok = True
+    if heavy:
+        print_error(f"    Schwere Module beim Laden importiert: {', '.join(heavy)}")
+        ok = False
+    if import_ms > args.budget_ms:
+        print_error(f"    Importzeit {import_ms:.1f} ms überschreitet Budget {args.budget_ms} ms")
+        ok = False
+    if help_ms > args.help_budget_ms:
+        print_error(f"    --help {help_ms:.1f} ms überschreitet Budget {args.help_budget_ms} ms")
+        ok = False
+    print()
+    return ok
+
+def main():
+    parser = argparse.ArgumentParser(description="Startzeit-Benchmark (Importzeit, --help) für transcribe.py und summarize.py")
+    parser.add_argument('--budget-ms', type=float, default=IMPORT_BUDGET_MS,
+                        help=f"Budget für die Importzeit je Skript in ms (default: {IMPORT_BUDGET_MS})")
+    parser.add_argument('--help-budget-ms', type=float, default=HELP_BUDGET_MS,
+                        help=f"Budget für '<skript>.py --help' in ms (default: {HELP_BUDGET_MS})")
+    parser.add_argument('--runs', type=int, default=5, help="Wiederholungen für --help (default: 5)")
+    parser.add_argument('--top', type=int, default=10, help="Anzahl der langsamsten Importe in der Ausgabe (default: 10)")
+    parser.add_argument('scripts', nargs='*', default=list(SCRIPTS), help="Zu prüfende Skripte (default: alle)")
+    args = parser.parse_args()
+
+    print("")
+    print_header("Startzeit-Benchmark")
+    results = [report_script(script, args) for script in args.scripts]
+
+    if all(results):
+        print_success("Alle Startzeit-Budgets eingehalten.")
+    else:
+        print_error("Startzeit-Budget verfehlt.")
+        sys.exit(1)
+
+if __name__ == "__main__":
+    main()
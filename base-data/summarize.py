@@ -12,14 +12,18 @@ import re                                #    Reguläre Ausdrücke – Textverar
                                          # Externe Prozesse starten (ffprobe für MP3-Metadaten ohne mutagen-Warnings)
 import argparse  # Für Kommandozeilen-Argumente
 import subprocess                        #    ffprobe aufrufen, um Dauer, Bitrate und Sample-Rate der MP3-Datei zu lesen
-                                         # Kern-Bibliotheken für Audio-Transkription und LLM-Inferenz
-from transformers import AutoTokenizer   #    Automatisches Laden des Tokenizers für das Summarization-Modell
-import ctranslate2                       #    Sehr schnelle C++-basierte Inferenz-Engine für quantisierte Modelle (CT2-Format)
+                                         # Kern-Bibliotheken für LLM-Inferenz (ctranslate2, transformers) werden erst bei
+                                         #    Bedarf importiert – --help und Fehlaufrufe starten ohne Sekunden Importzeit,
+                                         #    torch wird gar nicht mehr benötigt (siehe startup_benchmark.py)
                                          # Speichermanagement – wichtig bei GPU-Nutzung mit mehreren großen Modellen ---
 import gc                                #    Manuelles Auslösen des Garbage Collectors (Speicher freigeben)
-import torch                             #    PyTorch-Backend – benötigt für torch.cuda.empty_cache() (GPU-Speicher leeren)
 from datetime import datetime
 import textwrap                          # Für Umbruch
+from transcript_store import TranscriptStore, segment_text  # Gemeinsamer Transkript-Parser (Segmente mit Start/Ende, Header)
+import json                              # Stream-Modus: Segmente/Ergebnisse als JSON-Zeilen
+from instrumentation import RunRecorder, cuda_memory, describe_cuda_memory, query_nvidia_smi  # Messwerte je Stufe (Run-Report)
+from model_residency import active_manager  # Modell-Host: Llama bleibt zwischen Aufträgen geladen
+from tracing import span, start_script_trace  # --trace-id: Spans je Stufe und Block als @@SPAN (Zeitleiste in main.py)
 
 # -----------------------------------------------------------------------------------------------------------
 # Diverse Parameter
@@ -27,6 +31,41 @@ import textwrap                          # Für Umbruch
 AUDIO_DIR = "/mnt/d/Projekte_KI/pyenv_1_transcode_durchgabe/audio"
 WRAP_WIDTH = 160  # Variable für Textumbruch (kann geändert werden)
 
+BLOCK_SIZE = 20                  # Segmente pro Block (50% Overlap zum nächsten Block)
+STREAM_PREFIX = "@@"             # Stream-Modus: Präfix für maschinenlesbare Zeilen (@@BLOCK {...})
+
+# Hierarchische Gesamtzusammenfassung (Map-Reduce über die Block-Überschriften)
+REDUCE_FAN_OUT = 8               # Anzahl Überschriften/Zusammenfassungen, die pro Gruppe zusammengefasst werden
+REDUCE_MAX_LEVELS = 3            # Maximale Anzahl Reduktionsebenen; die letzte Ebene fasst immer alles zu EINER Zusammenfassung
+REDUCE_MAX_LENGTH = 120          # Token-Limit pro Gruppen-Zusammenfassung (begrenzt die Größe der Gesamtzusammenfassung)
+
+# Dekodierung der Block-Überschriften
+#   "sentence": Generierung endet beim ersten Satzende-Token, verbotene Phrasen werden bereits im Decoder unterdrückt
+#               ("." zählt nur als Satzende, wenn davor keine Zahl und kein einzelner Buchstabe steht: "am 3. Oktober", "z. B." –
+#               solche Prompts werden in einem weiteren Batch fortgesetzt)
+#   "free":     bisheriges Verhalten – immer bis max_length generieren und danach per Regex abschneiden
+DECODE_MODE = "sentence"
+BLOCK_MAX_TOKENS = 60            # Token-Limit pro Block-Überschrift (Überschrift war 80 Zeichen, jetzt reduziert für GPU; --block-max-tokens)
+SENTENCE_END_STRINGS = ["!", "?", ".\n", ".\n\n", "!\n", "?\n", ".\"", "..."]   # Immer Satzende
+SENTENCE_SOFT_END_STRINGS = ["."]                                                # Satzende je nach Token davor
+BANNED_PHRASES = ["assistant", "Assistant", "here is", "Here is", "*", "**"]    # "system" räumt clean_summary() ab
+# Satzende für clean_summary(): wie beim Dekodieren kein Punkt nach Zahl oder einzelnem Buchstaben
+SENTENCE_END_RE = re.compile(r'(?<!\d)(?<!\b\w)[.!?]+(?=["»“]?(\s|$))')
+
+# Ausführung des Generators (GPU oder CPU mit mehreren Replikaten)
+#   inter_threads: Anzahl Replikate, die unabhängige Blöcke parallel generieren (auf CPU teilen sie sich die Gewichte)
+#   intra_threads: OpenMP-Threads pro Replikat
+LLAMA_MODEL_PATH = os.path.expanduser("~/Llama-3.1-8B-CT2_int8_float16")   # lokales Llama 3.1-8B CT2 (int8_float16)
+LLAMA_MIN_FREE_VRAM_GB = 9.0     # "auto" weicht auf CPU aus, wenn weniger VRAM frei ist (z. B. Whisper-Job belegt die GPU)
+LLAMA_VRAM_MB = 9000             # Geschätzter VRAM des Generators für den Modell-Host (model_residency.py), bis gemessen
+CPU_THREADS_PER_REPLICA = 4      # Richtwert für intra_threads, solange keine Kalibrierung (--calibrate-cpu) vorliegt
+CPU_CALIBRATION_PATH = os.path.join(os.path.dirname(os.path.abspath(__file__)), "cpu_calibration.json")
+CPU_CALIBRATION_MAX_TOKENS = 40  # Tokens je Prompt beim Kalibrieren (freie Dekodierung → gleiche Arbeit je Aufteilung)
+CALIBRATION_TEXT = ( "Zusammenfassen in einem Satz: Der Engel spricht zu dir über das Vertrauen in die göttliche Führung. "
+                     "Er erinnert dich daran, dass jeder Schritt auf deinem Weg begleitet ist und du die Liebe in dir "
+                     "wiederfinden kannst, wenn du still wirst und auf dein Herz hörst." )
+CPU_COMPUTE_TYPE = "int8"        # int8_float16 gibt es auf der CPU nicht
+
 # Farbige Terminal-Ausgabe (ANSI-Codes)
 def print_header(text):
     print("\033[1;34m" + "═" * 120)
@@ -47,14 +86,25 @@ def print_result_header():
     print(f"Transkript der mp3 Datei:")
     print("═" * 40 + "\033[0m")
 
+# Freier GPU-Speicher in GB über nvidia-smi (ohne torch); None, wenn nicht ermittelbar
+def cuda_free_memory_gb():
+    rows = query_nvidia_smi("gpu", "memory.free")
+    try:
+        return float(rows[0][0]) / 1024 if rows else None
+    except ValueError:
+        return None
+
+# Speicher nach einer Generierungswelle freigeben. CT2 verwaltet seinen VRAM selbst; nur falls torch
+# ohnehin geladen ist (z. B. durch eine Bibliothek), auch dessen Cache leeren – nie torch nur dafür importieren
+def release_memory():
+    gc.collect()
+    torch = sys.modules.get("torch")
+    if torch is not None and torch.cuda.is_available():
+        torch.cuda.empty_cache()
+
 # GPU-Speicher anzeigen
 def print_gpu_memory():
-    test=1
-    #if torch.cuda.is_available():
-    #    print_info("GPU-Speicherverbrauch:")
-    #    print(torch.cuda.memory_summary(abbreviated=True))
-    #else:
-    #    print_info("Keine CUDA-GPU verfügbar – läuft auf CPU")
+    print_info(f"  ..GPU-Speicher: {describe_cuda_memory(cuda_memory())}")
     
 # -----------------------------------------------------------------------------------------------------------
 # MP3-Details anzeigen (mit ffprobe statt mutagen, um Warnings zu vermeiden)  
@@ -156,157 +206,415 @@ def select_text_file(args):
     return input_path, output_path, base_name, mp3_duration
 
 # -----------------------------------------------------------------------------------------------------------
-# Summarize Transkription mit Llama-3-8B-CT2 (nur wenn -summary Flag gesetzt)
+# Generator-Konfiguration für den Host bestimmen
+#   device="auto": CUDA, wenn eine GPU mit genug freiem VRAM vorhanden ist, sonst CPU
+#   Auf der CPU werden die Kerne auf mehrere Replikate (inter_threads) zu je intra_threads Threads verteilt:
+#   explizit übergebene Werte (> 0) haben Vorrang, sonst die mit --calibrate-cpu gemessene Aufteilung
+#   (cpu_calibration.json je Kernzahl und Modell), sonst der Richtwert CPU_THREADS_PER_REPLICA.
 # -----------------------------------------------------------------------------------------------------------
-def summarize_transcription_llama(formatted_transcription, prompt_type, mp3_duration):
-    print_info(f"Starte summarize_transcription (Llama-3-8B-CT2)")
-    print_gpu_memory()  # ← GPU-Verbrauch vor dem Start anzeigen
-    
-    # Startzeit für Summary messen
-    start_time = datetime.now()
-    start_time_str = start_time.strftime("%H:%M:%S")
+def select_generator_config(device="auto", inter_threads=0, intra_threads=0):
+    import ctranslate2
+    if device in ("auto", "cuda") and ctranslate2.get_cuda_device_count() > 0:
+        free_gb = cuda_free_memory_gb()
+        if device == "cuda" or free_gb is None or free_gb >= LLAMA_MIN_FREE_VRAM_GB:
+            return dict(device="cuda", compute_type="default", inter_threads=max(1, inter_threads), intra_threads=max(0, intra_threads))
+        print_info(f"  ..nur {free_gb:.1f} GB VRAM frei (< {LLAMA_MIN_FREE_VRAM_GB} GB) – GPU belegt, verwende CPU")
+    elif device == "cuda":
+        print_error("Keine CUDA-GPU verfügbar – verwende CPU.")
+
+    return cpu_generator_config(inter_threads, intra_threads)
+
+def cpu_generator_config(inter_threads=0, intra_threads=0):
+    cores = os.cpu_count() or 1
+    if inter_threads <= 0 and intra_threads <= 0:
+        calibrated = load_cpu_calibration().get(cpu_calibration_key())
+        if calibrated:
+            inter_threads, intra_threads = calibrated["inter_threads"], calibrated["intra_threads"]
+    if inter_threads <= 0:
+        inter_threads = max(1, cores // (intra_threads if intra_threads > 0 else CPU_THREADS_PER_REPLICA))
+    if intra_threads <= 0:
+        intra_threads = max(1, cores // inter_threads)
+    return dict(device="cpu", compute_type=CPU_COMPUTE_TYPE, inter_threads=inter_threads, intra_threads=intra_threads)
+
+def cpu_calibration_key():
+    return f"{os.cpu_count() or 1}:{LLAMA_MODEL_PATH}:{CPU_COMPUTE_TYPE}"
+
+def load_cpu_calibration():
+    try:
+        with open(CPU_CALIBRATION_PATH, "r", encoding="utf-8") as f:
+            return json.load(f)
+    except (OSError, ValueError):
+        return {}
 
-    # CT2-Generator laden (nutzt CUDA, falls verfügbar)
-    print_info(f"  ..lade summarizer")
-    #model_path = os.path.expanduser("~/Llama-3-8B-CT2_int8")                            # lokales Llama 3.0-8B CT2 (int8)
-    #model_path = os.path.expanduser("~/Llama-3-8B-CT2_int8_float16")                    # lokales Llama 3.0-8B CT2 (int8_float16)
-    model_path = os.path.expanduser("~/Llama-3.1-8B-CT2_int8_float16")                   # lokales Llama 3.1-8B CT2 (int8_float16)
+# -----------------------------------------------------------------------------------------------------------
+# CPU-Kalibrierung (--calibrate-cpu): je Aufteilung inter × intra (Zweierpotenzen, alle Kerne belegt) eine Welle
+# aus `inter` Blöcken generieren, Tokens/s messen und die schnellste Aufteilung in cpu_calibration.json ablegen
+# -----------------------------------------------------------------------------------------------------------
+def cpu_split_candidates(cores):
+    splits, intra = [], 1
+    while intra <= cores:
+        splits.append((max(1, cores // intra), intra))
+        intra *= 2
+    if splits[-1][1] != cores:
+        splits.append((1, cores))
+    return splits
+
+def calibrate_cpu(tokenizer=None):
+    import ctranslate2
+    from transformers import AutoTokenizer
+    cores = os.cpu_count() or 1
+    tokenizer = tokenizer or AutoTokenizer.from_pretrained(LLAMA_MODEL_PATH)
+    system_content = get_system_content("durchgabe")
+    results = []
+    print_info(f"Kalibriere CPU-Aufteilung ({cores} Kerne, {CPU_CALIBRATION_MAX_TOKENS} Tokens je Block)")
+    for inter_threads, intra_threads in cpu_split_candidates(cores):
+        generator = ctranslate2.Generator(LLAMA_MODEL_PATH, device="cpu", compute_type=CPU_COMPUTE_TYPE,
+                                          inter_threads=inter_threads, intra_threads=intra_threads)
+        counts = []
+        started = datetime.now()
+        generate_summaries(generator, tokenizer, system_content, [CALIBRATION_TEXT] * inter_threads,
+                           max_length=CPU_CALIBRATION_MAX_TOKENS, decode_mode="free", token_counts=counts,
+                           replicas=inter_threads)
+        seconds = (datetime.now() - started).total_seconds()
+        tokens_per_second = sum(counts) / seconds if seconds > 0 else 0
+        print_info(f"    {inter_threads:3d} Replikat(e) × {intra_threads:3d} Threads: {tokens_per_second:7.1f} Tokens/s "
+                   f"({seconds:.1f} s)")
+        results.append((tokens_per_second, inter_threads, intra_threads))
+        del generator
+        release_memory()
+
+    tokens_per_second, inter_threads, intra_threads = max(results)
+    calibration = load_cpu_calibration()
+    calibration[cpu_calibration_key()] = {"inter_threads": inter_threads, "intra_threads": intra_threads,
+                                          "tokensPerSecond": round(tokens_per_second, 2),
+                                          "measured": datetime.now().isoformat(timespec="seconds")}
+    with open(CPU_CALIBRATION_PATH, "w", encoding="utf-8") as f:
+        json.dump(calibration, f, indent=2)
+    print_success(f"Schnellste Aufteilung: {inter_threads} Replikat(e) × {intra_threads} Threads → {CPU_CALIBRATION_PATH}")
+    return inter_threads, intra_threads
+
+def describe_generator_config(config):
+    if config["device"] == "cuda":
+        return "cuda"
+    return f"cpu ({config['inter_threads']} Replikat(e) × {config['intra_threads']} Threads, {config['compute_type']})"
 
-    device = "cuda"  # Versuche CUDA zuerst
-    try:
-        generator = ctranslate2.Generator(model_path, device="cuda")
-    except RuntimeError as e:
-        if "out of memory" in str(e).lower():
-            print_error("CUDA out of memory – Versuche CPU-Fallback.")
-            generator = ctranslate2.Generator(model_path, device="cpu")
-        else:
-            raise e
-    
-    print_gpu_memory()  # ← nach Modell-Laden
-    
-    # Tokenizer laden (lokal!)
-    print_info(f"  ..lade tokenizer")
-    #tokenizer = AutoTokenizer.from_pretrained("meta-llama/Meta-Llama-3-8B-Instruct")                # Llama Tokenizer 3.1-8B (remote)
-    #tokenizer = AutoTokenizer.from_pretrained(os.path.expanduser("~/Llama-3-8B-CT2_int8_float16"))  # Llama Tokenizer 3.1-8B CT2 (int8_float16)
-    tokenizer = AutoTokenizer.from_pretrained(os.path.expanduser("~/Llama-3.1-8B-CT2_int8_float16")) # Llama Tokenizer 3.1-8B CT2 (int8_float16)
-    
-    # Transkription in Blöcke aufteilen: EinBlock ist 20 Zeilen (block_size=20)
-    block_size=20
-    overlap_size = block_size // 2  # 50% Overlap, z.B. 10 Zeilen
-    print_info(f"  ..teile transkription in Blöcke (Blockgröße: {block_size} Zeilen, Overlap: {overlap_size})")
-    lines = formatted_transcription.split("\n")
-    header_end = lines.index("") + 1 if "" in lines else 7  # Dynamisch Header-Ende finden (Leerzeile)
-    content_lines = lines[header_end:]
-    blocks = []
-    for i in range(0, len(content_lines), block_size - overlap_size):
-        block = content_lines[i:i + block_size]
-        if block:
-            blocks.append(block)
-    enhanced = ""  # Wird später mit Transkription + Überschriften gefüllt
-    summaries = []  # Sammle alle Block-Überschriften für Gesamtzusammenfassung
-    
-    # Wähle den System-Prompt basierend auf prompt_type
-    if prompt_type == "newsletter":
-        system_content = ( "Du bist ein präziser Zusammenfasser. Antworte NUR mit EINEM kurzen Satz auf Deutsch. "
-                           "Kein Reasoning, keine Einleitung, kein Nachsatz, nichts anderes. Ende mit einem Punkt. "
-                           "KEIN Englisch, KEINE Sternchen, KEINE Wörter wie assistant oder here is. "
-                           "Es geht bei dem Text generell um spirituelle Botschaften an mehrere Menschen zu Weltgeschehen."
-                           "Verwende NIEMALS die 'Du'-Form, sondern stattdessen IMMER die 'Ihr'-Form."
-                           "Erkenne den Kontext der Botschaft an die Gruppe. Bleibe nah am Inhalt ohne Abhebung."
-        )
-    else:  # durchgabe
-        system_content = ( "Du bist ein präziser Zusammenfasser. Antworte NUR mit EINEM kurzen Satz auf Deutsch. "
-                           "Kein Reasoning, keine Einleitung, kein Nachsatz, nichts anderes. Ende mit einem Punkt. "
-                           "KEIN Englisch, KEINE Sternchen, KEINE Wörter wie assistant oder here is. "
-                           "Verwende die 'Du'-Form wo passend für persönliche Referenzen auf 'Seele der Liebe', "
-                           "aber variiere die Satzstruktur für natürliche Zusammenfassungen. "
-                           "Der Text ist eine spirituelle Beratung eines Engels an einen Menschen ('Du' als Adressat). "
-                           "Erkenne den Kontext der Botschaft an den Menschen. " 
-                           "Fasse den Rat des Engels präzise zusammen, bleibe nah am Inhalt ohne Abhebung."
-        )
+# -----------------------------------------------------------------------------------------------------------
+# Generierte Zusammenfassung bereinigen (nur die ersten max_sentences Sätze, ohne Artefakte)
+# -----------------------------------------------------------------------------------------------------------
+def clean_summary(summary_raw, max_sentences=1):
+    # Nur bis zum max_sentences-ten Satzende behalten und alles danach entfernen ("!" und "?" bleiben erhalten)
+    ends = [match.end() for match in SENTENCE_END_RE.finditer(summary_raw)]
+    if len(ends) >= max_sentences:
+        summary = summary_raw[:ends[max_sentences - 1]].strip()
+    else:
+        summary = summary_raw.strip()
+        if not summary.endswith(('.', '!', '?')):
+            summary += '.'
 
-    # ---------------------------------------------------------------------------------------------------------------
-    # 1. Blockweise Zusammenfassungen
-    # ---------------------------------------------------------------------------------------------------------------
-    print_info(f"  ..generiere Überschrift für jeden Block")
-    for block in blocks:
-        text = " ".join([re.sub(r'\[\d{2}:\d{2}:\d{2}\] ', '', l) for l in block if re.match(r'\[\d{2}:\d{2}:\d{2}\] ', l)])
-        #print_info(f"    .. block=\n{text}\n\n")
+    # Erweiterte Bereinigung: Entferne Fragmente, Artefakte, Englisch
+    #   "system" nur klein und als eigenes Wort (Rollen-Label) – "System" und "Nervensystem" sind normales Deutsch
+    summary = re.sub(r'\.?((?i:assistant|here is)|\*.*?\*|göttliche,|\bsystem\b).*', '', summary, flags=re.DOTALL).strip()
+
+    # Leerzeichen bereinigen
+    return re.sub(r'\s+', ' ', summary).strip()
+
+# -----------------------------------------------------------------------------------------------------------
+# Stop-Bedingungen für die Satz-Dekodierung aus dem Tokenizer ableiten
+#   end_token:          alle Einzel-Tokens, die ein Satzende darstellen können (plus EOS/<|eot_id|>), inkl. Punkt-Tokens
+#   soft_end:           Punkt-Tokens – endet die Generierung darauf und ist das Token davor eine Zahl oder ein
+#                       einzelner Buchstabe (Ordinalzahlen, Abkürzungen), war es kein Satzende (early_sentence_stop)
+#   suppress_sequences: Token-Folgen der verbotenen Phrasen (mit und ohne führendes Leerzeichen)
+# -----------------------------------------------------------------------------------------------------------
+_stop_conditions_cache = {}
+
+def single_tokens(tokenizer, strings):
+    tokens = []
+    for string in strings:
+        tokenized = tokenizer.tokenize(string)
+        if len(tokenized) == 1 and tokenized[0] not in tokens:
+            tokens.append(tokenized[0])
+    return tokens
+
+def early_sentence_stop(tokens, soft_end):
+    """True, wenn die generierten Tokens auf einem Punkt nach Zahl oder einzelnem Buchstaben enden ("am 3.", "z.")"""
+    if len(tokens) < 2 or tokens[-1] not in soft_end:
+        return False
+    word = tokens[-2].lstrip("Ġ▁ ")
+    return word.isdigit() or (len(word) == 1 and word.isalpha())
+
+def build_sentence_stop_conditions(tokenizer):
+    if id(tokenizer) in _stop_conditions_cache:
+        return _stop_conditions_cache[id(tokenizer)]
+
+    soft_end = set(single_tokens(tokenizer, SENTENCE_SOFT_END_STRINGS))
+    end_tokens = single_tokens(tokenizer, SENTENCE_END_STRINGS)
+    end_tokens += [token for token in sorted(soft_end) if token not in end_tokens]
+    for special in (tokenizer.eos_token, "<|eot_id|>"):
+        if special and special in tokenizer.get_vocab() and special not in end_tokens:
+            end_tokens.append(special)
+
+    suppress_sequences = []
+    for phrase in BANNED_PHRASES:
+        for variant in (phrase, " " + phrase):
+            tokens = tokenizer.tokenize(variant)
+            if tokens and tokens not in suppress_sequences:
+                suppress_sequences.append(tokens)
+
+    _stop_conditions_cache[id(tokenizer)] = (end_tokens, soft_end, suppress_sequences)
+    return end_tokens, soft_end, suppress_sequences
 
-        # Sehr strikten prompt als Chat-Message formatieren
-        #print_info(f"    ..übergebe prompt-Anweisung an tokenizer")
+# -----------------------------------------------------------------------------------------------------------
+# Mehrere Prompts in EINEM generate_batch-Aufruf abarbeiten
+#   token_counts: optionale Liste, in die die Anzahl generierter Tokens je Prompt geschrieben wird
+#   replicas:     > 1 → jeder Prompt wird als eigener Job an den Replikat-Pool gegeben und parallel generiert
+# -----------------------------------------------------------------------------------------------------------
+def generate_summaries(generator, tokenizer, system_content, user_texts, max_length=BLOCK_MAX_TOKENS, max_sentences=1,
+                       decode_mode="free", token_counts=None, replicas=1):
+    # Sehr strikte Prompts als Chat-Messages formatieren und tokenisieren (als Strings!)
+    batch_tokens = []
+    for user_text in user_texts:
         messages = [
             {"role": "system", "content": system_content},
-            {"role": "user", "content": f"Zusammenfassen in einem Satz: {text}"}
+            {"role": "user", "content": user_text}
         ]
         prompt = tokenizer.apply_chat_template(messages, tokenize=False, add_generation_prompt=True)
-        #print_info(f"    .. prompt= {prompt}\n")
-        
-        # Tokenisieren (als Strings!)
-        #print_info(f"    ..rufe tokenizer für Block-Überschrift auf: tokenisieren")
-        start_tokens = tokenizer.tokenize(prompt)  # List[str]
-        #print_info(f"    .. start_tokens= {start_tokens}\n")
-        
-        # Generieren mit Satzende-Sicherung
-        #print_info(f"    ..generieren der Überschrift: rufe generator für Block-Überschrift auf")
+        batch_tokens.append(tokenizer.tokenize(prompt))  # List[str]
+
+    # Satz-Modus: früh abbrechen, sobald ein Satzende-Token kommt, statt Tokens nach dem Punkt zu verwerfen
+    #   Alle Prompts bleiben in einem generate_batch-Aufruf (end_token gilt je Sequenz). Endet eine Sequenz auf einem
+    #   Punkt nach Zahl/Buchstabe, wird sie samt bisheriger Tokens im nächsten Batch fortgesetzt; clean_summary()
+    #   schneidet danach am ersten echten Satzende ab
+    stop_kwargs = {}
+    soft_end = None
+    if decode_mode == "sentence":
+        end_tokens, soft_end, suppress_sequences = build_sentence_stop_conditions(tokenizer)
+        stop_kwargs = dict(end_token=end_tokens, return_end_token=True, suppress_sequences=suppress_sequences)
+
+    def generate(tokens, limit):
+        kwargs = dict(asynchronous=True, max_batch_size=1) if replicas > 1 else {}
         results = generator.generate_batch(
-            [start_tokens],
-            max_length=60,  # Überschrift war 80 Zeichen, jetzt reduziert für GPU
+            tokens,
+            max_length=limit,
             beam_size=1,
             sampling_temperature=0.0,
             include_prompt_in_result=False,
             repetition_penalty=1.5,  # verhindert Wiederholungen (erhöht)
-            no_repeat_ngram_size=3   # verhindert Wort-Wiederholungen
+            no_repeat_ngram_size=3,  # verhindert Wort-Wiederholungen
+            **stop_kwargs, **kwargs
         )
-        
-        # Dekodieren + Bereinigen
-        #print_info(f"    ..Dekodieren: rufe tokenizer für Block-Überschrift auf")
-        summary_raw = tokenizer.decode(results[0].sequences_ids[0]).strip()
-        #print_info(f"    .. summary_raw= {summary_raw}\n")
-        
-        # Prompt entfernen
-        if summary_raw.startswith(prompt):
-            summary_raw = summary_raw[len(prompt):].strip()
-            #print_info(f"    .. summary ohne prompt= {summary_raw}")
-        
-        # Nur bis zum ersten Punkt behalten und alles danach entfernen
-        if '.' in summary_raw:
-            summary = summary_raw.split('.')[0].strip() + '.'
-        else:
-            summary = summary_raw.strip() + '.'
+        # replicas > 1 → jeder Prompt als eigener Job an den Replikat-Pool (parallel)
+        return [result.result() for result in results] if replicas > 1 else results
+
+    generated = [list(result.sequences_ids[0]) for result in generate(batch_tokens, max_length)]
+    pending = [n for n, ids in enumerate(generated)
+               if soft_end and early_sentence_stop(tokenizer.convert_ids_to_tokens(ids), soft_end)]
+    while pending:
+        # Gemeinsames Limit der Fortsetzung: kein Prompt darf insgesamt mehr als max_length Tokens erzeugen
+        limit = max_length - max(len(generated[n]) for n in pending)
+        if limit <= 0:
+            break
+        continued = generate([batch_tokens[n] + tokenizer.convert_ids_to_tokens(generated[n]) for n in pending], limit)
+        for n, result in zip(pending, continued):
+            generated[n] += result.sequences_ids[0]
+        pending = [n for n in pending if early_sentence_stop(tokenizer.convert_ids_to_tokens(generated[n]), soft_end)]
+
+    if token_counts is not None:
+        token_counts.extend(len(ids) for ids in generated)
+
+    # Dekodieren + Bereinigen
+    return [clean_summary(tokenizer.decode(ids).strip(), max_sentences) for ids in generated]
 
-        # Erweiterte Bereinigung: Entferne Fragmente, Artefakte, Englisch
-        summary = re.sub(r'(?i)\.?(assistant|here is|\*.*?\*|göttliche,|system).*', '', summary, flags=re.DOTALL).strip()
-        
-        # Leerzeichen bereinigen
-        summary = re.sub(r'\s+', ' ', summary).strip()
-
-        # Nur ersten Satz behalten
-        #if '.' in summary:
-        #    summary = summary.split('.')[0].strip() + '.'
-        #    print_info(f"    .. summary nur erster Satz= {summary}\n")
-
-        # Ersten Satz abschneiden (falls unvollständig)
-        #sentences = re.split(r'(?<=[.!?])\s+', summary_raw)
-        #summary = sentences[0].strip()
-        #if not summary.endswith(('.', '!', '?')):
-        #    summary += '.'  # Satzende erzwingen
-        
-        print_info(f"    .. summary= {summary}")
-        summaries.append(summary)
-        enhanced += f"\n----------  {summary}\n" + "\n".join(block) + "\n"
+# -----------------------------------------------------------------------------------------------------------
+# Hierarchische Gesamtzusammenfassung (Map-Reduce)
+#   Ebene 1 fasst je fan_out Block-Überschriften zu einem Satz zusammen, Ebene 2 je fan_out dieser Sätze usw.
+#   Alle Gruppen einer Ebene laufen als ein Batch. Auf der letzten erlaubten Ebene wird alles Verbleibende
+#   in EINE Gruppe gelegt – die Gesamtzusammenfassung hat damit unabhängig von der MP3-Dauer eine feste Größe.
+# -----------------------------------------------------------------------------------------------------------
+def reduce_summaries(generator, tokenizer, summaries, prompt_type, fan_out=REDUCE_FAN_OUT, max_levels=REDUCE_MAX_LEVELS, replicas=1):
+    if len(summaries) <= 1:
+        return "\n".join(summaries)
+
+    fan_out = max(2, fan_out)
+    max_levels = max(1, max_levels)
+    if prompt_type == "newsletter":
+        address = "Verwende NIEMALS die 'Du'-Form, sondern stattdessen IMMER die 'Ihr'-Form. "
+    else:
+        address = "Verwende die 'Du'-Form für den Menschen, an den sich der Engel wendet. "
+    system_content = ( "Du bist ein präziser Zusammenfasser. Du erhältst nummerierte Zusammenfassungen aufeinanderfolgender "
+                       "Abschnitte einer spirituellen Botschaft. Antworte NUR mit höchstens ZWEI kurzen Sätzen auf Deutsch, "
+                       "die den gemeinsamen Kern wiedergeben. Kein Reasoning, keine Einleitung, keine Aufzählung. "
+                       "KEIN Englisch, KEINE Sternchen, KEINE Wörter wie assistant oder here is. " + address
+    )
+
+    print_info(f"  ..generiere Gesamtzusammenfassung (Fan-Out: {fan_out}, max. Ebenen: {max_levels})")
+    current = summaries
+    level = 0
+    while len(current) > 1 and level < max_levels:
+        level += 1
+        level_start = datetime.now()
+
+        # Letzte Ebene: alles in eine Gruppe, damit genau eine Zusammenfassung übrig bleibt
+        group_size = len(current) if level == max_levels else fan_out
+        groups = [current[i:i + group_size] for i in range(0, len(current), group_size)]
+        user_texts = [
+            "Zusammenfassen in höchstens zwei Sätzen:\n" + "\n".join(f"{n}. {s}" for n, s in enumerate(group, 1))
+            for group in groups
+        ]
+        reduced = generate_summaries(generator, tokenizer, system_content, user_texts,
+                                     max_length=REDUCE_MAX_LENGTH, max_sentences=2, replicas=replicas)
+
+        # Bleibt die Generierung leer (nur "."), die Gruppe unverändert übernehmen
+        current = [r if len(r) > 1 else " ".join(g) for r, g in zip(reduced, groups)]
+
+        level_seconds = (datetime.now() - level_start).total_seconds()
+        print_info(f"    .. Ebene {level}: {sum(len(g) for g in groups)} → {len(current)} Zusammenfassung(en) in {level_seconds:.1f} s")
+
+        release_memory()
+
+    return "\n".join(current)
+
+# -----------------------------------------------------------------------------------------------------------
+# Benchmark: freie Dekodierung vs. Satz-Dekodierung je Block (generierte Tokens, gesparte Tokens, Dauer)
+# -----------------------------------------------------------------------------------------------------------
+def benchmark_decoding(generator, tokenizer, system_content, block_texts, max_tokens=BLOCK_MAX_TOKENS):
+    print_info(f"  ..Benchmark Dekodierung ({len(block_texts)} Blöcke, Token-Limit: {max_tokens})")
+    print_info(f"    {'Block':>5} │ {'frei':>5} │ {'Satz':>5} │ {'gespart':>7} │ {'Zeit frei':>9} │ {'Zeit Satz':>9}")
+    total_free = total_sentence = 0
+    time_free = time_sentence = 0.0
+    for n, text in enumerate(block_texts, 1):
+        user_texts = [f"Zusammenfassen in einem Satz: {text}"]
+        counts_free, counts_sentence = [], []
+
+        t0 = datetime.now()
+        generate_summaries(generator, tokenizer, system_content, user_texts, max_length=max_tokens, decode_mode="free",
+                           token_counts=counts_free)
+        t1 = datetime.now()
+        generate_summaries(generator, tokenizer, system_content, user_texts, max_length=max_tokens, decode_mode="sentence",
+                           token_counts=counts_sentence)
+        t2 = datetime.now()
+
+        seconds_free = (t1 - t0).total_seconds()
+        seconds_sentence = (t2 - t1).total_seconds()
+        saved = counts_free[0] - counts_sentence[0]
+        print_info(f"    {n:5d} │ {counts_free[0]:5d} │ {counts_sentence[0]:5d} │ {saved:7d} │ {seconds_free:8.2f}s │ {seconds_sentence:8.2f}s")
+
+        total_free += counts_free[0]
+        total_sentence += counts_sentence[0]
+        time_free += seconds_free
+        time_sentence += seconds_sentence
+
+    if block_texts:
+        saved_total = total_free - total_sentence
+        saved_pct = (saved_total / total_free) * 100 if total_free > 0 else 0
+        print_info(f"    Gesamt: {total_free} → {total_sentence} Tokens, gespart {saved_total} ({saved_pct:.1f} %), "
+                   f"Ø {saved_total / len(block_texts):.1f} Tokens/Block, Zeit {time_free:.1f}s → {time_sentence:.1f}s")
+
+# -----------------------------------------------------------------------------------------------------------
+# Summarizer laden: CT2-Generator (nutzt CUDA, falls verfügbar und frei – sonst CPU mit mehreren Replikaten) + Tokenizer
+# -----------------------------------------------------------------------------------------------------------
+def load_summarizer(device="auto", inter_threads=0, intra_threads=0):
+    print_info(f"  ..lade summarizer")
+    import ctranslate2                      # Lazy: erst wenn tatsächlich generiert wird
+    from transformers import AutoTokenizer  # Lazy: transformers allein kostet mehrere Sekunden Import
+    #model_path = os.path.expanduser("~/Llama-3-8B-CT2_int8")                            # lokales Llama 3.0-8B CT2 (int8)
+    #model_path = os.path.expanduser("~/Llama-3-8B-CT2_int8_float16")                    # lokales Llama 3.0-8B CT2 (int8_float16)
+    model_path = LLAMA_MODEL_PATH                                                        # lokales Llama 3.1-8B CT2 (int8_float16)
+
+    def load():
+        # Im Modell-Host läuft das erst, nachdem der Manager Platz gemacht hat → select_generator_config sieht den freien VRAM
+        config = select_generator_config(device, inter_threads, intra_threads)
+        try:
+            generator = ctranslate2.Generator(model_path, **config)
+        except RuntimeError as e:
+            if config["device"] == "cuda" and "out of memory" in str(e).lower():
+                print_error("CUDA out of memory – Versuche CPU-Fallback.")
+                config = cpu_generator_config(inter_threads, intra_threads)
+                generator = ctranslate2.Generator(model_path, **config)
+            else:
+                raise e
+        print_info(f"  ..summarizer läuft auf {describe_generator_config(config)}")
+
+        print_gpu_memory()  # ← nach Modell-Laden
+
+        # Tokenizer laden (lokal!)
+        print_info(f"  ..lade tokenizer")
+        #tokenizer = AutoTokenizer.from_pretrained("meta-llama/Meta-Llama-3-8B-Instruct")                # Llama Tokenizer 3.1-8B (remote)
+        #tokenizer = AutoTokenizer.from_pretrained(os.path.expanduser("~/Llama-3-8B-CT2_int8_float16"))  # Llama Tokenizer 3.1-8B CT2 (int8_float16)
+        tokenizer = AutoTokenizer.from_pretrained(LLAMA_MODEL_PATH)                                      # Llama Tokenizer 3.1-8B CT2 (int8_float16)
+        return generator, tokenizer, config
+
+    # Im Modell-Host (model_host.py) bleibt der Generator zwischen Aufträgen geladen (Schlüssel = gewünschte Konfiguration)
+    manager = active_manager()
+    if manager is not None:
+        return manager.acquire(f"llama:{model_path}:{device}:{inter_threads}:{intra_threads}", load, owner="summarize",
+                               kind="llama", estimate_mb=LLAMA_VRAM_MB, ct2=lambda loaded: loaded[0])
+    return load()
+
+# Anzahl paralleler Replikate, auf die unabhängige Blöcke verteilt werden (GPU: 1)
+def replica_count(config):
+    return config["inter_threads"] if config["device"] == "cpu" else 1
+
+# -----------------------------------------------------------------------------------------------------------
+# System-Prompt basierend auf prompt_type
+# -----------------------------------------------------------------------------------------------------------
+def get_system_content(prompt_type):
+    if prompt_type == "newsletter":
+        return ( "Du bist ein präziser Zusammenfasser. Antworte NUR mit EINEM kurzen Satz auf Deutsch. "
+                 "Kein Reasoning, keine Einleitung, kein Nachsatz, nichts anderes. Ende mit einem Punkt. "
+                 "KEIN Englisch, KEINE Sternchen, KEINE Wörter wie assistant oder here is. "
+                 "Es geht bei dem Text generell um spirituelle Botschaften an mehrere Menschen zu Weltgeschehen."
+                 "Verwende NIEMALS die 'Du'-Form, sondern stattdessen IMMER die 'Ihr'-Form."
+                 "Erkenne den Kontext der Botschaft an die Gruppe. Bleibe nah am Inhalt ohne Abhebung."
+        )
+    # durchgabe
+    return ( "Du bist ein präziser Zusammenfasser. Antworte NUR mit EINEM kurzen Satz auf Deutsch. "
+             "Kein Reasoning, keine Einleitung, kein Nachsatz, nichts anderes. Ende mit einem Punkt. "
+             "KEIN Englisch, KEINE Sternchen, KEINE Wörter wie assistant oder here is. "
+             "Verwende die 'Du'-Form wo passend für persönliche Referenzen auf 'Seele der Liebe', "
+             "aber variiere die Satzstruktur für natürliche Zusammenfassungen. "
+             "Der Text ist eine spirituelle Beratung eines Engels an einen Menschen ('Du' als Adressat). "
+             "Erkenne den Kontext der Botschaft an den Menschen. " 
+             "Fasse den Rat des Engels präzise zusammen, bleibe nah am Inhalt ohne Abhebung."
+    )
+
+# -----------------------------------------------------------------------------------------------------------
+# Blöcke über die Segmente legen: (erstes Segment, letztes Segment + 1), 50% Overlap
+#   final=False (Stream-Modus): nur Blöcke, deren Segmente schon vollständig vorliegen
+# -----------------------------------------------------------------------------------------------------------
+def split_blocks(segment_count, first_start=0, final=True):
+    blocks = []
+    step = BLOCK_SIZE - BLOCK_SIZE // 2
+    i = first_start
+    while i < segment_count and (final or i + BLOCK_SIZE <= segment_count):
+        blocks.append((i, min(i + BLOCK_SIZE, segment_count)))
+        i += step
+    return blocks, i
+
+# -----------------------------------------------------------------------------------------------------------
+# Block-Überschriften generieren – in Wellen zu je `replicas` Blöcken parallel (GPU: 1 Block pro Welle)
+#   on_summary(block_index, (first, last), summary) wird pro fertigem Block aufgerufen
+# -----------------------------------------------------------------------------------------------------------
+def summarize_blocks(generator, tokenizer, system_content, blocks, block_texts, decode_mode, replicas, on_summary,
+                     max_tokens=BLOCK_MAX_TOKENS):
+    for i in range(0, len(blocks), replicas):
+        wave_texts = [f"Zusammenfassen in einem Satz: {text}" for text in block_texts[i:i + replicas]]
+
+        # Generieren mit Satzende-Sicherung (eine Span je Welle = je Block bei einem Replikat)
+        with span("block", index=i, blocks=len(wave_texts)):
+            wave_summaries = generate_summaries(generator, tokenizer, system_content, wave_texts, max_length=max_tokens,
+                                                decode_mode=decode_mode, replicas=replicas)
+
+        for n, (block, summary) in enumerate(zip(blocks[i:i + replicas], wave_summaries)):
+            print_info(f"    .. summary= {summary}")
+            on_summary(i + n, block, summary)
         
         # GPU freigeben
-        gc.collect()
-        if torch.cuda.is_available():
-            torch.cuda.empty_cache()
-    
-    # ---------------------------------------------------------------------------------------------------------------
-    # 2. Gesamt-Zusammenfassung am Anfang
-    # ---------------------------------------------------------------------------------------------------------------
-    # Keine Generierung mehr: Verwende Konkatenation der Block-Überschriften
-    full_summary = "\n".join(summaries)
-    
+        release_memory()
+
+# -----------------------------------------------------------------------------------------------------------
+# Finales Dokument: Header + Modell2 + Gesamtzusammenfassung + Transkription mit Blöcken
+# -----------------------------------------------------------------------------------------------------------
+def compose_summary_document(transcript_header, full_summary, enhanced, start_time, mp3_duration, prompt_type, config):
     # Endzeit für Summary messen
     end_time = datetime.now()
     end_time_str = end_time.strftime("%H:%M:%S")
@@ -314,22 +622,157 @@ def summarize_transcription_llama(formatted_transcription, prompt_type, mp3_dura
     duration_str = format_timestamp(duration_seconds)
     ratio = (duration_seconds / mp3_duration) * 100 if mp3_duration > 0 else 0
 
-    # Finales enhanced: Header + Modell2 + Gesamtzusammenfassung + Transkription mit Blöcken
-    header = "\n".join(lines[:header_end])
+    header = transcript_header.rstrip("\n") + "\n"
     header = f"═" * 40 + "\nMP3-Transkription\n" + "═" * 40 + "\n" + header
         
     summary_header = f"\n" + "═" * 40 + "\nZusammenfassung des Transkripts\n" + "═" * 40 + "\n"
-    summary_header += f"Start:   {start_time_str}\n"
+    summary_header += f"Start:   {start_time.strftime('%H:%M:%S')}\n"
     summary_header += f"Ende:    {end_time_str}\n"
     summary_header += f"Dauer:   {duration_str}\n"
     summary_header += f"Ratio:   {ratio:.2f} % (Transkriptionsdauer / MP3-Dauer)\n"
     summary_header += f"Modell:  Llama-3.1-8B-CT2_int8_float16\n"
+    summary_header += f"Gerät:   {describe_generator_config(config)}\n"
     summary_header += f"Typ:     {prompt_type}\n\nGesamtzusammenfassung:\n"
-    enhanced = header + summary_header + full_summary + "\n\n" + enhanced
+    return header + summary_header + full_summary + "\n\n" + enhanced
+
+# -----------------------------------------------------------------------------------------------------------
+# Summarize Transkription mit Llama-3-8B-CT2 (nur wenn -summary Flag gesetzt)
+# -----------------------------------------------------------------------------------------------------------
+def summarize_transcription_llama(formatted_transcription, prompt_type, mp3_duration, fan_out=REDUCE_FAN_OUT, max_levels=REDUCE_MAX_LEVELS,
+                                  decode_mode=DECODE_MODE, run_benchmark=False, device="auto", inter_threads=0, intra_threads=0,
+                                  recorder=None, block_max_tokens=BLOCK_MAX_TOKENS):
+    print_info(f"Starte summarize_transcription (Llama-3-8B-CT2)")
+    print_gpu_memory()  # ← GPU-Verbrauch vor dem Start anzeigen
+    recorder = recorder or RunRecorder("summarize")
+    
+    # Startzeit für Summary messen
+    start_time = datetime.now()
+
+    with recorder.stage("load"):
+        generator, tokenizer, config = load_summarizer(device, inter_threads, intra_threads)
+    replicas = replica_count(config)
+    recorder.meta["device"] = describe_generator_config(config)
+    
+    # Transkription in Blöcke aufteilen: Ein Block ist 20 Segmente (BLOCK_SIZE)
+    # Der Store parst das Transkript einmal; umgebrochene Folgezeilen gehören damit zum Segment-Text
+    print_info(f"  ..teile transkription in Blöcke (Blockgröße: {BLOCK_SIZE} Segmente, Overlap: {BLOCK_SIZE // 2})")
+    store = TranscriptStore.from_text(formatted_transcription, duration=mp3_duration)
+    blocks, _ = split_blocks(len(store))
+    system_content = get_system_content(prompt_type)
+
+    # ---------------------------------------------------------------------------------------------------------------
+    # 1. Blockweise Zusammenfassungen
+    # ---------------------------------------------------------------------------------------------------------------
+    block_texts = [" ".join(store.texts(first, last)) for first, last in blocks]
+    if run_benchmark:
+        benchmark_decoding(generator, tokenizer, system_content, block_texts, block_max_tokens)
+
+    summaries = []  # Sammle alle Block-Überschriften für Gesamtzusammenfassung
+    block_sections = []  # Transkription mit Überschriften
+    def on_summary(index, block, summary):
+        summaries.append(summary)
+        block_sections.append(f"\n----------  {summary}\n" + store.raw(*block).rstrip("\n") + "\n")
+
+    print_info(f"  ..generiere Überschrift für jeden Block (Dekodierung: {decode_mode})")
+    with recorder.stage("generate"):
+        summarize_blocks(generator, tokenizer, system_content, blocks, block_texts, decode_mode, replicas, on_summary,
+                         block_max_tokens)
+    
+    # ---------------------------------------------------------------------------------------------------------------
+    # 2. Gesamt-Zusammenfassung am Anfang
+    # ---------------------------------------------------------------------------------------------------------------
+    # Hierarchische Reduktion der Block-Überschriften statt reiner Konkatenation
+    with recorder.stage("reduce"):
+        full_summary = reduce_summaries(generator, tokenizer, summaries, prompt_type, fan_out, max_levels, replicas)
+
+    with recorder.stage("format"):
+        enhanced = compose_summary_document(store.header, full_summary, "".join(block_sections),
+                                            start_time, mp3_duration, prompt_type, config)
+    recorder.meta.update(segments=len(store), blocks=len(blocks), mp3Duration=mp3_duration)
     
     print_gpu_memory()  # ← GPU-Verbrauch am Ende
     return enhanced
 
+# -----------------------------------------------------------------------------------------------------------
+# Stream-Modus (Pipeline /process): Segmente kommen als JSON-Zeilen über stdin, während Whisper noch dekodiert
+#   {"type": "segment", "start": s, "end": s, "raw": "[hh:mm:ss] Text\n..."}
+#   {"type": "header", "text": "...", "mp3Duration": s}
+#   {"type": "end"}
+# Das Modell wird sofort geladen; jeder Block wird zusammengefasst, sobald seine 20 Segmente vorliegen,
+# und als @@BLOCK-Zeile ausgegeben. Ohne "end" (Transkription abgebrochen) wird mit Fehler beendet.
+# -----------------------------------------------------------------------------------------------------------
+def summarize_stream(input_stream, prompt_type, fan_out=REDUCE_FAN_OUT, max_levels=REDUCE_MAX_LEVELS,
+                     decode_mode=DECODE_MODE, device="auto", inter_threads=0, intra_threads=0, recorder=None,
+                     block_max_tokens=BLOCK_MAX_TOKENS):
+    print_info(f"Starte summarize_stream (Llama-3-8B-CT2)")
+    start_time = datetime.now()
+    recorder = recorder or RunRecorder("summarize")
+
+    with recorder.stage("load"):
+        generator, tokenizer, config = load_summarizer(device, inter_threads, intra_threads)
+    replicas = replica_count(config)
+    recorder.meta["device"] = describe_generator_config(config)
+    system_content = get_system_content(prompt_type)
+
+    raws, texts = [], []
+    header, mp3_duration = "", 0
+    summaries, block_sections = [], []
+    next_block_start = 0
+    complete = False
+
+    def on_summary(index, block, summary):
+        summaries.append(summary)
+        block_sections.append(f"\n----------  {summary}\n" + "".join(raws[block[0]:block[1]]).rstrip("\n") + "\n")
+        emit_stream_message("BLOCK", {"index": index, "first": block[0], "last": block[1], "summary": summary})
+
+    def run_ready_blocks(final):
+        nonlocal next_block_start
+        blocks, next_block_start = split_blocks(len(raws), next_block_start, final=final)
+        if blocks:
+            block_texts = [" ".join(texts[first:last]) for first, last in blocks]
+            offset = len(summaries)
+            summarize_blocks(generator, tokenizer, system_content, blocks, block_texts, decode_mode, replicas,
+                             lambda n, block, summary: on_summary(offset + n, block, summary), block_max_tokens)
+
+    # Stufe "generate" enthält im Stream-Modus auch die Wartezeit auf Segmente von transcribe.py
+    print_info(f"  ..generiere Überschrift für jeden Block (Dekodierung: {decode_mode}, Stream)")
+    with recorder.stage("generate"):
+        for line in input_stream:
+            line = line.strip()
+            if not line:
+                continue
+            message = json.loads(line)
+            if message["type"] == "segment":
+                raws.append(message["raw"])
+                texts.append(segment_text(message["raw"]))
+                run_ready_blocks(final=False)
+            elif message["type"] == "header":
+                header = message["text"]
+                mp3_duration = message.get("mp3Duration") or 0
+            elif message["type"] == "end":
+                complete = True
+                break
+
+        if not complete:
+            print_error("Transkriptions-Stream wurde abgebrochen – keine Summary erstellt.")
+            sys.exit(1)
+
+        run_ready_blocks(final=True)
+
+    with recorder.stage("reduce"):
+        full_summary = reduce_summaries(generator, tokenizer, summaries, prompt_type, fan_out, max_levels, replicas)
+    with recorder.stage("format"):
+        enhanced = compose_summary_document(header, full_summary, "".join(block_sections),
+                                            start_time, mp3_duration, prompt_type, config)
+    recorder.meta.update(segments=len(raws), blocks=len(summaries), mp3Duration=mp3_duration)
+
+    print_gpu_memory()  # ← GPU-Verbrauch am Ende
+    return enhanced
+
+# Stream-Modus: maschinenlesbare Zeile ausgeben (wird von main.py /process ausgewertet)
+def emit_stream_message(kind, payload):
+    print(f"{STREAM_PREFIX}{kind} " + json.dumps(payload, ensure_ascii=False), flush=True)
+
 # -----------------------------------------------------------------------------------------------------------
 # Transkription am Bildschirm anzeigen (nur wenn gewünscht)
 # -----------------------------------------------------------------------------------------------------------
@@ -352,6 +795,31 @@ def display_transcription(show_transcription, formatted_transcription):
                 for w in wrapped:
                     print(w)
 
+# -----------------------------------------------------------------------------------------------------------
+# Run-Report: Messwerte je Stufe anzeigen, als <name>_s_run.json speichern und/oder als @@REPORT ausgeben
+#   --profile: zusätzlich Hotspots und Collapsed-Stacks (<name>_s_profile.txt/.collapsed bzw. @@PROFILE)
+# -----------------------------------------------------------------------------------------------------------
+def report_run(recorder, output_path, save, emit):
+    if active_manager() is not None:
+        recorder.meta["residency"] = active_manager().report()
+    print_info("Messwerte je Stufe:")
+    for line in recorder.summary_lines():
+        print_info(f"    .. {line}")
+    if save:
+        report_file = recorder.save(output_path)
+        if report_file:
+            print_info(f"Run-Report gespeichert: {report_file}")
+    profiler = recorder.profiler
+    if profiler is not None:
+        print(profiler.summary_text())
+        profile_files = profiler.save(output_path) if save else None
+        if profile_files:
+            print_info(f"Profil gespeichert (Flamegraph: flamegraph.pl/speedscope): {', '.join(profile_files)}")
+    if emit:
+        emit_stream_message("REPORT", recorder.report())
+        if profiler is not None:
+            emit_stream_message("PROFILE", {"summary": profiler.summary_text(), "collapsed": profiler.collapsed()})
+
 # -----------------------------------------------------------------------------------------------------------
 # Transkription speichern
 # -----------------------------------------------------------------------------------------------------------
@@ -370,19 +838,63 @@ def save_transcription(output_path, formatted_transcription):
 # ────────────────────────────────────────────────
 # Starte Hauptprogramm
 # ────────────────────────────────────────────────
-def main():
+def main(argv=None):
     # Argument-Parser für Eingabedatei
     parser = argparse.ArgumentParser(description="Summary der Transkription mit Llama-CT2.")
     parser.add_argument('file', nargs='?', help="Optionaler TXT-Dateiname (ohne Pfad)")
     group = parser.add_mutually_exclusive_group()
     group.add_argument('-durchgabe', action='store_true', help="Verwende Prompt für persönliche Beratung (default)")
     group.add_argument('-newsletter', action='store_true', help="Verwende Prompt für Gruppenbotschaft")
-    args = parser.parse_args()
+    parser.add_argument('--fan-out', type=int, default=REDUCE_FAN_OUT,
+                        help=f"Anzahl Überschriften pro Gruppe in der Gesamtzusammenfassung (default: {REDUCE_FAN_OUT})")
+    parser.add_argument('--levels', type=int, default=REDUCE_MAX_LEVELS,
+                        help=f"Maximale Anzahl Reduktionsebenen der Gesamtzusammenfassung (default: {REDUCE_MAX_LEVELS})")
+    parser.add_argument('--decode', choices=["sentence", "free"], default=DECODE_MODE,
+                        help=f"Dekodierung der Block-Überschriften: Abbruch am Satzende oder frei bis Token-Limit (default: {DECODE_MODE})")
+    parser.add_argument('--block-max-tokens', type=int, default=BLOCK_MAX_TOKENS,
+                        help=f"Token-Limit pro Block-Überschrift (default: {BLOCK_MAX_TOKENS})")
+    parser.add_argument('--benchmark', action='store_true',
+                        help="Vergleicht vorab freie und Satz-Dekodierung je Block (gesparte Tokens, Dauer)")
+    parser.add_argument('--device', choices=["auto", "cuda", "cpu"], default="auto",
+                        help="Gerät für den Summarizer; auto = CUDA wenn genug VRAM frei, sonst CPU (default: auto)")
+    parser.add_argument('--inter-threads', type=int, default=0,
+                        help="Anzahl paralleler Generator-Replikate auf der CPU (default: 0 = automatisch)")
+    parser.add_argument('--intra-threads', type=int, default=0,
+                        help="Threads pro Replikat auf der CPU (default: 0 = automatisch)")
+    parser.add_argument('--calibrate-cpu', action='store_true',
+                        help="CPU-Aufteilungen (Replikate × Threads) an einem Block messen, die schnellste für "
+                             "--device cpu/auto merken und beenden")
+    parser.add_argument('--stream', action='store_true',
+                        help="Segmente als JSON-Zeilen von stdin lesen (Pipeline /process); 'file' ist dann der Name der Ausgabe")
+    parser.add_argument('--stdio', action='store_true',
+                        help="Transkript-Text von stdin lesen und Summary als @@RESULT-JSON ausgeben statt Dateien zu verwenden")
+    parser.add_argument('--profile', action='store_true',
+                        help="Jede Stufe profilieren (Sampling + cProfile): Hotspots und Flamegraph-Stacks neben der Summary")
+    parser.add_argument('--save', action='store_true',
+                        help="Im stdio-/Stream-Modus zusätzlich <name>_s.txt im Audio-Verzeichnis speichern")
+    parser.add_argument('--trace-id', default=None,
+                        help="Trace-ID des Auftrags: Spans je Stufe und Block als @@SPAN-Zeilen ausgeben (main.py)")
+    parser.add_argument('--trace-parent', default=None,
+                        help="Mit --trace-id: spanId der aufrufenden Span (Subprozess in main.py)")
+    args = parser.parse_args(argv)
+    start_script_trace("summarize", args.trace_id, args.trace_parent, import_span=active_manager() is None)
+    if args.calibrate_cpu:
+        calibrate_cpu()
+        return
 
     print("")
     print_header("Summary der Transkription")
 
-    input_path, output_path, base_name, mp3_duration = select_text_file(args)
+    if args.stream or args.stdio:
+        if not args.file:
+            print_error("Im Stream-/stdio-Modus muss ein TXT-Dateiname für die Ausgabe angegeben werden.")
+            sys.exit(1)
+        base_name = os.path.splitext(os.path.basename(args.file))[0]
+        input_path = os.path.join(AUDIO_DIR, f"{base_name}.txt")
+        output_path = os.path.join(AUDIO_DIR, f"{base_name}_s.txt")
+        mp3_duration = 0
+    else:
+        input_path, output_path, base_name, mp3_duration = select_text_file(args)
 
     # Prompt-Typ bestimmen: Default 'durchgabe', über Flag überschreiben
     prompt_type = "durchgabe"
@@ -394,21 +906,59 @@ def main():
         if "newsletter" in os.path.basename(input_path).lower():
             prompt_type = "newsletter"
 
-    # Transkription aus Datei laden
-    if not os.path.exists(input_path):
+    profiler = None
+    if args.profile:
+        from profiling import StageProfiler  # Nur im Profiling-Modus laden (Startzeit)
+        profiler = StageProfiler()
+    recorder = RunRecorder("summarize", profiler=profiler, file=f"{base_name}_s.txt", promptType=prompt_type, decodeMode=args.decode,
+                           blockMaxTokens=args.block_max_tokens)
+
+    if args.stream:
+        formatted_transcription_s = summarize_stream(sys.stdin, prompt_type,
+                                                     fan_out=args.fan_out, max_levels=args.levels,
+                                                     decode_mode=args.decode, device=args.device,
+                                                     inter_threads=args.inter_threads, intra_threads=args.intra_threads,
+                                                     recorder=recorder, block_max_tokens=args.block_max_tokens)
+        display_transcription(True, formatted_transcription_s)
+        if args.save:
+            with recorder.stage("save"):
+                save_transcription(output_path, formatted_transcription_s)
+        emit_stream_message("RESULT", {"summary": formatted_transcription_s, "filename": f"{base_name}_s.txt"})
+        report_run(recorder, output_path, save=args.save, emit=True)
+        print()
+        return
+
+    # Transkription aus Datei laden (stdio-Modus: von stdin)
+    if args.stdio:
+        formatted_transcription = sys.stdin.read()
+        if not formatted_transcription.strip():
+            print_error("Keine Transkription auf stdin erhalten.")
+            sys.exit(1)
+    elif not os.path.exists(input_path):
         print_error(f"Datei nicht gefunden: {input_path}")
         sys.exit(1)
-
-    with open(input_path, "r", encoding="utf-8") as f:
-        formatted_transcription = f.read()
+    else:
+        with open(input_path, "r", encoding="utf-8") as f:
+            formatted_transcription = f.read()
 
     # Summary generieren
     #print_info(f"    .. prompt_type= {prompt_type}\n")
-    formatted_transcription_s = summarize_transcription_llama(formatted_transcription, prompt_type, mp3_duration)
-
-    # Summary am Bildschirm anzeigen und speichern
+    formatted_transcription_s = summarize_transcription_llama(formatted_transcription, prompt_type, mp3_duration,
+                                                              fan_out=args.fan_out, max_levels=args.levels,
+                                                              decode_mode=args.decode, run_benchmark=args.benchmark,
+                                                              device=args.device, inter_threads=args.inter_threads,
+                                                              intra_threads=args.intra_threads, recorder=recorder,
+                                                              block_max_tokens=args.block_max_tokens)
+
+    # Summary am Bildschirm anzeigen und speichern (stdio-Modus: als JSON-Zeile, Datei nur auf Wunsch)
     display_transcription(True, formatted_transcription_s)  # Immer anzeigen, da dediziert
-    save_transcription(output_path, formatted_transcription_s)
+    save = not args.stdio or args.save
+    if save:
+        with recorder.stage("save"):
+            save_transcription(output_path, formatted_transcription_s)
+    if args.stdio:
+        emit_stream_message("RESULT", {"summary": formatted_transcription_s, "filename": f"{base_name}_s.txt"})
+    report_run(recorder, output_path, save=save, emit=args.stdio)
 
     print()
 
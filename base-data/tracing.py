@@ -0,0 +1,170 @@
+# ------------------------------------------------------------------------------------------------------------------------------------
+# tracing.py
+#
+# Zeit-Spans je Auftrag über Service, Subprozess und Modell-Stufen
+# Ein langsamer Auftrag lässt sich sonst nur aus den unstrukturierten Ausgaben von Node-Backend, main.py und den WSL-Skripten
+# rekonstruieren. Mit einer Trace-ID (X-Trace-Id bzw. --trace-id) schreibt jede Ebene Spans als JSON:
+#   {"traceId", "spanId", "parentId", "name", "service", "start", "end", "durationMs", "attributes"}
+# start/end sind Unix-Zeiten in Sekunden (WSL und Windows teilen die Uhr), parentId verknüpft die Ebenen:
+#   main.py: job → upload.write / spawn / subprocess → transcribe.py: import / load / audio / vad / decode / save
+#                                                       summarize.py: import / load / generate → block … / reduce / save
+# Die Skripte geben ihre Spans als @@SPAN-Zeilen aus, main.py sammelt sie mit den eigenen (traces.py: JSONL-Datei,
+# optionaler Collector, GET /traces/{id} als Zeitleiste).
+#
+# Ohne Trace-ID (interaktiver Aufruf) ist alles ein No-op.
+# Muss wie instrumentation.py neben den Skripten liegen (WSL: /home/tom/tracing.py).
+# ------------------------------------------------------------------------------------------------------------------------------------
+
+import os
+import re
+import json
+import time
+import uuid
+import threading
+from contextlib import contextmanager
+
+TRACE_ID_RE = re.compile(r'^[A-Za-z0-9_-]{8,64}$')   # Landet in der Shell-Kommandozeile der Skripte
+STREAM_PREFIX = "@@"
+
+_local = threading.local()                # Aktiver Tracer je Thread (Modell-Host: transcribe und summarize parallel)
+
+
+def new_trace_id():
+    return uuid.uuid4().hex
+
+
+def new_span_id():
+    return uuid.uuid4().hex[:16]
+
+
+def valid_trace_id(value):
+    return bool(value) and TRACE_ID_RE.match(value) is not None
+
+
+def process_started():
+    """Startzeit dieses Prozesses als Unix-Zeit (Linux: /proc), sonst None – Beginn der Span 'import'"""
+    try:
+        with open("/proc/self/stat") as f:
+            start_ticks = int(f.read().rsplit(")", 1)[1].split()[19])   # Feld 22: starttime in Ticks seit Boot
+        with open("/proc/uptime") as f:
+            uptime = float(f.read().split()[0])
+        return time.time() - uptime + start_ticks / os.sysconf("SC_CLK_TCK")
+    except (OSError, ValueError, IndexError, AttributeError):
+        return None
+
+
+def emit_span(span):
+    """Export der Skripte: @@SPAN-Zeile auf stdout (main.py sammelt sie ein)"""
+    print(f"{STREAM_PREFIX}SPAN " + json.dumps(span, ensure_ascii=False), flush=True)
+
+
+class Span:
+    """Laufende Span; attributes kann bis zum Ende ergänzt werden, id dient als parentId für Kind-Spans"""
+    __slots__ = ('id', 'parent_id', 'name', 'start', 'attributes')
+
+    def __init__(self, name, parent_id, attributes):
+        self.id = new_span_id()
+        self.parent_id = parent_id
+        self.name = name
+        self.start = time.time()
+        self.attributes = attributes
+
+
+class Tracer:
+    """
+    Spans eines Auftrags in einer Ebene (main.py oder ein Skript):
+
+        tracer = Tracer(trace_id, "transcribe", parent_id=args.trace_parent)
+        with tracer.span("decode", segments=0) as span:
+            ...
+            span.attributes["segments"] = n
+
+    Verschachtelte span()-Aufrufe werden Kind-Spans der umgebenden (Stapel je Tracer, nicht je Thread –
+    ein SSE-Generator in main.py läuft nacheinander auf verschiedenen Threads).
+    """
+
+    def __init__(self, trace_id, service, parent_id=None, export=emit_span):
+        self.trace_id = trace_id
+        self.service = service
+        self.parent_id = parent_id
+        self.export = export
+        self._stack = []
+
+    def current_id(self):
+        return self._stack[-1].id if self._stack else self.parent_id
+
+    @contextmanager
+    def span(self, name, parent_id=None, start=None, **attributes):
+        """start: früherer Beginn (z. B. Eingang der Anfrage, bevor der SSE-Generator läuft)"""
+        span = Span(name, parent_id or self.current_id(), attributes)
+        span.start = start or span.start
+        self._stack.append(span)
+        try:
+            yield span
+        except GeneratorExit:
+            span.attributes["cancelled"] = True            # Client hat die SSE-Verbindung getrennt
+            raise
+        except Exception as e:
+            span.attributes["error"] = f"{type(e).__name__}: {e}"
+            raise
+        finally:
+            if span in self._stack:
+                self._stack.remove(span)
+            self.record(name, span.start, time.time(), span_id=span.id, parent_id=span.parent_id, **span.attributes)
+
+    def record(self, name, start, end, span_id=None, parent_id=None, **attributes):
+        """Span mit bereits gemessenen Zeiten ausgeben; gibt die spanId zurück"""
+        span_id = span_id or new_span_id()
+        try:
+            self.export({
+                "traceId": self.trace_id,
+                "spanId": span_id,
+                "parentId": parent_id or self.current_id(),
+                "name": name,
+                "service": self.service,
+                "start": round(start, 6),
+                "end": round(end, 6),
+                "durationMs": round((end - start) * 1000, 3),
+                "attributes": attributes,
+            })
+        except (OSError, ValueError):
+            pass                                        # Tracing darf einen Auftrag nie abbrechen
+        return span_id
+
+
+# -----------------------------------------------------------------------------------------------------------
+# Aktiver Tracer der Skripte (analog model_residency.activate)
+# -----------------------------------------------------------------------------------------------------------
+def activate(tracer):
+    _local.tracer = tracer
+
+
+def active_tracer():
+    return getattr(_local, "tracer", None)
+
+
+def start_script_trace(script, trace_id, parent_id=None, import_span=True):
+    """
+    --trace-id/--trace-parent eines Skripts: Tracer aktivieren und Prozessstart → jetzt als 'import' ausgeben
+    (import_span=False im Modell-Host – dort gibt es keinen Prozessstart je Auftrag)
+    """
+    if not valid_trace_id(trace_id):
+        activate(None)
+        return None
+    tracer = Tracer(trace_id, script, parent_id)
+    activate(tracer)
+    started = process_started() if import_span else None
+    if started is not None:
+        tracer.record("import", started, time.time(), pid=os.getpid())
+    return tracer
+
+
+@contextmanager
+def span(name, **attributes):
+    """Span im aktiven Tracer; ohne Tracer ein No-op (liefert trotzdem ein Span-Objekt für attributes)"""
+    tracer = active_tracer()
+    if tracer is None:
+        yield Span(name, None, attributes)
+        return
+    with tracer.span(name, **attributes) as current:
+        yield current
@@ -13,21 +13,27 @@ import re                                #    Reguläre Ausdrücke – Textverar
                                          # Externe Prozesse starten (ffprobe für MP3-Metadaten ohne mutagen-Warnings)
 import argparse                          #    Für Kommandozeilen-Argumente
 import subprocess                        #    ffprobe aufrufen, um Dauer, Bitrate und Sample-Rate der MP3-Datei zu lesen
-                                         # Kern-Bibliotheken für Audio-Transkription und LLM-Inferenz
-
-from faster_whisper import WhisperModel  #    transcribe: Optimiertes Whisper-Modell (CT2-basiert) für Sprach-zu-Text
+                                         # Kern-Bibliotheken für Audio-Transkription (faster_whisper) werden erst in
+                                         #    load_model_fast_whisper() importiert – --help, Dateiauswahl und Fehlaufrufe
+                                         #    starten so ohne mehrere Sekunden Importzeit (siehe startup_benchmark.py)
 from datetime import datetime            #    transcribe: Datum und Uhrzeit für Start/Ende/Dauer der Verarbeitung
                                          # Speichermanagement – wichtig bei GPU-Nutzung mit mehreren großen Modellen ---
 import gc                                #    Manuelles Auslösen des Garbage Collectors (Speicher freigeben)
-import torch                             #    PyTorch-Backend – benötigt für torch.cuda.empty_cache() (GPU-Speicher leeren)
 import textwrap                          # Für Zeilenumbruch
+import json                              # Stream-Modus: Segmente als JSON-Zeilen auf stdout
+import io                                # stdio-Modus: Audiodaten aus stdin im Speicher halten
+import importlib.util                    # Verfügbarkeit optionaler Pakete prüfen, ohne sie zu importieren
+import dataclasses                       # Segmente verschieben (faster-whisper: Segment als dataclass oder NamedTuple)
+from collections import Counter          # Schleifen-Erkennung: wiederholte N-Gramme im Segment zählen
+from concurrent.futures import ThreadPoolExecutor  # Progressiver Modus: large-v3 lädt, während der Entwurf läuft
+from instrumentation import RunRecorder, cuda_memory, describe_cuda_memory  # Messwerte je Stufe (Run-Report)
+from transcript_store import TranscriptStore, parse_timestamp  # --range: bestehendes Transkript lesen und ersetzen
+from model_residency import active_manager  # Modell-Host: Modelle bleiben zwischen Aufträgen geladen
+from tracing import span, start_script_trace  # --trace-id: Spans je Stufe als @@SPAN (Zeitleiste je Auftrag in main.py)
 
-# Optionale Importe für Chunking (installiere pydub: pip install pydub)
-try:
-    from pydub import AudioSegment
-    HAS_PYDUB = True
-except ImportError:
-    HAS_PYDUB = False
+# Optionale Importe für Chunking (installiere pydub: pip install pydub) – nur Verfügbarkeit prüfen, Import bei Bedarf
+HAS_PYDUB = importlib.util.find_spec("pydub") is not None
+if not HAS_PYDUB:
     print("\033[1;31mWarnung: pydub nicht installiert. Kein Audio-Chunking für lange Dateien möglich. Installiere mit 'pip install pydub'.\033[0m")
 
 # --------------------------------------------------------------------------
@@ -47,8 +53,50 @@ VAD_PARAMS = dict(
 BEAM_SIZE = 7                    # 5 oder sogar 7, wenn du Rechenpower übrig hast
                                  # Beam Search ist ein Algorithmus, der multiple Hypothesen (mögliche Transkriptionen) parallel erkundet und die beste wählt. Höherer Wert: Mehr Hypothesen = genauer. Default: 5.
 CONDITION_ON_PREV = False        # Kontext beibehalten für längere Sätze
+COMPUTE_TYPE = "int8_float16"    # CT2-Quantisierung auf der GPU
+# Standard-Dekodierparameter für model.transcribe() – decode_benchmark.py variiert sie im Parameter-Sweep
+DECODE_OPTIONS = dict(
+    beam_size=BEAM_SIZE,
+    vad_filter=USE_VAD,
+    vad_parameters=VAD_PARAMS,
+    condition_on_previous_text=CONDITION_ON_PREV
+)
+INITIAL_PROMPT = "Dies ist eine klare, natürliche deutsche Sprache, eine Durchgabe eines Engelmediums welches Engel channelt"
 CHUNK_THRESHOLD_SEC = 999999     # 600, praktisch deaktiviert: Chunking, wenn Dauer > 999999 Sek
 CHUNK_SIZE_SEC = 600             # Jeder Chunk 10 Min
+# Adaptive Beam Search (--decode adaptive): erst greedy (beam_size=1), dann nur unsichere Segmente mit vollem Beam
+# über genau ihr Zeitfenster neu dekodieren. Schwellen strenger als die Whisper-Fallbacks (-1.0 / 2.4 / 0.6).
+DECODE_MODE = "beam"             # "beam" (jedes Segment mit BEAM_SIZE) oder "adaptive" – Default erst nach WER-Gleichstand
+                                 #    in decode_benchmark.py (--decode beam,adaptive) auf "adaptive" umstellen
+ADAPTIVE_LOGPROB_THRESHOLD = -0.6        # avg_logprob darunter → unsicher
+ADAPTIVE_COMPRESSION_THRESHOLD = 2.2     # compression_ratio darüber → Wiederholungen/Halluzination
+ADAPTIVE_NO_SPEECH_THRESHOLD = 0.5       # no_speech_prob darüber → keine Sprache: bleibt greedy und beendet das Fenster
+ADAPTIVE_PADDING_SEC = 0.5               # Audio-Kontext links/rechts des Fensters beim Neu-Dekodieren
+ADAPTIVE_MAX_WINDOW_SEC = 30             # Längere Folgen unsicherer Segmente werden in mehrere Fenster geteilt
+ADAPTIVE_MAX_GAP_SEC = 2.0               # Lücke (VAD-Pause) zwischen zwei unsicheren Segmenten darüber → neues Fenster
+SAMPLE_RATE = 16000                      # Whisper-Eingangsrate
+# Progressiver Modus (--progressive): kleines Modell liefert in Sekunden einen Entwurf (@@DRAFT), large-v3 ersetzt
+# ihn danach fensterweise (@@REFINE) – das Endergebnis ist unverändert das large-v3-Transkript
+DRAFT_MODEL = "small"                    # faster-whisper "small" (CT2, wird beim ersten Aufruf heruntergeladen)
+DRAFT_COMPUTE_TYPE = "int8_float16"
+DRAFT_OPTIONS = dict(beam_size=1, vad_filter=True, vad_parameters=VAD_PARAMS, condition_on_previous_text=False)
+REFINE_WINDOW_SEC = 30                   # Ersetzungen frühestens alle 30 s Audio bündeln
+RANGE_PADDING_SEC = 0.5                  # --range: Audio-Kontext links/rechts des Bereichs (Segmente zählen nach ihrer Mitte)
+# Schleifen-Erkennung: Whisper hängt über Musik/Stille trotz condition_on_previous_text=False an einer Phrase fest
+LOOP_COMPRESSION_RATIO = 2.8             # compression_ratio eines Segments darüber → Schleife (Whisper-Fallback: 2.4)
+LOOP_NGRAM = 3                           # Wortfolgen dieser Länge …
+LOOP_NGRAM_REPEATS = 4                   # … so oft im selben Segment …
+LOOP_NGRAM_SHARE = 0.5                   # … und dabei mindestens dieser Anteil der Wörter → Schleife
+LOOP_SEGMENT_REPEATS = 3                 # Gleicher Segmenttext so oft hintereinander → Schleife …
+LOOP_REPEAT_MIN_WORDS = 4                # … sofern er mindestens so viele Wörter hat („Amen.“, „Ja.“ dürfen sich wiederholen)
+LOOP_WINDOW_SEC = 30                     # Ab Schleifenbeginn neu dekodiertes Fenster
+LOOP_REDECODE_OPTIONS = dict(            # Neu-Dekodierung: Sampling statt Beam, Wiederholungsstrafe, VAD, kein Prompt
+    beam_size=1, temperature=(0.2, 0.4, 0.6, 0.8), repetition_penalty=1.3, no_repeat_ngram_size=LOOP_NGRAM,
+    vad_filter=True, vad_parameters=VAD_PARAMS, condition_on_previous_text=False
+)
+# Geschätzter VRAM je Modell für den Modell-Host (model_residency.py), bis beim ersten Laden gemessen wurde
+WHISPER_VRAM_MB = {MODEL_NAME: 3000, DRAFT_MODEL: 1000}
+STREAM_PREFIX = "@@"             # Stream-Modus: Präfix für maschinenlesbare Zeilen (@@SEGMENT {...}, @@HEADER {...})
 
 # -----------------------------------------------------------------------------------------------------------
 # Diverse Parameter
@@ -151,16 +199,16 @@ def select_audio_file(args):
 # -----------------------------------------------------------------------------------------------------------
 # MP3-Details anzeigen (mit ffprobe statt mutagen, um Warnings zu vermeiden)
 # -----------------------------------------------------------------------------------------------------------
-def get_mp3_details(audio_path):
+def get_mp3_details(audio_path, audio_data=None):
     try:
-        # ffprobe aufrufen, um Duration, Bitrate und Sample Rate zu holen
+        # ffprobe aufrufen, um Duration, Bitrate und Sample Rate zu holen (audio_data: Bytes statt Datei, via pipe:0)
         cmd = [
             'ffprobe', '-v', 'error', '-show_entries',
             'format=duration,bit_rate', '-select_streams', 'a:0',
             '-show_entries', 'stream=sample_rate',
-            '-of', 'default=noprint_wrappers=1', audio_path
+            '-of', 'default=noprint_wrappers=1', 'pipe:0' if audio_data is not None else audio_path
         ]
-        output = subprocess.check_output(cmd).decode('utf-8').strip()
+        output = subprocess.check_output(cmd, input=audio_data).decode('utf-8').strip()
         lines = output.split('\n')
         
         # Parse die Werte
@@ -210,44 +258,473 @@ def should_show_transcription():
 
     return show_transcription
 
-def load_model_fast_whisper():
-    print_info(f"Lade Modell {MODEL_DESC}")
-    model = WhisperModel(MODEL_NAME, device="cuda", compute_type="int8_float16")
-    return model
+def load_model_fast_whisper(model_name=MODEL_NAME, device="cuda", compute_type=COMPUTE_TYPE):
+    print_info(f"Lade Modell {MODEL_DESC if model_name == MODEL_NAME else model_name} ({device}, {compute_type})")
+
+    def load():
+        from faster_whisper import WhisperModel  # Lazy: zieht ctranslate2, tokenizers, av usw. nach
+        return WhisperModel(model_name, device=device, compute_type=compute_type)
+
+    # Im Modell-Host (model_host.py) bleibt das Modell zwischen Aufträgen geladen
+    manager = active_manager()
+    if manager is not None:
+        return manager.acquire(f"whisper:{model_name}:{device}:{compute_type}", load, owner="transcribe",
+                               kind="whisper", estimate_mb=WHISPER_VRAM_MB.get(model_name, 3000),
+                               ct2=lambda model: model.model)
+    return load()
 
 def delete(model):
-    # GPU-Speicher freigeben
+    # GPU-Speicher freigeben: das CT2-Modell gibt seinen VRAM selbst frei (unload_model bzw. beim Löschen),
+    # torch wird dafür nicht gebraucht – nur falls es ohnehin geladen ist, auch dessen Cache leeren
+    manager = active_manager()
+    if manager is not None and manager.release(model, owner="transcribe"):
+        print_info("Modell bleibt im Modell-Host geladen (verdrängbar).")
+        return
     print_info("Freigeben von GPU-Speicher...")
-    del model
+    ct2_model = getattr(model, "model", None)
+    if hasattr(ct2_model, "unload_model"):
+        ct2_model.unload_model()
+    del model, ct2_model
     gc.collect()
-    torch.cuda.empty_cache()
-    print_success("GPU-Speicher freigegeben.")
+    torch = sys.modules.get("torch")
+    if torch is not None and torch.cuda.is_available():
+        torch.cuda.empty_cache()
+    print_success(f"GPU-Speicher freigegeben ({describe_cuda_memory(cuda_memory())}).")
+
+
+# -----------------------------------------------------------------------------------------------------------
+# Adaptive Beam Search
+#   Greedy-Durchlauf über das ganze Audio; aufeinanderfolgende unsichere Segmente bilden ein Fenster, das mit
+#   vollem Beam (mit VAD wie im Hauptlauf, mit etwas Rand) neu dekodiert und anstelle der Greedy-Segmente
+#   eingesetzt wird – nur wenn es im Mittel sicherer ist. Fenster enden an VAD-Pausen, nach höchstens
+#   ADAPTIVE_MAX_WINDOW_SEC und an Segmenten ohne Sprache: über Musik/Stille hilft Beam nicht, dort halluziniert
+#   Whisper am ehesten. Segmente werden in Reihenfolge geliefert (Stream-Modus bleibt live).
+# -----------------------------------------------------------------------------------------------------------
+def needs_beam(segment):
+    if segment.no_speech_prob > ADAPTIVE_NO_SPEECH_THRESHOLD:
+        return False
+    return (segment.avg_logprob < ADAPTIVE_LOGPROB_THRESHOLD
+            or segment.compression_ratio > ADAPTIVE_COMPRESSION_THRESHOLD)
+
+def ends_window(run, segment):
+    """True, wenn segment nicht mehr ins laufende Fenster gehört (Pause davor oder Fenster zu lang)"""
+    return (segment.start - run[-1].end > ADAPTIVE_MAX_GAP_SEC
+            or segment.end - run[0].start > ADAPTIVE_MAX_WINDOW_SEC)
+
+def shift_segment(segment, offset):
+    if hasattr(segment, "_replace"):
+        return segment._replace(start=segment.start + offset, end=segment.end + offset)
+    return dataclasses.replace(segment, start=segment.start + offset, end=segment.end + offset)
+
+def mean_logprob(segments):
+    # Nach Dauer gewichtet, damit kurze Füll-Segmente den Vergleich nicht dominieren
+    weights = [max(s.end - s.start, 0.01) for s in segments]
+    return sum(s.avg_logprob * w for s, w in zip(segments, weights)) / sum(weights)
+
+def redecode_window(model, audio, run, options, initial_prompt, stats):
+    start, end = run[0].start, run[-1].end
+    first = max(0, int((start - ADAPTIVE_PADDING_SEC) * SAMPLE_RATE))
+    last = min(len(audio), int((end + ADAPTIVE_PADDING_SEC) * SAMPLE_RATE))
+    offset = first / SAMPLE_RATE
+
+    window, _ = model.transcribe(audio[first:last], language="de", initial_prompt=initial_prompt, **options)
+    # Nur Segmente übernehmen, deren Mitte im ursprünglichen Fenster liegt (Rand gehört den Nachbarn)
+    candidates = [shifted for shifted in (shift_segment(s, offset) for s in window)
+                  if start <= (shifted.start + shifted.end) / 2 <= end]
+
+    stats["windows"] += 1
+    stats["redecodedSegments"] += len(run)
+    stats["beamSeconds"] += end - start
+    if candidates and mean_logprob(candidates) >= mean_logprob(run):
+        return candidates
+    stats["keptGreedy"] += 1
+    return run
+
+def load_audio(audio_path):
+    """Audio einmal dekodieren (16 kHz float32, ~230 MB/h); bereits dekodierte Arrays werden durchgereicht"""
+    if hasattr(audio_path, "shape"):
+        return audio_path
+    from faster_whisper import decode_audio  # Lazy wie WhisperModel
+    if hasattr(audio_path, "seek"):
+        audio_path.seek(0)
+    return decode_audio(audio_path, sampling_rate=SAMPLE_RATE)
+
+def adaptive_segments(model, audio, options, initial_prompt, stats, offset=0.0):
+    # Fenster werden aus dem dekodierten Array ausgeschnitten – kein erneutes ffmpeg je Fenster
+    # offset > 0: Fortsetzung hinter einer Schleife – audio beginnt dort, Kennzahlen laufen weiter
+    if offset:
+        yield from (shift_segment(segment, offset)
+                    for segment in adaptive_segments(model, audio, options, initial_prompt, stats))
+        return
+    stats.setdefault("audioSeconds", len(audio) / SAMPLE_RATE)
+    for key in ("segments", "windows", "redecodedSegments", "keptGreedy"):
+        stats.setdefault(key, 0)
+    stats.setdefault("beamSeconds", 0.0)
+    stats["mode"] = "adaptive"
+
+    # transcribe() läuft VAD und Merkmalsextraktion sofort, dekodiert wird erst beim Abholen der Segmente
+    with span("vad", vad=options.get("vad_filter", False)):
+        greedy, _ = model.transcribe(audio, language="de", initial_prompt=initial_prompt, **{**options, "beam_size": 1})
+    run = []
+    for segment in greedy:
+        stats["segments"] += 1
+        if run and ends_window(run, segment):
+            yield from redecode_window(model, audio, run, options, initial_prompt, stats)
+            run = []
+        if needs_beam(segment):
+            run.append(segment)
+            continue
+        if run:
+            yield from redecode_window(model, audio, run, options, initial_prompt, stats)
+            run = []
+        yield segment
+    if run:
+        yield from redecode_window(model, audio, run, options, initial_prompt, stats)
+
+# -----------------------------------------------------------------------------------------------------------
+# Progressiver Modus: Entwurf mit kleinem Modell, danach fensterweise Ersetzung durch large-v3
+# -----------------------------------------------------------------------------------------------------------
+def run_draft_pass(audio_path, mp3_duration, width, started):
+    """Dekodiert das Audio einmal, gibt Entwurfs-Segmente sofort als @@DRAFT aus → (audio, Entwurf, Sekunden bis erster Text)"""
+    audio = load_audio(audio_path)
+    draft_model = load_model_fast_whisper(DRAFT_MODEL, "cuda", DRAFT_COMPUTE_TYPE)
+    draft = []
+    first_text_seconds = None
+
+    def on_draft(segment):
+        nonlocal first_text_seconds
+        if first_text_seconds is None:
+            first_text_seconds = round((datetime.now() - started).total_seconds(), 2)
+            print_info(f"Erster Entwurfstext nach {first_text_seconds} s")
+        emit_stream_message("DRAFT", {
+            "index": len(draft),
+            "start": segment.start,
+            "end": segment.end,
+            "raw": correct_transcription(format_segment(segment, width=width))
+        })
+        draft.append(segment)
+
+    print_info(f"Entwurf mit {DRAFT_MODEL} ({DRAFT_COMPUTE_TYPE}, greedy)")
+    transcribe_audio(draft_model, audio, mp3_duration, on_segment=on_draft, decode_options=DRAFT_OPTIONS, decode_mode="beam")
+    delete(draft_model)
+    return audio, draft, first_text_seconds
+
+def normalize_text(text):
+    return re.sub(r"\W+", " ", text.lower()).strip()
+
+class DraftRefiner:
+    """
+    Sammelt die large-v3-Segmente und ersetzt den Entwurf fensterweise:
+    sobald REFINE_WINDOW_SEC Audio fertig sind, werden alle Entwurfs-Segmente bis dahin durch die neuen ersetzt
+    (@@REFINE {first, last, start, end, changed, segments}). changed=False: Text identisch, nur Zeitstempel/Umbruch neu.
+    """
+
+    def __init__(self, draft, window_sec=REFINE_WINDOW_SEC):
+        self.draft = draft
+        self.window_sec = window_sec
+        self.cursor = 0                  # Erstes noch nicht ersetztes Entwurfs-Segment
+        self.window_start = 0.0
+        self.pending = []                # (segment, raw) seit der letzten Ersetzung
+        self.windows = 0
+        self.changed_windows = 0
+
+    def add(self, segment, raw):
+        self.pending.append((segment, raw))
+        if segment.end - self.window_start >= self.window_sec:
+            self.flush(until=segment.end)
+
+    def flush(self, until=None):
+        if not self.pending and self.cursor >= len(self.draft):
+            return
+        last = self.cursor
+        while last < len(self.draft) and (until is None or self.draft[last].end <= until):
+            last += 1
+        replaced = self.draft[self.cursor:last]
+        changed = (normalize_text(" ".join(s.text for s in replaced))
+                   != normalize_text(" ".join(s.text for s, _ in self.pending)))
+        end = until if until is not None else max([s.end for s, _ in self.pending] + [s.end for s in replaced] + [0])
+        emit_stream_message("REFINE", {
+            "first": self.cursor,
+            "last": last,
+            "start": self.window_start,
+            "end": end,
+            "changed": changed,
+            "segments": [{"start": s.start, "end": s.end, "raw": raw} for s, raw in self.pending]
+        })
+        self.windows += 1
+        self.changed_windows += changed
+        self.cursor = last
+        self.window_start = end
+        self.pending = []
+
+# -----------------------------------------------------------------------------------------------------------
+# Schleifen-Erkennung
+#   Über Musik/Stille wiederholt Whisper manchmal eine Phrase endlos – innerhalb eines Segments (N-Gramme,
+#   compression_ratio) oder als Folge identischer Segmente. Die Segmente werden beim Abholen geprüft; bei einer
+#   Schleife wird die Dekodierung abgebrochen und das Fenster ab Schleifenbeginn mit anderen Einstellungen neu
+#   dekodiert (Sampling, Wiederholungsstrafe, VAD); danach geht es hinter dem Fenster weiter. Hängt auch die
+#   Neu-Dekodierung, bleibt das Original erhalten: nur die Wiederholungen fallen weg (erstes Vorkommen bleibt),
+#   weiter geht es direkt hinter dem letzten verworfenen Segment. Die Ereignisse landen als decode.loops im Run-Report.
+# -----------------------------------------------------------------------------------------------------------
+def loop_reason(segment):
+    """'compression' | 'ngram', wenn das Segment selbst eine Wiederholungsschleife enthält, sonst None"""
+    if segment.compression_ratio > LOOP_COMPRESSION_RATIO:
+        return "compression"
+    words = normalize_text(segment.text).split()
+    ngrams = Counter(tuple(words[i:i + LOOP_NGRAM]) for i in range(len(words) - LOOP_NGRAM + 1))
+    if ngrams:
+        repeats = ngrams.most_common(1)[0][1]
+        if repeats >= LOOP_NGRAM_REPEATS and repeats * LOOP_NGRAM >= LOOP_NGRAM_SHARE * len(words):
+            return "ngram"
+    return None
+
+def repeat_key(segment):
+    """Normalisierter Text für die Segment-Wiederholung; None bei kurzen Texten (Kehrvers, Antwort), die sich wiederholen dürfen"""
+    text = normalize_text(segment.text)
+    return text if len(text.split()) >= LOOP_REPEAT_MIN_WORDS else None
+
+def collapse_repeats(text, max_phrase=8):
+    """Direkt aufeinanderfolgende Wiederholungen einer Wortfolge auf ihr erstes Vorkommen kürzen"""
+    words, kept = text.split(), []
+    for word in words:
+        kept.append(word)
+        for size in range(1, min(max_phrase, len(kept) // 2) + 1):
+            if [normalize_text(w) for w in kept[-size:]] == [normalize_text(w) for w in kept[-2 * size:-size]]:
+                del kept[-size:]
+                break
+    return " ".join(kept)
 
+def with_text(segment, text):
+    if hasattr(segment, "_replace"):
+        return segment._replace(text=text)
+    return dataclasses.replace(segment, text=text)
+
+def has_loop(segments):
+    repeats, previous = 1, None
+    for segment in segments:
+        if loop_reason(segment):
+            return True
+        text = repeat_key(segment)
+        repeats = repeats + 1 if text and text == previous else 1
+        if repeats >= LOOP_SEGMENT_REPEATS:
+            return True
+        previous = text
+    return False
+
+def redecode_loop(model, audio, start, end, options):
+    """Fenster [start, end) ohne Prompt mit LOOP_REDECODE_OPTIONS neu dekodieren; None, wenn es wieder hängt"""
+    window, _ = model.transcribe(audio[int(start * SAMPLE_RATE):int(end * SAMPLE_RATE)], language="de",
+                                 initial_prompt=None, **{**options, **LOOP_REDECODE_OPTIONS})
+    segments = [shift_segment(segment, start) for segment in window]
+    return None if has_loop(segments) else segments
+
+def guarded_segments(model, source, audio, restart, options, stats):
+    """
+    Reicht die Segmente von `source` durch und fängt Schleifen ab. Wiederholungen eines Segmenttexts werden
+    zurückgehalten, bis ein anderer Text kommt; restart(audio, offset) liefert die Segmente ab offset
+    (globale Zeitstempel). audio darf Pfad oder Array sein – dekodiert wird erst bei der ersten Schleife.
+    """
+    loops = stats.setdefault("loops", {"events": 0, "reseeded": 0, "kept": 0, "droppedSegments": 0, "reasons": {}})
+    repeated = None                          # Text einer im Original übernommenen Schleife – weitere Wiederholungen fallen weg
+    while source is not None:
+        previous, held = None, []
+        loop_at = reason = None
+        for segment in source:
+            reason = loop_reason(segment)
+            text = repeat_key(segment)
+            if reason is None and text and text == repeated:
+                loops["droppedSegments"] += 1
+                continue
+            repeated = None
+            if reason is None and text and text == previous:
+                held.append(segment)
+                if len(held) + 1 < LOOP_SEGMENT_REPEATS:
+                    continue
+                reason = "repeat"
+            if reason:
+                loop_at = held[0].start if held else segment.start
+                break
+            yield from held
+            held = []
+            previous = text
+            yield segment
+        else:
+            yield from held
+            return
+        source.close()
+
+        audio = load_audio(audio)
+        duration = len(audio) / SAMPLE_RATE
+        window_end = min(duration, loop_at + LOOP_WINDOW_SEC)
+        loops["events"] += 1
+        loops["reasons"][reason] = loops["reasons"].get(reason, 0) + 1
+        with span("loop", reason=reason, start=round(loop_at, 2), end=round(window_end, 2)):
+            replacement = redecode_loop(model, audio, loop_at, window_end, options)
+        if replacement is None:
+            # Original behalten: Wiederholungen verwerfen (das erste Vorkommen ist schon durchgereicht) bzw. die
+            # Schleife im Segment auf ihr erstes Vorkommen kürzen – und direkt dahinter weitermachen statt 30 s zu verlieren
+            loops["kept"] += 1
+            if reason == "repeat":
+                loops["droppedSegments"] += len(held)
+                repeated = previous
+                resume_at = held[-1].end
+            else:
+                collapsed = collapse_repeats(segment.text)
+                if collapsed.strip():
+                    yield with_text(segment, collapsed)
+                resume_at = segment.end
+            window_end = min(duration, max(resume_at, loop_at + 1.0))
+            print_info(f"   Schleife ({reason}) bei {format_timestamp(int(loop_at))}: "
+                       f"Neu-Dekodierung hängt ebenfalls – Original ohne Wiederholungen übernommen")
+        else:
+            loops["reseeded"] += 1
+            loops["droppedSegments"] += len(held) + (reason != "repeat")
+            print_info(f"   Schleife ({reason}) bei {format_timestamp(int(loop_at))}: "
+                       f"{window_end - loop_at:.0f} s neu dekodiert ({len(replacement)} Segmente)")
+            yield from replacement
+        source = restart(audio, window_end) if window_end < duration - 0.5 else None
 
 # -----------------------------------------------------------------------------------------------------------
 # Starte MP3-Transkription optionalem Chunking für lange Audios (um Drift zu vermeiden)
+#   decode_mode: "beam" = jedes Segment mit vollem Beam, "adaptive" = greedy + Beam nur für unsichere Fenster
+#   decode_stats (dict, optional) erhält im adaptiven Modus die Kennzahlen (Anteil Audio mit Beam usw.) und
+#   in beiden Modi unter "loops" die abgefangenen Wiederholungsschleifen
 # -----------------------------------------------------------------------------------------------------------
-def transcribe_audio(model, audio_path, mp3_duration_sec):
+def transcribe_audio(model, audio_path, mp3_duration_sec, on_segment=None, decode_options=None,
+                     decode_mode=DECODE_MODE, decode_stats=None):
     all_segments = []
     chunk_paths = []
     seconds = int(mp3_duration_sec)
     duration_str = format_timestamp(seconds)
     print_info(f"   mp3_duration:    {duration_str}")
 
-    initial_prompt = "Dies ist eine klare, natürliche deutsche Sprache, eine Durchgabe eines Engelmediums welches Engel channelt"
-    all_segments, info = model.transcribe(
-        audio_path, 
-        language="de", 
-        beam_size=BEAM_SIZE, 
-        vad_filter=USE_VAD, 
-        vad_parameters=VAD_PARAMS,
-        condition_on_previous_text=CONDITION_ON_PREV,
-        initial_prompt=initial_prompt
-    )
-    all_segments = list(all_segments)  # Zu Liste konvertieren
+    initial_prompt = INITIAL_PROMPT
+    options = {**DECODE_OPTIONS, **(decode_options or {})}
+    stats = decode_stats if decode_stats is not None else {}
+    if decode_mode == "adaptive" and options["beam_size"] > 1:
+        with span("audio"):
+            audio_path = load_audio(audio_path)
+        all_segments = adaptive_segments(model, audio_path, options, initial_prompt, stats)
+
+        def restart(audio, offset):
+            return adaptive_segments(model, audio[int(offset * SAMPLE_RATE):], options, initial_prompt, stats,
+                                     offset=offset)
+    else:
+        stats.update(mode="beam")
+        with span("vad", vad=options.get("vad_filter", False)):   # inkl. Audio dekodieren
+            all_segments, info = model.transcribe(
+                audio_path, 
+                language="de", 
+                initial_prompt=initial_prompt,
+                **options
+            )
+
+        def restart(audio, offset):
+            segments, _ = model.transcribe(audio[int(offset * SAMPLE_RATE):], language="de",
+                                           initial_prompt=initial_prompt, **options)
+            return (shift_segment(segment, offset) for segment in segments)
+    all_segments = guarded_segments(model, all_segments, audio_path, restart, options, stats)
+    # Segmente einzeln abholen, damit fertige Segmente sofort weitergereicht werden können (Stream-Modus)
+    collected = []
+    for segment in all_segments:
+        collected.append(segment)
+        if on_segment:
+            on_segment(segment)
+    all_segments = collected
+
+    if stats.get("mode") == "adaptive":
+        audio_seconds = stats["audioSeconds"] or 1
+        stats["beamShare"] = round(stats["beamSeconds"] / audio_seconds, 4)
+        print_info(f"   Adaptive Dekodierung: {stats['windows']} Fenster / {stats['redecodedSegments']} von "
+                   f"{stats['segments']} Segmenten mit Beam {options['beam_size']} neu dekodiert, "
+                   f"{stats['beamShare'] * 100:.1f} % des Audios auf dem teuren Pfad "
+                   f"({stats['keptGreedy']} Fenster greedy belassen)")
+    loops = stats["loops"]
+    if loops["events"]:
+        print_info(f"   Schleifen: {loops['events']} erkannt, {loops['reseeded']} neu dekodiert, "
+                   f"{loops['kept']} im Original ohne Wiederholungen übernommen, "
+                   f"{loops['droppedSegments']} Segmente verworfen")
 
     return all_segments, chunk_paths
 
+# -----------------------------------------------------------------------------------------------------------
+# Teil-Transkription (--range): nur einzelne Zeitbereiche neu dekodieren und im bestehenden Transkript ersetzen
+#   Bereiche werden auf Segmentgrenzen des Transkripts ausgeweitet (kein halber Satz doppelt), nur das Audio
+#   dieser Fenster wird per ffmpeg -ss/-t dekodiert, die neuen Segmente erhalten globale Zeitstempel.
+# -----------------------------------------------------------------------------------------------------------
+def parse_range(value):
+    """argparse-Typ für --range: 'START-END' mit hh:mm:ss, mm:ss oder Sekunden → (start, end)"""
+    try:
+        start, end = (parse_timestamp(part) for part in value.split("-", 1))
+    except ValueError:
+        raise argparse.ArgumentTypeError(f"Ungültiger Bereich '{value}' (erwartet z. B. 01:02:30-01:03:00)")
+    if end <= start:
+        raise argparse.ArgumentTypeError(f"Bereich '{value}': Ende muss nach dem Start liegen")
+    return start, end
+
+def resolve_ranges(store, ranges, mp3_duration):
+    """Zeitbereiche → [(first, last, start, end)]: auf Segmentgrenzen ausgeweitet, Überlappungen zusammengefasst"""
+    windows = []
+    for start, end in sorted(ranges):
+        if mp3_duration > 0:
+            end = min(end, mp3_duration)
+        indices = store.indices_between(start, end)
+        if indices:
+            first, last = indices.start, indices.stop
+            start, end = store.starts[first], store.ends[last - 1]
+        else:
+            # Bereich vor dem ersten Segment bzw. leeres Transkript: neue Segmente werden dort eingefügt
+            first = last = indices.start
+        if windows and first < windows[-1][1]:
+            previous = windows.pop()
+            first, last = previous[0], max(previous[1], last)
+            start, end = previous[2], max(previous[3], end)
+        windows.append((first, last, start, end))
+    return windows
+
+def load_audio_window(audio_path, start, end):
+    """Nur [start, end) dekodieren (16 kHz float32) – ffmpeg springt direkt hin, statt die ganze Datei zu dekodieren"""
+    import numpy as np  # Lazy: kommt mit faster-whisper
+    stdin_data = audio_path.getvalue() if hasattr(audio_path, "getvalue") else b""
+    cmd = [
+        'ffmpeg', '-v', 'error', '-ss', f"{start:.3f}", '-t', f"{end - start:.3f}",
+        '-i', 'pipe:0' if stdin_data else audio_path,
+        '-f', 'f32le', '-ac', '1', '-ar', str(SAMPLE_RATE), 'pipe:1'
+    ]
+    output = subprocess.run(cmd, input=stdin_data, capture_output=True, check=True).stdout
+    return np.frombuffer(output, dtype=np.float32)
+
+def transcribe_ranges(model, audio_path, store, windows, width=160, on_window=None, decode_mode=DECODE_MODE):
+    """
+    Dekodiert die Fenster aus resolve_ranges und gibt (neuer Transkript-Text, Kennzahlen je Fenster) zurück.
+    on_window(payload) erhält je Fenster {first, last, start, end, changed, segments} – first/last beziehen sich
+    auf das Transkript vor dem Lauf (wie @@REFINE im progressiven Modus).
+    """
+    replacements = []
+    window_stats = []
+    for first, last, start, end in windows:
+        audio_start = max(0.0, start - RANGE_PADDING_SEC)
+        audio = load_audio_window(audio_path, audio_start, end + RANGE_PADDING_SEC)
+        print_info(f"Bereich {format_timestamp(start)}–{format_timestamp(end)}: Segmente {first}..{last - 1} "
+                   f"({len(audio) / SAMPLE_RATE:.1f} s Audio)")
+        stats = {}
+        segments, _ = transcribe_audio(model, audio, len(audio) / SAMPLE_RATE, decode_mode=decode_mode, decode_stats=stats)
+        # Zeitstempel global machen; Rand-Segmente gehören zum Nachbarbereich, der unverändert bleibt
+        segments = [shifted for shifted in (shift_segment(s, audio_start) for s in segments)
+                    if start <= (shifted.start + shifted.end) / 2 <= end]
+        raws = [correct_transcription(format_segment(segment, width=width)) for segment in segments]
+        changed = (normalize_text(" ".join(store.texts(first, last)))
+                   != normalize_text(" ".join(segment.text for segment in segments)))
+        replacements.append((first, last, "".join(raws)))
+        window_stats.append({"first": first, "last": last, "start": start, "end": end,
+                             "segments": len(segments), "changed": changed, "decode": stats})
+        if on_window:
+            on_window({
+                "first": first, "last": last, "start": start, "end": end, "changed": changed,
+                "segments": [{"start": s.start, "end": s.end, "raw": raw} for s, raw in zip(segments, raws)]
+            })
+    return store.splice(replacements), window_stats
+
 # -----------------------------------------------------------------------------------------------------------
 # Textumbruch bei Spalte 80
 # -----------------------------------------------------------------------------------------------------------
@@ -280,21 +757,35 @@ def format_transcription(all_segments, start_date_str, start_time_str, end_time_
     
     processed_transcription = ""
     for segment in all_segments:
-        line = f"[{format_timestamp(segment.start)}] {segment.text}"
-        if re.match(r"^\[\d{2}:\d{2}:\d{2}\] ", line):
-            timestamp = line[:11]  # [00:00:00] 
-            text = line[11:]
-            wrapped = wrap_text(text, width=width)
-            sublines = wrapped.splitlines()
-            if sublines:
-                processed_transcription += timestamp + sublines[0] + "\n"
-                for sub in sublines[1:]:
-                    processed_transcription += " " * 12 + sub + "\n"
+        processed_transcription += format_segment(segment, width=width)
 
     formatted_transcription += processed_transcription
 
     return formatted_transcription
 
+# -----------------------------------------------------------------------------------------------------------
+# Ein Segment als "[hh:mm:ss] Text" mit eingerückten Folgezeilen formatieren
+# -----------------------------------------------------------------------------------------------------------
+def format_segment(segment, width=160):
+    formatted = ""
+    line = f"[{format_timestamp(segment.start)}] {segment.text}"
+    if re.match(r"^\[\d{2}:\d{2}:\d{2}\] ", line):
+        timestamp = line[:11]  # [00:00:00] 
+        text = line[11:]
+        wrapped = wrap_text(text, width=width)
+        sublines = wrapped.splitlines()
+        if sublines:
+            formatted += timestamp + sublines[0] + "\n"
+            for sub in sublines[1:]:
+                formatted += " " * 12 + sub + "\n"
+    return formatted
+
+# -----------------------------------------------------------------------------------------------------------
+# Stream-Modus: maschinenlesbare Zeile ausgeben (wird von main.py /process an summarize.py weitergereicht)
+# -----------------------------------------------------------------------------------------------------------
+def emit_stream_message(kind, payload):
+    print(f"{STREAM_PREFIX}{kind} " + json.dumps(payload, ensure_ascii=False), flush=True)
+
 # -----------------------------------------------------------------------------------------------------------
 # Nachkorrektur der Transkription
 # -----------------------------------------------------------------------------------------------------------
@@ -360,24 +851,89 @@ def cleanup_chunks(chunk_paths):
 # ────────────────────────────────────────────────
 # Starte Hauptprogramm
 # ────────────────────────────────────────────────
-def main():
+def main(argv=None):
     global duration_seconds  # Um im format_transcription zugreifen zu können
 
+    # Daemon-Modus: AUDIO_DIR überwachen, Modell bleibt geladen (Optionen siehe watch_folder.py --help)
+    argv = sys.argv[1:] if argv is None else list(argv)
+    if '--watch' in argv:
+        import watch_folder
+        watch_folder.main([arg for arg in argv if arg != '--watch'])
+        return
+
     # Argument-Parser – ALLE Parameter sind optional / benannt
     parser = argparse.ArgumentParser(description="Transkription von MP3-Dateien mit Faster-Whisper.")
     parser.add_argument('file', nargs='?', default=None,
                         help="Optionaler MP3-Dateiname (relativ zu AUDIO_DIR)")
     parser.add_argument('-w', '--width', type=int, default=160,
                         help="Spaltenwert für Zeilenumbruch (default: 160)")
+    parser.add_argument('--stream', action='store_true',
+                        help="Fertige Segmente sofort als @@SEGMENT-JSON-Zeilen ausgeben (Pipeline /process)")
+    parser.add_argument('--stdio', action='store_true',
+                        help="Audiodaten von stdin lesen und Ergebnis als @@RESULT-JSON ausgeben statt Dateien zu verwenden; "
+                             "'file' ist dann nur der Anzeigename")
+    parser.add_argument('--decode', choices=["adaptive", "beam"], default=DECODE_MODE,
+                        help=f"adaptive = greedy, unsichere Segmente mit Beam {BEAM_SIZE} neu dekodieren; "
+                             f"beam = alles mit Beam {BEAM_SIZE} (default: {DECODE_MODE})")
+    parser.add_argument('--progressive', action='store_true',
+                        help=f"Nur mit --stream: sofort Entwurf mit {DRAFT_MODEL} (@@DRAFT), dann fensterweise Ersetzung "
+                             f"durch {os.path.basename(MODEL_NAME)} (@@REFINE)")
+    parser.add_argument('--profile', action='store_true',
+                        help="Jede Stufe profilieren (Sampling + cProfile): Hotspots und Flamegraph-Stacks neben dem Transkript")
+    parser.add_argument('--save', action='store_true',
+                        help="Im stdio-Modus zusätzlich <name>.txt im Audio-Verzeichnis speichern")
+    parser.add_argument('--range', dest='ranges', action='append', type=parse_range, metavar='START-END',
+                        help="Nur diesen Zeitbereich neu transkribieren (hh:mm:ss-hh:mm:ss oder Sekunden, mehrfach möglich) "
+                             "und im bestehenden Transkript ersetzen (im Stream-Modus je Bereich @@REFINE)")
+    parser.add_argument('--transcript', default=None,
+                        help="Mit --range: bestehendes Transkript relativ zu AUDIO_DIR (default: <name>.txt)")
+    parser.add_argument('--watch', action='store_true',
+                        help="Daemon: AUDIO_DIR überwachen und neue MP3s mit geladen bleibendem Modell transkribieren "
+                             "(weitere Optionen: watch_folder.py --help)")
+    parser.add_argument('--trace-id', default=None,
+                        help="Trace-ID des Auftrags: Spans je Stufe als @@SPAN-Zeilen ausgeben (main.py)")
+    parser.add_argument('--trace-parent', default=None,
+                        help="Mit --trace-id: spanId der aufrufenden Span (Subprozess in main.py)")
     
-    args = parser.parse_args()
+    args = parser.parse_args(argv)
+    if args.progressive and not args.stream:
+        parser.error("--progressive erfordert --stream")
+    if args.ranges and args.progressive:
+        parser.error("--range und --progressive schließen sich aus")
+    start_script_trace("transcribe", args.trace_id, args.trace_parent, import_span=active_manager() is None)
     
     print("")
     print_header(f"Transkription von MP3-Dateien mit {MODEL_DESC}")
 
-    audio_path, output_path, base_name = select_audio_file(args)
+    if args.stdio:
+        # Audio komplett im Speicher – kein Umweg über eine Temp-Datei auf /mnt/d
+        audio_data = sys.stdin.buffer.read()
+        if not audio_data:
+            print_error("Keine Audiodaten auf stdin erhalten.")
+            sys.exit(1)
+        base_name = os.path.splitext(os.path.basename(args.file or "stdin.mp3"))[0]
+        output_path = os.path.join(AUDIO_DIR, f"{base_name}.txt")
+        print_info(f"Audiodaten von stdin:               {len(audio_data) / 1024 / 1024:.2f} MB ({base_name})")
+        mp3_duration = get_mp3_details(None, audio_data=audio_data)
+        audio_path = io.BytesIO(audio_data)
+    else:
+        audio_path, output_path, base_name = select_audio_file(args)
+        mp3_duration = get_mp3_details(audio_path)
 
-    mp3_duration = get_mp3_details(audio_path)
+    # --range: das bestehende Transkript wird an Ort und Stelle ergänzt (auch im stdio-Modus)
+    store = None
+    if args.ranges:
+        if args.transcript:
+            output_path = os.path.join(AUDIO_DIR, os.path.basename(args.transcript))
+            base_name = os.path.splitext(os.path.basename(output_path))[0]
+        if not os.path.isfile(output_path):
+            print_error(f"Kein bestehendes Transkript für --range: {output_path}")
+            sys.exit(1)
+        store = TranscriptStore.open(output_path, duration=mp3_duration)
+        windows = resolve_ranges(store, args.ranges, mp3_duration)
+        range_seconds = sum(end - start for _, _, start, end in windows)
+        print_info(f"Teil-Transkription: {len(windows)} Bereich(e), {format_timestamp(range_seconds)} von "
+                   f"{format_timestamp(mp3_duration)} Audio, Transkript: {os.path.basename(output_path)}")
 
     show_transcription = should_show_transcription()
 
@@ -393,19 +949,80 @@ def main():
     print_info("═" * 40)
     print_info(f"Start der Transkription: {start_time_str}")
 
-    # Modell laden
-    model_fast_whisper = load_model_fast_whisper()
+    profiler = None
+    if args.profile:
+        from profiling import StageProfiler  # Nur im Profiling-Modus laden (Startzeit)
+        profiler = StageProfiler()
+    recorder = RunRecorder("transcribe", profiler=profiler, file=f"{base_name}.txt", mp3Duration=mp3_duration,
+                           model=MODEL_DESC, beamSize=BEAM_SIZE, vad=USE_VAD, decodeMode=args.decode,
+                           progressive=args.progressive)
+    if store is not None:
+        recorder.meta.update(ranges=[[start, end] for _, _, start, end in windows], rangeSeconds=range_seconds)
+
+    # Modell laden (progressiv: large-v3 lädt im Hintergrund, während das kleine Modell den Entwurf liefert –
+    # die Stufe "load" misst dann nur noch die Restwartezeit nach dem Entwurf)
+    draft_segments = []
+    if args.progressive:
+        with ThreadPoolExecutor(max_workers=1) as executor:
+            large_model = executor.submit(load_model_fast_whisper)
+            with recorder.stage("draft"):
+                audio_path, draft_segments, first_text_seconds = run_draft_pass(audio_path, mp3_duration, args.width, start_time)
+            recorder.meta.update(draftModel=DRAFT_MODEL, draftSegments=len(draft_segments), firstTextSeconds=first_text_seconds)
+            with recorder.stage("load"):
+                model_fast_whisper = large_model.result()
+    else:
+        with recorder.stage("load"):
+            model_fast_whisper = load_model_fast_whisper()
     
     end_time_lm = datetime.now()
     duration_lm_seconds = (end_time_lm - start_time).total_seconds()
     duration_lm_str = format_timestamp(duration_lm_seconds)
     print_success(f"Modell geladen, Dauer = {duration_lm_str}")
 
-    # Transkription starten
-    all_segments, chunk_paths = transcribe_audio(model_fast_whisper, audio_path, mp3_duration)
+    # Transkription starten (im Stream-Modus wird jedes fertige Segment sofort ausgegeben)
+    # (progressiv zusätzlich als fensterweise Ersetzung des Entwurfs)
+    on_segment = None
+    refiner = DraftRefiner(draft_segments) if args.progressive else None
+    if args.stream:
+        def on_segment(segment):
+            raw = correct_transcription(format_segment(segment, width=args.width))
+            emit_stream_message("SEGMENT", {
+                "start": segment.start,
+                "end": segment.end,
+                "raw": raw
+            })
+            if refiner:
+                refiner.add(segment, raw)
+    decode_stats = {}
+    if store is not None:
+        # Teil-Transkription: je Bereich @@REFINE (Segmente first..last-1 des bisherigen Transkripts ersetzen)
+        on_window = (lambda payload: emit_stream_message("REFINE", payload)) if args.stream else None
+        with recorder.stage("decode"):
+            merged_transcription, window_stats = transcribe_ranges(model_fast_whisper, audio_path, store, windows,
+                                                                   width=args.width, on_window=on_window,
+                                                                   decode_mode=args.decode)
+        store.close()
+        all_segments, chunk_paths = [], []
+        recorder.meta["segments"] = sum(window["segments"] for window in window_stats)
+        recorder.meta["decode"] = window_stats
+        print_info(f"{len(window_stats)} Bereich(e) neu transkribiert, davon "
+                   f"{sum(window['changed'] for window in window_stats)} mit geändertem Text")
+    else:
+        with recorder.stage("decode"):
+            all_segments, chunk_paths = transcribe_audio(model_fast_whisper, audio_path, mp3_duration, on_segment=on_segment,
+                                                         decode_mode=args.decode, decode_stats=decode_stats)
+            if refiner:
+                refiner.flush()
+        recorder.meta["segments"] = len(all_segments)
+        recorder.meta["decode"] = decode_stats
+    if refiner:
+        recorder.meta["refineWindows"] = refiner.windows
+        recorder.meta["changedWindows"] = refiner.changed_windows
+        print_info(f"Entwurf in {refiner.windows} Fenstern ersetzt, davon {refiner.changed_windows} mit geändertem Text")
 
     # GPU-Speicher freigeben
-    delete(model_fast_whisper)
+    with recorder.stage("release"):
+        delete(model_fast_whisper)
 
     # Zeitmessung beenden
     end_time = datetime.now()
@@ -413,24 +1030,67 @@ def main():
     duration_seconds = (end_time - start_time).total_seconds()
     duration_str = format_timestamp(duration_seconds)
 
-    # Transkription formatieren (width wird jetzt korrekt weitergegeben)
-    formatted_transcription = format_transcription(
-        all_segments, start_date_str, start_time_str, end_time_str, 
-        duration_str, mp3_duration, width=args.width
-    )
-    formatted_transcription = correct_transcription(formatted_transcription)
+    # Transkription formatieren (width wird jetzt korrekt weitergegeben; --range: Header und übrige Segmente bleiben)
+    if store is not None:
+        formatted_transcription = merged_transcription
+    else:
+        with recorder.stage("format"):
+            formatted_transcription = format_transcription(
+                all_segments, start_date_str, start_time_str, end_time_str, 
+                duration_str, mp3_duration, width=args.width
+            )
+            formatted_transcription = correct_transcription(formatted_transcription)
+    if args.stream:
+        # Header = alles vor dem ersten Segment (Datum, Dauer, Ratio, Modell)
+        first_segment = re.search(r"^\[\d{2}:\d{2}:\d{2}\] ", formatted_transcription, flags=re.MULTILINE)
+        header_text = formatted_transcription[:first_segment.start()] if first_segment else formatted_transcription
+        emit_stream_message("HEADER", {"text": header_text, "mp3Duration": mp3_duration})
 
     print_success(f"Transkription beendet um {end_time_str}, Dauer = {duration_str}")
 
-    # Anzeigen & Speichern
+    # Anzeigen & Speichern (stdio-Modus: Ergebnis als JSON-Zeile, Datei nur auf Wunsch)
     display_transcription(show_transcription, formatted_transcription, width=args.width)
-    save_transcription(output_path, formatted_transcription)
+    save = not args.stdio or args.save or store is not None
+    if save:
+        with recorder.stage("save"):
+            save_transcription(output_path, formatted_transcription)
+    if args.stdio:
+        emit_stream_message("RESULT", {
+            "transcription": formatted_transcription,
+            "filename": f"{base_name}.txt",
+            "mp3Duration": mp3_duration,
+            "segments": recorder.meta["segments"]
+        })
 
     # Zeitinfo
     display_time_for_transcription(start_date_str, start_time_str, end_time_str, duration_str, mp3_duration, duration_seconds)
 
     cleanup_chunks(chunk_paths)
 
+    # Run-Report: Messwerte je Stufe anzeigen, als <name>_run.json speichern und/oder als @@REPORT ausgeben
+    # (im Modell-Host zusätzlich die Residenz-Zähler: Ladevorgänge, Auslagerungen, Ladezeiten)
+    if active_manager() is not None:
+        recorder.meta["residency"] = active_manager().report()
+    print_info("Messwerte je Stufe:")
+    for line in recorder.summary_lines():
+        print_info(f"    .. {line}")
+    # (--range: Run-Report und Profil des vollständigen Laufs nicht überschreiben – nur @@REPORT im Stream-Modus)
+    save_report = save and store is None
+    if save_report:
+        report_file = recorder.save(output_path)
+        if report_file:
+            print_info(f"Run-Report gespeichert: {report_file}")
+    if profiler is not None:
+        # --profile: Hotspots je Stufe und Collapsed-Stacks (<name>_profile.txt/.collapsed bzw. @@PROFILE)
+        print(profiler.summary_text())
+        profile_files = profiler.save(output_path) if save_report else None
+        if profile_files:
+            print_info(f"Profil gespeichert (Flamegraph: flamegraph.pl/speedscope): {', '.join(profile_files)}")
+    if args.stream or args.stdio:
+        emit_stream_message("REPORT", recorder.report())
+        if profiler is not None:
+            emit_stream_message("PROFILE", {"summary": profiler.summary_text(), "collapsed": profiler.collapsed()})
+
     print()
 
 
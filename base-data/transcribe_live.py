@@ -0,0 +1,240 @@
+# ------------------------------------------------------------------------------------------------------------------------------------
+# transcribe_live.py
+#
+# Live-Transkription für den WebSocket-Endpunkt /live des lokalen KI-Service (main.py)
+# Liest einen fortlaufenden Audio-Strom von stdin und dekodiert ihn in einem rollierenden Fenster mit denselben
+# Whisper-Einstellungen wie transcribe.py (large-v3, language "de", INITIAL_PROMPT, DECODE_OPTIONS):
+#   - alle STEP_SEC Sekunden neues Audio wird das offene Fenster (höchstens MAX_WINDOW_SEC) neu dekodiert
+#   - ein Segment gilt als fertig, wenn es nicht das letzte ist, in zwei Durchläufen gleich lautet und nicht in den
+#     letzten HOLD_SEC liegt (LocalAgreement) → @@FINAL, das Fenster beginnt danach neu
+#   - läuft das Fenster voll, wird alles bis auf das letzte Segment erzwungen übernommen → Latenz bleibt begrenzt
+#   - der Rest des Fensters geht als @@PARTIAL raus (ersetzt jeweils den vorherigen Partial-Text)
+#
+# Eingabe: --format pcm = s16le, 16 kHz, mono (roh); sonst (opus, webm, ogg, mp3) dekodiert ffmpeg den Strom.
+# Ausgabe: @@READY {..} nach dem Laden, @@PARTIAL/@@FINAL je Durchlauf, @@DONE und @@REPORT am Ende (stdin geschlossen).
+#
+# Muss neben transcribe.py liegen (WSL: /home/tom/transcribe_live.py).
+# ------------------------------------------------------------------------------------------------------------------------------------
+
+import sys
+import time
+import queue
+import argparse
+import threading
+import subprocess
+
+from transcribe import (SAMPLE_RATE, DECODE_OPTIONS, INITIAL_PROMPT, BEAM_SIZE, MODEL_DESC, load_model_fast_whisper,
+                        delete, shift_segment, normalize_text, format_segment, correct_transcription,
+                        emit_stream_message, print_info, print_error)
+from instrumentation import RunRecorder
+
+STEP_SEC = 1.0                   # Neu dekodieren, sobald so viel neues Audio vorliegt
+MAX_WINDOW_SEC = 15.0            # Längstes offenes Fenster – danach wird erzwungen übernommen (Latenzgrenze)
+HOLD_SEC = 1.0                   # Segmente, die in den letzten HOLD_SEC enden, bleiben vorläufig
+CONTEXT_CHARS = 200              # So viel bereits übernommener Text wird dem initial_prompt angehängt
+READ_SIZE = 3200                 # Bytes je read() von stdin bzw. ffmpeg (PCM: 100 ms s16le)
+INPUT_FORMATS = ("pcm", "opus", "webm", "ogg", "mp3")
+
+
+# -----------------------------------------------------------------------------------------------------------
+# Audio-Eingang: stdin → float32-Blöcke (16 kHz mono) in eine Queue, None = Ende des Stroms
+# -----------------------------------------------------------------------------------------------------------
+def start_reader(input_format, blocks):
+    import numpy as np  # Lazy wie in transcribe.py (kommt mit faster-whisper)
+
+    if input_format == "pcm":
+        source, dtype, scale, decoder = sys.stdin.buffer, np.int16, 1 / 32768, None
+    else:
+        # ffmpeg liest den Container-Strom direkt vom stdin dieses Prozesses
+        decoder = subprocess.Popen(
+            ['ffmpeg', '-v', 'error', '-f', input_format, '-i', 'pipe:0',
+             '-f', 'f32le', '-ac', '1', '-ar', str(SAMPLE_RATE), 'pipe:1'],
+            stdin=sys.stdin.buffer, stdout=subprocess.PIPE
+        )
+        source, dtype, scale = decoder.stdout, np.float32, 1.0
+
+    def read():
+        width = np.dtype(dtype).itemsize
+        rest = b""
+        while True:
+            data = source.read1(READ_SIZE) if hasattr(source, "read1") else source.read(READ_SIZE)
+            if not data:
+                break
+            data = rest + data
+            usable = len(data) - len(data) % width   # Blöcke können mitten in einem Sample enden
+            rest = data[usable:]
+            if usable:
+                blocks.put(np.frombuffer(data[:usable], dtype=dtype).astype(np.float32) * scale)
+        if decoder is not None:
+            decoder.wait()
+        blocks.put(None)
+
+    threading.Thread(target=read, daemon=True).start()
+
+
+# -----------------------------------------------------------------------------------------------------------
+# Rollierendes Fenster
+# -----------------------------------------------------------------------------------------------------------
+class LiveDecoder:
+    """Hält das offene Audio-Fenster und entscheidet je Durchlauf, welche Segmente final sind"""
+
+    def __init__(self, model, options, width=160, step_sec=STEP_SEC, max_window_sec=MAX_WINDOW_SEC, hold_sec=HOLD_SEC):
+        import numpy as np
+        self.np = np
+        self.model = model
+        self.options = options
+        self.width = width
+        self.step_sec = step_sec
+        self.max_window_sec = max_window_sec
+        self.hold_sec = hold_sec
+        self.audio = np.zeros(0, dtype=np.float32)
+        self.offset = 0.0                # Globale Zeit von audio[0]
+        self.received = 0.0              # Insgesamt empfangene Sekunden
+        self.undecoded = 0.0             # Seit dem letzten Durchlauf empfangene Sekunden
+        self.previous = []               # Texte der vorläufigen Segmente des letzten Durchlaufs
+        self.committed = ""              # Übernommener Text (Ende dient als Kontext im Prompt)
+        self.finals = 0
+        self.passes = 0
+        self.decode_seconds = 0.0
+        self.forced = 0
+
+    def feed(self, samples):
+        self.audio = self.np.concatenate([self.audio, samples])
+        seconds = len(samples) / SAMPLE_RATE
+        self.received += seconds
+        self.undecoded += seconds
+
+    def ready(self):
+        return self.undecoded >= self.step_sec
+
+    def decode(self, final=False):
+        self.undecoded = 0.0
+        if not len(self.audio):
+            return
+        prompt = f"{INITIAL_PROMPT} {self.committed[-CONTEXT_CHARS:]}".strip()
+        started = time.perf_counter()
+        segments, _ = self.model.transcribe(self.audio, language="de", initial_prompt=prompt, **self.options)
+        segments = [shift_segment(segment, self.offset) for segment in segments]
+        self.decode_seconds += time.perf_counter() - started
+        self.passes += 1
+
+        window_end = self.offset + len(self.audio) / SAMPLE_RATE
+        window_full = window_end - self.offset >= self.max_window_sec
+        if final:
+            commit = len(segments)
+        else:
+            commit = 0
+            for index, segment in enumerate(segments[:-1]):
+                stable = index < len(self.previous) and normalize_text(self.previous[index]) == normalize_text(segment.text)
+                if not (stable and segment.end <= window_end - self.hold_sec):
+                    break
+                commit = index + 1
+            if window_full and commit < len(segments) - 1:
+                commit = len(segments) - 1
+                self.forced += 1
+            elif window_full and len(segments) == 1:
+                commit = 1           # Ein einziges, überlanges Segment: ebenfalls übernehmen
+                self.forced += 1
+
+        for segment in segments[:commit]:
+            emit_stream_message("FINAL", {
+                "index": self.finals,
+                "start": segment.start,
+                "end": segment.end,
+                "raw": correct_transcription(format_segment(segment, width=self.width)),
+                "receivedSeconds": round(self.received, 3)
+            })
+            self.finals += 1
+            self.committed = f"{self.committed} {segment.text.strip()}".strip()
+
+        # Fenster nach dem letzten übernommenen Segment neu beginnen; reine Stille nicht endlos mitschleppen
+        if commit:
+            cut = segments[commit - 1].end
+        elif not segments and window_end - self.offset > self.hold_sec:
+            cut = window_end - self.hold_sec
+        else:
+            cut = self.offset
+        if cut > self.offset:
+            self.audio = self.audio[int((cut - self.offset) * SAMPLE_RATE):]
+            self.offset = cut
+
+        rest = segments[commit:]
+        self.previous = [segment.text for segment in rest]
+        if not final:
+            emit_stream_message("PARTIAL", {
+                "start": rest[0].start if rest else self.offset,
+                "end": rest[-1].end if rest else self.offset,
+                "text": " ".join(segment.text.strip() for segment in rest),
+                "receivedSeconds": round(self.received, 3)
+            })
+
+    def stats(self):
+        return {
+            "audioSeconds": round(self.received, 3),
+            "segments": self.finals,
+            "passes": self.passes,
+            "forcedCommits": self.forced,
+            "decodeSeconds": round(self.decode_seconds, 3),
+            "rtf": round(self.decode_seconds / self.received, 4) if self.received else None,
+        }
+
+
+# ────────────────────────────────────────────────
+# Starte Hauptprogramm
+# ────────────────────────────────────────────────
+def main():
+    parser = argparse.ArgumentParser(description="Live-Transkription eines Audio-Stroms von stdin (rollierendes Fenster).")
+    parser.add_argument('--format', choices=INPUT_FORMATS, default="pcm",
+                        help="pcm = s16le 16 kHz mono, sonst per ffmpeg dekodierter Container-Strom (default: pcm)")
+    parser.add_argument('--beam', type=int, default=BEAM_SIZE, help=f"beam_size (default: {BEAM_SIZE} wie transcribe.py)")
+    parser.add_argument('--step', type=float, default=STEP_SEC, help=f"Sekunden neues Audio je Durchlauf (default: {STEP_SEC})")
+    parser.add_argument('--max-window', type=float, default=MAX_WINDOW_SEC,
+                        help=f"Längstes offenes Fenster in Sekunden (default: {MAX_WINDOW_SEC})")
+    parser.add_argument('-w', '--width', type=int, default=160, help="Spaltenwert für Zeilenumbruch (default: 160)")
+    args = parser.parse_args()
+
+    recorder = RunRecorder("transcribe_live", model=MODEL_DESC, format=args.format, beamSize=args.beam,
+                           stepSec=args.step, maxWindowSec=args.max_window)
+    with recorder.stage("load"):
+        model = load_model_fast_whisper()
+    options = {**DECODE_OPTIONS, "beam_size": args.beam}
+    decoder = LiveDecoder(model, options, width=args.width, step_sec=args.step, max_window_sec=args.max_window)
+
+    blocks = queue.Queue()
+    start_reader(args.format, blocks)
+    emit_stream_message("READY", {"model": MODEL_DESC, "format": args.format, "sampleRate": SAMPLE_RATE,
+                                  "beamSize": args.beam, "stepSec": args.step, "maxWindowSec": args.max_window})
+
+    with recorder.stage("decode"):
+        ended = False
+        while not ended:
+            block = blocks.get()
+            # Alles bereits Angekommene auf einmal übernehmen – bei langsamer Dekodierung wächst nur das Fenster
+            while block is not None:
+                decoder.feed(block)
+                try:
+                    block = blocks.get_nowait()
+                except queue.Empty:
+                    break
+            ended = block is None
+            if ended:
+                decoder.decode(final=True)
+            elif decoder.ready():
+                decoder.decode()
+
+    stats = decoder.stats()
+    recorder.meta.update(stats)
+    print_info(f"Live-Sitzung beendet: {stats['segments']} Segmente, {stats['audioSeconds']:.1f} s Audio, "
+               f"{stats['passes']} Durchläufe, RTF {stats['rtf']}")
+    with recorder.stage("release"):
+        delete(model)
+    emit_stream_message("DONE", stats)
+    emit_stream_message("REPORT", recorder.report())
+
+
+if __name__ == "__main__":
+    try:
+        main()
+    except KeyboardInterrupt:
+        print_error("Abgebrochen.")
+        sys.exit(130)
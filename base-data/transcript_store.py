@@ -0,0 +1,245 @@
+# ------------------------------------------------------------------------------------------------------------------------------------
+# transcript_store.py
+#
+# Gemeinsamer Parser für Transkript-Dateien (<name>.txt aus transcribe.py)
+# Liest ein Transkript EINMAL ein und legt die Segmente kompakt ab:
+#   - ein einziger Puffer mit dem Originaltext (bytes oder mmap)
+#   - Start-/End-Zeiten als array('d'), Byte-Offsets der Segmente als array('Q')
+#   - Segment-Objekte (__slots__) werden erst beim Zugriff erzeugt
+# Zeitbasierte Suche (Audio-Player-Seeking, Zeitfenster) per Binärsuche in O(log n).
+#
+# Wird von summarize.py und vom lokalen KI-Service (main.py) verwendet und muss daher neben den Skripten liegen
+# (WSL: /home/tom/transcript_store.py, Service: BASE_DATA_DIR).
+# ------------------------------------------------------------------------------------------------------------------------------------
+
+import mmap
+import re
+from array import array
+from bisect import bisect_left, bisect_right
+
+# Segment: "[hh:mm:ss] Text", Folgezeilen (Umbruch) sind um CONTINUATION_INDENT eingerückt (transcribe.py).
+# Andere Zeilen dazwischen (Block-Überschriften "----------  …" in <name>_s.txt) gehören nicht zum Segment-Text.
+CONTINUATION_INDENT = " " * 12
+SEGMENT_RE = re.compile(rb'^\[(\d{2}):(\d{2}):(\d{2})\] [^\n]*(?:\n' + CONTINUATION_INDENT.encode() + rb'[^\n]*)*\n?',
+                        re.MULTILINE)
+TIMESTAMP_LEN = 11               # "[00:00:00] "
+
+
+def format_timestamp(seconds):
+    seconds = int(max(0, seconds))
+    return f"{seconds // 3600:02d}:{(seconds % 3600) // 60:02d}:{seconds % 60:02d}"
+
+
+def parse_timestamp(value):
+    """'hh:mm:ss', 'mm:ss' oder Sekunden (str/int/float) → Sekunden als float"""
+    if isinstance(value, (int, float)):
+        return float(value)
+    parts = str(value).strip().strip('[]').split(':')
+    seconds = 0.0
+    for part in parts:
+        seconds = seconds * 60 + float(part)
+    return seconds
+
+
+def segment_text(raw):
+    """Reiner Text eines Segments: Timestamp entfernt, eingerückte Folgezeilen zu einer Zeile zusammengefügt"""
+    lines = raw.splitlines()
+    if not lines:
+        return ""
+    parts = [lines[0][TIMESTAMP_LEN:].strip()]
+    for line in lines[1:]:
+        if not line.startswith(CONTINUATION_INDENT):
+            break
+        if line.strip():
+            parts.append(line.strip())
+    return " ".join(parts)
+
+
+class Segment:
+    """Ein Transkript-Segment; wird nur bei Zugriff aus dem TranscriptStore erzeugt"""
+    __slots__ = ('index', 'start', 'end', 'text')
+
+    def __init__(self, index, start, end, text):
+        self.index = index
+        self.start = start
+        self.end = end
+        self.text = text
+
+    @property
+    def timestamp(self):
+        return f"[{format_timestamp(self.start)}]"
+
+    def to_dict(self):
+        return {"index": self.index, "start": self.start, "end": self.end,
+                "timestamp": self.timestamp, "text": self.text}
+
+    def __repr__(self):
+        return f"Segment({self.index}, {self.timestamp}, {self.text[:40]!r})"
+
+
+class TranscriptStore:
+    """
+    Array-basierter Segment-Speicher für ein Transkript.
+
+    Segment i umfasst buffer[offsets[i]:stops[i]] (Timestamp-Zeile + eingerückte Folgezeilen); was bis
+    offsets[i + 1] folgt (z. B. Block-Überschriften), bleibt nur in raw()/splice() erhalten. Alles vor dem
+    ersten Segment ist der Header. Das Ende eines Segments ist der Start des nächsten, beim letzten Segment
+    die übergebene Audio-Dauer (sonst sein Start).
+    """
+    __slots__ = ('_buffer', '_file', 'starts', 'ends', 'offsets', 'stops', 'header_end')
+
+    def __init__(self, buffer, duration=None, file=None):
+        self._buffer = buffer
+        self._file = file
+        self.starts = array('d')
+        self.offsets = array('Q')
+        self.stops = array('Q')
+
+        for match in SEGMENT_RE.finditer(buffer):
+            h, m, s = match.groups()
+            self.starts.append(int(h) * 3600 + int(m) * 60 + int(s))
+            self.offsets.append(match.start())
+            self.stops.append(match.end())
+
+        self.header_end = self.offsets[0] if self.offsets else len(buffer)
+        self.offsets.append(len(buffer))  # Sentinel: Ende des letzten Segments
+
+        self.ends = array('d', self.starts[1:])
+        if self.starts:
+            last_start = self.starts[-1]
+            self.ends.append(max(last_start, duration) if duration else last_start)
+
+    # -------------------------------------------------------------------------
+    # Konstruktoren
+    # -------------------------------------------------------------------------
+    @classmethod
+    def from_text(cls, text, duration=None):
+        return cls(text.encode('utf-8'), duration)
+
+    @classmethod
+    def open(cls, path, duration=None, use_mmap=False):
+        """Liest eine Transkript-Datei; mit use_mmap=True wird sie nur eingeblendet statt kopiert"""
+        f = open(path, 'rb')
+        if use_mmap:
+            try:
+                return cls(mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ), duration, file=f)
+            except ValueError:
+                pass  # Leere Dateien lassen sich nicht mappen → normal einlesen
+        try:
+            return cls(f.read(), duration)
+        finally:
+            f.close()
+
+    def close(self):
+        if isinstance(self._buffer, mmap.mmap):
+            self._buffer.close()
+        if self._file:
+            self._file.close()
+            self._file = None
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+    # -------------------------------------------------------------------------
+    # Zugriff
+    # -------------------------------------------------------------------------
+    def __len__(self):
+        return len(self.starts)
+
+    def __getitem__(self, index):
+        if index < 0:
+            index += len(self)
+        if not 0 <= index < len(self):
+            raise IndexError(index)
+        return Segment(index, self.starts[index], self.ends[index], self.text(index))
+
+    def __iter__(self):
+        for index in range(len(self)):
+            yield self[index]
+
+    @property
+    def header(self):
+        return self._decode(0, self.header_end)
+
+    def raw(self, first, last=None):
+        """Originaltext der Segmente first..last-1 inkl. Timestamps und Umbrüchen (ein einziger Slice)"""
+        last = first + 1 if last is None else min(last, len(self))
+        return self._decode(self.offsets[first], self.offsets[last])
+
+    def segment_raw(self, index):
+        """Nur die eigenen Zeilen des Segments (ohne nachfolgende Überschriften o. ä.)"""
+        return self._decode(self.offsets[index], self.stops[index])
+
+    def between(self, index):
+        """Text zwischen Segment index und dem nächsten (bzw. dem Dateiende), z. B. eine Block-Überschrift"""
+        return self._decode(self.stops[index], self.offsets[index + 1])
+
+    def text(self, index):
+        """Reiner Segment-Text ohne Timestamp, Folgezeilen zu einer Zeile zusammengefügt"""
+        return segment_text(self.segment_raw(index))
+
+    def texts(self, first, last):
+        return [self.text(i) for i in range(first, min(last, len(self)))]
+
+    # -------------------------------------------------------------------------
+    # Zeitbasierte Suche (Binärsuche auf starts)
+    # -------------------------------------------------------------------------
+    def index_at(self, seconds):
+        """Index des Segments, das zum Zeitpunkt `seconds` läuft (-1 wenn leer, 0 vor dem ersten Segment)"""
+        if not self.starts:
+            return -1
+        return max(0, bisect_right(self.starts, parse_timestamp(seconds)) - 1)
+
+    def segment_at(self, seconds):
+        index = self.index_at(seconds)
+        return self[index] if index >= 0 else None
+
+    def indices_between(self, start, end):
+        """Indizes aller Segmente, die das Zeitfenster [start, end) überlappen"""
+        if not self.starts:
+            return range(0)
+        first = self.index_at(start)
+        last = bisect_left(self.starts, parse_timestamp(end))
+        return range(first, max(first, last))
+
+    # -------------------------------------------------------------------------
+    # Ersetzen (Nachtranskription einzelner Zeitbereiche)
+    # -------------------------------------------------------------------------
+    def splice(self, replacements):
+        """
+        Neuer Transkript-Text, in dem je (first, last, raw) die Segmente first..last-1 durch raw ersetzt sind
+        (first == last: raw wird vor Segment first eingefügt). Bereiche dürfen sich nicht überlappen;
+        Header und alle übrigen Segmente bleiben byte-genau erhalten.
+        """
+        parts = []
+        position = 0
+        for first, last, raw in sorted(replacements, key=lambda replacement: replacement[0]):
+            parts.append(self._decode(position, self.offsets[first]))
+            parts.append(raw)
+            position = self.offsets[last]
+        parts.append(self._decode(position, self.offsets[len(self)]))
+        return "".join(parts)
+
+    # -------------------------------------------------------------------------
+    # Versetzen (Transkript einer anders geschnittenen Fassung derselben Aufnahme)
+    # -------------------------------------------------------------------------
+    def shifted(self, offset, duration=None, header=None):
+        """
+        Transkript-Text für eine Fassung, die `offset` Sekunden später beginnt (negativ: früher):
+        Timestamps um offset verschoben, Segmente vor dem Beginn bzw. ab `duration` entfallen –
+        das Segment, das beim neuen Beginn gerade läuft, bleibt mit [00:00:00] erhalten.
+        """
+        parts = [self.header if header is None else header]
+        first = self.index_at(offset) if offset > 0 else 0
+        for index in range(max(0, first), len(self)):
+            start = self.starts[index] - offset
+            if duration is not None and start >= duration:
+                break
+            parts.append(f"[{format_timestamp(start)}]" + self.segment_raw(index)[TIMESTAMP_LEN - 1:])
+        return "".join(parts)
+
+    def _decode(self, begin, end):
+        return bytes(self._buffer[begin:end]).decode('utf-8', errors='replace')
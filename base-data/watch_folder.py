@@ -0,0 +1,282 @@
+# ------------------------------------------------------------------------------------------------------------------------------------
+# watch_folder.py
+#
+# Daemon-Modus für transcribe.py: überwacht AUDIO_DIR und arbeitet den Rückstand ab, ohne dass jemand einen Auftrag anstößt
+#   - Kandidaten: MP3s ohne passende <name>.txt sowie MP3s, die sich geändert haben, seit der Daemon sie transkribiert hat
+#                 (Größe/mtime im Ledger); _temp-Uploads des lokalen KI-Service bleiben außen vor
+#   - Gesperrt:   Dateien, die ein Auftrag des lokalen KI-Service gerade hält, liegen mit <name>.mp3.lock daneben
+#                 (storage.StorageManager.using()) und werden übersprungen; Sperren älter als LOCK_MAX_AGE_SEC gelten als Rest
+#   - Stabil:     eine Datei wird erst angefasst, wenn sie seit --settle Sekunden unverändert ist (Kopiervorgang läuft noch)
+#   - Warm:       transcribe.py/summarize.py laufen im selben Prozess über model_residency.ResidencyManager – large-v3 bleibt
+#                 zwischen den Dateien geladen und wird erst nach Leerlauf in den RAM ausgelagert (wie im Modell-Host)
+#   - Leerlauf:   mit --max-gpu-util startet eine Datei nur, wenn die GPU gerade nicht von anderen Aufträgen belegt ist
+#   - Ledger:     JSON im Audio-Verzeichnis (Zustand, Fingerabdruck, Versuche, Dauer je Datei) – ein Neustart wiederholt
+#                 keine fertigen Dateien, fehlgeschlagene erst nach einer Änderung der MP3 (nach --max-attempts Versuchen)
+#   - Optional:   --summarize hängt summarize.py an (wenn noch keine <name>_s.txt existiert)
+# /mnt/d (drvfs) liefert keine inotify-Ereignisse aus Windows – daher Abfrage im Intervall statt Dateisystem-Events.
+#
+# Aufruf (WSL, neben transcribe.py):
+#   python watch_folder.py [--summarize] [--interval 30] [--settle 60] [--max-gpu-util 30] [--once]
+#   python transcribe.py --watch [Optionen wie oben]
+# ------------------------------------------------------------------------------------------------------------------------------------
+
+import os
+import sys
+import json
+import time
+import argparse
+import importlib
+import traceback
+from datetime import datetime
+
+from instrumentation import query_nvidia_smi
+from model_residency import ResidencyManager, activate, CPU_BUDGET_MB, IDLE_OFFLOAD_SEC, IDLE_UNLOAD_SEC
+
+LEDGER_VERSION = 1
+LEDGER_NAME = ".watch_ledger.json"       # Im Audio-Verzeichnis (liegt damit neben den Dateien, die es beschreibt)
+POLL_INTERVAL_SEC = 30
+SETTLE_SEC = 60                          # So lange muss eine MP3 unverändert sein
+MAX_ATTEMPTS = 3                         # Danach gilt eine Datei bis zur nächsten Änderung als fehlgeschlagen
+LOCK_SUFFIX = ".lock"                    # Sperrdatei des lokalen KI-Service (local-ai-service/storage.py)
+LOCK_MAX_AGE_SEC = 12 * 3600             # Ältere Sperrdateien stammen von einem abgestürzten Service
+GPU_BUSY_WAIT_SEC = 60                   # Wartezeit, wenn die GPU über --max-gpu-util ausgelastet ist
+
+
+def print_info(text):
+    print("\033[1;32m" + "→ " + text + "\033[0m", flush=True)
+
+def print_error(text):
+    print("\033[1;31m" + "✖ " + text + "\033[0m", flush=True)
+
+def print_success(text):
+    print("\033[1;32m" + "✔ " + text + "\033[0m", flush=True)
+
+
+def script(name):
+    """transcribe/summarize als Modul – läuft transcribe.py selbst als __main__ (--watch), diese Instanz verwenden"""
+    main_module = sys.modules.get("__main__")
+    if name == "transcribe" and os.path.basename(getattr(main_module, "__file__", "") or "") == "transcribe.py":
+        sys.modules.setdefault("transcribe", main_module)
+    return importlib.import_module(name)
+
+
+# -----------------------------------------------------------------------------------------------------------
+# Ledger
+# -----------------------------------------------------------------------------------------------------------
+class WorkLedger:
+    """Dateiname → {state, size, mtime, attempts, transcribedAt, summarizedAt, seconds, error}"""
+
+    def __init__(self, path):
+        self.path = path
+        self.files = {}
+        if os.path.isfile(path):
+            try:
+                with open(path, "r", encoding="utf-8") as f:
+                    data = json.load(f)
+                if data.get("version") == LEDGER_VERSION:
+                    self.files = data["files"]
+            except (OSError, ValueError, KeyError) as e:
+                print_error(f"Ledger konnte nicht geladen werden ({e}) – beginne leer")
+        # Beim Absturz mitten im Lauf bleibt "running" stehen → erneut versuchen
+        for entry in self.files.values():
+            if entry.get("state") == "running":
+                entry["state"] = "pending"
+
+    def save(self):
+        tmp_path = self.path + ".tmp"
+        try:
+            with open(tmp_path, "w", encoding="utf-8") as f:
+                json.dump({"version": LEDGER_VERSION, "files": self.files}, f, ensure_ascii=False, indent=1)
+            os.replace(tmp_path, self.path)
+        except OSError as e:
+            print_error(f"Ledger konnte nicht gespeichert werden: {e}")
+
+    def entry(self, filename, size, mtime):
+        """Eintrag zur aktuellen Dateiversion; eine geänderte MP3 beginnt von vorn"""
+        entry = self.files.get(filename)
+        if entry is None or entry.get("size") != size or entry.get("mtime") != mtime:
+            entry = self.files[filename] = {"state": "pending", "size": size, "mtime": mtime, "attempts": 0,
+                                            "changed": entry is not None}
+        return entry
+
+    def stats(self):
+        counts = {}
+        for entry in self.files.values():
+            counts[entry["state"]] = counts.get(entry["state"], 0) + 1
+        return counts
+
+
+# -----------------------------------------------------------------------------------------------------------
+# Kandidaten und Leerlauf
+# -----------------------------------------------------------------------------------------------------------
+def candidates(audio_dir, ledger, settle, max_attempts):
+    """[(dateiname, eintrag)] der zu transkribierenden MP3s, älteste zuerst"""
+    now = time.time()
+    found = []
+    try:
+        with os.scandir(audio_dir) as entries:
+            files, locks = [], {}
+            for entry in entries:
+                if not entry.is_file():
+                    continue
+                if entry.name.endswith(LOCK_SUFFIX):
+                    locks[entry.name[:-len(LOCK_SUFFIX)]] = entry.stat().st_mtime
+                elif entry.name.lower().endswith(".mp3"):
+                    files.append((entry.name, entry.stat()))
+    except OSError as e:
+        print_error(f"Verzeichnis nicht lesbar: {e}")
+        return []
+    for filename, stat in files:
+        base_name = os.path.splitext(filename)[0]
+        if base_name.endswith("_temp") or now - stat.st_mtime < settle:
+            continue
+        if filename in locks and now - locks[filename] < LOCK_MAX_AGE_SEC:
+            continue                                     # Läuft gerade im lokalen KI-Service
+        entry = ledger.entry(filename, stat.st_size, stat.st_mtime)
+        if entry["state"] == "done" or (entry["state"] == "failed" and entry["attempts"] >= max_attempts):
+            continue
+        has_transcript = os.path.isfile(os.path.join(audio_dir, f"{base_name}.txt"))
+        if has_transcript and not entry.get("changed"):
+            entry.update(state="done", external=True)   # Schon transkribiert (vom Service oder von Hand)
+            continue
+        found.append((stat.st_mtime, filename, entry))
+    return [(filename, entry) for _, filename, entry in sorted(found)]
+
+
+def gpu_utilization():
+    values = [int(row[0]) for row in query_nvidia_smi("gpu", "utilization.gpu") if row and row[0].isdigit()]
+    return max(values) if values else None
+
+
+def wait_for_idle_gpu(max_util):
+    """Blockiert, bis die GPU-Auslastung unter max_util % liegt (ohne nvidia-smi: sofort weiter)"""
+    while True:
+        util = gpu_utilization()
+        if util is None or util < max_util:
+            return
+        print_info(f"GPU ausgelastet ({util} % ≥ {max_util} %) – warte {GPU_BUSY_WAIT_SEC} s")
+        time.sleep(GPU_BUSY_WAIT_SEC)
+
+
+# -----------------------------------------------------------------------------------------------------------
+# Eine Datei abarbeiten
+# -----------------------------------------------------------------------------------------------------------
+def run_script(name, argv):
+    """main() des Skripts im eigenen Prozess; Exit-Code wie beim direkten Aufruf"""
+    try:
+        script(name).main(argv)
+        return 0
+    except SystemExit as e:
+        return e.code if isinstance(e.code, int) else (0 if e.code is None else 1)
+    except Exception:
+        traceback.print_exc()
+        return 1
+
+
+def process_file(audio_dir, filename, entry, args, ledger):
+    base_name = os.path.splitext(filename)[0]
+    changed = entry.get("changed")           # Geänderte MP3: auch eine vorhandene Summary ist veraltet
+    entry.update(state="running", attempts=entry["attempts"] + 1, startedAt=datetime.now().isoformat(timespec="seconds"))
+    ledger.save()
+    print_info(f"Transkribiere {filename} (Versuch {entry['attempts']})")
+    started = time.perf_counter()
+    code = run_script("transcribe", [filename, "--decode", args.decode])
+    txt_path = os.path.join(audio_dir, f"{base_name}.txt")
+    if code != 0 or not os.path.isfile(txt_path):
+        entry.update(state="failed", error=f"transcribe.py Exit-Code {code}")
+        ledger.save()
+        print_error(f"{filename}: Transkription fehlgeschlagen (Exit-Code {code})")
+        return False
+    entry.update(transcribedAt=datetime.now().isoformat(timespec="seconds"),
+                 transcribeSeconds=round(time.perf_counter() - started, 1), error=None, changed=False)
+
+    summary_path = os.path.join(audio_dir, f"{base_name}_s.txt")
+    if args.summarize and (changed or not os.path.isfile(summary_path)):
+        print_info(f"Summary für {base_name}.txt")
+        started = time.perf_counter()
+        prompt_flag = "-newsletter" if "newsletter" in base_name.lower() else "-durchgabe"
+        code = run_script("summarize", [f"{base_name}.txt", prompt_flag])
+        if code != 0:
+            # Transkript ist fertig – Summary lässt sich jederzeit über den Service nachholen
+            entry["summaryError"] = f"summarize.py Exit-Code {code}"
+            print_error(f"{base_name}.txt: Summary fehlgeschlagen (Exit-Code {code})")
+        else:
+            entry.update(summarizedAt=datetime.now().isoformat(timespec="seconds"),
+                         summarizeSeconds=round(time.perf_counter() - started, 1), summaryError=None)
+    entry["state"] = "done"
+    ledger.save()
+    print_success(f"{filename} fertig")
+    return True
+
+
+# ────────────────────────────────────────────────
+# Starte Hauptprogramm
+# ────────────────────────────────────────────────
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Daemon: neue MP3s im Audio-Verzeichnis mit geladen bleibendem Modell transkribieren.")
+    parser.add_argument('--summarize', action='store_true', help="Nach der Transkription summarize.py anhängen")
+    parser.add_argument('--interval', type=float, default=POLL_INTERVAL_SEC,
+                        help=f"Sekunden zwischen zwei Verzeichnis-Abfragen (default: {POLL_INTERVAL_SEC})")
+    parser.add_argument('--settle', type=float, default=SETTLE_SEC,
+                        help=f"MP3 erst nach so vielen Sekunden ohne Änderung bearbeiten (default: {SETTLE_SEC})")
+    parser.add_argument('--max-attempts', type=int, default=MAX_ATTEMPTS,
+                        help=f"Versuche je Dateiversion (default: {MAX_ATTEMPTS})")
+    parser.add_argument('--max-gpu-util', type=int, default=None,
+                        help="Nur starten, wenn die GPU-Auslastung darunter liegt (%%, default: immer starten)")
+    parser.add_argument('--decode', choices=["adaptive", "beam"], default="beam",
+                        help="Dekodier-Modus für transcribe.py (default: beam)")
+    parser.add_argument('--budget-mb', type=float, default=None,
+                        help="VRAM-Budget für geladene Modelle (default: Gerätespeicher abzüglich Reserve)")
+    parser.add_argument('--idle-offload', type=float, default=IDLE_OFFLOAD_SEC,
+                        help=f"Sekunden Leerlauf bis zum Auslagern in den RAM, 0 = nie (default: {IDLE_OFFLOAD_SEC})")
+    parser.add_argument('--idle-unload', type=float, default=IDLE_UNLOAD_SEC,
+                        help=f"Sekunden Leerlauf bis zum Entladen, 0 = nie (default: {IDLE_UNLOAD_SEC})")
+    parser.add_argument('--ledger', default=None, help=f"Ledger-Datei (default: <AUDIO_DIR>/{LEDGER_NAME})")
+    parser.add_argument('--once', action='store_true', help="Rückstand einmal abarbeiten und beenden")
+    args = parser.parse_args(argv)
+
+    audio_dir = script("transcribe").AUDIO_DIR
+    if not os.path.isdir(audio_dir):
+        print_error(f"Verzeichnis nicht gefunden: {audio_dir}")
+        sys.exit(1)
+    ledger = WorkLedger(args.ledger or os.path.join(audio_dir, LEDGER_NAME))
+
+    # Modelle bleiben zwischen den Dateien geladen (transcribe.delete() gibt sie nur frei statt zu entladen)
+    manager = ResidencyManager(budget_mb=args.budget_mb, cpu_budget_mb=CPU_BUDGET_MB,
+                               idle_offload_sec=args.idle_offload, idle_unload_sec=args.idle_unload)
+    activate(manager)
+    # Keine interaktive Auswahl im Daemon: verschwundene Dateien führen zu EOFError statt zu einem hängenden input()
+    sys.stdin = open(os.devnull)
+
+    print_info(f"Überwache {audio_dir} (alle {args.interval:.0f} s, Ledger: {ledger.path}, "
+               f"Summary: {'ja' if args.summarize else 'nein'})")
+    print_info(f"Ledger: {ledger.stats() or 'leer'}")
+    try:
+        while True:
+            work = candidates(audio_dir, ledger, args.settle, args.max_attempts)
+            ledger.save()
+            if work:
+                print_info(f"{len(work)} Datei(en) im Rückstand")
+            for filename, entry in work:
+                if args.max_gpu_util is not None:
+                    wait_for_idle_gpu(args.max_gpu_util)
+                try:
+                    process_file(audio_dir, filename, entry, args, ledger)
+                finally:
+                    manager.release_owner("transcribe")
+                    manager.release_owner("summarize")
+            if args.once:
+                break
+            manager.sweep()                      # Leerlauf: Modelle auslagern/entladen, GPU für andere frei
+            time.sleep(args.interval)
+    except KeyboardInterrupt:
+        print_info("Beendet")
+    finally:
+        ledger.save()
+        report = manager.report()
+        print_info(f"Ledger: {ledger.stats()} – Ladevorgänge/Auslagerungen: {report['swaps']}, "
+                   f"Ladezeit gesamt {report['loadSeconds']:.1f} s")
+
+
+if __name__ == "__main__":
+    main()
@@ -6,7 +6,7 @@
 import React from 'react';
 import { FaSpinner, FaCheckCircle } from 'react-icons/fa';
 
-function ProgressModal({ step, message, progress }) {
+function ProgressModal({ step, message, progress, etaSeconds }) {
   const getStepIcon = () => {
     if (progress === 100) {
       return <FaCheckCircle className="text-green-500 text-4xl" />;
@@ -22,6 +22,7 @@ function ProgressModal({ step, message, progress }) {
       split: 'Vorbereitung',
       summarize: 'Zusammenfassung',
       saving: 'Speichern',
+      eta: 'Warteschlange',
       complete: 'Abgeschlossen'
     };
     return labels[stepName] || stepName;
@@ -76,7 +77,9 @@ function ProgressModal({ step, message, progress }) {
         {/* Info */}
         <div className="mt-6 pt-6 border-t border-gray-200 text-center">
           <p className="text-xs text-gray-400">
-            Dieser Vorgang kann einige Minuten dauern
+            {etaSeconds !== undefined && progress < 100
+              ? `Geschätzte Restzeit: ${etaSeconds < 60 ? `${Math.round(etaSeconds)} s` : `ca. ${Math.round(etaSeconds / 60)} min`}`
+              : 'Dieser Vorgang kann einige Minuten dauern'}
           </p>
         </div>
       </div>
@@ -1135,6 +1135,7 @@ function TranscribeScreen() {
           step={progress.step}
           message={progress.message}
           progress={progress.progress}
+          etaSeconds={progress.etaSeconds}
         />
       )}
       
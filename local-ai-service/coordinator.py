@@ -0,0 +1,264 @@
+"""
+Koordinator für mehrere lokale KI-Services (SERVICE_ROLE=coordinator)
+============================================================================
+Der Koordinator nimmt die Aufträge des Railway-Backends an (/transcribe, /summarize, /process)
+und verteilt sie auf registrierte Worker – jeweils eine normale Instanz von main.py auf einem PC
+mit eigener GPU/CPU, eigenem AUDIO_DIR und eigenem WSL.
+
+- Registrierung: statisch über WORKERS oder per POST /workers/register (Worker mit COORDINATOR_URL)
+- Zustand:       GET /health jedes Workers alle COORDINATOR_HEALTH_INTERVAL Sekunden
+                 (Gerät, Fähigkeiten, laufende Aufträge, gemessener Durchsatz aus den Run-Reports)
+- Routing:       fähiger, erreichbarer Worker mit der kürzesten erwarteten Wartezeit
+                 (laufende Aufträge + 1) / Durchsatz
+- Audio:         nur übertragen, wenn der Worker die Datei nicht schon hat (/files/has, gleiche Größe)
+                 – sonst Upload über /files/save (landet dort im Speicher oder als _temp-Datei)
+- Ausfall:       Verbindungsfehler, 5xx oder ein Stream ohne complete/error → Worker als down markieren
+                 und den Auftrag auf dem nächsten Worker neu starten (höchstens max_attempts Versuche)
+- Ausgelastet:   503 (Deadline nur nach der Warteschlange machbar) und 507 (Speicher-Kontingent voll) sind kein
+                 Ausfall – der Worker bleibt gesund, bekommt bis Retry-After keine Aufträge, der Auftrag geht an
+                 den nächsten; sind alle ausgelastet, endet er mit retryAfter
+
+Nur Standardbibliothek (urllib), damit der Service keine zusätzliche HTTP-Abhängigkeit braucht.
+"""
+
+import http.client
+import json
+import threading
+import time
+import urllib.error
+import urllib.parse
+import urllib.request
+import uuid
+
+DEFAULT_THROUGHPUT = 1.0        # Audio-Sekunden je Sekunde, solange ein Worker noch keinen Run-Report hat
+TERMINAL_EVENTS = ("complete", "error")
+BUSY_STATUS = (503, 507)        # Worker gesund, aber ausgelastet bzw. Speicher voll
+BUSY_RETRY_SEC = 30             # Pause ohne Retry-After-Header
+
+
+class WorkerLost(Exception):
+    """Worker während eines Auftrags nicht mehr erreichbar bzw. Stream abgebrochen"""
+
+
+class Worker:
+    __slots__ = ('url', 'device', 'capabilities', 'throughput', 'active', 'remote_active', 'healthy',
+                 'last_seen', 'last_error', 'jobs', 'failures', 'busy_until')
+
+    def __init__(self, url: str, device: str = None, capabilities=None, throughput: float = None):
+        self.url = url.rstrip('/')
+        self.device = device
+        self.capabilities = set(capabilities or ())   # leer = noch unbekannt → alles zulassen
+        self.throughput = throughput
+        self.active = 0                 # Vom Koordinator gestartete, laufende Aufträge
+        self.remote_active = 0          # Laut /health laufende Aufträge (auch von anderen Clients)
+        self.healthy = True
+        self.last_seen = None
+        self.last_error = None
+        self.jobs = 0
+        self.failures = 0
+        self.busy_until = 0.0           # Nach 503/507: bis dahin keine neuen Aufträge
+
+    def can(self, job: str) -> bool:
+        return (self.healthy and self.busy_until <= time.time()
+                and (not self.capabilities or job in self.capabilities))
+
+    def expected_wait(self) -> float:
+        return (max(self.active, self.remote_active) + 1) / (self.throughput or DEFAULT_THROUGHPUT)
+
+    def to_dict(self) -> dict:
+        return {
+            "url": self.url, "device": self.device, "capabilities": sorted(self.capabilities),
+            "throughput": self.throughput, "activeJobs": max(self.active, self.remote_active),
+            "healthy": self.healthy, "lastSeen": self.last_seen, "lastError": self.last_error,
+            "jobs": self.jobs, "failures": self.failures,
+            "busyUntil": self.busy_until if self.busy_until > time.time() else None
+        }
+
+
+class WorkerPool:
+    """Registrierte Worker, Zustandsabfrage im Hintergrund und Ausführung von Aufträgen mit Wiederholung"""
+
+    def __init__(self, api_key: str = "", health_interval: float = 15, stream_timeout: float = 600,
+                 max_attempts: int = 3):
+        self.api_key = api_key
+        self.health_interval = health_interval
+        self.stream_timeout = stream_timeout
+        self.max_attempts = max_attempts
+        self.lock = threading.Lock()
+        self.workers = {}               # url → Worker
+        self._poller = None
+
+    # -------------------------------------------------------------------------
+    # Registrierung und Zustand
+    # -------------------------------------------------------------------------
+    def register(self, url: str, device: str = None, capabilities=None, throughput: float = None) -> Worker:
+        with self.lock:
+            worker = self.workers.get(url.rstrip('/'))
+            if worker is None:
+                worker = Worker(url, device, capabilities, throughput)
+                self.workers[worker.url] = worker
+            else:
+                worker.device = device or worker.device
+                worker.capabilities = set(capabilities or worker.capabilities)
+                worker.throughput = throughput or worker.throughput
+                worker.healthy = True
+        return worker
+
+    def start(self):
+        if self._poller is None:
+            self._poller = threading.Thread(target=self._poll, daemon=True)
+            self._poller.start()
+
+    def _poll(self):
+        while True:
+            self.refresh()
+            time.sleep(self.health_interval)
+
+    def refresh(self):
+        for worker in list(self.workers.values()):
+            try:
+                health = self._json("GET", worker, "/health", timeout=10)
+            except (OSError, http.client.HTTPException, ValueError) as e:
+                self._mark_down(worker, e)
+                continue
+            worker.healthy = health.get("status") == "ok"
+            worker.device = health.get("device") or worker.device
+            worker.capabilities = set(health.get("capabilities") or worker.capabilities)
+            worker.throughput = health.get("throughput") or worker.throughput
+            worker.remote_active = health.get("activeJobs") or 0
+            worker.last_seen = time.time()
+
+    def snapshot(self) -> list:
+        return [worker.to_dict() for worker in self.workers.values()]
+
+    def pick(self, job: str, exclude=()) -> Worker:
+        """Fähiger, erreichbarer Worker mit der kürzesten erwarteten Wartezeit (None = keiner frei)"""
+        with self.lock:
+            candidates = [w for w in self.workers.values() if w.can(job) and w.url not in exclude]
+            if not candidates:
+                return None
+            worker = min(candidates, key=Worker.expected_wait)
+            worker.active += 1
+            return worker
+
+    def _mark_down(self, worker: Worker, error):
+        worker.healthy = False
+        worker.last_error = str(error)
+        print(f"[COORDINATOR] ⚠️ Worker {worker.url} nicht erreichbar: {error}")
+
+    # -------------------------------------------------------------------------
+    # HTTP
+    # -------------------------------------------------------------------------
+    def _open(self, method: str, worker: Worker, path: str, body: bytes = None, content_type: str = None,
+              timeout: float = 30):
+        request = urllib.request.Request(worker.url + path, data=body, method=method)
+        if self.api_key:
+            request.add_header("X-API-Key", self.api_key)
+        if content_type:
+            request.add_header("Content-Type", content_type)
+        return urllib.request.urlopen(request, timeout=timeout)
+
+    def _json(self, method: str, worker: Worker, path: str, payload: dict = None, timeout: float = 30) -> dict:
+        body = json.dumps(payload).encode('utf-8') if payload is not None else None
+        with self._open(method, worker, path, body, "application/json" if body else None, timeout) as response:
+            return json.loads(response.read().decode('utf-8'))
+
+    def ensure_audio(self, worker: Worker, filename: str, size: int, load) -> str:
+        """Dateiname, unter dem der Worker das Audio findet – überträgt es nur, wenn es dort fehlt"""
+        query = urllib.parse.urlencode({"filename": filename})
+        existing = self._json("GET", worker, f"/files/has?{query}")
+        if existing.get("exists") and existing.get("size") == size:
+            return filename
+
+        boundary = uuid.uuid4().hex
+        body = b"".join([
+            f'--{boundary}\r\nContent-Disposition: form-data; name="file"; filename="{filename}"\r\n'
+            f'Content-Type: application/octet-stream\r\n\r\n'.encode('utf-8'),
+            load(),
+            f'\r\n--{boundary}--\r\n'.encode('utf-8'),
+        ])
+        with self._open("POST", worker, "/files/save", body, f"multipart/form-data; boundary={boundary}",
+                        timeout=self.stream_timeout) as response:
+            return json.loads(response.read().decode('utf-8'))["filename"]
+
+    def _stream(self, worker: Worker, path: str, payload: dict):
+        """SSE-Events eines Workers als dicts; WorkerLost, wenn der Stream ohne complete/error endet"""
+        body = json.dumps(payload).encode('utf-8')
+        with self._open("POST", worker, path, body, "application/json", timeout=self.stream_timeout) as response:
+            for raw in response:
+                line = raw.decode('utf-8', errors='replace').strip()
+                if not line.startswith("data: "):
+                    continue
+                event = json.loads(line[len("data: "):])
+                yield event
+                if event.get("type") in TERMINAL_EVENTS:
+                    return
+        raise WorkerLost("Stream ohne Abschluss beendet")
+
+    # -------------------------------------------------------------------------
+    # Auftrag ausführen
+    # -------------------------------------------------------------------------
+    def run(self, job: str, path: str, payload: dict, audio: tuple = None):
+        """
+        Führt einen Auftrag auf dem passenden Worker aus und liefert dessen SSE-Events weiter
+        (plus progress-Events mit step "worker"/"retry"). audio = (filename, size, load) → payload["filename"]
+        wird durch den Namen ersetzt, unter dem der Worker die Datei findet.
+        """
+        tried = set()
+        attempt = failures = 0
+        retry_after = None              # Kürzestes Retry-After der ausgelasteten Worker
+        while failures < self.max_attempts:
+            worker = self.pick(job, exclude=tried)
+            if worker is None:
+                if retry_after is not None:
+                    yield {"type": "error", "step": "error", "retryAfter": retry_after,
+                           "message": f"Alle Worker für '{job}' ausgelastet – erneut versuchen in {retry_after} s"}
+                    return
+                yield {"type": "error", "step": "error",
+                       "message": f"Kein erreichbarer Worker für '{job}' verfügbar ({len(tried)} versucht)"}
+                return
+            tried.add(worker.url)
+            attempt += 1
+            worker.jobs += 1
+            try:
+                yield {"type": "progress", "step": "worker", "progress": 0, "worker": worker.url,
+                       "message": f"Auftrag an Worker {worker.url} ({worker.device or 'unbekannt'}), Versuch {attempt}"}
+                remote_payload = dict(payload)
+                if audio is not None:
+                    remote_payload["filename"] = self.ensure_audio(worker, *audio)
+                for event in self._stream(worker, path, remote_payload):
+                    if event.get("type") in TERMINAL_EVENTS:
+                        event["worker"] = worker.url
+                    yield event
+                return
+            except urllib.error.HTTPError as e:
+                if e.code in BUSY_STATUS:
+                    # Gesund, nur ausgelastet/voll: nicht als Ausfall zählen, bis Retry-After nicht mehr anfragen
+                    try:
+                        wait = max(1, int(e.headers.get("Retry-After") or BUSY_RETRY_SEC))
+                    except ValueError:
+                        wait = BUSY_RETRY_SEC
+                    worker.busy_until = time.time() + wait
+                    retry_after = wait if retry_after is None else min(retry_after, wait)
+                    yield {"type": "progress", "step": "retry", "progress": 0, "worker": worker.url,
+                           "message": f"Worker {worker.url} ausgelastet ({e.code}, Retry-After {wait} s) – "
+                                      f"versuche nächsten Worker"}
+                    continue
+                if e.code < 500:
+                    # Fehler im Auftrag selbst (404, 400, 401) – auf einem anderen Worker nicht anders
+                    detail = e.read().decode('utf-8', errors='replace')
+                    yield {"type": "error", "step": "error", "worker": worker.url,
+                           "message": f"Worker {worker.url} lehnt Auftrag ab ({e.code}): {detail}"}
+                    return
+                error = e
+            except (OSError, http.client.HTTPException, ValueError, WorkerLost) as e:
+                error = e
+            finally:
+                with self.lock:
+                    worker.active -= 1
+            failures += 1
+            worker.failures += 1
+            self._mark_down(worker, error)
+            yield {"type": "progress", "step": "retry", "progress": 0, "worker": worker.url,
+                   "message": f"Worker {worker.url} ausgefallen ({error}) – starte Auftrag neu"}
+        yield {"type": "error", "step": "error", "message": f"Auftrag nach {self.max_attempts} Versuchen abgebrochen"}
@@ -0,0 +1,254 @@
+"""
+Restzeit-Vorhersage (ETA) und Zulassung nach Deadline
+============================================================================
+Lernt aus den Run-Reports von transcribe.py/summarize.py (record_run_report in main.py),
+wie schnell diese Instanz arbeitet – getrennt nach Modell und Gerät:
+
+- Transkription:  Ladezeit + Echtzeitfaktor (RTF = Dekodier-Wandzeit / Audiodauer) × Audiodauer
+- Summary:        Ladezeit + Sekunden je Block × Anzahl Blöcke (Blöcke aus der Segmentzahl wie split_blocks)
+- Pipeline:       Transkription und Summary überlappen → der Summarizer hängt nur um die letzten Blöcke nach
+
+Vorhergesagt wird mit dem Median der letzten `size` Messungen für genau das Modell und Gerät, das den Auftrag
+ausführt (ohne Angabe: das zuletzt gemessene Modell, das Gerät der Instanz); fehlen dafür Messungen, gilt der
+Schlüssel mit den meisten Messungen, ohne jede Historie DEFAULTS.
+Dazu kommt die Wartezeit durch laufende Aufträge: sie laufen nacheinander auf der GPU, ein neuer Auftrag beginnt also,
+wenn der zuletzt fertige endet (dessen finish_at enthält die Wartezeiten der anderen bereits).
+Die Historie wird als JSON gespeichert, damit ein Neustart nicht wieder bei den Default-Werten beginnt.
+"""
+
+import json
+import math
+import os
+import subprocess
+import threading
+import time
+import uuid
+from collections import defaultdict
+from datetime import datetime
+from statistics import median
+
+HISTORY_VERSION = 1
+BLOCK_STEP = 10                 # summarize.py: BLOCK_SIZE 20 mit 50 % Overlap → alle 10 Segmente ein Block
+FALLBACK_KBPS = 128             # Audiodauer aus der Dateigröße, wenn ffprobe fehlt
+DEFAULTS = {
+    "rtf": 0.15,                # large-v3 int8 auf der GPU, adaptiv
+    "transcribeLoad": 20.0,     # Sekunden WSL-Start + Modell laden
+    "segmentsPerSecond": 0.2,   # ~ ein Segment je 5 s Audio
+    "block": 8.0,               # Sekunden je Block-Überschrift
+    "summarizeLoad": 15.0,
+}
+
+
+def probe_duration(path: str = None, data: bytes = None) -> float:
+    """Audiodauer in Sekunden per ffprobe (Datei oder Bytes über stdin); ohne ffprobe aus der Größe geschätzt"""
+    try:
+        result = subprocess.run(
+            ['ffprobe', '-v', 'error', '-show_entries', 'format=duration', '-of', 'default=nw=1:nk=1',
+             'pipe:0' if data is not None else path],
+            input=data, capture_output=True, timeout=30
+        )
+        if result.returncode == 0:
+            return float(result.stdout.decode().strip())
+    except (OSError, ValueError, subprocess.TimeoutExpired):
+        pass
+    size = len(data) if data is not None else os.path.getsize(path)
+    return size * 8 / (FALLBACK_KBPS * 1000)
+
+
+def count_blocks(segments: int) -> int:
+    return max(1, math.ceil(segments / BLOCK_STEP))
+
+
+class Estimate:
+    """Vorhersage für einen laufenden Auftrag; fields() liefert die aktuelle Restzeit für SSE-Events"""
+    __slots__ = ('id', 'job', 'predicted', 'queue', 'started', 'basis')
+
+    def __init__(self, job: str, predicted: float, queue: float, basis: int):
+        self.id = uuid.uuid4().hex[:8]
+        self.job = job
+        self.predicted = predicted      # Sekunden Verarbeitung (ohne Wartezeit)
+        self.queue = queue              # Sekunden Wartezeit durch laufende Aufträge beim Start
+        self.started = time.time()
+        self.basis = basis              # Anzahl Messungen, auf denen die Vorhersage beruht (0 = Defaults)
+
+    @property
+    def finish_at(self) -> float:
+        return self.started + self.queue + self.predicted
+
+    def remaining(self) -> float:
+        return max(0.0, self.finish_at - time.time())
+
+    def fields(self) -> dict:
+        return {
+            "etaSeconds": round(self.remaining(), 1),
+            "etaAt": datetime.fromtimestamp(self.finish_at).isoformat(timespec="seconds"),
+        }
+
+    def to_dict(self) -> dict:
+        return {"id": self.id, "job": self.job, "predictedSeconds": round(self.predicted, 1),
+                "queueSeconds": round(self.queue, 1), "basis": self.basis, **self.fields()}
+
+
+class EtaModel:
+    """Messhistorie je (Auftrag, Modell, Gerät) und laufende Aufträge dieser Instanz"""
+
+    def __init__(self, path: str = None, size: int = 50, device: str = "cuda"):
+        self.path = path
+        self.size = size
+        self.device = device
+        self.lock = threading.Lock()
+        self.history = defaultdict(lambda: defaultdict(list))   # "job|modell|gerät" → kennzahl → [werte]
+        self.models = {}                                         # job → zuletzt gemessenes Modell
+        self.active = {}                                         # id → Estimate
+        self._load()
+
+    # -------------------------------------------------------------------------
+    # Persistenz
+    # -------------------------------------------------------------------------
+    def _load(self):
+        if not self.path or not os.path.isfile(self.path):
+            return
+        try:
+            with open(self.path, "r", encoding="utf-8") as f:
+                data = json.load(f)
+            if data.get("version") == HISTORY_VERSION:
+                for key, metrics in data["history"].items():
+                    self.history[key].update(metrics)
+                self.models.update(data.get("models", {}))
+        except (OSError, ValueError, KeyError) as e:
+            print(f"[ETA] ⚠️ Historie konnte nicht geladen werden: {e}")
+
+    def save(self):
+        if not self.path:
+            return
+        with self.lock:
+            data = {"version": HISTORY_VERSION, "history": {key: dict(metrics) for key, metrics in self.history.items()},
+                    "models": dict(self.models)}
+        tmp_path = self.path + ".tmp"
+        with open(tmp_path, "w", encoding="utf-8") as f:
+            json.dump(data, f, ensure_ascii=False, indent=1)
+        os.replace(tmp_path, self.path)
+
+    # -------------------------------------------------------------------------
+    # Lernen aus Run-Reports
+    # -------------------------------------------------------------------------
+    def observe(self, report: dict):
+        """Übernimmt Kennzahlen aus einem Run-Report (instrumentation.RunRecorder.report)"""
+        meta = report.get("meta", {})
+        stages = {stage["name"]: stage["wallSeconds"] for stage in report.get("stages", [])}
+        total = report.get("total", {}).get("wallSeconds")
+        load = stages.get("load", 0.0)
+        if not total:
+            return
+
+        script = report.get("script")
+        if script == "transcribe":
+            audio = meta.get("rangeSeconds") if meta.get("ranges") else meta.get("mp3Duration")
+            if not audio:
+                return
+            metrics = {"rtf": (total - load) / audio, "transcribeLoad": load}
+            if not meta.get("ranges") and meta.get("segments"):
+                metrics["segmentsPerSecond"] = meta["segments"] / audio
+            self._add(metric_key("transcribe", meta.get("model", ""), self.device), metrics)
+            with self.lock:
+                self.models["transcribe"] = meta.get("model", "")
+        elif script == "summarize" and meta.get("blocks"):
+            # meta.device: "cuda" oder "cpu (… Replikat(e) × … Threads, …)" – Schlüssel nur nach Gerät
+            device = (meta.get("device") or self.device).split()[0]
+            self._add(metric_key("summarize", "", device), {"block": (total - load) / meta["blocks"], "summarizeLoad": load})
+        else:
+            return
+        try:
+            self.save()
+        except OSError as e:
+            print(f"[ETA] ⚠️ Historie konnte nicht gespeichert werden: {e}")
+
+    def _add(self, key: str, metrics: dict):
+        with self.lock:
+            for name, value in metrics.items():
+                values = self.history[key][name]
+                values.append(round(value, 4))
+                del values[:-self.size]
+
+    def _metric(self, job: str, name: str, model: str = None, device: str = None):
+        """
+        (Median, Anzahl) der Kennzahl für Modell und Gerät des Auftrags (Summary: nur Gerät); ohne Messungen dafür
+        über den Schlüssel dieses Auftrags mit den meisten Messungen, ohne jede Historie DEFAULTS
+        """
+        with self.lock:
+            if model is None:
+                model = self.models.get(job, "")
+            key = metric_key(job, model, device or self.device)
+            values = self.history[key].get(name) if key in self.history else None
+            if not values:
+                candidates = [metrics[name] for key, metrics in self.history.items()
+                              if key.startswith(f"{job}|") and metrics.get(name)]
+                values = max(candidates, key=len) if candidates else None
+        if not values:
+            return DEFAULTS[name], 0
+        return median(values), len(values)
+
+    # -------------------------------------------------------------------------
+    # Vorhersage (model/device: was den Auftrag ausführt; None = zuletzt gemessenes Modell, Gerät der Instanz)
+    # -------------------------------------------------------------------------
+    def predict_transcribe(self, audio_seconds: float, model: str = None, device: str = None) -> tuple:
+        rtf, basis = self._metric("transcribe", "rtf", model, device)
+        load, _ = self._metric("transcribe", "transcribeLoad", model, device)
+        return load + rtf * audio_seconds, basis
+
+    def predict_summarize(self, segments: int, device: str = None) -> tuple:
+        block, basis = self._metric("summarize", "block", device=device)
+        load, _ = self._metric("summarize", "summarizeLoad", device=device)
+        return load + block * count_blocks(segments), basis
+
+    def predict_process(self, audio_seconds: float, model: str = None, device: str = None) -> tuple:
+        transcribe, basis = self.predict_transcribe(audio_seconds, model, device)
+        segments_per_second, _ = self._metric("transcribe", "segmentsPerSecond", model, device)
+        summarize, _ = self.predict_summarize(int(audio_seconds * segments_per_second), device)
+        block, _ = self._metric("summarize", "block", device=device)
+        # Summarizer läuft mit; Ende = der langsamere der beiden + letzte Blöcke und Gesamtzusammenfassung
+        return max(transcribe, summarize) + 2 * block, basis
+
+    def queue_seconds(self) -> float:
+        """Wartezeit eines neuen Auftrags: bis der zuletzt fertige laufende Auftrag endet"""
+        with self.lock:
+            return max((estimate.remaining() for estimate in self.active.values()), default=0.0)
+
+    # -------------------------------------------------------------------------
+    # Laufende Aufträge
+    # -------------------------------------------------------------------------
+    def start(self, job: str, prediction: tuple, queue: float = None) -> Estimate:
+        predicted, basis = prediction
+        estimate = Estimate(job, predicted, self.queue_seconds() if queue is None else queue, basis)
+        with self.lock:
+            self.active[estimate.id] = estimate
+        return estimate
+
+    def finish(self, estimate: Estimate):
+        with self.lock:
+            self.active.pop(estimate.id, None)
+
+    def snapshot(self) -> dict:
+        with self.lock:
+            history = {key: {name: {"median": round(median(values), 4), "count": len(values)}
+                             for name, values in metrics.items() if values}
+                       for key, metrics in self.history.items()}
+            active = [estimate.to_dict() for estimate in self.active.values()]
+        return {"history": history, "active": active, "defaults": DEFAULTS}
+
+
+def metric_key(job: str, model: str, device: str) -> str:
+    """Schlüssel der Messhistorie: transcribe|modell|gerät bzw. summarize|gerät"""
+    return f"{job}|{model}|{device}" if job == "transcribe" else f"{job}|{device}"
+
+
+def deadline_verdict(predicted: float, queue: float, deadline: float, margin: float = 1.0):
+    """
+    None = Deadline einhaltbar; "defer" = nur wegen der Warteschlange nicht (später erneut einreichen);
+    "reject" = selbst ohne Wartezeit zu langsam
+    """
+    if predicted * margin > deadline:
+        return "reject"
+    if (queue + predicted) * margin > deadline:
+        return "defer"
+    return None
@@ -0,0 +1,301 @@
+"""
+Akustische Fingerabdrücke gegen doppelt transkribierte Aufnahmen
+============================================================================
+Dieselbe Durchgabe kommt oft mehrfach an – neu exportiert mit anderer Bitrate, um eine Sekunde gekürzt,
+umbenannt. Ein Byte-Hash erkennt das nicht, die GPU transkribiert alles noch einmal.
+
+- Fingerabdruck: Audio per ffmpeg als 8 kHz mono, 256-ms-Fenster im 32-ms-Raster, Energie in 17 logarithmischen
+                 Bändern (300–3000 Hz, Sprachbereich); je Fenster 16 Bit = Vorzeichen der Energie-Differenz
+                 benachbarter Bänder gegenüber dem vorigen Fenster (Haitsma/Kalker). Robust gegen Neukodierung
+                 und Lautstärke, ~220 KB und wenige Sekunden Rechenzeit je Stunde Audio
+- Abgleich:      nur gegen Aufnahmen ähnlicher Länge mit vorhandenem Transkript; der Versatz wird über gleiche
+                 16-Bit-Werte ausgezählt (Trimmen bis MAX_OFFSET_SEC), bestätigt wird über die Bitfehlerrate
+                 im Überlappungsbereich (zufällig ≈ 0.5, gleiche Aufnahme neu kodiert ≈ 0.1–0.2); je indizierter
+                 Aufnahme liegt dafür eine sortierte Positionstabelle im Speicher (position_table, ~6 Byte je Fenster),
+                 damit nicht jeder Abgleich für jeden Kandidaten neu zählt
+- Persistent:    Fingerabdrücke aller MP3s mit Transkript als Pickle (wie der Suchindex), refresh() nur für
+                 neue/geänderte Dateien; dazu die Zähler wiederverwendeter Transkripte und gesparter Sekunden
+
+Benötigt numpy und ffmpeg im PATH des Service – fehlt eins davon, ist die Erkennung abgeschaltet (available).
+"""
+
+import os
+import pickle
+import shutil
+import subprocess
+import threading
+import time
+
+try:
+    import numpy as np
+except ImportError:
+    np = None
+
+INDEX_VERSION = 1
+SAMPLE_RATE = 8000
+FRAME = 2048                    # 256 ms
+HOP = 256                       # 32 ms – starke Überlappung, damit ein um Millisekunden versetzter Schnitt gleich aussieht
+BAND_EDGES = (300.0, 3000.0)    # 17 Bänder → 16 Bit je Fenster
+BANDS = 17
+CHUNK_FRAMES = 2048             # Fenster je FFT-Block (begrenzt den Speicher bei langen Aufnahmen)
+MAX_OFFSET_SEC = 120.0          # Größter gesuchter Versatz zwischen zwei Fassungen
+MAX_POSITIONS = 32              # Häufigere 16-Bit-Werte (Stille, Rauschen) zählen nicht beim Versatz
+MAX_BER = 0.35                  # Bitfehlerrate, bis zu der zwei Aufnahmen als gleich gelten
+MIN_COVERAGE = 0.95             # Anteil der neuen Aufnahme, der im Original enthalten sein muss
+DECODE_TIMEOUT_SEC = 600
+
+
+def frame_seconds(frames: int) -> float:
+    return frames * HOP / SAMPLE_RATE
+
+
+def decode(path: str = None, data: bytes = None):
+    """Audio (Datei oder Bytes über stdin) → int16-Samples 8 kHz mono; None, wenn ffmpeg fehlt oder scheitert"""
+    try:
+        result = subprocess.run(
+            ['ffmpeg', '-v', 'error', '-i', 'pipe:0' if data is not None else path,
+             '-f', 's16le', '-ac', '1', '-ar', str(SAMPLE_RATE), 'pipe:1'],
+            input=data, capture_output=True, timeout=DECODE_TIMEOUT_SEC
+        )
+    except (OSError, subprocess.TimeoutExpired):
+        return None
+    if result.returncode != 0 or not result.stdout:
+        return None
+    return np.frombuffer(result.stdout[:len(result.stdout) // 2 * 2], dtype=np.int16)
+
+
+def compute(samples) -> "np.ndarray":
+    """int16-Samples → Fingerabdruck (uint16 je 32-ms-Fenster)"""
+    frames = 1 + (len(samples) - FRAME) // HOP
+    if frames < 2:
+        return np.zeros(0, dtype=np.uint16)
+    window = np.hanning(FRAME).astype(np.float32)
+    freqs = np.fft.rfftfreq(FRAME, 1 / SAMPLE_RATE)
+    edges = np.geomspace(BAND_EDGES[0], BAND_EDGES[1], BANDS + 1)
+    band_of = np.digitize(freqs, edges) - 1
+    weights = np.zeros((len(freqs), BANDS), dtype=np.float32)
+    for band in range(BANDS):
+        weights[band_of == band, band] = 1.0
+
+    signal = samples.astype(np.float32)
+    windows = np.lib.stride_tricks.sliding_window_view(signal, FRAME)[::HOP][:frames]
+    energy = np.empty((frames, BANDS), dtype=np.float32)
+    for first in range(0, frames, CHUNK_FRAMES):
+        spectrum = np.fft.rfft(windows[first:first + CHUNK_FRAMES] * window, axis=1)
+        energy[first:first + CHUNK_FRAMES] = (np.abs(spectrum) ** 2).astype(np.float32) @ weights
+
+    slope = energy[:, :-1] - energy[:, 1:]                     # Band b gegenüber b+1
+    bits = (slope[1:] - slope[:-1]) > 0                         # … gegenüber dem vorigen Fenster
+    return (bits @ (1 << np.arange(BANDS - 1, dtype=np.uint32))).astype(np.uint16)
+
+
+def bit_error_rate(a, b) -> float:
+    return float(np.unpackbits(np.bitwise_xor(a, b).view(np.uint8)).sum()) / (16 * len(a))
+
+
+def position_table(candidate) -> tuple:
+    """(Positionen nach Wert sortiert, sortierte Werte) – alle Positionen eines 16-Bit-Werts liegen zusammen"""
+    order = np.argsort(candidate, kind="stable").astype(np.int32)
+    return order, candidate[order]
+
+
+def match(query, candidate, table: tuple = None) -> dict:
+    """
+    Versatz und Bitfehlerrate, mit denen query in candidate enthalten ist (oder None):
+    offsetSeconds > 0 heißt, query beginnt so viele Sekunden nach candidate.
+    table = position_table(candidate), falls schon vorhanden (FingerprintIndex hält sie je Aufnahme vor)
+    """
+    if len(query) == 0 or len(candidate) == 0:
+        return None
+    max_offset = int(MAX_OFFSET_SEC * SAMPLE_RATE / HOP)
+    order, values = table if table is not None else position_table(candidate)
+    first = np.searchsorted(values, query, side="left")
+    counts = np.searchsorted(values, query, side="right") - first
+    usable = (counts > 0) & (counts <= MAX_POSITIONS)
+    query_positions, first, counts = np.nonzero(usable)[0], first[usable], counts[usable]
+    if len(counts) == 0:
+        return None
+    # Jede Query-Position gegen alle Positionen ihres Werts im Kandidaten
+    starts = np.cumsum(counts) - counts
+    index = np.repeat(first - starts, counts) + np.arange(int(counts.sum()))
+    offsets = order[index].astype(np.int64) - np.repeat(query_positions, counts)
+    offsets = offsets[np.abs(offsets) <= max_offset]
+    if len(offsets) == 0:
+        return None
+    voted, votes = np.unique(offsets, return_counts=True)
+
+    best = None
+    for offset in voted[np.argsort(-votes, kind="stable")[:3]].tolist():   # Nachbar-Versätze liegen oft knapp dahinter
+        first = max(0, -offset)
+        last = min(len(query), len(candidate) - offset)
+        if last - first < MIN_COVERAGE * len(query):
+            continue
+        ber = bit_error_rate(query[first:last], candidate[first + offset:last + offset])
+        if best is None or ber < best["ber"]:
+            best = {"offset": offset, "ber": ber, "coverage": (last - first) / len(query)}
+    if best is None or best["ber"] > MAX_BER:
+        return None
+    return {
+        "offsetSeconds": round(frame_seconds(best["offset"]), 2),
+        "similarity": round(1 - best["ber"], 3),
+        "coverage": round(best["coverage"], 3),
+    }
+
+
+class FingerprintIndex:
+    """Fingerabdrücke aller MP3s im Audio-Verzeichnis, zu denen ein Transkript (<name>.txt) existiert"""
+
+    def __init__(self, directory: str, index_path: str = None, enabled: bool = True):
+        self.directory = directory
+        self.index_path = index_path
+        self.lock = threading.RLock()
+        self.entries = {}                   # mp3 → {"mtime", "size", "duration", "fingerprint": bytes}
+        self.tables = {}                    # mp3 → position_table() des Fingerabdrucks (nur im Speicher)
+        self.reused = 0                     # Transkripte, die statt einer Transkription übernommen wurden
+        self.saved_seconds = 0.0            # Vorhergesagte Transkriptionsdauer dieser Aufträge
+        self.last_refresh = 0.0
+        self.available = enabled and np is not None and shutil.which('ffmpeg') is not None
+        if enabled and not self.available:
+            print("[FINGERPRINT] ⚠️ numpy oder ffmpeg nicht gefunden – Duplikat-Erkennung abgeschaltet")
+        self._load()
+
+    # -------------------------------------------------------------------------
+    # Persistenz
+    # -------------------------------------------------------------------------
+    def _load(self):
+        if not self.index_path or not os.path.isfile(self.index_path):
+            return
+        try:
+            with open(self.index_path, "rb") as f:
+                data = pickle.load(f)
+            if data.get("version") != INDEX_VERSION or data.get("directory") != self.directory:
+                return
+            self.entries = data["entries"]
+            self.reused = data["reused"]
+            self.saved_seconds = data["savedSeconds"]
+        except Exception as e:
+            print(f"[FINGERPRINT] ⚠️ Index konnte nicht geladen werden, baue neu auf: {e}")
+
+    def save(self):
+        if not self.index_path:
+            return
+        with self.lock:
+            data = {
+                "version": INDEX_VERSION, "directory": self.directory, "entries": dict(self.entries),
+                "reused": self.reused, "savedSeconds": self.saved_seconds
+            }
+            tmp_path = self.index_path + ".tmp"
+            with open(tmp_path, "wb") as f:
+                pickle.dump(data, f, protocol=pickle.HIGHEST_PROTOCOL)
+            os.replace(tmp_path, self.index_path)
+
+    # -------------------------------------------------------------------------
+    # Indizierung
+    # -------------------------------------------------------------------------
+    def fingerprint(self, path: str = None, data: bytes = None):
+        """Fingerabdruck einer Datei oder hochgeladener Bytes; None, wenn nicht verfügbar oder nicht dekodierbar"""
+        if not self.available:
+            return None
+        samples = decode(path, data)
+        return compute(samples) if samples is not None else None
+
+    def refresh(self) -> dict:
+        """Gleicht den Index mit dem Verzeichnis ab (neue/geänderte MP3s mit Transkript, entfernte Dateien)"""
+        added = removed = 0
+        if not self.available or not os.path.isdir(self.directory):
+            return {"added": 0, "removed": 0}
+
+        names = set(os.listdir(self.directory))
+        current = {}
+        for filename in names:
+            stem, ext = os.path.splitext(filename)
+            if ext.lower() == ".mp3" and not stem.endswith("_temp") and f"{stem}.txt" in names:
+                stat = os.stat(os.path.join(self.directory, filename))
+                current[filename] = (stat.st_mtime, stat.st_size)
+
+        with self.lock:
+            for filename in [name for name in self.entries if name not in current]:
+                del self.entries[filename]
+                self.tables.pop(filename, None)
+                removed += 1
+            changed = [name for name, (mtime, size) in current.items()
+                       if (self.entries.get(name) or {}).get("mtime") != mtime
+                       or self.entries[name]["size"] != size]
+        # Außerhalb der Sperre: ein Abgleich im Hintergrund darf keinen Upload blockieren
+        for filename in changed:
+            if self.update_file(filename):
+                added += 1
+            if added and added % 20 == 0:
+                self.save()
+        self.last_refresh = time.time()
+
+        if added or removed:
+            self.save()
+        return {"added": added, "removed": removed}
+
+    def update_file(self, filename: str) -> bool:
+        """(Neu-)Fingerabdruck einer MP3 – z. B. direkt nachdem ihr Transkript geschrieben wurde"""
+        path = os.path.join(self.directory, os.path.basename(filename))
+        if not os.path.isfile(path):
+            return False
+        stat = os.stat(path)
+        fingerprint = self.fingerprint(path)
+        if fingerprint is None:
+            return False
+        table = position_table(fingerprint)
+        with self.lock:
+            self.entries[os.path.basename(path)] = {
+                "mtime": stat.st_mtime, "size": stat.st_size,
+                "duration": round(frame_seconds(len(fingerprint)), 1), "fingerprint": fingerprint.tobytes()
+            }
+            self.tables[os.path.basename(path)] = table
+        return True
+
+    def table(self, filename: str, entry: dict) -> tuple:
+        """Positionstabelle einer indizierten Aufnahme – nach dem Laden des Index beim ersten Abgleich aufgebaut"""
+        with self.lock:
+            table = self.tables.get(filename)
+        if table is None:
+            table = position_table(np.frombuffer(entry["fingerprint"], dtype=np.uint16))
+            with self.lock:
+                if self.entries.get(filename) is entry:
+                    self.tables[filename] = table
+        return table
+
+    # -------------------------------------------------------------------------
+    # Abgleich
+    # -------------------------------------------------------------------------
+    def find_duplicate(self, fingerprint, exclude: str = None) -> dict:
+        """Beste Aufnahme mit Transkript, in der `fingerprint` enthalten ist – oder None"""
+        if fingerprint is None or len(fingerprint) == 0:
+            return None
+        duration = frame_seconds(len(fingerprint))
+        with self.lock:
+            candidates = [(name, entry) for name, entry in self.entries.items()
+                          if name != exclude and MIN_COVERAGE * duration <= entry["duration"] <= duration + 2 * MAX_OFFSET_SEC]
+        best = None
+        for name, entry in candidates:
+            transcript = f"{os.path.splitext(name)[0]}.txt"
+            if not os.path.isfile(os.path.join(self.directory, transcript)):
+                continue
+            result = match(fingerprint, np.frombuffer(entry["fingerprint"], dtype=np.uint16), self.table(name, entry))
+            if result and (best is None or result["similarity"] > best["similarity"]):
+                best = {"filename": name, "transcript": transcript, "duration": round(duration, 1), **result}
+        return best
+
+    def record_reuse(self, saved_seconds: float):
+        with self.lock:
+            self.reused += 1
+            self.saved_seconds += saved_seconds
+        self.save()
+
+    def stats(self) -> dict:
+        with self.lock:
+            return {
+                "available": self.available,
+                "files": len(self.entries),
+                "audioHours": round(sum(entry["duration"] for entry in self.entries.values()) / 3600, 1),
+                "reused": self.reused,
+                "savedSeconds": round(self.saved_seconds, 1),
+                "lastRefresh": self.last_refresh or None,
+            }
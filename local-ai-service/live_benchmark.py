@@ -0,0 +1,198 @@
+# ------------------------------------------------------------------------------------------------------------------------------------
+# live_benchmark.py
+#
+# Latenz-Benchmark für die Live-Transkription (WebSocket /live des lokalen KI-Service)
+# Spielt eine MP3-Datei in Echtzeit (bzw. mit --speed) als PCM-Strom gegen eine laufende Instanz ab und misst
+# je Nachricht die Latenz = Empfangszeit − Zeitpunkt, zu dem das Audio bis zum Segment-Ende gesendet war:
+#   - partial: wie schnell vorläufiger Text erscheint
+#   - final:   wie lange es dauert, bis ein Segment endgültig ist (durch MAX_WINDOW_SEC in transcribe_live.py begrenzt)
+# Zusätzlich: Zeit bis "ready" (Modell-Ladezeit), RTF der Dekodierung laut "done".
+# Ausgabe: p50/p95/max je Nachrichtentyp und live_benchmark_<datum>.json im Temp-Verzeichnis (oder --output); Exit-Code 1 bei überschrittenem Budget.
+#
+# Voraussetzungen: ffmpeg im PATH, pip install websockets (kommt mit uvicorn[standard])
+# Aufruf: python live_benchmark.py aufnahme.mp3 [--url ws://localhost:8765/live] [--speed 1.0] [--final-budget 8]
+# ------------------------------------------------------------------------------------------------------------------------------------
+
+import os
+import sys
+import json
+import time
+import asyncio
+import argparse
+import tempfile
+import subprocess
+from datetime import datetime
+
+SAMPLE_RATE = 16000
+BYTES_PER_SECOND = SAMPLE_RATE * 2       # s16le mono
+CHUNK_MS = 100                           # Größe einer WebSocket-Nachricht (wie ein Mikrofon-Puffer)
+PARTIAL_BUDGET_SEC = 3.0                 # Budget p95-Latenz vorläufiger Text
+FINAL_BUDGET_SEC = 8.0                   # Budget p95-Latenz finaler Segmente
+
+def print_header(text):
+    print("\033[1;34m" + "═" * 120)
+    print("  " + text.center(76) + "  ")
+    print("═" * 120 + "\033[0m")
+
+def print_info(text):
+    print("\033[1;32m" + "→ " + text + "\033[0m")
+
+def print_error(text):
+    print("\033[1;31m" + "✖ " + text + "\033[0m")
+
+def print_success(text):
+    print("\033[1;32m" + "✔ " + text + "\033[0m")
+
+# -----------------------------------------------------------------------------------------------------------
+# MP3 → PCM s16le 16 kHz mono (das Format, das /live?format=pcm erwartet)
+# -----------------------------------------------------------------------------------------------------------
+def decode_pcm(path):
+    result = subprocess.run(
+        ['ffmpeg', '-v', 'error', '-i', path, '-f', 's16le', '-ac', '1', '-ar', str(SAMPLE_RATE), 'pipe:1'],
+        capture_output=True
+    )
+    if result.returncode != 0:
+        raise RuntimeError(f"ffmpeg fehlgeschlagen: {result.stderr.decode('utf-8', errors='replace').strip()}")
+    return result.stdout
+
+def percentile(values, share):
+    if not values:
+        return None
+    ordered = sorted(values)
+    return ordered[min(len(ordered) - 1, int(round(share * (len(ordered) - 1))))]
+
+def latency_stats(values):
+    return {
+        "count": len(values),
+        "p50": percentile(values, 0.5),
+        "p95": percentile(values, 0.95),
+        "max": max(values) if values else None,
+    }
+
+# -----------------------------------------------------------------------------------------------------------
+# Eine Live-Sitzung abspielen
+# -----------------------------------------------------------------------------------------------------------
+async def replay(url, pcm, speed, chunk_ms):
+    import websockets  # Nur für den Benchmark nötig
+
+    chunk_bytes = BYTES_PER_SECOND * chunk_ms // 1000
+    latencies = {"partial": [], "final": []}
+    finals = []
+    result = {}
+
+    connect_start = time.perf_counter()
+    async with websockets.connect(url, max_size=None) as websocket:
+        while True:
+            message = json.loads(await websocket.recv())
+            if message["type"] == "ready":
+                result["readySeconds"] = round(time.perf_counter() - connect_start, 3)
+                result["ready"] = message
+                break
+            if message["type"] == "error":
+                raise RuntimeError(message.get("message"))
+        print_info(f"    .. bereit nach {result['readySeconds']:.1f} s, spiele {len(pcm) / BYTES_PER_SECOND:.1f} s Audio "
+                   f"mit {speed}x Echtzeit ab")
+
+        stream_start = time.perf_counter()
+
+        def sent_at(audio_seconds):
+            # Wandzeit, zu der das Audio bis audio_seconds vollständig gesendet war
+            return stream_start + audio_seconds / speed
+
+        async def send():
+            for index, offset in enumerate(range(0, len(pcm), chunk_bytes)):
+                delay = stream_start + index * chunk_ms / 1000 / speed - time.perf_counter()
+                if delay > 0:
+                    await asyncio.sleep(delay)
+                await websocket.send(pcm[offset:offset + chunk_bytes])
+            await websocket.send("end")
+
+        sender = asyncio.create_task(send())
+        async for raw in websocket:
+            received = time.perf_counter()
+            message = json.loads(raw)
+            kind = message["type"]
+            if kind == "partial" and message.get("text"):
+                latencies["partial"].append(received - sent_at(message["end"]))
+            elif kind == "final":
+                latencies["final"].append(received - sent_at(message["end"]))
+                finals.append(message["text"])
+            elif kind == "done":
+                result["done"] = message
+            elif kind == "error":
+                print_error(f"    {message.get('message')}")
+            elif kind == "complete":
+                result["exitCode"] = message.get("exitCode")
+                break
+        await sender
+
+    result["latency"] = {kind: latency_stats(values) for kind, values in latencies.items()}
+    result["transcript"] = " ".join(finals)
+    return result
+
+def format_seconds(value):
+    return f"{value:6.2f} s" if value is not None else "     –  "
+
+def main():
+    parser = argparse.ArgumentParser(description="Latenz-Benchmark für die Live-Transkription (WebSocket /live)")
+    parser.add_argument('file', help="MP3-Datei, die in Echtzeit abgespielt wird")
+    parser.add_argument('--url', default="ws://localhost:8765/live", help="WebSocket-URL (default: ws://localhost:8765/live)")
+    parser.add_argument('--api-key', default=os.environ.get('LOCAL_SERVICE_API_KEY', ''),
+                        help="API-Key (default: LOCAL_SERVICE_API_KEY)")
+    parser.add_argument('--speed', type=float, default=1.0, help="Abspielgeschwindigkeit, 1.0 = Echtzeit (default: 1.0)")
+    parser.add_argument('--chunk-ms', type=int, default=CHUNK_MS, help=f"Audio je Nachricht in ms (default: {CHUNK_MS})")
+    parser.add_argument('--seconds', type=float, default=None, help="Nur die ersten N Sekunden abspielen")
+    parser.add_argument('--partial-budget', type=float, default=PARTIAL_BUDGET_SEC,
+                        help=f"Budget p95-Latenz partial in s (default: {PARTIAL_BUDGET_SEC})")
+    parser.add_argument('--final-budget', type=float, default=FINAL_BUDGET_SEC,
+                        help=f"Budget p95-Latenz final in s (default: {FINAL_BUDGET_SEC})")
+    parser.add_argument('--output', default=None,
+                        help="Ergebnis-JSON (default: live_benchmark_<datum>.json im Temp-Verzeichnis des Systems)")
+    args = parser.parse_args()
+
+    print("")
+    print_header("Live-Transkription: Latenz-Benchmark")
+    pcm = decode_pcm(args.file)
+    if args.seconds:
+        pcm = pcm[:int(args.seconds * SAMPLE_RATE) * 2]
+    url = f"{args.url}{'&' if '?' in args.url else '?'}format=pcm"
+    if args.api_key:
+        url += f"&api_key={args.api_key}"
+    print_info(f"{os.path.basename(args.file)} → {args.url}")
+
+    result = asyncio.run(replay(url, pcm, args.speed, args.chunk_ms))
+
+    print()
+    print_info(f"{'':10} {'Anzahl':>8} {'p50':>10} {'p95':>10} {'max':>10}")
+    for kind, stats in result["latency"].items():
+        print_info(f"{kind:10} {stats['count']:8d} {format_seconds(stats['p50']):>10} "
+                   f"{format_seconds(stats['p95']):>10} {format_seconds(stats['max']):>10}")
+    done = result.get("done") or {}
+    if done:
+        print_info(f"Dekodierung: {done.get('passes')} Durchläufe, RTF {done.get('rtf')}, "
+                   f"{done.get('forcedCommits')} erzwungene Übernahmen")
+
+    output_path = args.output or os.path.join(tempfile.gettempdir(),
+                                              f"live_benchmark_{datetime.now().strftime('%Y%m%d_%H%M%S')}.json")
+    with open(output_path, "w", encoding="utf-8") as f:
+        json.dump({"file": os.path.basename(args.file), "url": args.url, "speed": args.speed, "chunkMs": args.chunk_ms,
+                   "audioSeconds": round(len(pcm) / BYTES_PER_SECOND, 3), **result}, f, ensure_ascii=False, indent=2)
+    print_info(f"Ergebnis gespeichert: {output_path}")
+
+    ok = result.get("exitCode") == 0
+    for kind, budget in (("partial", args.partial_budget), ("final", args.final_budget)):
+        p95 = result["latency"][kind]["p95"]
+        if p95 is not None and p95 > budget:
+            print_error(f"p95-Latenz {kind} {p95:.2f} s überschreitet Budget {budget} s")
+            ok = False
+    if not result["latency"]["final"]["count"]:
+        print_error("Keine finalen Segmente erhalten.")
+        ok = False
+
+    if ok:
+        print_success("Latenz-Budgets eingehalten.")
+    else:
+        sys.exit(1)
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,439 @@
+# ------------------------------------------------------------------------------------------------------------------------------------
+# load_benchmark.py
+#
+# Last- und Nebenläufigkeits-Benchmark für den lokalen KI-Service (main.py)
+# Startet die FastAPI-App in einem Temp-Verzeichnis mit den Stub-Skripten aus load_stubs.py statt WSL, GPU und Modellen
+# (ein "wsl" im PATH führt die Kommandos direkt aus) und treibt je Stufe N gleichzeitige Clients durch den Auftrags-Mix:
+#   - transcribe: Upload (/files/save) + /transcribe
+#   - summarize:  /summarize mit Transkriptionstext
+#   - process:    Upload + /process (Transkription und Summary überlappend)
+# Gemessen wird, was main.py selbst kostet – Upload-Zeit, Zeit bis zum ersten SSE-Event, Abstände zwischen Events
+# (p50/p95/p99/max), Gesamtdauer, Fehlerquote je Auftragsart, Durchsatz (Aufträge/s, Audio-Sekunden/s) und das
+# Speicherwachstum des Service-Prozesses (VmRSS: Start, Spitze, Ende) über alle Stufen.
+# Ausgabe: Tabelle je Stufe und load_benchmark_<datum>.json im Temp-Verzeichnis (oder --output); Exit-Code 1 bei überschrittenem Budget.
+#
+# Voraussetzungen: pip install fastapi uvicorn python-multipart (wie main.py), Linux/WSL für VmRSS (/proc)
+# Aufruf: python load_benchmark.py [--clients 5,50] [--jobs 2] [--mix transcribe,summarize,process] [--audio-seconds 300]
+#         python load_benchmark.py --url http://localhost:8765 [--pid N]   (laufende Instanz, z. B. mit echten Modellen)
+# Zeitverhalten der Stubs: STUB_LOAD_SEC, STUB_RTF, STUB_SEGMENT_SEC, STUB_BLOCK_SEC (siehe load_stubs.py)
+# ------------------------------------------------------------------------------------------------------------------------------------
+
+import os
+import sys
+import json
+import time
+import uuid
+import shutil
+import socket
+import argparse
+import tempfile
+import threading
+import subprocess
+import http.client
+from datetime import datetime
+from urllib.parse import urlsplit
+from concurrent.futures import ThreadPoolExecutor
+
+SERVICE_DIR = os.path.dirname(os.path.abspath(__file__))
+CLIENT_LEVELS = "5,50"
+JOB_KINDS = ("transcribe", "summarize", "process")
+AUDIO_SECONDS = 300                      # Länge der synthetischen Aufnahme je Auftrag
+AUDIO_BYTES_PER_SECOND = 16000           # 128 kbps – daraus schätzen probe_duration() und die Stubs die Dauer
+SEGMENT_SEC = 5                          # Segmentlänge des synthetischen Transkripts (/summarize)
+SAMPLE_INTERVAL_SEC = 0.2                # VmRSS-Abtastung
+REQUEST_TIMEOUT_SEC = 600
+FAILURE_BUDGET = 0.0                     # Budget Fehlerquote je Auftragsart
+FIRST_EVENT_BUDGET_SEC = 2.0             # Budget p95 Zeit bis zum ersten SSE-Event
+RSS_GROWTH_BUDGET_MB = 200.0             # Budget Speicherwachstum des Service über alle Stufen
+
+def print_header(text):
+    print("\033[1;34m" + "═" * 120)
+    print("  " + text.center(76) + "  ")
+    print("═" * 120 + "\033[0m")
+
+def print_info(text):
+    print("\033[1;32m" + "→ " + text + "\033[0m")
+
+def print_error(text):
+    print("\033[1;31m" + "✖ " + text + "\033[0m")
+
+def print_success(text):
+    print("\033[1;32m" + "✔ " + text + "\033[0m")
+
+def percentile(values, share):
+    if not values:
+        return None
+    ordered = sorted(values)
+    return ordered[min(len(ordered) - 1, int(round(share * (len(ordered) - 1))))]
+
+def latency_stats(values):
+    return {
+        "count": len(values),
+        "p50": percentile(values, 0.5),
+        "p95": percentile(values, 0.95),
+        "p99": percentile(values, 0.99),
+        "max": max(values) if values else None,
+    }
+
+def format_seconds(value):
+    return "–" if value is None else f"{value:.2f}s"
+
+# -----------------------------------------------------------------------------------------------------------
+# Service mit Stub-Skripten starten
+# -----------------------------------------------------------------------------------------------------------
+def free_port():
+    with socket.socket() as sock:
+        sock.bind(("127.0.0.1", 0))
+        return sock.getsockname()[1]
+
+def start_service(workdir, port):
+    """uvicorn main:app mit Audio-Verzeichnis, Historien und Ledger im Temp-Verzeichnis; "wsl" = direkt ausführen"""
+    audio_dir = os.path.join(workdir, "audio")
+    bin_dir = os.path.join(workdir, "bin")
+    os.makedirs(audio_dir)
+    os.makedirs(bin_dir)
+    wsl = os.path.join(bin_dir, "wsl")
+    with open(wsl, "w") as f:
+        f.write('#!/bin/sh\nexec "$@"\n')
+    os.chmod(wsl, 0o755)
+    os.symlink(sys.executable, os.path.join(bin_dir, "python"))   # "python" in den Kommandos = dieser Interpreter
+    activate = os.path.join(workdir, "activate")
+    open(activate, "w").close()
+
+    stubs = os.path.join(SERVICE_DIR, "load_stubs.py")
+    env = {
+        **os.environ,
+        "PATH": bin_dir + os.pathsep + os.environ.get("PATH", ""),
+        "AUDIO_DIR": audio_dir,
+        "WSL_AUDIO_DIR": audio_dir,
+        "PYTHON_TRANSCRIBE": f"{stubs} transcribe",
+        "PYTHON_SUMMARIZE": f"{stubs} summarize",
+        "VENV_ACTIVATE": activate,
+        "LOCAL_SERVICE_API_KEY": "",
+        "SERVICE_ROLE": "worker",
+        "MODEL_HOST": "0",
+        "HANDOFF_MODE": os.environ.get("HANDOFF_MODE", "memory"),
+        "SEARCH_INDEX_PATH": os.path.join(workdir, "search_index.json"),
+        "ETA_HISTORY_PATH": os.path.join(workdir, "eta_history.json"),
+        "STORAGE_LEDGER_PATH": os.path.join(workdir, "storage_ledger.json"),
+        "TRACE_LOG_PATH": os.path.join(workdir, "traces.jsonl"),
+        "FINGERPRINT_INDEX_PATH": os.path.join(workdir, "fingerprint_index.pkl"),
+        "RESULT_DIR": os.path.join(workdir, "results"),
+        "STORAGE_MIN_FREE_MB": "0",
+    }
+    log = open(os.path.join(workdir, "service.log"), "w")
+    process = subprocess.Popen([sys.executable, "-m", "uvicorn", "main:app", "--host", "127.0.0.1", "--port", str(port),
+                                "--log-level", "warning"],
+                               cwd=SERVICE_DIR, env=env, stdout=log, stderr=subprocess.STDOUT)
+    url = f"http://127.0.0.1:{port}"
+    deadline = time.time() + 60
+    while time.time() < deadline:
+        if process.poll() is not None:
+            raise RuntimeError(f"Service beendet (Exit {process.returncode}), siehe {log.name}")
+        try:
+            status, _ = request_json(url, "GET", "/health", timeout=2)
+            if status == 200:
+                return process, url
+        except OSError:
+            pass
+        time.sleep(0.2)
+    process.terminate()
+    raise RuntimeError(f"Service nicht erreichbar nach 60 s, siehe {log.name}")
+
+def rss_mb(pid):
+    try:
+        with open(f"/proc/{pid}/status") as f:
+            for line in f:
+                if line.startswith("VmRSS:"):
+                    return int(line.split()[1]) / 1024
+    except OSError:
+        pass
+    return None
+
+class RssSampler(threading.Thread):
+    """VmRSS des Service-Prozesses im Hintergrund abtasten (Spitze je Stufe und insgesamt)"""
+
+    def __init__(self, pid):
+        super().__init__(daemon=True)
+        self.pid = pid
+        self.samples = []
+        self.stopped = threading.Event()
+
+    def run(self):
+        while not self.stopped.is_set():
+            value = rss_mb(self.pid)
+            if value is not None:
+                self.samples.append((time.time(), value))
+            self.stopped.wait(SAMPLE_INTERVAL_SEC)
+
+    def peak(self, since=0.0):
+        values = [value for at, value in self.samples if at >= since]
+        return max(values) if values else None
+
+# -----------------------------------------------------------------------------------------------------------
+# HTTP-Client (http.client: ein Thread je Client, keine Zusatzpakete)
+# -----------------------------------------------------------------------------------------------------------
+def connection(url, timeout=REQUEST_TIMEOUT_SEC):
+    parts = urlsplit(url)
+    cls = http.client.HTTPSConnection if parts.scheme == "https" else http.client.HTTPConnection
+    return cls(parts.hostname, parts.port, timeout=timeout)
+
+def request_json(url, method, path, body=None, headers=None, timeout=REQUEST_TIMEOUT_SEC):
+    conn = connection(url, timeout)
+    try:
+        conn.request(method, path, body=body, headers=headers or {})
+        response = conn.getresponse()
+        data = response.read()
+        try:
+            return response.status, json.loads(data or b"null")
+        except ValueError:
+            return response.status, None
+    finally:
+        conn.close()
+
+def upload(url, api_key, name, audio):
+    boundary = uuid.uuid4().hex
+    body = (f"--{boundary}\r\nContent-Disposition: form-data; name=\"file\"; filename=\"{name}\"\r\n"
+            f"Content-Type: audio/mpeg\r\n\r\n").encode() + audio + f"\r\n--{boundary}--\r\n".encode()
+    status, payload = request_json(url, "POST", "/files/save", body,
+                                   {"Content-Type": f"multipart/form-data; boundary={boundary}", "X-API-Key": api_key})
+    if status != 200:
+        raise RuntimeError(f"Upload HTTP {status}: {payload}")
+    return payload["filename"]
+
+def stream_job(url, api_key, path, payload):
+    """SSE-Auftrag: (Zeit bis zum ersten Event, Abstände zwischen Events, Event-Typen, letztes Event, erstes error-Event)"""
+    conn = connection(url)
+    try:
+        started = time.perf_counter()
+        conn.request("POST", path, body=json.dumps(payload),
+                     headers={"Content-Type": "application/json", "X-API-Key": api_key})
+        response = conn.getresponse()
+        if response.status != 200:
+            raise RuntimeError(f"HTTP {response.status}: {response.read()[:200].decode('utf-8', errors='replace')}")
+        first_event, gaps, kinds, last, error = None, [], [], None, None
+        previous = started
+        while True:
+            line = response.readline()
+            if not line:
+                break
+            if not line.startswith(b"data: "):
+                continue
+            now = time.perf_counter()
+            if first_event is None:
+                first_event = now - started
+            else:
+                gaps.append(now - previous)
+            previous = now
+            last = json.loads(line[len(b"data: "):])
+            kinds.append(last.get("type"))
+            if last.get("type") == "error" and error is None:
+                error = last
+        return first_event, gaps, kinds, last, error
+    finally:
+        conn.close()
+
+# -----------------------------------------------------------------------------------------------------------
+# Aufträge
+# -----------------------------------------------------------------------------------------------------------
+def synthetic_audio(seconds):
+    # Inhalt egal: Stubs und probe_duration()-Fallback leiten die Dauer aus der Größe ab
+    return os.urandom(int(seconds * AUDIO_BYTES_PER_SECOND))
+
+def synthetic_transcript(seconds):
+    lines = [f"[{int(t) // 3600:02d}:{int(t) % 3600 // 60:02d}:{int(t) % 60:02d}] Segment {n} der Lastmessung."
+             for n, t in enumerate(range(0, int(seconds), SEGMENT_SEC))]
+    return "Datum:   01.01.2026\nModell:  stub\n\n\n\n" + "\n".join(lines) + "\n"
+
+def run_job(url, api_key, kind, client, index, audio, transcript):
+    result = {"kind": kind, "ok": False, "upload": None, "firstEvent": None, "gaps": [], "total": None, "events": 0,
+              "error": None}
+    started = time.perf_counter()
+    try:
+        name = f"load_{client:03d}_{index:03d}.mp3"
+        if kind == "summarize":
+            path, payload = "/summarize", {"transcription": transcript, "mp3Filename": name}
+        else:
+            upload_started = time.perf_counter()
+            filename = upload(url, api_key, name, audio)
+            result["upload"] = time.perf_counter() - upload_started
+            path, payload = f"/{kind}", {"filename": filename}
+        first_event, gaps, kinds, last, error = stream_job(url, api_key, path, payload)
+        result.update(firstEvent=first_event, gaps=gaps, events=len(kinds))
+        if error:
+            result["error"] = f"error-Event: {error.get('message')}"
+        elif not last or last.get("type") != "complete":
+            result["error"] = f"kein complete-Event (zuletzt: {last and last.get('type')})"
+        else:
+            result["ok"] = True
+    except Exception as e:
+        result["error"] = f"{type(e).__name__}: {e}"
+    result["total"] = time.perf_counter() - started
+    return result
+
+def run_level(url, api_key, clients, jobs, mix, audio_seconds, sampler):
+    audio = synthetic_audio(audio_seconds)
+    transcript = synthetic_transcript(audio_seconds)
+    rss_before = rss_mb(sampler.pid) if sampler else None
+    started_at = time.time()
+    started = time.perf_counter()
+
+    def client_loop(client):
+        return [run_job(url, api_key, mix[(client + index) % len(mix)], client, index, audio, transcript)
+                for index in range(jobs)]
+
+    with ThreadPoolExecutor(max_workers=clients) as pool:
+        results = [result for results in pool.map(client_loop, range(clients)) for result in results]
+    wall = time.perf_counter() - started
+
+    by_kind = {}
+    for kind in mix:
+        runs = [result for result in results if result["kind"] == kind]
+        if not runs:
+            continue
+        failures = [result for result in runs if not result["ok"]]
+        by_kind[kind] = {
+            "jobs": len(runs),
+            "failures": len(failures),
+            "failureRate": round(len(failures) / len(runs), 4),
+            "errors": sorted({result["error"] for result in failures})[:5],
+            "upload": latency_stats([result["upload"] for result in runs if result["upload"] is not None]),
+            "firstEvent": latency_stats([result["firstEvent"] for result in runs if result["firstEvent"] is not None]),
+            "eventGap": latency_stats([gap for result in runs for gap in result["gaps"]]),
+            "total": latency_stats([result["total"] for result in runs if result["ok"]]),
+        }
+    completed = [result for result in results if result["ok"]]
+    audio_done = sum(audio_seconds for result in completed if result["kind"] != "summarize")
+    return {
+        "clients": clients,
+        "jobs": len(results),
+        "wallSeconds": round(wall, 2),
+        "jobsPerSecond": round(len(completed) / wall, 3),
+        "audioSecondsPerSecond": round(audio_done / wall, 1),
+        "failureRate": round(1 - len(completed) / len(results), 4) if results else 0.0,
+        "rssBeforeMb": rss_before and round(rss_before, 1),
+        "rssPeakMb": sampler and sampler.peak(started_at) and round(sampler.peak(started_at), 1),
+        "rssAfterMb": sampler and rss_mb(sampler.pid) and round(rss_mb(sampler.pid), 1),
+        "kinds": by_kind,
+    }
+
+def print_level(level):
+    print_header(f"{level['clients']} Clients · {level['jobs']} Aufträge · {level['wallSeconds']:.1f} s")
+    print(f"  {'Art':<12}{'Fehler':>8}{'Upload p95':>12}{'1. Event p50':>14}{'p95':>9}{'p99':>9}"
+          f"{'Abstand p95':>13}{'max':>9}{'Dauer p50':>11}{'p95':>9}")
+    for kind, stats in level["kinds"].items():
+        print(f"  {kind:<12}{stats['failures']:>4}/{stats['jobs']:<3}{format_seconds(stats['upload']['p95']):>12}"
+              f"{format_seconds(stats['firstEvent']['p50']):>14}{format_seconds(stats['firstEvent']['p95']):>9}"
+              f"{format_seconds(stats['firstEvent']['p99']):>9}{format_seconds(stats['eventGap']['p95']):>13}"
+              f"{format_seconds(stats['eventGap']['max']):>9}{format_seconds(stats['total']['p50']):>11}"
+              f"{format_seconds(stats['total']['p95']):>9}")
+        for error in stats["errors"]:
+            print_error(f"{kind}: {error[:110]}")
+    rss = ""
+    if level["rssBeforeMb"] is not None:
+        rss = f", VmRSS {level['rssBeforeMb']:.0f} → Spitze {level['rssPeakMb']:.0f} → {level['rssAfterMb']:.0f} MB"
+    print_info(f"Durchsatz: {level['jobsPerSecond']:.2f} Aufträge/s, {level['audioSecondsPerSecond']:.0f} Audio-s/s{rss}")
+
+# ────────────────────────────────────────────────
+# Starte Hauptprogramm
+# ────────────────────────────────────────────────
+def main():
+    parser = argparse.ArgumentParser(description="Last-Benchmark für den lokalen KI-Service (Stub-Skripte statt Modelle)")
+    parser.add_argument('--clients', default=CLIENT_LEVELS, help=f"Stufen gleichzeitiger Clients (default: {CLIENT_LEVELS})")
+    parser.add_argument('--jobs', type=int, default=2, help="Aufträge je Client und Stufe (default: 2)")
+    parser.add_argument('--mix', default=",".join(JOB_KINDS), help=f"Auftragsarten im Wechsel (default: {','.join(JOB_KINDS)})")
+    parser.add_argument('--audio-seconds', type=float, default=AUDIO_SECONDS,
+                        help=f"Länge der synthetischen Aufnahme je Auftrag (default: {AUDIO_SECONDS})")
+    parser.add_argument('--url', default=None, help="Laufende Instanz statt eigenem Service mit Stubs")
+    parser.add_argument('--pid', type=int, default=None, help="Mit --url: PID des Service für VmRSS")
+    parser.add_argument('--api-key', default=os.environ.get('LOCAL_SERVICE_API_KEY', ''),
+                        help="Mit --url: API-Key (default: LOCAL_SERVICE_API_KEY)")
+    parser.add_argument('--max-failure-rate', type=float, default=FAILURE_BUDGET,
+                        help=f"Budget Fehlerquote je Auftragsart (default: {FAILURE_BUDGET})")
+    parser.add_argument('--max-first-event-p95', type=float, default=FIRST_EVENT_BUDGET_SEC,
+                        help=f"Budget p95 Zeit bis zum ersten Event in Sekunden (default: {FIRST_EVENT_BUDGET_SEC})")
+    parser.add_argument('--max-rss-growth-mb', type=float, default=RSS_GROWTH_BUDGET_MB,
+                        help=f"Budget Speicherwachstum des Service in MB (default: {RSS_GROWTH_BUDGET_MB})")
+    parser.add_argument('--keep', action='store_true', help="Temp-Verzeichnis (Audio, service.log) behalten")
+    parser.add_argument('--output', default=None,
+                        help="Ergebnis-JSON (default: load_benchmark_<datum>.json im Temp-Verzeichnis des Systems)")
+    args = parser.parse_args()
+
+    levels = [int(value) for value in args.clients.split(",") if value.strip()]
+    mix = [kind.strip() for kind in args.mix.split(",") if kind.strip()]
+    unknown = [kind for kind in mix if kind not in JOB_KINDS]
+    if unknown or not levels or not mix:
+        print_error(f"Ungültige Stufen oder Auftragsarten: {unknown or args.clients}")
+        sys.exit(2)
+
+    workdir, service = None, None
+    if args.url:
+        url, api_key, pid = args.url.rstrip("/"), args.api_key, args.pid
+    else:
+        workdir = tempfile.mkdtemp(prefix="load_benchmark_")
+        print_info(f"Starte Service mit Stub-Skripten in {workdir}")
+        try:
+            service, url = start_service(workdir, free_port())
+        except RuntimeError as e:
+            print_error(str(e))
+            sys.exit(1)
+        api_key, pid = "", service.pid
+
+    sampler = RssSampler(pid) if pid else None
+    results = {"date": datetime.now().isoformat(timespec="seconds"), "url": url, "stubs": service is not None,
+               "mix": mix, "jobsPerClient": args.jobs, "audioSeconds": args.audio_seconds, "levels": []}
+    try:
+        if sampler:
+            sampler.start()
+            # Ein Aufwärm-Auftrag je Art: Importe, Suchindex und ETA-Historie sollen nicht als Wachstum zählen
+            run_level(url, api_key, 1, len(mix), mix, min(args.audio_seconds, 30), None)
+            results["rssBaselineMb"] = rss_mb(pid)
+        for clients in levels:
+            print_info(f"Stufe: {clients} Clients × {args.jobs} Aufträge ({', '.join(mix)})")
+            level = run_level(url, api_key, clients, args.jobs, mix, args.audio_seconds, sampler)
+            results["levels"].append(level)
+            print_level(level)
+        if sampler:
+            results["rssEndMb"] = rss_mb(pid)
+            results["rssPeakMb"] = sampler.peak()
+    finally:
+        if sampler:
+            sampler.stopped.set()
+        if service:
+            service.terminate()
+            service.wait(timeout=10)
+        if workdir and not args.keep:
+            shutil.rmtree(workdir, ignore_errors=True)
+
+    # Budgets
+    violations = []
+    for level in results["levels"]:
+        for kind, stats in level["kinds"].items():
+            if stats["failureRate"] > args.max_failure_rate:
+                violations.append(f"{level['clients']} Clients/{kind}: Fehlerquote {stats['failureRate']:.1%}")
+            p95 = stats["firstEvent"]["p95"]
+            if p95 is not None and p95 > args.max_first_event_p95:
+                violations.append(f"{level['clients']} Clients/{kind}: erstes Event p95 {p95:.2f}s")
+    if results.get("rssBaselineMb") and results.get("rssEndMb"):
+        growth = results["rssEndMb"] - results["rssBaselineMb"]
+        results["rssGrowthMb"] = round(growth, 1)
+        print_info(f"Speicherwachstum Service: {growth:+.1f} MB (Spitze {results['rssPeakMb']:.0f} MB)")
+        if growth > args.max_rss_growth_mb:
+            violations.append(f"Speicherwachstum {growth:.1f} MB")
+    results["violations"] = violations
+
+    output = args.output or os.path.join(tempfile.gettempdir(),
+                                         f"load_benchmark_{datetime.now().strftime('%Y%m%d_%H%M%S')}.json")
+    with open(output, "w", encoding="utf-8") as f:
+        json.dump(results, f, ensure_ascii=False, indent=2)
+    print_info(f"Ergebnisse gespeichert: {output}")
+
+    if violations:
+        for violation in violations:
+            print_error(f"Budget überschritten – {violation}")
+        sys.exit(1)
+    print_success("Alle Budgets eingehalten")
+
+
+if __name__ == "__main__":
+    main()
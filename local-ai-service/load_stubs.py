@@ -0,0 +1,258 @@
+# ------------------------------------------------------------------------------------------------------------------------------------
+# load_stubs.py
+#
+# Stub-Skripte für load_benchmark.py: ersetzen transcribe.py und summarize.py (und damit WSL, GPU und Modelle) durch Prozesse,
+# die dieselben Argumente verstehen und dieselbe Ausgabe mit realistischem Zeitverhalten liefern:
+#   - Konsolenzeilen, an denen main.py den Fortschritt festmacht ("Lade Modell", "Modell geladen", "summary= ...")
+#   - Stream-Protokoll @@SEGMENT/@@HEADER/@@BLOCK/@@RESULT/@@REPORT (Run-Report über instrumentation.RunRecorder)
+#   - Dateien im Arbeitsverzeichnis (= WSL_AUDIO_DIR), wenn nicht im stdio-Modus bzw. mit --save
+# Zeitverhalten über Umgebungsvariablen: STUB_LOAD_SEC (Modell laden), STUB_RTF (Dekodierzeit / Audiodauer),
+# STUB_SEGMENT_SEC (Audio je Segment), STUB_BLOCK_SEC (Sekunden je Block-Überschrift).
+# Die Audiodauer ergibt sich wie im ETA-Fallback aus der Dateigröße (128 kbps).
+#
+# Aufruf (über PYTHON_TRANSCRIBE/PYTHON_SUMMARIZE = "load_stubs.py transcribe" bzw. "load_stubs.py summarize"):
+#   python load_stubs.py transcribe [--stream] [--stdio] [--save] [--range START-END ... [--transcript name.txt]] aufnahme.mp3
+#   python load_stubs.py summarize [--stream] [--stdio] [--save] [-durchgabe|-newsletter] aufnahme.txt
+# ------------------------------------------------------------------------------------------------------------------------------------
+
+import os
+import re
+import sys
+import json
+import time
+import argparse
+from datetime import datetime
+from pathlib import Path
+
+sys.path.insert(0, os.environ.get('BASE_DATA_DIR', str(Path(__file__).resolve().parent.parent / 'base-data')))
+from instrumentation import RunRecorder  # noqa: E402
+from transcript_store import TranscriptStore  # noqa: E402
+from tracing import span, start_script_trace  # noqa: E402
+
+LOAD_SEC = float(os.environ.get('STUB_LOAD_SEC', '0.5'))
+RTF = float(os.environ.get('STUB_RTF', '0.05'))
+SEGMENT_SEC = float(os.environ.get('STUB_SEGMENT_SEC', '5'))
+BLOCK_SEC = float(os.environ.get('STUB_BLOCK_SEC', '0.05'))
+AUDIO_KBPS = 128
+BLOCK_SIZE = 20                          # wie summarize.py: 20 Segmente je Block, 50 % Overlap
+SEGMENT_RE = re.compile(r'^\[\d{2}:\d{2}:\d{2}\] ', re.MULTILINE)
+WORDS = ("Liebe", "Licht", "Seele", "Weg", "Vertrauen", "Herz", "Frieden", "Wandel", "Kraft", "Zeit")
+
+
+def emit(kind, payload):
+    print(f"@@{kind} " + json.dumps(payload, ensure_ascii=False), flush=True)
+
+
+def timestamp(seconds):
+    seconds = int(seconds)
+    return f"{seconds // 3600:02d}:{seconds % 3600 // 60:02d}:{seconds % 60:02d}"
+
+
+def segment_sentence(index):
+    return " ".join(WORDS[(index + n) % len(WORDS)] for n in range(8)) + "."
+
+
+# -----------------------------------------------------------------------------------------------------------
+# transcribe.py
+# -----------------------------------------------------------------------------------------------------------
+def transcribe(argv):
+    parser = argparse.ArgumentParser(prog="load_stubs.py transcribe")
+    parser.add_argument('file', nargs='?')
+    parser.add_argument('-w', '--width', type=int, default=160)
+    parser.add_argument('--stream', action='store_true')
+    parser.add_argument('--stdio', action='store_true')
+    parser.add_argument('--save', action='store_true')
+    parser.add_argument('--profile', action='store_true')
+    parser.add_argument('--trace-id', default=None)
+    parser.add_argument('--trace-parent', default=None)
+    parser.add_argument('--progressive', action='store_true')
+    parser.add_argument('--decode', default="beam")
+    parser.add_argument('--range', dest='ranges', action='append', metavar='START-END')
+    parser.add_argument('--transcript', default=None)
+    args, _ = parser.parse_known_args(argv)
+    start_script_trace("transcribe", args.trace_id, args.trace_parent)
+
+    base_name = Path(args.file).stem
+    recorder = RunRecorder("transcribe", file=f"{base_name}.txt", model="stub", decodeMode=args.decode)
+    audio_bytes = len(sys.stdin.buffer.read()) if args.stdio else os.path.getsize(args.file)
+    duration = audio_bytes * 8 / (AUDIO_KBPS * 1000)
+    recorder.meta["mp3Duration"] = duration
+    start = datetime.now()
+
+    # --range: wie transcribe.py das bestehende Transkript lesen und nur die Bereiche ersetzen
+    if args.ranges:
+        from transcribe import parse_range, resolve_ranges   # Erst hier: transcribe.py importieren kostet Startzeit
+        if args.transcript:
+            base_name = Path(args.transcript).stem
+        path = Path(f"{base_name}.txt")
+        if not path.is_file():
+            print(f"Kein bestehendes Transkript für --range: {path}", flush=True)
+            sys.exit(1)
+        with TranscriptStore.open(str(path), duration=duration) as store:
+            windows = resolve_ranges(store, [parse_range(value) for value in args.ranges], duration)
+            transcribe_ranges(args, store, windows, path, recorder)
+        if args.stream or args.stdio:
+            emit("REPORT", recorder.report())
+        return
+
+    print(f"Lade Modell stub ({LOAD_SEC} s)", flush=True)
+    with recorder.stage("load"):
+        time.sleep(LOAD_SEC)
+    print("Modell geladen", flush=True)
+
+    print(f"Transkription der mp3 ({duration:.0f} s Audio)", flush=True)
+    raws = []
+    with recorder.stage("decode"):
+        position = 0.0
+        while position < duration:
+            end = min(duration, position + SEGMENT_SEC)
+            time.sleep((end - position) * RTF)
+            raw = f"[{timestamp(position)}] {segment_sentence(len(raws))}\n"
+            raws.append(raw)
+            if args.stream:
+                emit("SEGMENT", {"start": position, "end": end, "raw": raw})
+            position = end
+    recorder.meta["segments"] = len(raws)
+
+    header = (f"Datum:   {start.strftime('%d.%m.%Y')}\nStart:   {start.strftime('%H:%M:%S')}\n"
+              f"Dauer:   {timestamp(duration * RTF + LOAD_SEC)}\nModell:  stub\n\n\n\n")
+    transcription = header + "".join(raws)
+    if args.stream:
+        emit("HEADER", {"text": header, "mp3Duration": duration})
+    print(f"Transkription beendet um {datetime.now().strftime('%H:%M:%S')}", flush=True)
+
+    if not args.stdio or args.save:
+        with recorder.stage("save"):
+            Path(f"{base_name}.txt").write_text(transcription, encoding="utf-8")
+        print(f"Transkription erfolgreich gespeichert: {base_name}.txt", flush=True)
+    if args.stdio:
+        emit("RESULT", {"transcription": transcription, "filename": f"{base_name}.txt", "mp3Duration": duration,
+                        "segments": len(raws)})
+    if args.stream or args.stdio:
+        emit("REPORT", recorder.report())
+
+
+def transcribe_ranges(args, store, windows, path, recorder):
+    """Stub für transcribe.transcribe_ranges: je Bereich neue Segmente im Takt von STUB_SEGMENT_SEC, @@REFINE je Bereich"""
+    recorder.meta["ranges"] = [[start, end] for _, _, start, end in windows]
+    print(f"Lade Modell stub ({LOAD_SEC} s)", flush=True)
+    with recorder.stage("load"):
+        time.sleep(LOAD_SEC)
+    print("Modell geladen", flush=True)
+
+    replacements, count = [], 0
+    with recorder.stage("decode"):
+        for first, last, start, end in windows:
+            segments = []
+            position = start
+            while position < end:
+                segment_end = min(end, position + SEGMENT_SEC)
+                time.sleep((segment_end - position) * RTF)
+                segments.append({"start": position, "end": segment_end,
+                                 "raw": f"[{timestamp(position)}] {segment_sentence(first + len(segments) + 1)}\n"})
+                position = segment_end
+            changed = [s["raw"].split("] ", 1)[1].strip() for s in segments] != store.texts(first, last)
+            replacements.append((first, last, "".join(s["raw"] for s in segments)))
+            count += len(segments)
+            if args.stream:
+                emit("REFINE", {"first": first, "last": last, "start": start, "end": end, "changed": changed,
+                                "segments": segments})
+    recorder.meta["segments"] = count
+    transcription = store.splice(replacements)
+
+    if args.stream:
+        emit("HEADER", {"text": store.header, "mp3Duration": recorder.meta["mp3Duration"]})
+    print(f"Transkription beendet um {datetime.now().strftime('%H:%M:%S')}", flush=True)
+    with recorder.stage("save"):
+        path.write_text(transcription, encoding="utf-8")
+    print(f"Transkription erfolgreich gespeichert: {path.name}", flush=True)
+    if args.stdio:
+        emit("RESULT", {"transcription": transcription, "filename": path.name,
+                        "mp3Duration": recorder.meta["mp3Duration"], "segments": count})
+
+
+# -----------------------------------------------------------------------------------------------------------
+# summarize.py
+# -----------------------------------------------------------------------------------------------------------
+def summarize(argv):
+    parser = argparse.ArgumentParser(prog="load_stubs.py summarize")
+    parser.add_argument('file', nargs='?')
+    parser.add_argument('-durchgabe', action='store_true')
+    parser.add_argument('-newsletter', action='store_true')
+    parser.add_argument('--stream', action='store_true')
+    parser.add_argument('--stdio', action='store_true')
+    parser.add_argument('--save', action='store_true')
+    parser.add_argument('--profile', action='store_true')
+    parser.add_argument('--trace-id', default=None)
+    parser.add_argument('--trace-parent', default=None)
+    args, _ = parser.parse_known_args(argv)
+    start_script_trace("summarize", args.trace_id, args.trace_parent)
+
+    base_name = Path(args.file).stem
+    recorder = RunRecorder("summarize", file=f"{base_name}_s.txt",
+                           promptType="newsletter" if args.newsletter else "durchgabe")
+    print("  ..lade summarizer", flush=True)
+    with recorder.stage("load"):
+        time.sleep(LOAD_SEC)
+    print("  ..lade tokenizer", flush=True)
+    recorder.meta["device"] = "stub"
+
+    summaries = []
+
+    def summarize_block(first, last):
+        with span("block", index=len(summaries), blocks=1):
+            time.sleep(BLOCK_SEC)
+        summary = f"Block {len(summaries) + 1} über {WORDS[first % len(WORDS)]} und {WORDS[last % len(WORDS)]}."
+        print(f"    .. summary= {summary}", flush=True)
+        if args.stream:
+            emit("BLOCK", {"index": len(summaries), "first": first, "last": last, "summary": summary})
+        summaries.append(summary)
+
+    print("  ..generiere Überschrift für jeden Block", flush=True)
+    step = BLOCK_SIZE - BLOCK_SIZE // 2
+    with recorder.stage("generate"):
+        if args.stream:
+            # Blöcke laufen mit, sobald ihre Segmente vorliegen; ohne "end" wurde die Transkription abgebrochen
+            segments, next_start, complete = 0, 0, False
+            for line in sys.stdin:
+                if not line.strip():
+                    continue
+                message = json.loads(line)
+                if message["type"] == "segment":
+                    segments += 1
+                    while next_start + BLOCK_SIZE <= segments:
+                        summarize_block(next_start, next_start + BLOCK_SIZE)
+                        next_start += step
+                elif message["type"] == "end":
+                    complete = True
+                    break
+            if not complete:
+                print("Transkription abgebrochen (kein 'end').", flush=True)
+                sys.exit(1)
+        else:
+            text = sys.stdin.read() if args.stdio else Path(args.file).read_text(encoding="utf-8")
+            segments, next_start = len(SEGMENT_RE.findall(text)), 0
+        while next_start < segments:
+            summarize_block(next_start, min(next_start + BLOCK_SIZE, segments))
+            next_start += step
+
+    with recorder.stage("reduce"):
+        time.sleep(BLOCK_SEC)
+    print("  ..Gesamtzusammenfassung", flush=True)
+    summary = "Gesamtzusammenfassung.\n\n" + "\n".join(f"----------  {s}" for s in summaries)
+    recorder.meta.update(segments=segments, blocks=len(summaries))
+
+    if not (args.stdio or args.stream) or args.save:
+        print("Speichern der Summary", flush=True)
+        Path(f"{base_name}_s.txt").write_text(summary, encoding="utf-8")
+        print(f"Summary erfolgreich gespeichert: {base_name}_s.txt", flush=True)
+    if args.stdio or args.stream:
+        emit("RESULT", {"summary": summary, "filename": f"{base_name}_s.txt"})
+        emit("REPORT", recorder.report())
+
+
+if __name__ == "__main__":
+    if len(sys.argv) < 2 or sys.argv[1] not in ("transcribe", "summarize"):
+        print("Aufruf: python load_stubs.py transcribe|summarize [Argumente wie transcribe.py/summarize.py]")
+        sys.exit(2)
+    {"transcribe": transcribe, "summarize": summarize}[sys.argv[1]](sys.argv[2:])
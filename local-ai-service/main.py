@@ -13,19 +13,26 @@ Start:
 Konfiguration via .env Datei oder Umgebungsvariablen (siehe .env.example).
 """
 
+import asyncio
 import json
 import os
+import queue
 import re
 import subprocess
+import sys
+import threading
 import time
+import urllib.request
 import uuid
+from collections import OrderedDict, deque
+from concurrent.futures import Future, ThreadPoolExecutor
 from datetime import datetime
 from pathlib import Path
-from typing import Optional
+from typing import List, Optional
 
 from dotenv import load_dotenv
-from fastapi import FastAPI, Header, HTTPException, UploadFile, File
-from fastapi.responses import StreamingResponse
+from fastapi import FastAPI, Header, HTTPException, Request, UploadFile, File, WebSocket, WebSocketDisconnect
+from fastapi.responses import Response, StreamingResponse
 from pydantic import BaseModel
 
 # .env laden (falls vorhanden)
@@ -38,8 +45,86 @@ AUDIO_DIR = os.environ.get('AUDIO_DIR', r'D:\Projekte_KI\pyenv_1_transcode_durch
 WSL_AUDIO_DIR = os.environ.get('WSL_AUDIO_DIR', '/mnt/d/Projekte_KI/pyenv_1_transcode_durchgabe/audio')
 PYTHON_TRANSCRIBE = os.environ.get('PYTHON_TRANSCRIBE', '/home/tom/transcribe.py')
 PYTHON_SUMMARIZE = os.environ.get('PYTHON_SUMMARIZE', '/home/tom/summarize.py')
+PYTHON_TRANSCRIBE_LIVE = os.environ.get('PYTHON_TRANSCRIBE_LIVE', '/home/tom/transcribe_live.py')
 VENV_ACTIVATE = os.environ.get('VENV_ACTIVATE', '~/pyenv_1_transcode_durchgabe/bin/activate')
 API_KEY = os.environ.get('LOCAL_SERVICE_API_KEY', '')  # Leer = kein Auth
+# Verzeichnis mit den gemeinsamen Python-Modulen (transcript_store.py etc.)
+BASE_DATA_DIR = os.environ.get('BASE_DATA_DIR', str(Path(__file__).resolve().parent.parent / 'base-data'))
+TRANSCRIPT_CACHE_SIZE = int(os.environ.get('TRANSCRIPT_CACHE_SIZE', '32'))  # Anzahl geparster Transkripte im Speicher
+
+# Volltext-Suche: Index-Datei und minimaler Abstand zwischen zwei Verzeichnis-Abgleichen
+SEARCH_INDEX_PATH = os.environ.get('SEARCH_INDEX_PATH', str(Path(__file__).resolve().parent / 'search_index.pkl'))
+SEARCH_REFRESH_INTERVAL = int(os.environ.get('SEARCH_REFRESH_INTERVAL', '60'))  # Sekunden zwischen Abgleichen im Hintergrund
+STREAM_PREFIX = "@@"  # Präfix der maschinenlesbaren Zeilen von transcribe.py/summarize.py im --stream-Modus
+RANGE_RE = re.compile(r'^[\d:.]+-[\d:.]+$')  # Zeitbereich für /transcribe ranges, z. B. "01:02:30-01:03:00" oder "90-120"
+# Übergabe an die WSL-Skripte: "memory" = Uploads/Transkriptionen per stdin/stdout (keine Temp-Dateien auf /mnt/d),
+# "file" = bisheriges Verhalten mit _temp-Dateien im Audio-Verzeichnis
+HANDOFF_MODE = os.environ.get('HANDOFF_MODE', 'memory').lower()
+MAX_MEMORY_UPLOAD_MB = int(os.environ.get('MAX_MEMORY_UPLOAD_MB', '300'))  # Größere Uploads gehen auf die Platte
+STAGED_UPLOADS_MAX_MB = int(os.environ.get('STAGED_UPLOADS_MAX_MB', '1024'))  # Alle Uploads im Speicher zusammen
+STAGED_UPLOAD_MAX_AGE_MIN = float(os.environ.get('STAGED_UPLOAD_MAX_AGE_MIN', '60'))  # Danach als _temp-Datei ausgelagert
+RUN_REPORT_HISTORY = int(os.environ.get('RUN_REPORT_HISTORY', '50'))  # Anzahl Run-Reports (Speicher/Zeit je Stufe) im Speicher
+# Live-Transkription (/live): jede Sitzung lädt ein eigenes large-v3 (~3 GB VRAM) → Anzahl gleichzeitiger Sitzungen begrenzen
+LIVE_MAX_SESSIONS = int(os.environ.get('LIVE_MAX_SESSIONS', '1'))
+LIVE_FORMATS = ("pcm", "opus", "webm", "ogg", "mp3")  # pcm = s16le 16 kHz mono, Rest dekodiert ffmpeg in WSL
+
+# Mehrere PCs: "worker" = normale Instanz (Default), "coordinator" = verteilt Aufträge auf die Worker (coordinator.py)
+SERVICE_ROLE = os.environ.get('SERVICE_ROLE', 'worker').lower()
+WORKERS = [url.strip() for url in os.environ.get('WORKERS', '').split(',') if url.strip()]  # Statische Worker-URLs
+COORDINATOR_HEALTH_INTERVAL = int(os.environ.get('COORDINATOR_HEALTH_INTERVAL', '15'))  # Sekunden
+COORDINATOR_MAX_ATTEMPTS = int(os.environ.get('COORDINATOR_MAX_ATTEMPTS', '3'))  # Versuche je Auftrag (Worker-Ausfall)
+# Worker: beim Koordinator anmelden (WORKER_URL = eigene, vom Koordinator erreichbare Adresse)
+COORDINATOR_URL = os.environ.get('COORDINATOR_URL', '')
+WORKER_URL = os.environ.get('WORKER_URL', '')
+WORKER_DEVICE = os.environ.get('WORKER_DEVICE', 'cuda')
+# Restzeit-Vorhersage aus der Messhistorie (eta.py) und Zulassung nach deadlineSeconds
+ETA_HISTORY_PATH = os.environ.get('ETA_HISTORY_PATH', str(Path(__file__).resolve().parent / 'eta_history.json'))
+ETA_HISTORY_SIZE = int(os.environ.get('ETA_HISTORY_SIZE', '50'))  # Messungen je Kennzahl (Median)
+ETA_DEADLINE_MARGIN = float(os.environ.get('ETA_DEADLINE_MARGIN', '1.2'))  # Sicherheitsfaktor bei der Deadline-Prüfung
+ETA_TRANSCRIBE_MODEL = os.environ.get('ETA_TRANSCRIBE_MODEL') or None  # MODEL_DESC aus transcribe.py; leer = zuletzt gemessenes Modell
+# Speicherverwaltung des Audio-Verzeichnisses (storage.py): Ledger der vom Service angelegten Dateien, Aufräumen
+# verwaister Temp-Dateien, LRU-Verdrängung unter Kontingent und Mindest-Freiplatz auf dem Datenträger
+STORAGE_LEDGER_PATH = os.environ.get('STORAGE_LEDGER_PATH', str(Path(__file__).resolve().parent / 'storage_ledger.json'))
+STORAGE_QUOTA_MB = float(os.environ.get('STORAGE_QUOTA_MB', '0'))  # 0 = kein Kontingent für das Audio-Verzeichnis
+STORAGE_MIN_FREE_MB = float(os.environ.get('STORAGE_MIN_FREE_MB', '2048'))  # Freier Platz, der nie unterschritten wird
+STORAGE_JOB_RESERVE_MB = float(os.environ.get('STORAGE_JOB_RESERVE_MB', '100'))  # Je Auftrag (Transkript, Reports)
+STORAGE_TEMP_MAX_AGE_HOURS = float(os.environ.get('STORAGE_TEMP_MAX_AGE_HOURS', '6'))  # Danach gilt eine Temp-Datei als verwaist
+STORAGE_GC_INTERVAL = int(os.environ.get('STORAGE_GC_INTERVAL', '600'))  # Sekunden
+STORAGE_EVICT_RESULTS = os.environ.get('STORAGE_EVICT_RESULTS', '0') == '1'  # Auch Transkripte/Summaries verdrängen
+# Modell-Host (base-data/model_host.py): ein langlebiger WSL-Prozess führt transcribe.py/summarize.py aus und hält
+# large-v3 und Llama im VRAM-Budget geladen bzw. in den RAM ausgelagert, statt sie je Auftrag neu zu laden
+MODEL_HOST = os.environ.get('MODEL_HOST', '0') == '1'
+PYTHON_MODEL_HOST = os.environ.get('PYTHON_MODEL_HOST', '/home/tom/model_host.py')
+MODEL_HOST_ARGS = os.environ.get('MODEL_HOST_ARGS', '')  # z. B. "--budget-mb 10000 --idle-offload 600"
+WORKER_CAPABILITIES = [c.strip() for c in os.environ.get('WORKER_CAPABILITIES', 'transcribe,summarize,process,live').split(',')
+                       if c.strip()]
+# Tracing (base-data/tracing.py, traces.py): Spans je Auftrag über main.py und die WSL-Skripte (X-Trace-Id)
+TRACE_LOG_PATH = os.environ.get('TRACE_LOG_PATH', str(Path(__file__).resolve().parent / 'traces.jsonl'))  # Leer = keine Datei
+TRACE_LOG_MAX_MB = float(os.environ.get('TRACE_LOG_MAX_MB', '50'))  # Danach wird nach <datei>.1 rotiert
+TRACE_COLLECTOR_URL = os.environ.get('TRACE_COLLECTOR_URL', '')  # Optional: Spans gebündelt per POST an einen Collector
+TRACE_HISTORY = int(os.environ.get('TRACE_HISTORY', '100'))  # Anzahl Traces im Speicher (GET /traces)
+# Akustische Duplikate (fingerprint.py): Transkript einer neu kodierten/gekürzten Fassung übernehmen statt neu transkribieren
+FINGERPRINT_ENABLED = os.environ.get('FINGERPRINT_ENABLED', '1') == '1'  # Benötigt numpy und ffmpeg im PATH
+# Ergebnis-Ablage (results.py): Transkripte/Summaries unter GET /results/{id} statt nur im 'complete'-Event
+RESULT_DIR = os.environ.get('RESULT_DIR', str(Path(__file__).resolve().parent / 'results'))
+RESULT_HISTORY = int(os.environ.get('RESULT_HISTORY', '200'))  # Anzahl abgelegter Ergebnisse
+RESULT_MAX_AGE_HOURS = float(os.environ.get('RESULT_MAX_AGE_HOURS', '24'))  # Danach wird ein Ergebnis gelöscht
+RESULT_INLINE_MAX_KB = float(os.environ.get('RESULT_INLINE_MAX_KB', '0'))  # Größere Texte nicht mehr inline (0 = immer inline)
+RESULT_PAGE_MAX = 1000  # Höchstens so viele Segmente je Seite (GET /results/{id}?first=&limit=)
+FINGERPRINT_INDEX_PATH = os.environ.get('FINGERPRINT_INDEX_PATH', str(Path(__file__).resolve().parent / 'fingerprint_index.pkl'))
+
+sys.path.insert(0, BASE_DATA_DIR)
+from transcript_store import TranscriptStore, parse_timestamp, segment_text  # noqa: E402
+from search_index import SearchIndex  # noqa: E402
+from instrumentation import report_path  # noqa: E402
+from profiling import profile_paths  # noqa: E402
+from coordinator import WorkerPool  # noqa: E402
+from eta import EtaModel, deadline_verdict, probe_duration  # noqa: E402
+from storage import StagedUploads, StorageManager  # noqa: E402
+from tracing import Tracer, new_span_id, new_trace_id, valid_trace_id  # noqa: E402
+from traces import TraceExporter, timeline  # noqa: E402
+from fingerprint import FingerprintIndex  # noqa: E402
+from results import ResultStore, accepted_encoding, parse_byte_range  # noqa: E402
 
 app = FastAPI(
     title="MP3 Transcriber Local AI Service",
@@ -48,6 +133,90 @@ app = FastAPI(
 )
 
 
+search_index = SearchIndex(AUDIO_DIR, SEARCH_INDEX_PATH)
+eta_model = EtaModel(ETA_HISTORY_PATH, ETA_HISTORY_SIZE, WORKER_DEVICE)
+storage = StorageManager(AUDIO_DIR, STORAGE_LEDGER_PATH, STORAGE_QUOTA_MB, STORAGE_MIN_FREE_MB,
+                         STORAGE_TEMP_MAX_AGE_HOURS * 3600, STORAGE_EVICT_RESULTS)
+trace_exporter = TraceExporter(TRACE_LOG_PATH, TRACE_COLLECTOR_URL, TRACE_HISTORY, TRACE_LOG_MAX_MB)
+result_store = ResultStore(RESULT_DIR, RESULT_HISTORY, RESULT_MAX_AGE_HOURS * 3600)
+fingerprint_index = FingerprintIndex(AUDIO_DIR, FINGERPRINT_INDEX_PATH, FINGERPRINT_ENABLED)
+
+
+_model_host = None  # Popen des Modell-Hosts (MODEL_HOST=1)
+
+
+worker_pool = WorkerPool(API_KEY, COORDINATOR_HEALTH_INTERVAL, max_attempts=COORDINATOR_MAX_ATTEMPTS) \
+    if SERVICE_ROLE == 'coordinator' else None
+
+
+@app.on_event("startup")
+def build_search_index():
+    """Index im Hintergrund mit dem Audio-Verzeichnis abgleichen – beim Start und danach alle SEARCH_REFRESH_INTERVAL s"""
+    threading.Thread(target=search_index.run, args=(SEARCH_REFRESH_INTERVAL,), daemon=True).start()
+
+
+@app.on_event("startup")
+def build_fingerprint_index():
+    """Fingerabdrücke der MP3s mit Transkript im Hintergrund nachtragen (beim ersten Start einmal alle, danach nur neue)"""
+    threading.Thread(target=fingerprint_index.refresh, daemon=True).start()
+
+
+@app.on_event("startup")
+def start_storage_gc():
+    """Verwaiste Temp-Dateien (auch aus der Zeit vor dem Neustart) und Kontingent regelmäßig im Hintergrund prüfen"""
+    threading.Thread(target=storage.run, args=(STORAGE_GC_INTERVAL, staged_uploads), daemon=True).start()
+
+
+@app.on_event("startup")
+def start_coordination():
+    """Koordinator: statische Worker eintragen und Zustandsabfrage starten; Worker: beim Koordinator anmelden"""
+    if worker_pool is not None:
+        for url in WORKERS:
+            worker_pool.register(url)
+        worker_pool.start()
+        print(f"[LOCAL-SERVICE] Koordinator-Modus mit {len(WORKERS)} statischen Worker(n)")
+    elif COORDINATOR_URL and WORKER_URL:
+        threading.Thread(target=_register_at_coordinator, daemon=True).start()
+
+
+@app.on_event("startup")
+def start_model_host():
+    """MODEL_HOST=1: Modell-Host in WSL starten (läuft er schon, beendet sich der neue mangels freiem Port)"""
+    global _model_host
+    if MODEL_HOST and worker_pool is None:
+        _model_host = subprocess.Popen(['wsl', 'bash', '-c',
+                                        f"cd {WSL_AUDIO_DIR} && source {VENV_ACTIVATE} && "
+                                        f"exec python {PYTHON_MODEL_HOST} serve {MODEL_HOST_ARGS}"])
+        print(f"[LOCAL-SERVICE] Modell-Host gestartet: {PYTHON_MODEL_HOST} {MODEL_HOST_ARGS}")
+
+
+@app.on_event("shutdown")
+def stop_model_host():
+    if _model_host is not None and _model_host.poll() is None:
+        _model_host.terminate()
+
+
+def wsl_python(script: str) -> str:
+    """Aufruf eines WSL-Skripts – mit MODEL_HOST über den Modell-Host (ohne laufenden Host läuft das Skript direkt)"""
+    return f"python {PYTHON_MODEL_HOST} run {script}" if MODEL_HOST else f"python {script}"
+
+
+def _register_at_coordinator(attempts: int = 10, delay: float = 5):
+    """Meldet diese Instanz beim Koordinator an (wiederholt, falls der Koordinator noch startet)"""
+    payload = json.dumps({"url": WORKER_URL, "device": WORKER_DEVICE, "capabilities": WORKER_CAPABILITIES,
+                          "throughput": measured_throughput()}).encode('utf-8')
+    for _ in range(attempts):
+        request = urllib.request.Request(f"{COORDINATOR_URL.rstrip('/')}/workers/register", data=payload, method="POST",
+                                         headers={"Content-Type": "application/json", "X-API-Key": API_KEY})
+        try:
+            urllib.request.urlopen(request, timeout=10).close()
+            print(f"[LOCAL-SERVICE] ✅ Beim Koordinator angemeldet: {COORDINATOR_URL}")
+            return
+        except OSError as e:
+            print(f"[LOCAL-SERVICE] ⚠️ Anmeldung beim Koordinator fehlgeschlagen: {e}")
+            time.sleep(delay)
+
+
 # ============================================================================
 # API-Key Authentifizierung
 # ============================================================================
@@ -70,6 +239,58 @@ def sse_event(data: dict) -> str:
     return f"data: {json.dumps(data, ensure_ascii=False)}\n\n"
 
 
+def transcribe_progress(clean: str) -> int:
+    """Grobe Fortschritts-Schätzung (0–100) anhand der Ausgabe von transcribe.py"""
+    if 'Lade Modell' in clean:              return 30
+    elif 'Modell geladen' in clean:         return 50
+    elif 'Transkription der mp3' in clean:  return 60
+    elif 'Transkription beendet' in clean:  return 90
+    elif 'erfolgreich gespeichert' in clean: return 95
+    return 20
+
+
+def summarize_progress(clean: str) -> int:
+    """Grobe Fortschritts-Schätzung (0–100) anhand der Ausgabe von summarize.py"""
+    lower = clean.lower()
+    if 'lade summarizer' in lower:          return 30
+    elif 'lade tokenizer' in lower:          return 40
+    elif 'teile transkription' in lower:     return 50
+    elif 'generiere überschrift' in lower:   return 60
+    elif 'summary=' in lower:                return 70
+    elif 'gesamtzusammenfassung' in lower:   return 80
+    elif 'speichern der summary' in lower:   return 90
+    elif 'erfolgreich gespeichert' in lower: return 95
+    return 20
+
+
+def parse_stream_message(line: str):
+    """Wertet maschinenlesbare Skript-Zeilen aus ('@@SEGMENT {...}' → ('SEGMENT', {...})), sonst None"""
+    if not line.startswith(STREAM_PREFIX):
+        return None
+    kind, _, payload = line[len(STREAM_PREFIX):].partition(' ')
+    try:
+        return kind, json.loads(payload) if payload else {}
+    except json.JSONDecodeError:
+        return None
+
+
+def draft_event(payload: dict, **extra) -> dict:
+    """@@DRAFT (Entwurfs-Segment des kleinen Modells) → SSE-Event 'draft'"""
+    return {"type": "draft", **extra, "index": payload.get("index"), "start": payload.get("start"),
+            "end": payload.get("end"), "text": segment_text(payload.get("raw", ""))}
+
+
+def replace_event(payload: dict, **extra) -> dict:
+    """@@REFINE (large-v3 ersetzt Entwurfs-Segmente first..last-1) → SSE-Event 'replace'"""
+    return {
+        "type": "replace", **extra,
+        "first": payload.get("first"), "last": payload.get("last"),
+        "start": payload.get("start"), "end": payload.get("end"), "changed": payload.get("changed"),
+        "segments": [{"start": seg.get("start"), "end": seg.get("end"), "text": segment_text(seg.get("raw", ""))}
+                     for seg in payload.get("segments", [])]
+    }
+
+
 def format_file_size(size_bytes: int) -> str:
     """Formatiert Dateigröße lesbar"""
     if size_bytes == 0:
@@ -87,17 +308,402 @@ def format_date(timestamp: float) -> str:
     return d.strftime("%d.%m.%Y %H:%M")
 
 
+# Geparste Transkripte (LRU, Schlüssel: Pfad + mtime) – Seeking-Anfragen des Audio-Players
+# sollen nicht bei jedem Aufruf die ganze Datei neu parsen
+_transcript_cache: "OrderedDict[tuple, TranscriptStore]" = OrderedDict()
+
+
+def get_transcript_store(filename: str) -> TranscriptStore:
+    """Liefert den (gecachten) TranscriptStore für eine TXT-Datei im Audio-Verzeichnis"""
+    txt_path = os.path.join(AUDIO_DIR, os.path.basename(filename))
+    if not txt_path.lower().endswith('.txt') or not os.path.isfile(txt_path):
+        raise HTTPException(status_code=404, detail=f"TXT-Datei nicht gefunden: {filename}")
+    storage.touch(txt_path)
+
+    key = (txt_path, os.stat(txt_path).st_mtime)
+    store = _transcript_cache.get(key)
+    if store is not None:
+        _transcript_cache.move_to_end(key)
+        return store
+
+    store = TranscriptStore.open(txt_path)
+    _transcript_cache[key] = store
+    while len(_transcript_cache) > TRANSCRIPT_CACHE_SIZE:
+        _transcript_cache.popitem(last=False)[1].close()
+    return store
+
+
+def spill_staged_upload(filename: str, data: bytes):
+    """Zu lange nicht abgeholten Upload aus dem Speicher als _temp-Datei ablegen (wird dort wie verwaist behandelt)"""
+    try:
+        if storage.ensure_space(len(data)):
+            with open(os.path.join(AUDIO_DIR, filename), 'wb') as f:
+                f.write(data)
+            storage.track(filename)
+            return
+    except OSError as e:
+        print(f"[LOCAL-SERVICE] ⚠️ Upload {filename} konnte nicht ausgelagert werden: {e}")
+    print(f"[LOCAL-SERVICE] ⚠️ Kein Platz zum Auslagern – Upload {filename} verworfen")
+
+
+# Hochgeladene Dateien im Speicher (HANDOFF_MODE=memory), bis /transcribe bzw. /process sie abholt
+staged_uploads = StagedUploads(STAGED_UPLOADS_MAX_MB * 1024 * 1024, STAGED_UPLOAD_MAX_AGE_MIN * 60, spill_staged_upload)
+
+
+def _write_stdin(process: subprocess.Popen, data):
+    """Schreibt Eingabedaten (bytes oder str) in einem eigenen Thread nach stdin und schließt den Stream"""
+    try:
+        if isinstance(data, bytes):
+            process.stdin.buffer.write(data)
+        else:
+            process.stdin.write(data)
+        process.stdin.close()
+    except (BrokenPipeError, OSError):
+        pass
+
+
+# Letzte Run-Reports der Skripte (@@REPORT) – Grundlage für Host-Dimensionierung und Speicher-Regressionen
+_run_reports: "deque[dict]" = deque(maxlen=RUN_REPORT_HISTORY)
+
+
+def record_run_report(report: dict, job: str) -> dict:
+    """Merkt sich einen Run-Report von transcribe.py/summarize.py (job = Endpunkt) und gibt ihn zurück"""
+    report = {**report, "job": job, "receivedAt": datetime.now().isoformat(timespec="seconds")}
+    _run_reports.append(report)
+    eta_model.observe(report)
+    return report
+
+
+# Laufende Aufträge dieser Instanz (für /health → Lastverteilung durch den Koordinator)
+_active_jobs = 0
+_active_lock = threading.Lock()
+
+
+def tracked_job(events, hold=(), cleanup=()):
+    """
+    Zählt einen SSE-Auftrag als laufend, bis sein Generator endet (auch bei Client-Abbruch).
+    hold = Dateien, die solange vor Aufräumen und Verdrängung geschützt sind; cleanup = Temp-Dateien, die danach
+    in jedem Fall gelöscht werden – auch nach Fehlern und Abbrüchen, nicht nur am Ende eines erfolgreichen Laufs.
+    """
+    global _active_jobs
+    with _active_lock:
+        _active_jobs += 1
+    try:
+        with storage.using(*hold):
+            yield from events
+    finally:
+        with _active_lock:
+            _active_jobs -= 1
+        for path in cleanup:
+            if os.path.isfile(path):
+                remove_result_file(path)
+                print(f"[LOCAL-SERVICE] ✓ Temp-Datei gelöscht: {path}")
+
+
+def ensure_storage(extra_bytes: int = 0):
+    """507, wenn im Audio-Verzeichnis auch nach LRU-Verdrängung kein Platz für extra_bytes bleibt"""
+    if not storage.ensure_space(extra_bytes):
+        usage = storage.usage()
+        raise HTTPException(status_code=507, detail={
+            "message": "Zu wenig Speicherplatz im Audio-Verzeichnis",
+            "requiredMb": round(extra_bytes / 1024 / 1024, 1), "usedMb": usage["usedMb"], "quotaMb": usage["quotaMb"],
+            "disk": usage["disk"]
+        })
+
+
+def start_trace(x_trace_id: Optional[str]) -> Tracer:
+    """Tracer eines Auftrags: X-Trace-Id des Aufrufers (Node-Backend) übernehmen, sonst neue Trace-ID"""
+    if x_trace_id and not valid_trace_id(x_trace_id):
+        raise HTTPException(status_code=400, detail="Ungültige X-Trace-Id (8–64 Zeichen aus A-Z, a-z, 0-9, _ und -)")
+    return Tracer(x_trace_id or new_trace_id(), "local-service", export=trace_exporter.export)
+
+
+def traced_job(events, tracer: Tracer, name: str, started: float, **attributes):
+    """Root-Span des Auftrags ab Eingang der Anfrage über den ganzen SSE-Strom; 'complete' trägt die traceId"""
+    with tracer.span(name, start=started, **attributes) as job:
+        for event in events:
+            payload = json.loads(event[len("data: "):])
+            if payload.get("type") == "complete":
+                event = sse_event({**payload, "traceId": tracer.trace_id})
+            elif payload.get("type") == "error":
+                job.attributes["error"] = payload.get("message")
+            yield event
+
+
+# Textfelder im 'complete'-Event je Endpunkt → Art des Ergebnisses (results.*)
+TRANSCRIBE_RESULTS = {"transcription": "transcript"}
+SUMMARIZE_RESULTS = {"transcription": "summary"}  # /summarize liefert die Summary (Node-kompatibel) unter 'transcription'
+PROCESS_RESULTS = {"transcription": "transcript", "summary": "summary"}
+
+
+def result_job(events, fields: dict, inline: Optional[bool] = None):
+    """
+    Texte aus 'complete' in der Ergebnis-Ablage speichern: results.<feld> = {id, url, bytes, segments, etag}.
+    Inline bleibt der Text nur bei inline=True bzw. ohne Angabe bis RESULT_INLINE_MAX_KB (0 = immer).
+    """
+    for event in events:
+        payload = json.loads(event[len("data: "):])
+        if payload.get("type") == "complete":
+            results = {}
+            for field, kind in fields.items():
+                text = payload.get(field)
+                if not isinstance(text, str):
+                    continue
+                entry = result_store.put(text, kind, payload.get("summaryFilename" if field == "summary" else "filename"))
+                results[field] = {"id": entry["id"], "url": f"/results/{entry['id']}", "bytes": entry["bytes"],
+                                  "segments": entry["segments"], "etag": entry["etag"]}
+                keep = inline if inline is not None else \
+                    (not RESULT_INLINE_MAX_KB or entry["bytes"] <= RESULT_INLINE_MAX_KB * 1024)
+                if not keep:
+                    del payload[field]
+            event = sse_event({**payload, "results": results})
+        yield event
+
+
+def subprocess_trace(tracer: Tracer, script: str) -> dict:
+    """Span 'subprocess' eines Skript-Aufrufs vorbereiten; flags = --trace-id/--trace-parent für die Kommandozeile"""
+    span_id = new_span_id()
+    return {"tracer": tracer, "id": span_id, "script": script, "started": time.time(),
+            "flags": f"--trace-id {tracer.trace_id} --trace-parent {span_id} "}
+
+
+def collect_span(trace: dict, span: dict):
+    """@@SPAN eines Skripts exportieren; zu 'import' die Span 'spawn' (Popen bis Prozessstart: WSL, bash, venv) ergänzen"""
+    trace_exporter.export(span)
+    if span.get("name") == "import" and span.get("parentId") == trace["id"]:
+        trace["tracer"].record("spawn", trace["started"], max(trace["started"], span["start"]), parent_id=trace["id"])
+
+
+def finish_subprocess_trace(trace: dict, exit_code: int):
+    trace["tracer"].record("subprocess", trace["started"], time.time(), span_id=trace["id"],
+                           script=trace["script"], exitCode=exit_code)
+
+
+def admit_job(job: str, prediction: tuple, deadline: Optional[float]):
+    """
+    Restzeit-Vorhersage für einen neuen Auftrag anlegen – oder ablehnen, wenn er deadlineSeconds verfehlen würde:
+    422 = auch ohne Warteschlange zu langsam, 503 + Retry-After = erst nach den laufenden Aufträgen machbar
+    """
+    ensure_storage(int(STORAGE_JOB_RESERVE_MB * 1024 * 1024))
+    queue_seconds = eta_model.queue_seconds()
+    if deadline is not None:
+        verdict = deadline_verdict(prediction[0], queue_seconds, deadline, ETA_DEADLINE_MARGIN)
+        detail = {"message": "", "predictedSeconds": round(prediction[0], 1), "queueSeconds": round(queue_seconds, 1),
+                  "deadlineSeconds": deadline}
+        if verdict == "reject":
+            detail["message"] = "Deadline nicht einhaltbar: Vorhersage liegt auch ohne Warteschlange darüber"
+            raise HTTPException(status_code=422, detail=detail)
+        if verdict == "defer":
+            detail["message"] = "Deadline wegen laufender Aufträge nicht einhaltbar – später erneut einreichen"
+            raise HTTPException(status_code=503, detail=detail, headers={"Retry-After": str(int(queue_seconds) + 1)})
+    return eta_model.start(job, prediction, queue_seconds)
+
+
+def eta_job(events, estimate):
+    """Kündigt die Vorhersage als 'eta'-Event an, ergänzt progress/complete-Events um die Restzeit, meldet am Ende ab"""
+    try:
+        yield sse_event({"type": "eta", **estimate.to_dict()})
+        for event in events:
+            payload = json.loads(event[len("data: "):])
+            if payload.get("type") == "progress":
+                event = sse_event({**payload, **estimate.fields()})
+            elif payload.get("type") == "complete":
+                event = sse_event({**payload, "eta": {"predictedSeconds": round(estimate.predicted, 1),
+                                                      "queueSeconds": round(estimate.queue, 1)}})
+            yield event
+    finally:
+        eta_model.finish(estimate)
+
+
+def measured_throughput() -> Optional[float]:
+    """Audio-Sekunden je Sekunde Laufzeit aus den Transkriptions-Run-Reports (None = noch keine Messung)"""
+    audio = wall = 0.0
+    for report in list(_run_reports):
+        if report.get("script") != "transcribe" or not report.get("meta", {}).get("mp3Duration"):
+            continue
+        if report["meta"].get("ranges"):
+            continue  # Teil-Transkriptionen: mp3Duration ist nicht das dekodierte Audio
+        audio += report["meta"]["mp3Duration"]
+        wall += report.get("total", {}).get("wallSeconds") or 0
+    return round(audio / wall, 2) if wall else None
+
+
+def remove_result_file(path: str):
+    """Löscht eine (Temp-)Ergebnisdatei samt Run-Report und Profil-Dateien der Skripte"""
+    for candidate in (path, report_path(path), *profile_paths(path)):
+        if os.path.isfile(candidate):
+            os.unlink(candidate)
+        storage.forget(candidate)
+
+
+def index_result_file(filename: str):
+    """Neu erzeugte Transkripte/Summaries sofort in den Suchindex aufnehmen und samt Run-Report/Profil im Ledger eintragen"""
+    storage.track(filename, report_path(filename), *profile_paths(filename))
+
+    def update_search_index():
+        # Im Hintergrund: läuft gerade ein Abgleich, wartet nur dieser Thread auf ihn, nicht die Antwort
+        try:
+            search_index.update_file(filename)
+            search_index.save()
+        except Exception as e:
+            print(f"[LOCAL-SERVICE] ⚠️ Suchindex-Update fehlgeschlagen für {filename}: {e}")
+    threading.Thread(target=update_search_index, daemon=True).start()
+    # Neues Transkript zu einer MP3 → deren Fingerabdruck steht künftigen Duplikaten zur Verfügung
+    stem = Path(filename).stem
+    if fingerprint_index.available and not stem.endswith("_s") and os.path.isfile(os.path.join(AUDIO_DIR, f"{stem}.mp3")):
+        def fingerprint_mp3():
+            if fingerprint_index.update_file(f"{stem}.mp3"):
+                fingerprint_index.save()
+        threading.Thread(target=fingerprint_mp3, daemon=True).start()
+
+
+# Beim Upload erkannte Duplikate (Dateiname → Treffer, None oder Future, solange der Fingerabdruck noch läuft),
+# bis /transcribe sie abholt
+_upload_duplicates: "OrderedDict[str, Optional[dict]]" = OrderedDict()
+_duplicates_lock = threading.Lock()
+UPLOAD_DUPLICATE_HISTORY = 64
+UPLOAD_FINGERPRINT_WORKERS = 2  # Gleichzeitige Fingerabdrücke von Uploads (ffmpeg + FFT)
+_fingerprint_pool = ThreadPoolExecutor(max_workers=UPLOAD_FINGERPRINT_WORKERS, thread_name_prefix="fingerprint")
+
+
+def find_duplicate(filename: str, data: bytes = None) -> Optional[dict]:
+    """
+    Aufnahme mit Transkript, die akustisch dieselbe ist wie filename (Upload-Bytes oder Datei im Audio-Verzeichnis),
+    samt Versatz und der Transkriptionszeit, die eine Übernahme spart; None = keine oder Erkennung nicht verfügbar
+    """
+    path = os.path.join(AUDIO_DIR, filename)
+    if not fingerprint_index.available or (data is None and not os.path.isfile(path)):
+        return None
+    fingerprint = fingerprint_index.fingerprint(None if data is not None else path, data)
+    duplicate = fingerprint_index.find_duplicate(fingerprint, exclude=filename)
+    if duplicate:
+        duplicate["savedSeconds"] = round(eta_model.predict_transcribe(duplicate["duration"], ETA_TRANSCRIBE_MODEL, WORKER_DEVICE)[0], 1)
+    return duplicate
+
+
+def reuse_transcript_job(duplicate: dict, display_filename: str, save: bool, tracer: Tracer):
+    """SSE-Strom wie /transcribe – statt des WSL-Laufs das versetzte Transkript eines akustischen Duplikats"""
+    start_time = time.time()
+    yield sse_event({
+        "type": "progress", "step": "duplicate",
+        "message": f"Akustisches Duplikat von {duplicate['filename']} (Versatz {duplicate['offsetSeconds']:+.2f} s, "
+                   f"Ähnlichkeit {duplicate['similarity']:.3f}) – übernehme Transkript",
+        "progress": 10
+    })
+    with tracer.span("reuse", source=duplicate["filename"], offsetSeconds=duplicate["offsetSeconds"]):
+        store = get_transcript_store(duplicate["transcript"])
+        header = (store.header.rstrip("\n") + f"\nQuelle:  {duplicate['transcript']} (akustisches Duplikat, "
+                  f"Versatz {duplicate['offsetSeconds']:+.2f} s, Ähnlichkeit {duplicate['similarity']:.3f})\n\n\n\n")
+        transcription_text = store.shifted(duplicate["offsetSeconds"], duplicate["duration"], header)
+
+    display_base = Path(display_filename).stem
+    if save:
+        with open(os.path.join(AUDIO_DIR, f"{display_base}.txt"), 'w', encoding='utf-8') as f:
+            f.write(transcription_text)
+        with tracer.span("index"):
+            index_result_file(f"{display_base}.txt")
+    fingerprint_index.record_reuse(duplicate["savedSeconds"])
+
+    duration = round(time.time() - start_time, 1)
+    print(f"[LOCAL-SERVICE] ♻️ Transkript von {duplicate['transcript']} übernommen – "
+          f"ca. {duplicate['savedSeconds']}s Transkription gespart")
+    yield sse_event({
+        "type": "complete", "step": "complete",
+        "message": f"Transkript von {duplicate['transcript']} übernommen (ca. {duplicate['savedSeconds']}s gespart)",
+        "progress": 100,
+        "transcription": transcription_text,
+        "filename": f"{display_base}.txt",
+        "mp3Filename": display_filename,
+        "duration": duration,
+        "reused": duplicate,
+        "savedSeconds": duplicate["savedSeconds"],
+        "runReport": None,
+        "profile": None
+    })
+
+
+def remember_upload_duplicate(filename: str, duplicate):
+    with _duplicates_lock:
+        _upload_duplicates[filename] = duplicate
+        _upload_duplicates.move_to_end(filename)
+        while len(_upload_duplicates) > UPLOAD_DUPLICATE_HISTORY:
+            _upload_duplicates.popitem(last=False)
+
+
+def fingerprint_upload(filename: str, data: bytes, tracer: Optional[Tracer]) -> Future:
+    """Duplikat-Suche eines Uploads im Hintergrund – /files/save antwortet, ohne auf ffmpeg und den Abgleich zu warten"""
+    def run():
+        started = time.time()
+        duplicate = find_duplicate(filename, data)
+        remember_upload_duplicate(filename, duplicate)
+        if tracer:
+            tracer.record("upload.fingerprint", started, time.time(), filename=filename,
+                          duplicate=duplicate["filename"] if duplicate else None)
+        if duplicate:
+            print(f"[LOCAL-SERVICE] ♻️ {filename} ist akustisch {duplicate['filename']} "
+                  f"(Versatz {duplicate['offsetSeconds']} s, Ähnlichkeit {duplicate['similarity']})")
+        return duplicate
+
+    future = _fingerprint_pool.submit(run)
+    remember_upload_duplicate(filename, future)
+    return future
+
+
+def upload_duplicate(filename: str, data: bytes = None) -> Optional[dict]:
+    """
+    Treffer aus dem Upload (wartet, falls dessen Fingerabdruck noch läuft), sonst jetzt berechnen
+    (Datei im Audio-Verzeichnis oder Upload vor dem Neustart)
+    """
+    with _duplicates_lock:
+        known = filename in _upload_duplicates
+        duplicate = _upload_duplicates.get(filename)
+    if isinstance(duplicate, Future):
+        try:
+            return duplicate.result()
+        except Exception as e:
+            print(f"[LOCAL-SERVICE] ⚠️ Duplikat-Suche fehlgeschlagen für {filename}: {e}")
+            return None
+    if known:
+        return duplicate
+    return find_duplicate(filename, data)
+
+
 # ============================================================================
 # Pydantic Models
 # ============================================================================
 class TranscribeRequest(BaseModel):
     filename: str
+    profile: bool = False  # --profile: Hotspots je Stufe + Flamegraph-Stacks (langsamer, nur zur Fehlersuche)
+    progressive: bool = False  # Sofort Entwurf (kleines Modell, SSE 'draft'), danach Ersetzung durch large-v3 ('replace')
+    ranges: Optional[List[str]] = None  # ["01:02:30-01:03:00", ...] – nur diese Bereiche neu, im bestehenden Transkript ersetzen
+    deadlineSeconds: Optional[float] = None  # Spätestens fertig nach … Sekunden, sonst 422/503 statt Start
+    reuseDuplicate: bool = False  # Akustisches Duplikat mit Transkript vorhanden → dessen Transkript (versetzt) übernehmen
+    inlineResult: Optional[bool] = None  # Text auch im 'complete'-Event (None = bis RESULT_INLINE_MAX_KB)
 
 
 class SummarizeRequest(BaseModel):
     filename: Optional[str] = None
     transcription: Optional[str] = None
     mp3Filename: Optional[str] = None
+    profile: bool = False
+    deadlineSeconds: Optional[float] = None
+    inlineResult: Optional[bool] = None
+
+
+class WorkerRegistration(BaseModel):
+    url: str
+    device: Optional[str] = None
+    capabilities: Optional[List[str]] = None
+    throughput: Optional[float] = None  # Audio-Sekunden je Sekunde (gemessen aus den Run-Reports des Workers)
+
+
+class ProcessRequest(BaseModel):
+    filename: str
+    mode: Optional[str] = None  # "durchgabe" | "newsletter" – leer = anhand des Dateinamens erkennen
+    profile: bool = False
+    progressive: bool = False
+    deadlineSeconds: Optional[float] = None
+    inlineResult: Optional[bool] = None
 
 
 # ============================================================================
@@ -107,12 +713,19 @@ class SummarizeRequest(BaseModel):
 @app.get("/health")
 def health():
     """Health-Check – wird auch vom Railway-Backend genutzt"""
-    return {
+    status = {
         "status": "ok",
         "audio_dir": AUDIO_DIR,
         "audio_dir_exists": os.path.isdir(AUDIO_DIR),
-        "wsl_available": _check_wsl_available()
+        "role": SERVICE_ROLE,
+        "activeJobs": _active_jobs
     }
+    if worker_pool is not None:
+        status["workers"] = worker_pool.snapshot()
+    else:
+        status.update(wsl_available=_check_wsl_available(), device=WORKER_DEVICE, capabilities=WORKER_CAPABILITIES,
+                      throughput=measured_throughput())
+    return status
 
 
 def _check_wsl_available() -> bool:
@@ -153,6 +766,17 @@ def files_info(x_api_key: Optional[str] = Header(None)):
     }
 
 
+@app.get("/files/has")
+def files_has(filename: str, x_api_key: Optional[str] = Header(None)):
+    """Liegt die Datei schon im Audio-Verzeichnis? (Koordinator überträgt Audio nur bei Bedarf)"""
+    verify_api_key(x_api_key)
+
+    path = os.path.join(AUDIO_DIR, os.path.basename(filename))
+    if not os.path.isfile(path):
+        return {"filename": filename, "exists": False, "size": None}
+    return {"filename": filename, "exists": True, "size": os.path.getsize(path)}
+
+
 @app.get("/files/list")
 def files_list(type: str = "mp3", x_api_key: Optional[str] = Header(None)):
     """Liste lokale MP3 oder TXT Dateien aus dem Audio-Verzeichnis"""
@@ -205,40 +829,439 @@ def files_list(type: str = "mp3", x_api_key: Optional[str] = Header(None)):
 @app.post("/files/save")
 async def files_save(
     file: UploadFile = File(...),
-    x_api_key: Optional[str] = Header(None)
+    persist: bool = False,
+    x_api_key: Optional[str] = Header(None),
+    x_trace_id: Optional[str] = Header(None)
 ):
     """
-    Speichert eine hochgeladene Datei im lokalen Audio-Verzeichnis.
+    Speichert eine hochgeladene Datei für die lokale Transkription.
     Wird vom Railway-Backend verwendet wenn eine Datei für lokale Transkription
     hochgeladen wurde.
+
+    HANDOFF_MODE=memory: Datei bleibt im Speicher und wird /transcribe per stdin übergeben
+    (kein Umweg über /mnt/d). persist=true, zu große Dateien oder volle Ablage (STAGED_UPLOADS_MAX_MB)
+    → _temp-Datei im Audio-Verzeichnis; nicht abgeholte Uploads lagert die Aufräum-Schleife nach
+    STAGED_UPLOAD_MAX_AGE_MIN ebenfalls dorthin aus.
+    Mit X-Trace-Id (dieselbe wie beim folgenden /transcribe) erscheint das Schreiben in der Zeitleiste des Auftrags.
+
+    duplicatePending: der akustische Fingerabdruck läuft im Hintergrund – ob dieselbe Aufnahme (andere Kodierung,
+    gekürzt, umbenannt) schon transkribiert ist, liefert GET /files/duplicate; /transcribe mit reuseDuplicate wartet
+    auf das Ergebnis und übernimmt dann das Transkript.
     """
     verify_api_key(x_api_key)
-
-    if not os.path.isdir(AUDIO_DIR):
-        os.makedirs(AUDIO_DIR, exist_ok=True)
+    tracer = start_trace(x_trace_id) if x_trace_id else None
 
     # Sicherer Dateiname mit _temp Suffix
     safe_name = re.sub(r'[^a-zA-Z0-9._\-]', '_', os.path.basename(file.filename))
     ext = Path(safe_name).suffix
     base = Path(safe_name).stem
     temp_filename = f"{base}_temp{ext}"
-    target_path = os.path.join(AUDIO_DIR, temp_filename)
 
     content = await file.read()
+    size_mb = round(len(content) / 1024 / 1024, 2)
+
+    duplicate_pending = fingerprint_index.available
+    if duplicate_pending:
+        fingerprint_upload(temp_filename, content, tracer)
+
+    if (HANDOFF_MODE == 'memory' and not persist and size_mb <= MAX_MEMORY_UPLOAD_MB
+            and staged_uploads.put(temp_filename, content)):
+        if tracer:
+            tracer.record("upload.stage", time.time(), time.time(), filename=temp_filename, bytes=len(content))
+        print(f"[LOCAL-SERVICE] ✅ Datei im Speicher bereitgestellt: {temp_filename} ({size_mb} MB)")
+        return {
+            "success": True,
+            "filename": temp_filename,
+            "originalFilename": safe_name,
+            "path": None,
+            "inMemory": True,
+            "duplicatePending": duplicate_pending
+        }
+
+    if not os.path.isdir(AUDIO_DIR):
+        os.makedirs(AUDIO_DIR, exist_ok=True)
+
+    write_started = time.time()
+    ensure_storage(len(content))
+    target_path = os.path.join(AUDIO_DIR, temp_filename)
     with open(target_path, 'wb') as f:
         f.write(content)
+    storage.track(temp_filename)
+    if tracer:
+        tracer.record("upload.write", write_started, time.time(), filename=temp_filename, bytes=len(content))
 
-    size_mb = round(len(content) / 1024 / 1024, 2)
     print(f"[LOCAL-SERVICE] ✅ Datei gespeichert: {temp_filename} ({size_mb} MB)")
 
     return {
         "success": True,
         "filename": temp_filename,
         "originalFilename": safe_name,
-        "path": target_path
+        "path": target_path,
+        "inMemory": False,
+        "duplicatePending": duplicate_pending
+    }
+
+
+@app.get("/files/duplicate")
+def files_duplicate(filename: str, x_api_key: Optional[str] = Header(None)):
+    """
+    Akustisches Duplikat einer hochgeladenen oder lokalen MP3: bereits transkribierte Aufnahme, Versatz
+    (offsetSeconds > 0 = diese Fassung beginnt später), Ähnlichkeit, Überdeckung und gesparte Transkriptionszeit.
+    Läuft der Fingerabdruck des Uploads noch, wartet die Anfrage auf ihn.
+    """
+    verify_api_key(x_api_key)
+
+    filename = os.path.basename(filename)
+    staged_audio = staged_uploads.get(filename)
+    if staged_audio is None and not os.path.isfile(os.path.join(AUDIO_DIR, filename)):
+        raise HTTPException(status_code=404, detail=f"MP3-Datei nicht gefunden: {filename}")
+    if not fingerprint_index.available:
+        raise HTTPException(status_code=503, detail="Duplikat-Erkennung nicht verfügbar (numpy/ffmpeg fehlt oder abgeschaltet)")
+    return {"filename": filename, "duplicate": upload_duplicate(filename, staged_audio)}
+
+
+# ============================================================================
+# Endpunkte: Transkript-Segmente (Audio-Player-Seeking)
+# ============================================================================
+
+@app.get("/transcripts/segment")
+def transcript_segment(filename: str, t: str, x_api_key: Optional[str] = Header(None)):
+    """
+    Liefert das Segment, das zum Zeitpunkt t läuft (t in Sekunden oder hh:mm:ss).
+    Binärsuche im gecachten TranscriptStore – O(log n) pro Anfrage.
+    """
+    verify_api_key(x_api_key)
+
+    store = get_transcript_store(filename)
+    try:
+        segment = store.segment_at(t)
+    except ValueError:
+        raise HTTPException(status_code=400, detail=f"Ungültiger Zeitpunkt: {t}")
+    if segment is None:
+        raise HTTPException(status_code=404, detail="Transkript enthält keine Segmente")
+
+    return {"filename": filename, "count": len(store), "segment": segment.to_dict()}
+
+
+@app.get("/transcripts/segments")
+def transcript_segments(filename: str, start: str = "0", end: Optional[str] = None,
+                        x_api_key: Optional[str] = Header(None)):
+    """Liefert alle Segmente, die das Zeitfenster [start, end) überlappen (ohne end: bis zum Ende)"""
+    verify_api_key(x_api_key)
+
+    store = get_transcript_store(filename)
+    try:
+        indices = store.indices_between(start, end) if end is not None else range(max(0, store.index_at(start)), len(store))
+    except ValueError:
+        raise HTTPException(status_code=400, detail="Ungültiges Zeitfenster")
+
+    return {
+        "filename": filename,
+        "count": len(indices),
+        "segments": [store[i].to_dict() for i in indices]
     }
 
 
+# ============================================================================
+# Endpunkt: Volltext-Suche
+# ============================================================================
+
+@app.get("/search")
+def search(q: str, limit: int = 20, snippets: bool = False, x_api_key: Optional[str] = Header(None)):
+    """
+    Volltext-Suche über alle Transkripte (.txt) und Summaries (_s.txt, inkl. Block-Überschriften und
+    Gesamtzusammenfassung). Liefert je Datei die besten Treffer mit [hh:mm:ss]; snippets=true ergänzt den
+    Segment-Text (liest dafür die Trefferdateien – langsamer als die reine Index-Abfrage).
+    Liest nur: abgeglichen wird der Index im Hintergrund (Start, Timer, neue Ergebnisdateien).
+    """
+    verify_api_key(x_api_key)
+
+    if not q.strip():
+        raise HTTPException(status_code=400, detail="Suchbegriff fehlt")
+
+    started = time.perf_counter()
+    results = search_index.search(q, limit=max(1, min(limit, 100)))
+    if snippets:
+        for result in results:
+            store = get_transcript_store(result["filename"])
+            for hit in result["hits"]:
+                if hit["segment"] is not None and hit["segment"] < len(store):
+                    hit["text"] = store.text(hit["segment"])
+
+    return {
+        "query": q,
+        "count": len(results),
+        "results": results,
+        "tookMs": round((time.perf_counter() - started) * 1000, 2),
+        "index": search_index.stats()
+    }
+
+
+# ============================================================================
+# Endpunkte: Run-Reports (Speicher und Zeit je Pipeline-Stufe)
+# ============================================================================
+
+@app.get("/reports")
+def reports(limit: int = 20, x_api_key: Optional[str] = Header(None)):
+    """
+    Letzte Run-Reports (neueste zuerst) plus Spitzenwerte je Skript über alle gemerkten Läufe –
+    zur Dimensionierung von Hosts (RAM/VRAM) und zum Erkennen von Speicher-Regressionen.
+    """
+    verify_api_key(x_api_key)
+
+    recent = list(_run_reports)
+    peaks = {}
+    for report in recent:
+        total = report.get("total", {})
+        peak = peaks.setdefault(report.get("script"), {"runs": 0, "peakRssMb": None, "peakCudaMb": None})
+        peak["runs"] += 1
+        for key in ("peakRssMb", "peakCudaMb"):
+            if total.get(key) is not None:
+                peak[key] = max(peak[key] or 0, total[key])
+
+    return {
+        "count": len(recent),
+        "peaks": peaks,
+        "reports": recent[::-1][:max(1, min(limit, RUN_REPORT_HISTORY))]
+    }
+
+
+@app.get("/eta")
+def eta(job: str = "transcribe", duration: Optional[str] = None, segments: Optional[int] = None,
+        model: Optional[str] = None, device: Optional[str] = None, x_api_key: Optional[str] = Header(None)):
+    """
+    Vorhersage ohne Auftrag (z. B. für das Timeout im Node-Proxy): job = transcribe | process (duration als
+    Sekunden oder hh:mm:ss) bzw. summarize (segments). model/device wählen den Schlüssel der Messhistorie
+    (default: ETA_TRANSCRIBE_MODEL bzw. zuletzt gemessenes Modell, WORKER_DEVICE). Dazu Messhistorie und laufende Aufträge.
+    """
+    verify_api_key(x_api_key)
+
+    if job in ("transcribe", "process"):
+        if duration is None:
+            raise HTTPException(status_code=400, detail="duration erforderlich")
+        audio_seconds = parse_timestamp(duration)
+        predicted, basis = (eta_model.predict_transcribe if job == "transcribe" else eta_model.predict_process)(
+            audio_seconds, model or ETA_TRANSCRIBE_MODEL, device or WORKER_DEVICE)
+    elif job == "summarize":
+        predicted, basis = eta_model.predict_summarize(segments or 0, device or WORKER_DEVICE)
+    else:
+        raise HTTPException(status_code=400, detail=f"Unbekannter Auftrag: {job}")
+    queue_seconds = eta_model.queue_seconds()
+    return {
+        "job": job,
+        "predictedSeconds": round(predicted, 1),
+        "queueSeconds": round(queue_seconds, 1),
+        "etaSeconds": round(predicted + queue_seconds, 1),
+        "basis": basis,
+        **eta_model.snapshot()
+    }
+
+
+@app.get("/storage")
+def storage_usage(x_api_key: Optional[str] = Header(None)):
+    """
+    Belegung des Audio-Verzeichnisses je Dateiart, Kontingent, freier Platz, gehaltene Dateien und Aufräum-Zähler;
+    dazu die Ergebnis-Ablage (GET /results/{id}) und die Uploads im Speicher
+    """
+    verify_api_key(x_api_key)
+    return {**storage.usage(), "results": result_store.stats(), "stagedUploads": staged_uploads.usage()}
+
+
+@app.get("/fingerprints")
+def fingerprints(x_api_key: Optional[str] = Header(None)):
+    """Duplikat-Erkennung: Anzahl Fingerabdrücke, übernommene Transkripte und dadurch gesparte Transkriptionszeit"""
+    verify_api_key(x_api_key)
+    return fingerprint_index.stats()
+
+
+@app.post("/storage/gc")
+def storage_gc(x_api_key: Optional[str] = Header(None)):
+    """Sofort aufräumen: verwaiste Temp-Dateien löschen und Kontingent/Mindest-Freiplatz per LRU herstellen"""
+    verify_api_key(x_api_key)
+
+    removed = storage.collect_orphans()
+    within_limits = storage.ensure_space()
+    return {"removed": removed, "withinLimits": within_limits, **storage.usage()}
+
+
+@app.get("/models")
+def models(x_api_key: Optional[str] = Header(None)):
+    """
+    Residenz-Zähler des Modell-Hosts (MODEL_HOST=1): geladene/ausgelagerte Modelle, VRAM-Belegung und -Budget,
+    wartende Aufträge je Modell, Swaps und Ladezeiten
+    """
+    verify_api_key(x_api_key)
+
+    if not MODEL_HOST:
+        raise HTTPException(status_code=404, detail="Modell-Host nicht aktiviert (MODEL_HOST=1)")
+    try:
+        result = subprocess.run(['wsl', 'bash', '-c',
+                                 f"source {VENV_ACTIVATE} && python {PYTHON_MODEL_HOST} status"],
+                                capture_output=True, timeout=30)
+        if result.returncode == 0:
+            return json.loads(result.stdout.decode('utf-8'))
+        detail = result.stderr.decode('utf-8', errors='replace').strip()
+    except (OSError, ValueError, subprocess.TimeoutExpired) as e:
+        detail = str(e)
+    raise HTTPException(status_code=503, detail=f"Modell-Host nicht erreichbar: {detail}")
+
+
+@app.get("/reports/file")
+def report_file(filename: str, x_api_key: Optional[str] = Header(None)):
+    """Gespeicherter Run-Report zu einer Ergebnisdatei (<name>.txt → <name>_run.json im Audio-Verzeichnis)"""
+    verify_api_key(x_api_key)
+
+    path = report_path(os.path.join(AUDIO_DIR, os.path.basename(filename)))
+    if not os.path.isfile(path):
+        raise HTTPException(status_code=404, detail=f"Kein Run-Report für: {filename}")
+    storage.touch(path)
+    with open(path, 'r', encoding='utf-8') as f:
+        return json.load(f)
+
+
+@app.get("/traces")
+def traces(limit: int = 20, x_api_key: Optional[str] = Header(None)):
+    """Letzte Traces (neueste zuerst): Root-Span, Dauer, Anzahl Spans, Fehler"""
+    verify_api_key(x_api_key)
+    return {"traces": trace_exporter.recent()[:max(1, min(limit, TRACE_HISTORY))],
+            "file": TRACE_LOG_PATH or None, "collector": TRACE_COLLECTOR_URL or None,
+            "droppedSpans": trace_exporter.dropped}
+
+
+@app.get("/traces/{trace_id}")
+def trace_timeline(trace_id: str, x_api_key: Optional[str] = Header(None)):
+    """Zeitleiste eines Auftrags über main.py und die WSL-Skripte (Versatz ab Beginn, Tiefe im Span-Baum)"""
+    verify_api_key(x_api_key)
+    spans = trace_exporter.spans(trace_id) if valid_trace_id(trace_id) else []
+    if not spans:
+        raise HTTPException(status_code=404, detail=f"Kein Trace: {trace_id}")
+    return timeline(spans)
+
+
+# ============================================================================
+# Endpunkte: Ergebnis-Ablage (Transkripte/Summaries aus 'complete'.results)
+# ============================================================================
+
+@app.get("/results/{result_id}")
+def result(result_id: str, request: Request, first: Optional[int] = None, limit: int = 200,
+           x_api_key: Optional[str] = Header(None)):
+    """
+    Abgelegtes Ergebnis (results.<feld>.id aus dem 'complete'-Event).
+
+    Ohne first: Text als text/plain – gzip/zstd nach Accept-Encoding, ETag + If-None-Match (304),
+    Range: bytes=a-b auf den unkomprimierten UTF-8-Bytes (206, unkomprimiert; If-Range wird beachtet).
+    Mit first/limit: Segment-Seite als JSON {total, first, segments, next} (bei first=0 zusätzlich header).
+    """
+    verify_api_key(x_api_key)
+
+    entry = result_store.get(result_id)
+    if entry is None:
+        raise HTTPException(status_code=404, detail=f"Kein Ergebnis: {result_id}")
+
+    if first is not None:
+        if first < 0 or limit < 1:
+            raise HTTPException(status_code=400, detail="first >= 0 und limit >= 1 erwartet")
+        store = result_store.store(result_id)
+        last = min(len(store), first + min(limit, RESULT_PAGE_MAX))
+        page = {"id": result_id, "total": len(store), "first": first,
+                "segments": [store[i].to_dict() for i in range(first, last)],
+                "next": last if last < len(store) else None}
+        if first == 0:
+            page["header"] = store.header
+        return page
+
+    etag = entry["etag"]
+    headers = {"Accept-Ranges": "bytes", "Vary": "Accept-Encoding", "Cache-Control": "private, max-age=86400"}
+    tags = {f'"{etag}"', *(f'"{etag}-{encoding}"' for encoding in entry["encodings"])}
+    if_none_match = request.headers.get("if-none-match")
+    if if_none_match and (if_none_match.strip() == "*" or tags & {tag.strip() for tag in if_none_match.split(",")}):
+        return Response(status_code=304, headers={**headers, "ETag": f'"{etag}"'})
+
+    range_header = request.headers.get("range")
+    if range_header and request.headers.get("if-range", f'"{etag}"') == f'"{etag}"':
+        byte_range = parse_byte_range(range_header, entry["bytes"])
+        if byte_range is None:
+            raise HTTPException(status_code=416, detail="Bereich nicht erfüllbar",
+                                headers={"Content-Range": f"bytes */{entry['bytes']}"})
+        start, end = byte_range
+        with open(result_store.path(result_id), 'rb') as f:
+            f.seek(start)
+            data = f.read(end - start + 1)
+        return Response(data, status_code=206, media_type="text/plain; charset=utf-8",
+                        headers={**headers, "ETag": f'"{etag}"', "Content-Range": f"bytes {start}-{end}/{entry['bytes']}"})
+
+    encoding = accepted_encoding(request.headers.get("accept-encoding"), list(entry["encodings"]))
+    if encoding:
+        headers.update({"Content-Encoding": encoding, "ETag": f'"{etag}-{encoding}"'})
+    else:
+        headers["ETag"] = f'"{etag}"'
+    with open(result_store.path(result_id, encoding), 'rb') as f:
+        data = f.read()
+    return Response(data, media_type="text/plain; charset=utf-8", headers=headers)
+
+
+# ============================================================================
+# Koordinator-Modus (SERVICE_ROLE=coordinator): Worker-Verwaltung und Weiterleitung
+# ============================================================================
+
+@app.post("/workers/register")
+def workers_register(body: WorkerRegistration, x_api_key: Optional[str] = Header(None)):
+    """Worker meldet sich an (COORDINATOR_URL/WORKER_URL in dessen .env) oder aktualisiert seine Angaben"""
+    verify_api_key(x_api_key)
+    if worker_pool is None:
+        raise HTTPException(status_code=409, detail="Instanz läuft nicht als Koordinator (SERVICE_ROLE=coordinator)")
+
+    worker = worker_pool.register(body.url, body.device, body.capabilities, body.throughput)
+    print(f"[LOCAL-SERVICE] ✅ Worker registriert: {worker.url} ({worker.device})")
+    return worker.to_dict()
+
+
+@app.get("/workers")
+def workers_list(x_api_key: Optional[str] = Header(None)):
+    """Registrierte Worker mit Zustand, Last und Durchsatz"""
+    verify_api_key(x_api_key)
+    if worker_pool is None:
+        raise HTTPException(status_code=409, detail="Instanz läuft nicht als Koordinator (SERVICE_ROLE=coordinator)")
+    return {"workers": worker_pool.snapshot()}
+
+
+def coordinator_audio(filename: str) -> tuple:
+    """(Dateiname, Größe, Loader) für WorkerPool.run – bereitgestellter Upload oder Datei im Audio-Verzeichnis"""
+    data = staged_uploads.pop(filename)
+    if data is not None:
+        return filename, len(data), lambda: data
+    path = os.path.join(AUDIO_DIR, filename)
+    if not os.path.isfile(path):
+        raise HTTPException(status_code=404, detail=f"MP3-Datei nicht gefunden: {filename}")
+    return filename, os.path.getsize(path), Path(path).read_bytes
+
+
+def save_coordinated_result(filename: str, text: str):
+    """Ergebnis eines Workers im eigenen Audio-Verzeichnis ablegen (wie bei lokaler Verarbeitung) und indizieren"""
+    with open(os.path.join(AUDIO_DIR, filename), 'w', encoding='utf-8') as f:
+        f.write(text)
+    index_result_file(filename)
+
+
+def coordinated(job: str, path: str, payload: dict, audio: tuple = None, on_complete=None,
+                fields: dict = None) -> StreamingResponse:
+    """
+    Auftrag über den WorkerPool ausführen und die SSE-Events des Workers durchreichen; der Worker liefert den Text
+    immer inline, abgelegt wird er hier (GET /results/{id} beim Koordinator)
+    """
+    inline = payload.get("inlineResult")
+
+    def generate():
+        for event in worker_pool.run(job, path, {**payload, "inlineResult": True}, audio):
+            if event.get("type") == "complete":
+                event.pop("results", None)
+                if on_complete:
+                    on_complete(event)
+            yield sse_event(event)
+
+    return StreamingResponse(tracked_job(result_job(generate(), fields or {}, inline)), media_type="text/event-stream")
+
+
 # ============================================================================
 # Endpunkt: Transkription (SSE Streaming)
 # ============================================================================
@@ -246,7 +1269,8 @@ async def files_save(
 @app.post("/transcribe")
 def transcribe(
     body: TranscribeRequest,
-    x_api_key: Optional[str] = Header(None)
+    x_api_key: Optional[str] = Header(None),
+    x_trace_id: Optional[str] = Header(None)
 ):
     """
     Transkribiert eine lokale MP3-Datei mit WSL2 Python (Faster-Whisper).
@@ -256,21 +1280,85 @@ def transcribe(
     - progress: { type, step, message, progress }
     - warning:  { type, step, message, progress }
     - error:    { type, message, exitCode? }
-    - complete: { type, transcription, filename, mp3Filename, duration }
+    - draft:    { type, index, start, end, text }                      (nur progressive: Entwurf des kleinen Modells)
+    - replace:  { type, first, last, start, end, changed, segments }  (progressive: large-v3 ersetzt Entwurf first..last-1,
+                                                                        ranges: neuer Bereich ersetzt Segmente first..last-1)
+    - complete: { type, transcription?, filename, mp3Filename, duration, results, reused?, savedSeconds? }
+
+    results.transcription = {id, url, bytes, segments, etag}: das Transkript in der Ergebnis-Ablage (GET /results/{id});
+    mit inlineResult=false bzw. über RESULT_INLINE_MAX_KB fehlt 'transcription' im Event.
+
+    Mit reuseDuplicate und einem akustischen Duplikat (siehe /files/save, /files/duplicate) läuft keine Transkription:
+    das Transkript der bekannten Aufnahme wird um den Versatz verschoben übernommen ('complete'.reused/savedSeconds).
+
+    Mit ranges werden nur diese Zeitbereiche neu dekodiert und in das bestehende <name>.txt eingesetzt
+    (first/last beziehen sich auf das Transkript vor dem Lauf); 'complete' enthält das ganze neue Transkript.
+
+    X-Trace-Id (optional, sonst neu vergeben; Antwort-Header und 'complete'.traceId): Spans von main.py und
+    transcribe.py landen unter dieser ID im Trace-Export (GET /traces/{id}).
     """
     verify_api_key(x_api_key)
+    started = time.time()
+    tracer = start_trace(x_trace_id)
 
     filename = body.filename
     mp3_path = os.path.join(AUDIO_DIR, filename)
 
-    if not os.path.isfile(mp3_path):
-        raise HTTPException(status_code=404, detail=f"MP3-Datei nicht gefunden: {filename}")
-
     is_temp_file = bool(re.match(r'^.+_temp\.[^.]+$', filename))
     display_filename = re.sub(r'_temp(\.[^.]+)$', r'\1', filename)
 
+    # Teil-Transkription: Bereiche prüfen (landen in der Shell-Kommandozeile) und bestehendes Transkript voraussetzen
+    range_flags = ""
+    if body.ranges:
+        if body.progressive:
+            raise HTTPException(status_code=400, detail="ranges und progressive schließen sich aus")
+        invalid = [value for value in body.ranges if not RANGE_RE.match(value)]
+        if invalid:
+            raise HTTPException(status_code=400, detail=f"Ungültige Bereiche (erwartet hh:mm:ss-hh:mm:ss): {invalid}")
+        transcript_name = f"{Path(display_filename).stem}.txt"
+        if not os.path.isfile(os.path.join(AUDIO_DIR, transcript_name)):
+            raise HTTPException(status_code=404, detail=f"Kein bestehendes Transkript: {transcript_name}")
+        range_flags = "--stream " + "".join(f"--range {value} " for value in body.ranges) + f"--transcript '{transcript_name}' "
+
+    # Koordinator: Audio bei Bedarf an den Worker übertragen, Transkript hier ablegen
+    # (ranges: der Worker braucht das bestehende Transkript ebenfalls, z. B. über ein gemeinsames Laufwerk)
+    if worker_pool is not None:
+        def store_transcription(event: dict):
+            if not is_temp_file:
+                save_coordinated_result(f"{Path(display_filename).stem}.txt", event.get("transcription", ""))
+        return coordinated("transcribe", "/transcribe", body.dict(), coordinator_audio(filename), store_transcription,
+                           TRANSCRIBE_RESULTS)
+
+    staged_audio = staged_uploads.get(filename)
+    if staged_audio is None and not os.path.isfile(mp3_path):
+        raise HTTPException(status_code=404, detail=f"MP3-Datei nicht gefunden: {filename}")
+
+    # Akustisches Duplikat: bekanntes Transkript versetzt übernehmen – keine GPU-Zeit, keine Vorhersage nötig
+    duplicate = upload_duplicate(filename, staged_audio) if body.reuseDuplicate and not body.ranges else None
+    if duplicate is not None:
+        staged_uploads.pop(filename)
+        events = traced_job(result_job(reuse_transcript_job(duplicate, display_filename, not is_temp_file, tracer),
+                                       TRANSCRIBE_RESULTS, body.inlineResult),
+                            tracer, "transcribe", started, filename=display_filename, reused=duplicate["filename"])
+        return StreamingResponse(tracked_job(events, hold=(filename, duplicate["transcript"]),
+                                             cleanup=(mp3_path,) if is_temp_file else ()),
+                                 media_type="text/event-stream", headers={"X-Trace-Id": tracer.trace_id})
+
+    # Vorhersage (ranges: nur die Bereiche werden dekodiert); ein abgelehnter Upload bleibt für den nächsten Versuch liegen
+    if body.ranges:
+        audio_seconds = sum(parse_timestamp(end) - parse_timestamp(start)
+                            for start, end in (value.split("-", 1) for value in body.ranges))
+    else:
+        audio_seconds = probe_duration(mp3_path, staged_audio)
+    estimate = admit_job("transcribe", eta_model.predict_transcribe(audio_seconds, ETA_TRANSCRIBE_MODEL, WORKER_DEVICE),
+                         body.deadlineSeconds)
+    staged_uploads.pop(filename)
+
     def generate():
         start_time = time.time()
+        result = None
+        run_report = None
+        profile = None
 
         yield sse_event({
             "type": "progress", "step": "init",
@@ -278,10 +1366,15 @@ def transcribe(
             "progress": 0
         })
 
+        # Upload im Speicher → Audio per stdin, Ergebnis per stdout (@@RESULT), keine Dateien
+        stdio_flag = "--stdio " if staged_audio is not None else ""
+        profile_flag = "--profile " if body.profile else ""
+        progressive_flag = "--stream --progressive " if body.progressive else ""
+        trace = subprocess_trace(tracer, "transcribe")
         wsl_cmd = (
             f"cd {WSL_AUDIO_DIR} && "
             f"source {VENV_ACTIVATE} && "
-            f"python {PYTHON_TRANSCRIBE} {filename}"
+            f"{wsl_python(PYTHON_TRANSCRIBE)} {stdio_flag}{profile_flag}{progressive_flag}{range_flags}{trace['flags']}{filename}"
         )
 
         yield sse_event({
@@ -294,89 +1387,123 @@ def transcribe(
 
         process = subprocess.Popen(
             ['wsl', 'bash', '-c', wsl_cmd],
+            stdin=subprocess.PIPE if staged_audio is not None else None,
             stdout=subprocess.PIPE,
             stderr=subprocess.PIPE,
             text=True,
             encoding='utf-8',
             errors='replace'
         )
+        try:
+            if staged_audio is not None:
+                threading.Thread(target=_write_stdin, args=(process, staged_audio), daemon=True).start()
+
+            # stdout live streamen
+            for line in process.stdout:
+                line = line.strip()
+                if not line:
+                    continue
+                message = parse_stream_message(line)
+                if message:
+                    if message[0] == "RESULT":
+                        result = message[1]
+                    elif message[0] == "REPORT":
+                        run_report = record_run_report(message[1], "transcribe")
+                    elif message[0] == "PROFILE":
+                        profile = message[1]
+                    elif message[0] == "DRAFT":
+                        yield sse_event(draft_event(message[1]))
+                    elif message[0] == "REFINE":
+                        yield sse_event(replace_event(message[1]))
+                    elif message[0] == "SPAN":
+                        collect_span(trace, message[1])
+                    continue
+                clean = strip_ansi(line)
+                progress = transcribe_progress(clean)
+                yield sse_event({
+                    "type": "progress", "step": "processing",
+                    "message": clean, "progress": progress
+                })
 
-        # stdout live streamen
-        for line in process.stdout:
-            line = line.strip()
-            if not line:
-                continue
-            clean = strip_ansi(line)
-            progress = 20
-            if 'Lade Modell' in clean:           progress = 30
-            elif 'Modell geladen' in clean:       progress = 50
-            elif 'Transkription der mp3' in clean: progress = 60
-            elif 'Transkription beendet' in clean: progress = 90
-            elif 'erfolgreich gespeichert' in clean: progress = 95
-            yield sse_event({
-                "type": "progress", "step": "processing",
-                "message": clean, "progress": progress
-            })
-
-        stderr_output = process.stderr.read()
-        if stderr_output:
-            for line in stderr_output.split('\n'):
-                if line.strip():
-                    yield sse_event({
-                        "type": "progress", "step": "warning",
-                        "message": strip_ansi(line), "progress": 0
-                    })
+            stderr_output = process.stderr.read()
+            if stderr_output:
+                for line in stderr_output.split('\n'):
+                    if line.strip():
+                        yield sse_event({
+                            "type": "progress", "step": "warning",
+                            "message": strip_ansi(line), "progress": 0
+                        })
+
+            exit_code = process.wait()
+            finish_subprocess_trace(trace, exit_code)
+            duration = round(time.time() - start_time, 1)
+
+            # Temp-MP3 löschen
+            if is_temp_file and os.path.isfile(mp3_path):
+                os.unlink(mp3_path)
+                storage.forget(filename)
+                print(f"[LOCAL-SERVICE] ✓ Temp-MP3 gelöscht: {filename}")
+
+            if exit_code != 0:
+                print(f"[LOCAL-SERVICE] ❌ WSL exit code: {exit_code}")
+                yield sse_event({
+                    "type": "error", "step": "error",
+                    "message": f"Transkription fehlgeschlagen (Exit-Code: {exit_code})",
+                    "exitCode": exit_code
+                })
+                return
 
-        exit_code = process.wait()
-        duration = round(time.time() - start_time, 1)
+            # Ergebnis laden (stdio-Modus: direkt aus @@RESULT, sonst aus der TXT-Datei)
+            # (ranges: das ergänzte Transkript trägt den Anzeigenamen und wird nie als Temp-Datei gelöscht)
+            base_name = Path(display_filename if body.ranges else filename).stem
+            txt_path = os.path.join(AUDIO_DIR, f"{base_name}.txt")
 
-        # Temp-MP3 löschen
-        if is_temp_file and os.path.isfile(mp3_path):
-            os.unlink(mp3_path)
-            print(f"[LOCAL-SERVICE] ✓ Temp-MP3 gelöscht: {filename}")
+            if result is not None:
+                transcription_text = result.get("transcription", "")
+            elif not os.path.isfile(txt_path):
+                yield sse_event({
+                    "type": "error", "step": "error",
+                    "message": "Transkriptionsdatei wurde nicht erstellt"
+                })
+                return
+            else:
+                with open(txt_path, 'r', encoding='utf-8') as f:
+                    transcription_text = f.read()
 
-        if exit_code != 0:
-            print(f"[LOCAL-SERVICE] ❌ WSL exit code: {exit_code}")
-            yield sse_event({
-                "type": "error", "step": "error",
-                "message": f"Transkription fehlgeschlagen (Exit-Code: {exit_code})",
-                "exitCode": exit_code
-            })
-            return
+            # Temp-TXT löschen (samt Run-Report/Profil)
+            if is_temp_file and not body.ranges and os.path.isfile(txt_path):
+                remove_result_file(txt_path)
+                print(f"[LOCAL-SERVICE] ✓ Temp-TXT gelöscht: {txt_path}")
 
-        # Ergebnis laden
-        base_name = Path(filename).stem
-        txt_path = os.path.join(AUDIO_DIR, f"{base_name}.txt")
+            display_base = Path(display_filename).stem
+            if body.ranges or (not is_temp_file and result is None):
+                with tracer.span("index"):
+                    index_result_file(f"{base_name}.txt")
 
-        if not os.path.isfile(txt_path):
+            print(f"[LOCAL-SERVICE] ✅ Transkription abgeschlossen in {duration}s")
             yield sse_event({
-                "type": "error", "step": "error",
-                "message": "Transkriptionsdatei wurde nicht erstellt"
+                "type": "complete", "step": "complete",
+                "message": f"Transkription abgeschlossen in {duration}s",
+                "progress": 100,
+                "transcription": transcription_text,
+                "filename": f"{display_base}.txt",
+                "mp3Filename": display_filename,
+                "duration": duration,
+                "runReport": run_report,
+                "profile": profile
             })
-            return
-
-        with open(txt_path, 'r', encoding='utf-8') as f:
-            transcription_text = f.read()
-
-        # Temp-TXT löschen
-        if is_temp_file and os.path.isfile(txt_path):
-            os.unlink(txt_path)
-            print(f"[LOCAL-SERVICE] ✓ Temp-TXT gelöscht: {txt_path}")
-
-        display_base = Path(display_filename).stem
-
-        print(f"[LOCAL-SERVICE] ✅ Transkription abgeschlossen in {duration}s")
-        yield sse_event({
-            "type": "complete", "step": "complete",
-            "message": f"Transkription abgeschlossen in {duration}s",
-            "progress": 100,
-            "transcription": transcription_text,
-            "filename": f"{display_base}.txt",
-            "mp3Filename": display_filename,
-            "duration": duration
-        })
+        finally:
+            # Client weg oder Fehler: WSL-Prozess nicht weiterlaufen lassen (hält sonst GPU und Temp-Dateien)
+            if process.poll() is None:
+                process.kill()
 
-    return StreamingResponse(generate(), media_type="text/event-stream")
+    # Temp-Upload und dessen Transkript nach dem Lauf immer löschen (auch nach Fehler oder Client-Abbruch)
+    result_name = f"{Path(display_filename if body.ranges else filename).stem}.txt"
+    cleanup = ((mp3_path,) + (() if body.ranges else (os.path.join(AUDIO_DIR, result_name),))) if is_temp_file else ()
+    events = traced_job(result_job(generate(), TRANSCRIBE_RESULTS, body.inlineResult), tracer, "transcribe", started,
+                        filename=display_filename, audioSeconds=audio_seconds)
+    return StreamingResponse(tracked_job(eta_job(events, estimate), hold=(filename, result_name), cleanup=cleanup),
+                             media_type="text/event-stream", headers={"X-Trace-Id": tracer.trace_id})
 
 
 # ============================================================================
@@ -386,36 +1513,80 @@ def transcribe(
 @app.post("/summarize")
 def summarize(
     body: SummarizeRequest,
-    x_api_key: Optional[str] = Header(None)
+    x_api_key: Optional[str] = Header(None),
+    x_trace_id: Optional[str] = Header(None)
 ):
     """
     Erstellt Summary einer lokalen TXT-Datei mit WSL2 Python (Llama).
     Streamt Fortschritt als Server-Sent Events (SSE).
+    X-Trace-Id wie bei /transcribe (Spans von main.py und summarize.py, je Block eine Span).
     """
     verify_api_key(x_api_key)
+    started = time.time()
+    tracer = start_trace(x_trace_id)
+
+    # Koordinator: TXT-Datei als Text an den Worker schicken, Summary hier als <name>_s.txt ablegen
+    if worker_pool is not None:
+        payload = body.dict()
+        summary_filename = None
+        if not (body.transcription and body.transcription.strip()) and body.filename:
+            txt_path = os.path.join(AUDIO_DIR, body.filename)
+            if not os.path.isfile(txt_path):
+                raise HTTPException(status_code=404, detail=f"TXT-Datei nicht gefunden: {body.filename}")
+            payload.update(transcription=Path(txt_path).read_text(encoding='utf-8'), mp3Filename=body.filename)
+            summary_filename = f"{Path(body.filename).stem}_s.txt"
+
+        def store_summary(event: dict):
+            if summary_filename:
+                save_coordinated_result(summary_filename, event.get("transcription", ""))
+                event["filename"] = summary_filename
+        return coordinated("summarize", "/summarize", payload, on_complete=store_summary, fields=SUMMARIZE_RESULTS)
+
+    # Vorhersage aus der Segmentzahl (Blöcke); fehlende Datei meldet generate() wie bisher als error-Event
+    if body.transcription and body.transcription.strip():
+        segments = len(TranscriptStore.from_text(body.transcription))
+    elif body.filename and os.path.isfile(os.path.join(AUDIO_DIR, body.filename)):
+        with TranscriptStore.open(os.path.join(AUDIO_DIR, body.filename)) as store:
+            segments = len(store)
+    else:
+        segments = 0
+    estimate = admit_job("summarize", eta_model.predict_summarize(segments, WORKER_DEVICE), body.deadlineSeconds)
+
+    # Direkte Transkription: Name der Eingabe (file-Modus: Temp-Datei im Audio-Verzeichnis)
+    temp_filename = None
+    if body.transcription and body.transcription.strip():
+        if body.mp3Filename:
+            safe = re.sub(r'[^a-zA-Z0-9._\-]', '_', Path(body.mp3Filename).stem)
+            temp_filename = f"{safe}_temp.txt"
+        else:
+            temp_filename = f"temp_{uuid.uuid4().hex[:8]}_transcription.txt"
 
     def generate():
         start_time = time.time()
         txt_path = None
         temp_file = None
+        stdin_text = None  # HANDOFF_MODE=memory: Transkription per stdin statt Temp-Datei
+        result = None
+        run_report = None
+        profile = None
 
-        # Fall 1: Direkte Transkription → temporäre Datei erstellen
+        # Fall 1: Direkte Transkription → per stdin übergeben (oder temporäre Datei im file-Modus)
         if body.transcription and body.transcription.strip():
             yield sse_event({
                 "type": "progress", "step": "init",
                 "message": "Verwende aktuelle Transkription...", "progress": 0
             })
 
-            if body.mp3Filename:
-                safe = re.sub(r'[^a-zA-Z0-9._\-]', '_', Path(body.mp3Filename).stem)
-                temp_filename = f"{safe}_temp.txt"
+            if HANDOFF_MODE == 'memory':
+                stdin_text = body.transcription
+                txt_path = temp_filename
             else:
-                temp_filename = f"temp_{uuid.uuid4().hex[:8]}_transcription.txt"
-
-            temp_file = os.path.join(AUDIO_DIR, temp_filename)
-            with open(temp_file, 'w', encoding='utf-8') as f:
-                f.write(body.transcription)
-            txt_path = temp_file
+                temp_file = os.path.join(AUDIO_DIR, temp_filename)
+                with tracer.span("upload.write", filename=temp_filename, bytes=len(body.transcription.encode('utf-8'))):
+                    with open(temp_file, 'w', encoding='utf-8') as f:
+                        f.write(body.transcription)
+                    storage.track(temp_filename)
+                txt_path = temp_file
 
         # Fall 2: Dateiname angegeben
         elif body.filename:
@@ -454,10 +1625,13 @@ def summarize(
                 "message": "Erkannt: Durchgabe-Modus", "progress": 5
             })
 
+        stdio_flag = "--stdio " if stdin_text is not None else ""
+        profile_flag = "--profile " if body.profile else ""
+        trace = subprocess_trace(tracer, "summarize")
         wsl_cmd = (
             f"cd {WSL_AUDIO_DIR} && "
             f"source {VENV_ACTIVATE} && "
-            f"python {PYTHON_SUMMARIZE} {prompt_flag} {actual_filename}"
+            f"{wsl_python(PYTHON_SUMMARIZE)} {stdio_flag}{profile_flag}{trace['flags']}{prompt_flag} {actual_filename}"
         )
 
         yield sse_event({
@@ -469,85 +1643,529 @@ def summarize(
 
         process = subprocess.Popen(
             ['wsl', 'bash', '-c', wsl_cmd],
+            stdin=subprocess.PIPE if stdin_text is not None else None,
             stdout=subprocess.PIPE,
             stderr=subprocess.PIPE,
             text=True,
             encoding='utf-8',
             errors='replace'
         )
+        try:
+            if stdin_text is not None:
+                threading.Thread(target=_write_stdin, args=(process, stdin_text), daemon=True).start()
+
+            for line in process.stdout:
+                line = line.strip()
+                if not line:
+                    continue
+                message = parse_stream_message(line)
+                if message:
+                    if message[0] == "RESULT":
+                        result = message[1]
+                    elif message[0] == "REPORT":
+                        run_report = record_run_report(message[1], "summarize")
+                    elif message[0] == "PROFILE":
+                        profile = message[1]
+                    elif message[0] == "SPAN":
+                        collect_span(trace, message[1])
+                    continue
+                clean = strip_ansi(line)
+                progress = summarize_progress(clean)
+                yield sse_event({
+                    "type": "progress", "step": "processing",
+                    "message": clean, "progress": progress
+                })
 
-        for line in process.stdout:
-            line = line.strip()
-            if not line:
-                continue
-            clean = strip_ansi(line)
-            progress = 20
-            if 'lade summarizer' in clean.lower():          progress = 30
-            elif 'lade tokenizer' in clean.lower():          progress = 40
-            elif 'teile transkription' in clean.lower():     progress = 50
-            elif 'generiere überschrift' in clean.lower():   progress = 60
-            elif 'summary=' in clean.lower():                progress = 70
-            elif 'speichern der summary' in clean.lower():   progress = 90
-            elif 'erfolgreich gespeichert' in clean.lower(): progress = 95
-            yield sse_event({
-                "type": "progress", "step": "processing",
-                "message": clean, "progress": progress
-            })
+            stderr_output = process.stderr.read()
+            if stderr_output:
+                for line in stderr_output.split('\n'):
+                    if line.strip():
+                        yield sse_event({
+                            "type": "progress", "step": "warning",
+                            "message": strip_ansi(line), "progress": 0
+                        })
+
+            # Temp-Input-Datei löschen
+            if temp_file and os.path.isfile(temp_file):
+                os.unlink(temp_file)
+                print(f"[LOCAL-SERVICE] ✓ Temp-Input gelöscht: {temp_file}")
+
+            exit_code = process.wait()
+            finish_subprocess_trace(trace, exit_code)
+            duration = round(time.time() - start_time, 1)
+
+            if exit_code != 0:
+                print(f"[LOCAL-SERVICE] ❌ WSL exit code: {exit_code}")
+                yield sse_event({
+                    "type": "error", "step": "error",
+                    "message": f"Summarization fehlgeschlagen (Exit-Code: {exit_code})",
+                    "exitCode": exit_code
+                })
+                return
 
-        stderr_output = process.stderr.read()
-        if stderr_output:
-            for line in stderr_output.split('\n'):
-                if line.strip():
-                    yield sse_event({
-                        "type": "progress", "step": "warning",
-                        "message": strip_ansi(line), "progress": 0
-                    })
-
-        # Temp-Input-Datei löschen
-        if temp_file and os.path.isfile(temp_file):
-            os.unlink(temp_file)
-            print(f"[LOCAL-SERVICE] ✓ Temp-Input gelöscht: {temp_file}")
-
-        exit_code = process.wait()
-        duration = round(time.time() - start_time, 1)
+            # Ergebnis laden (stdio-Modus: direkt aus @@RESULT, sonst _s.txt Suffix)
+            base_name = Path(actual_filename).stem
+            summary_path = os.path.join(AUDIO_DIR, f"{base_name}_s.txt")
 
-        if exit_code != 0:
-            print(f"[LOCAL-SERVICE] ❌ WSL exit code: {exit_code}")
+            if result is not None:
+                summary_text = result.get("summary", "")
+            elif not os.path.isfile(summary_path):
+                yield sse_event({
+                    "type": "error", "step": "error",
+                    "message": "Summary-Datei wurde nicht erstellt"
+                })
+                return
+            else:
+                with open(summary_path, 'r', encoding='utf-8') as f:
+                    summary_text = f.read()
+
+            # Temp-Output-Datei löschen
+            if temp_file and os.path.isfile(summary_path):
+                remove_result_file(summary_path)
+                print(f"[LOCAL-SERVICE] ✓ Temp-Output gelöscht: {summary_path}")
+            elif not temp_file and result is None:
+                with tracer.span("index"):
+                    index_result_file(f"{base_name}_s.txt")
+
+            print(f"[LOCAL-SERVICE] ✅ Summarization abgeschlossen in {duration}s")
             yield sse_event({
-                "type": "error", "step": "error",
-                "message": f"Summarization fehlgeschlagen (Exit-Code: {exit_code})",
-                "exitCode": exit_code
+                "type": "complete", "step": "complete",
+                "message": f"Summarization abgeschlossen in {duration}s",
+                "progress": 100,
+                "transcription": summary_text,
+                "filename": f"{base_name}_s.txt",
+                "duration": duration,
+                "mode": prompt_flag,
+                "runReport": run_report,
+                "profile": profile
             })
-            return
+        finally:
+            # Client weg oder Fehler: WSL-Prozess nicht weiterlaufen lassen (hält sonst GPU und Temp-Dateien)
+            if process.poll() is None:
+                process.kill()
+
+    # file-Modus: Temp-Eingabe und deren Summary nach dem Lauf immer löschen (auch nach Fehler oder Client-Abbruch)
+    input_name = temp_filename or os.path.basename(body.filename or "")
+    summary_name = f"{Path(input_name).stem}_s.txt"
+    cleanup = tuple(os.path.join(AUDIO_DIR, name) for name in (temp_filename, summary_name)) \
+        if temp_filename and HANDOFF_MODE != 'memory' else ()
+    events = traced_job(result_job(generate(), SUMMARIZE_RESULTS, body.inlineResult), tracer, "summarize", started,
+                        filename=input_name, segments=segments)
+    return StreamingResponse(tracked_job(eta_job(events, estimate), hold=(input_name, summary_name), cleanup=cleanup),
+                             media_type="text/event-stream", headers={"X-Trace-Id": tracer.trace_id})
+
+
+# ============================================================================
+# Endpunkt: Pipeline Transkription → Summary (SSE Streaming)
+# ============================================================================
+
+def _pump_lines(stream, source: str, events: "queue.Queue"):
+    """Liest Zeilen eines Prozesses in die gemeinsame Event-Queue (None = Stream beendet)"""
+    for line in stream:
+        events.put((source, line.rstrip('\n')))
+    events.put((source, None))
+
+
+def _feed_stdin(process: subprocess.Popen, messages: "queue.Queue"):
+    """
+    Schreibt Nachrichten in stdin von summarize.py. Eigener Thread mit unbegrenzter Queue,
+    damit ein langsamer Summarizer nie das Auslesen von transcribe.py blockiert.
+    """
+    while True:
+        message = messages.get()
+        if message is None:
+            break
+        try:
+            process.stdin.write(json.dumps(message, ensure_ascii=False) + "\n")
+            process.stdin.flush()
+        except (BrokenPipeError, OSError):
+            break
+    try:
+        process.stdin.close()
+    except OSError:
+        pass
+
+
+@app.post("/process")
+def process(
+    body: ProcessRequest,
+    x_api_key: Optional[str] = Header(None)
+):
+    """
+    Pipeline: Transkription und Summary überlappend in EINER SSE-Verbindung.
+    transcribe.py --stream gibt jedes fertige Segment sofort aus; main.py reicht es per stdin
+    an summarize.py --stream weiter, das jeden Block zusammenfasst, sobald seine Segmente vorliegen.
+    Keine temporäre TXT-Datei für die Summary-Eingabe; Ergebnisse kommen als @@RESULT über stdout.
+    Liegt der Upload im Speicher (HANDOFF_MODE=memory), wird auch das Audio per stdin übergeben.
+
+    Mit progressive=true liefert transcribe.py zuerst einen Entwurf (kleines Modell) und ersetzt ihn
+    fensterweise durch large-v3; statt 'segment' kommen dann 'draft' und 'replace'.
+
+    SSE-Event-Typen (zusätzlich zu progress/error):
+    - segment:       { type, stage, start, end, text }
+    - draft:         { type, stage, index, start, end, text }                      (nur progressive)
+    - replace:       { type, stage, first, last, start, end, changed, segments }  (nur progressive)
+    - block:         { type, stage, index, first, last, summary }
+    - transcription: { type, transcription, filename, duration }
+    - complete:      { type, transcription, summary, filename, summaryFilename, mp3Filename, duration, runReports, profiles }
+    """
+    verify_api_key(x_api_key)
+
+    filename = body.filename
+    mp3_path = os.path.join(AUDIO_DIR, filename)
+
+    is_temp_file = bool(re.match(r'^.+_temp\.[^.]+$', filename))
+    display_filename = re.sub(r'_temp(\.[^.]+)$', r'\1', filename)
+    base_name = Path(filename).stem
+    display_base = Path(display_filename).stem
+
+    # Koordinator: ganze Pipeline auf einem Worker, Transkript und Summary hier ablegen
+    if worker_pool is not None:
+        def store_results(event: dict):
+            if not is_temp_file:
+                save_coordinated_result(f"{display_base}.txt", event.get("transcription", ""))
+                save_coordinated_result(f"{display_base}_s.txt", event.get("summary", ""))
+        return coordinated("process", "/process", body.dict(), coordinator_audio(filename), store_results, PROCESS_RESULTS)
+
+    staged_audio = staged_uploads.get(filename)
+    if staged_audio is None and not os.path.isfile(mp3_path):
+        raise HTTPException(status_code=404, detail=f"MP3-Datei nicht gefunden: {filename}")
+
+    estimate = admit_job("process", eta_model.predict_process(probe_duration(mp3_path, staged_audio), ETA_TRANSCRIBE_MODEL,
+                                                             WORKER_DEVICE), body.deadlineSeconds)
+    staged_uploads.pop(filename)
 
-        # Ergebnis laden (_s.txt Suffix)
-        base_name = Path(actual_filename).stem
+    if body.mode in ("durchgabe", "newsletter"):
+        prompt_flag = f"-{body.mode}"
+    else:
+        prompt_flag = '-newsletter' if 'newsletter' in filename.lower() else '-durchgabe'
+
+    def generate():
+        start_time = time.time()
+        txt_path = os.path.join(AUDIO_DIR, f"{base_name}.txt")
         summary_path = os.path.join(AUDIO_DIR, f"{base_name}_s.txt")
 
-        if not os.path.isfile(summary_path):
+        yield sse_event({
+            "type": "progress", "step": "init", "stage": "pipeline",
+            "message": f"Starte Transkription + Summary für: {display_filename}",
+            "progress": 0
+        })
+
+        # Temp-Uploads brauchen keine Dateien im Audio-Verzeichnis, alles andere wird wie bisher gespeichert
+        stdio_flag = " --stdio" if staged_audio is not None else ""
+        save_flag = "" if is_temp_file else " --save"
+        profile_flag = " --profile" if body.profile else ""
+        progressive_flag = " --progressive" if body.progressive else ""
+        transcribe_cmd = (
+            f"cd {WSL_AUDIO_DIR} && source {VENV_ACTIVATE} && "
+            f"{wsl_python(PYTHON_TRANSCRIBE)} --stream{stdio_flag}{save_flag if stdio_flag else ''}{profile_flag}{progressive_flag} "
+            f"{filename}"
+        )
+        summarize_cmd = (
+            f"cd {WSL_AUDIO_DIR} && source {VENV_ACTIVATE} && "
+            f"{wsl_python(PYTHON_SUMMARIZE)} --stream{save_flag}{profile_flag} {prompt_flag} {base_name}.txt"
+        )
+        print(f"[LOCAL-SERVICE] Executing WSL pipeline: {transcribe_cmd} | {summarize_cmd}")
+
+        # stderr → stdout, damit kein voller stderr-Puffer einen der Prozesse blockiert
+        popen_kwargs = dict(stdout=subprocess.PIPE, stderr=subprocess.STDOUT,
+                            text=True, encoding='utf-8', errors='replace')
+        transcriber = subprocess.Popen(['wsl', 'bash', '-c', transcribe_cmd],
+                                       stdin=subprocess.PIPE if staged_audio is not None else None, **popen_kwargs)
+        if staged_audio is not None:
+            threading.Thread(target=_write_stdin, args=(transcriber, staged_audio), daemon=True).start()
+        summarizer = subprocess.Popen(['wsl', 'bash', '-c', summarize_cmd], stdin=subprocess.PIPE, **popen_kwargs)
+
+        events: "queue.Queue" = queue.Queue()
+        to_summarizer: "queue.Queue" = queue.Queue()
+        threading.Thread(target=_pump_lines, args=(transcriber.stdout, "transcribe", events), daemon=True).start()
+        threading.Thread(target=_pump_lines, args=(summarizer.stdout, "summarize", events), daemon=True).start()
+        threading.Thread(target=_feed_stdin, args=(summarizer, to_summarizer), daemon=True).start()
+
+        transcription_text = None
+        transcribe_result = None
+        summary_result = None
+        run_reports = {}
+        profiles = {}
+        segment_count = 0
+        block_count = 0
+        open_sources = {"transcribe", "summarize"}
+
+        try:
+            while open_sources:
+                source, line = events.get()
+
+                if line is None:
+                    open_sources.discard(source)
+                    if source == "transcribe":
+                        exit_code = transcriber.wait()
+                        if exit_code != 0 or (transcribe_result is None and not os.path.isfile(txt_path)):
+                            # stdin ohne "end" schließen → summarize.py bricht ab
+                            to_summarizer.put(None)
+                            print(f"[LOCAL-SERVICE] ❌ WSL exit code (transcribe): {exit_code}")
+                            yield sse_event({
+                                "type": "error", "step": "error", "stage": "transcribe",
+                                "message": f"Transkription fehlgeschlagen (Exit-Code: {exit_code})",
+                                "exitCode": exit_code
+                            })
+                            continue
+
+                        to_summarizer.put({"type": "end"})
+                        to_summarizer.put(None)
+                        if transcribe_result is not None:
+                            transcription_text = transcribe_result.get("transcription", "")
+                        else:
+                            with open(txt_path, 'r', encoding='utf-8') as f:
+                                transcription_text = f.read()
+                        yield sse_event({
+                            "type": "transcription", "step": "transcription", "stage": "transcribe",
+                            "message": f"Transkription abgeschlossen nach {round(time.time() - start_time, 1)}s "
+                                       f"({segment_count} Segmente, {block_count} Blöcke bereits zusammengefasst)",
+                            "progress": 100,
+                            "transcription": transcription_text,
+                            "filename": f"{display_base}.txt",
+                            "duration": round(time.time() - start_time, 1)
+                        })
+                    continue
+
+                line = line.strip()
+                if not line:
+                    continue
+                message = parse_stream_message(line)
+
+                if source == "transcribe":
+                    if message and message[0] == "SEGMENT":
+                        payload = message[1]
+                        segment_count += 1
+                        to_summarizer.put({"type": "segment", **payload})
+                        if not body.progressive:  # Progressiv sieht der Client Entwurf + 'replace' statt Einzelsegmenten
+                            yield sse_event({
+                                "type": "segment", "stage": "transcribe",
+                                "start": payload.get("start"), "end": payload.get("end"),
+                                "text": segment_text(payload.get("raw", ""))
+                            })
+                    elif message and message[0] == "DRAFT":
+                        yield sse_event(draft_event(message[1], stage="transcribe"))
+                    elif message and message[0] == "REFINE":
+                        yield sse_event(replace_event(message[1], stage="transcribe"))
+                    elif message and message[0] == "HEADER":
+                        to_summarizer.put({"type": "header", **message[1]})
+                    elif message and message[0] == "RESULT":
+                        transcribe_result = message[1]
+                    elif message and message[0] == "REPORT":
+                        run_reports["transcribe"] = record_run_report(message[1], "process")
+                    elif message and message[0] == "PROFILE":
+                        profiles["transcribe"] = message[1]
+                    elif not message:
+                        clean = strip_ansi(line)
+                        yield sse_event({
+                            "type": "progress", "step": "processing", "stage": "transcribe",
+                            "message": clean, "progress": transcribe_progress(clean)
+                        })
+                else:
+                    if message and message[0] == "BLOCK":
+                        block_count += 1
+                        yield sse_event({"type": "block", "stage": "summarize", **message[1]})
+                    elif message and message[0] == "RESULT":
+                        summary_result = message[1]
+                    elif message and message[0] == "REPORT":
+                        run_reports["summarize"] = record_run_report(message[1], "process")
+                    elif message and message[0] == "PROFILE":
+                        profiles["summarize"] = message[1]
+                    elif not message:
+                        clean = strip_ansi(line)
+                        yield sse_event({
+                            "type": "progress", "step": "processing", "stage": "summarize",
+                            "message": clean, "progress": summarize_progress(clean)
+                        })
+
+            summarize_exit = summarizer.wait()
+            duration = round(time.time() - start_time, 1)
+
+            if transcription_text is None:
+                return
+
+            if summarize_exit != 0 or summary_result is None:
+                print(f"[LOCAL-SERVICE] ❌ WSL exit code (summarize): {summarize_exit}")
+                yield sse_event({
+                    "type": "error", "step": "error", "stage": "summarize",
+                    "message": f"Summarization fehlgeschlagen (Exit-Code: {summarize_exit})",
+                    "exitCode": summarize_exit
+                })
+                return
+
+            summary_text = summary_result.get("summary", "")
+
+            if not is_temp_file:
+                index_result_file(f"{base_name}.txt")
+                index_result_file(f"{base_name}_s.txt")
+
+            print(f"[LOCAL-SERVICE] ✅ Pipeline abgeschlossen in {duration}s")
             yield sse_event({
-                "type": "error", "step": "error",
-                "message": "Summary-Datei wurde nicht erstellt"
+                "type": "complete", "step": "complete",
+                "message": f"Transkription + Summary abgeschlossen in {duration}s",
+                "progress": 100,
+                "transcription": transcription_text,
+                "summary": summary_text,
+                "filename": f"{display_base}.txt",
+                "summaryFilename": f"{display_base}_s.txt",
+                "mp3Filename": display_filename,
+                "duration": duration,
+                "mode": prompt_flag,
+                "runReports": run_reports,
+                "profiles": profiles or None
             })
-            return
 
-        with open(summary_path, 'r', encoding='utf-8') as f:
-            summary_text = f.read()
+        finally:
+            # Client weg oder Fehler: laufende Prozesse nicht weiterlaufen lassen
+            for proc in (transcriber, summarizer):
+                if proc.poll() is None:
+                    proc.kill()
+            to_summarizer.put(None)
 
-        # Temp-Output-Datei löschen
-        if temp_file and os.path.isfile(summary_path):
-            os.unlink(summary_path)
-            print(f"[LOCAL-SERVICE] ✓ Temp-Output gelöscht: {summary_path}")
+            if is_temp_file:
+                for path in (mp3_path, txt_path, summary_path):
+                    if os.path.isfile(path):
+                        remove_result_file(path)
+                        print(f"[LOCAL-SERVICE] ✓ Temp-Datei gelöscht: {path}")
+
+    events = result_job(generate(), PROCESS_RESULTS, body.inlineResult)
+    return StreamingResponse(tracked_job(eta_job(events, estimate), hold=(filename, f"{base_name}.txt", f"{base_name}_s.txt")),
+                             media_type="text/event-stream")
+
+
+# ============================================================================
+# Endpunkt: Live-Transkription (WebSocket)
+# ============================================================================
+
+_live_sessions = 0
+_live_lock = threading.Lock()
+
+
+def live_event(kind: str, payload: dict) -> Optional[dict]:
+    """Zeile von transcribe_live.py → WebSocket-Nachricht (None = nicht weiterreichen)"""
+    if kind == "READY":
+        return {"type": "ready", **payload}
+    if kind == "PARTIAL":
+        return {"type": "partial", **payload}
+    if kind == "FINAL":
+        return {"type": "final", "index": payload.get("index"), "start": payload.get("start"),
+                "end": payload.get("end"), "text": segment_text(payload.get("raw", "")), "raw": payload.get("raw"),
+                "receivedSeconds": payload.get("receivedSeconds")}
+    if kind == "DONE":
+        return {"type": "done", **payload}
+    return None
 
-        print(f"[LOCAL-SERVICE] ✅ Summarization abgeschlossen in {duration}s")
-        yield sse_event({
-            "type": "complete", "step": "complete",
-            "message": f"Summarization abgeschlossen in {duration}s",
-            "progress": 100,
-            "transcription": summary_text,
-            "filename": f"{base_name}_s.txt",
-            "duration": duration,
-            "mode": prompt_flag
-        })
 
-    return StreamingResponse(generate(), media_type="text/event-stream")
+@app.websocket("/live")
+async def live(websocket: WebSocket, format: str = "pcm", api_key: Optional[str] = None):
+    """
+    Live-Transkription: der Client schickt Audio als Binär-Nachrichten (format=pcm: s16le 16 kHz mono,
+    sonst opus/webm/ogg/mp3-Strom) und zum Schluss die Text-Nachricht "end". transcribe_live.py dekodiert
+    in WSL ein rollierendes Fenster mit den Einstellungen von transcribe.py.
+    Browser können keine Header setzen → API-Key auch als Query-Parameter api_key.
+
+    Nachrichten an den Client:
+    - ready:    { type, model, format, sampleRate, beamSize, stepSec, maxWindowSec }  (Modell geladen, Audio senden)
+    - partial:  { type, start, end, text, receivedSeconds }        (vorläufiger Text, ersetzt den vorherigen)
+    - final:    { type, index, start, end, text, raw, receivedSeconds }
+    - done:     { type, audioSeconds, segments, passes, forcedCommits, decodeSeconds, rtf }
+    - error:    { type, message }
+    - complete: { type, exitCode, duration, runReport }
+    """
+    global _live_sessions
+    key = websocket.headers.get("x-api-key") or api_key
+    if API_KEY and key != API_KEY:
+        await websocket.close(code=1008)
+        return
+    if format not in LIVE_FORMATS:
+        await websocket.close(code=1003)
+        return
+    with _live_lock:
+        if _live_sessions >= LIVE_MAX_SESSIONS:
+            full = True
+        else:
+            full = False
+            _live_sessions += 1
+    if full:
+        await websocket.close(code=1013)  # "Try Again Later"
+        return
+
+    await websocket.accept()
+    start_time = time.time()
+    wsl_cmd = (
+        f"cd {WSL_AUDIO_DIR} && source {VENV_ACTIVATE} && "
+        f"python {PYTHON_TRANSCRIBE_LIVE} --format {format}"
+    )
+    print(f"[LOCAL-SERVICE] Live-Sitzung, Executing WSL: {wsl_cmd}")
+    process = subprocess.Popen(['wsl', 'bash', '-c', wsl_cmd], stdin=subprocess.PIPE, stdout=subprocess.PIPE)
+
+    # stdout des Skripts im Thread lesen und in die Event-Loop übergeben (None = Prozess beendet)
+    loop = asyncio.get_running_loop()
+    messages: asyncio.Queue = asyncio.Queue()
+
+    def read_stdout():
+        for raw in process.stdout:
+            message = parse_stream_message(raw.decode('utf-8', errors='replace').strip())
+            if message:
+                loop.call_soon_threadsafe(messages.put_nowait, message)
+        loop.call_soon_threadsafe(messages.put_nowait, None)
+
+    threading.Thread(target=read_stdout, daemon=True).start()
+
+    run_report = None
+
+    async def forward_messages():
+        nonlocal run_report
+        while True:
+            message = await messages.get()
+            if message is None:
+                return
+            kind, payload = message
+            if kind == "REPORT":
+                run_report = record_run_report(payload, "live")
+                continue
+            event = live_event(kind, payload)
+            if event:
+                await websocket.send_json(event)
+
+    def write_audio(data: bytes):
+        process.stdin.write(data)
+        process.stdin.flush()
+
+    forwarder = asyncio.create_task(forward_messages())
+    try:
+        try:
+            while True:
+                message = await websocket.receive()
+                if message["type"] == "websocket.disconnect":
+                    raise WebSocketDisconnect()
+                if message.get("bytes"):
+                    await asyncio.to_thread(write_audio, message["bytes"])
+                elif (message.get("text") or "").strip() == "end":
+                    break
+        finally:
+            # stdin schließen = Ende des Stroms → das Skript übernimmt den Rest als final und beendet sich
+            try:
+                process.stdin.close()
+            except OSError:
+                pass
+
+        await forwarder
+        exit_code = await asyncio.to_thread(process.wait)
+        duration = round(time.time() - start_time, 1)
+        if exit_code != 0:
+            await websocket.send_json({"type": "error", "message": f"Live-Transkription fehlgeschlagen (Exit-Code: {exit_code})"})
+        await websocket.send_json({"type": "complete", "exitCode": exit_code, "duration": duration, "runReport": run_report})
+        await websocket.close()
+        print(f"[LOCAL-SERVICE] ✅ Live-Sitzung beendet nach {duration}s")
+
+    except (WebSocketDisconnect, RuntimeError, OSError):
+        # Client weg (auch beim Senden bemerkt) oder stdin-Pipe gebrochen
+        print("[LOCAL-SERVICE] Live-Sitzung vom Client beendet")
+    finally:
+        forwarder.cancel()
+        if process.poll() is None:
+            process.kill()
+        with _live_lock:
+            _live_sessions -= 1
@@ -0,0 +1,200 @@
+"""
+Ergebnis-Ablage für Transkripte und Summaries
+============================================================================
+Das SSE-Event 'complete' trug bisher den ganzen Text – bei mehrstündigen Transkripten eine einzige große
+Nachricht durch den Cloudflare-Tunnel, die das Node-Backend puffert und neu zerlegt. Stattdessen legt main.py
+jedes Ergebnis hier unter einer ID ab; 'complete' verweist nur noch darauf (results.*), der Client holt über
+GET /results/{id} genau das, was er anzeigt:
+
+- Komprimiert:  gzip (und zstd, falls das Paket zstandard installiert ist) wird beim Ablegen einmal erzeugt
+                und je nach Accept-Encoding ausgeliefert
+- ETag:         SHA-256 des Textes (je Kodierung eigenes Suffix), If-None-Match → 304
+- Bereiche:     Range: bytes=… auf den unkomprimierten UTF-8-Bytes (206) oder Segment-Seiten über den
+                TranscriptStore (?first=&limit=)
+- Aufräumen:    höchstens `history` Ergebnisse und nicht älter als `max_age`; die Ablage übersteht Neustarts
+                (Metadaten als JSON im Ergebnis-Verzeichnis)
+"""
+
+import gzip
+import hashlib
+import json
+import os
+import threading
+import time
+import uuid
+from collections import OrderedDict
+
+from transcript_store import TranscriptStore
+
+try:
+    import zstandard
+except ImportError:
+    zstandard = None
+
+INDEX_VERSION = 1
+INDEX_NAME = "index.json"
+STORE_CACHE_SIZE = 8            # Geparste Ergebnisse für Segment-Seiten
+GZIP_LEVEL = 6
+ZSTD_LEVEL = 9
+ENCODINGS = {"gzip": ".gz", "zstd": ".zst"}
+
+
+def parse_byte_range(header: str, size: int):
+    """'bytes=a-b' | 'bytes=a-' | 'bytes=-n' → (start, end) inklusive; None = ungültig/nicht erfüllbar"""
+    if not header or not header.startswith("bytes=") or "," in header:
+        return None
+    first, _, last = header[len("bytes="):].strip().partition("-")
+    try:
+        if not first:
+            length = int(last)
+            if length <= 0:
+                return None
+            return max(0, size - length), size - 1
+        start = int(first)
+        end = int(last) if last else size - 1
+    except ValueError:
+        return None
+    if start >= size or end < start:
+        return None
+    return start, min(end, size - 1)
+
+
+def accepted_encoding(accept_encoding: str, available: list) -> str:
+    """Bevorzugte verfügbare Kodierung aus Accept-Encoding (zstd vor gzip), sonst None"""
+    accepted = {}
+    for part in (accept_encoding or "").split(","):
+        name, _, params = part.strip().partition(";")
+        quality = 1.0
+        if params.strip().startswith("q="):
+            try:
+                quality = float(params.strip()[2:])
+            except ValueError:
+                pass
+        accepted[name.strip().lower()] = quality
+    for encoding in ("zstd", "gzip"):
+        if encoding in available and accepted.get(encoding, accepted.get("*", 0)) > 0:
+            return encoding
+    return None
+
+
+class ResultStore:
+    """Ergebnis-Texte unter IDs im Verzeichnis `directory` (<id>.txt, <id>.txt.gz, <id>.txt.zst)"""
+
+    def __init__(self, directory: str, history: int = 200, max_age: float = 24 * 3600):
+        self.directory = directory
+        self.history = history
+        self.max_age = max_age
+        self.lock = threading.Lock()
+        self.results = OrderedDict()            # id → {"id", "kind", "filename", "created", "bytes", "etag", ...}
+        self._stores = OrderedDict()            # id → TranscriptStore
+        os.makedirs(directory, exist_ok=True)
+        self._load()
+
+    # -------------------------------------------------------------------------
+    # Persistenz
+    # -------------------------------------------------------------------------
+    def _load(self):
+        path = os.path.join(self.directory, INDEX_NAME)
+        if not os.path.isfile(path):
+            return
+        try:
+            with open(path, "r", encoding="utf-8") as f:
+                data = json.load(f)
+            if data.get("version") == INDEX_VERSION:
+                self.results = OrderedDict((entry["id"], entry) for entry in data["results"]
+                                           if os.path.isfile(self.path(entry["id"])))
+        except (OSError, ValueError, KeyError) as e:
+            print(f"[RESULTS] ⚠️ Index konnte nicht geladen werden: {e}")
+
+    def _save(self):
+        path = os.path.join(self.directory, INDEX_NAME)
+        tmp_path = path + ".tmp"
+        try:
+            with open(tmp_path, "w", encoding="utf-8") as f:
+                json.dump({"version": INDEX_VERSION, "results": list(self.results.values())}, f, ensure_ascii=False)
+            os.replace(tmp_path, path)
+        except OSError as e:
+            print(f"[RESULTS] ⚠️ Index konnte nicht gespeichert werden: {e}")
+
+    def path(self, result_id: str, encoding: str = None) -> str:
+        return os.path.join(self.directory, f"{result_id}.txt" + (ENCODINGS[encoding] if encoding else ""))
+
+    # -------------------------------------------------------------------------
+    # Ablegen und Aufräumen
+    # -------------------------------------------------------------------------
+    def put(self, text: str, kind: str, filename: str = None) -> dict:
+        """Text ablegen (inkl. komprimierter Fassungen); gibt die Metadaten samt id zurück"""
+        data = text.encode("utf-8")
+        result_id = uuid.uuid4().hex
+        encodings = {"gzip": gzip.compress(data, GZIP_LEVEL, mtime=0)}
+        if zstandard is not None:
+            encodings["zstd"] = zstandard.ZstdCompressor(level=ZSTD_LEVEL).compress(data)
+        with open(self.path(result_id), "wb") as f:
+            f.write(data)
+        for encoding, compressed in encodings.items():
+            with open(self.path(result_id, encoding), "wb") as f:
+                f.write(compressed)
+
+        segments = len(TranscriptStore(data))
+        entry = {
+            "id": result_id,
+            "kind": kind,
+            "filename": filename,
+            "created": time.time(),
+            "bytes": len(data),
+            "segments": segments,
+            "etag": hashlib.sha256(data).hexdigest()[:32],
+            "encodings": {encoding: len(compressed) for encoding, compressed in encodings.items()},
+        }
+        with self.lock:
+            self.results[result_id] = entry
+            self._expire()
+            self._save()
+        return entry
+
+    def _expire(self):
+        """Älteste Ergebnisse über `history` bzw. älter als `max_age` löschen (mit gehaltener Sperre)"""
+        now = time.time()
+        while self.results:
+            result_id, entry = next(iter(self.results.items()))
+            if len(self.results) <= self.history and now - entry["created"] <= self.max_age:
+                break
+            del self.results[result_id]
+            self._stores.pop(result_id, None)
+            for encoding in (None, *ENCODINGS):
+                try:
+                    os.unlink(self.path(result_id, encoding))
+                except OSError:
+                    pass
+
+    # -------------------------------------------------------------------------
+    # Abfrage
+    # -------------------------------------------------------------------------
+    def get(self, result_id: str) -> dict:
+        with self.lock:
+            self._expire()
+            return self.results.get(result_id)
+
+    def store(self, result_id: str) -> TranscriptStore:
+        """Geparstes Ergebnis für Segment-Seiten (kleiner LRU-Cache)"""
+        with self.lock:
+            store = self._stores.get(result_id)
+            if store is not None:
+                self._stores.move_to_end(result_id)
+                return store
+        store = TranscriptStore.open(self.path(result_id))
+        with self.lock:
+            self._stores[result_id] = store
+            while len(self._stores) > STORE_CACHE_SIZE:
+                self._stores.popitem(last=False)
+        return store
+
+    def stats(self) -> dict:
+        with self.lock:
+            entries = list(self.results.values())
+        return {
+            "results": len(entries),
+            "bytes": sum(entry["bytes"] for entry in entries),
+            "gzipBytes": sum(entry["encodings"].get("gzip", 0) for entry in entries),
+            "zstd": zstandard is not None,
+        }
@@ -0,0 +1,308 @@
+"""
+Volltext-Suchindex über alle Transkripte und Summaries im Audio-Verzeichnis
+============================================================================
+Invertierter Index: Term → {Dokument-ID → array('I') mit Eintrags-Indizes}.
+Zu jedem Dokument werden die Startzeiten der Einträge gespeichert, damit ein Treffer
+direkt als [hh:mm:ss] zurückgegeben werden kann, ohne die Datei erneut zu lesen.
+
+- Einträge:     im Transkript (<name>.txt) jedes Segment; in der Summary (<name>_s.txt) zusätzlich jede
+                Block-Überschrift (unter dem ersten Timestamp ihres Blocks) und die Gesamtzusammenfassung
+                als eigener Eintrag – die durch den Block-Overlap doppelten Segmente nur einmal
+- Inkrementell: refresh() indiziert nur neue/geänderte Dateien (mtime) und entfernt gelöschte
+- Nebenläufig:  Lesen und Parsen der Dateien ohne die Such-Sperre; die wird nur zum Austauschen der
+                Postings eines Dokuments kurz gehalten – Suchen warten nie auf eine Indizierung
+- Persistent:   Index wird als Pickle gespeichert, damit ein Neustart nicht alles neu einliest
+- Deutsch:      Kleinschreibung, ß/Umlaut-Faltung, Stoppwörter, leichtes Suffix-Stemming
+- Ranking:      BM25 je Datei (Eintrag = Wort der Datei-Länge), innerhalb einer Datei zuerst nach Anzahl
+                getroffener Anfrage-Terme, dann nach Summe der IDF
+"""
+
+import math
+import os
+import pickle
+import re
+import threading
+import time
+from array import array
+from collections import defaultdict
+
+from profiling import SUMMARY_SUFFIX as PROFILE_SUMMARY_SUFFIX
+from transcript_store import TranscriptStore, format_timestamp
+
+INDEX_VERSION = 2
+SUMMARY_SUFFIX = "_s.txt"
+SUMMARY_MARKER = "Gesamtzusammenfassung:"
+HEADLINE_RE = re.compile(r"^-{10}\s+(.+?)\s*$", re.MULTILINE)   # "----------  Überschrift" (summarize.py)
+KINDS = ("segment", "headline", "summary")
+WORD_RE = re.compile(r"\w+", re.UNICODE)
+UMLAUT_MAP = str.maketrans({"ä": "a", "ö": "o", "ü": "u", "ß": "ss"})
+# Reihenfolge wichtig: längere Endungen zuerst
+GERMAN_SUFFIXES = ("ern", "em", "en", "er", "es", "e", "s", "n")
+MIN_STEM_LEN = 3
+BM25_K1 = 1.2                       # Sättigung: jeder weitere Eintrag mit dem Term zählt weniger
+BM25_B = 0.75                       # Längen-Normalisierung über die Anzahl Einträge je Datei
+GERMAN_STOPWORDS = frozenset("""
+    aber alle als also am an auch auf aus bei bin bis bist da dann das dass dein deine dem den der des dich die dir
+    doch du durch ein eine einem einen einer es euch euer eure für hat hatte ich ihr im in ist ja jetzt kann mein
+    meine mich mir mit nach nicht noch nun nur ob oder sehr sein seine sich sie sind so um und uns unser von vor war
+    was weil wenn werden wie wir wird zu zum zur
+""".split())
+
+
+def normalize_token(word: str) -> str:
+    """Normalisiert ein Wort für Index und Suche (gleiche Regeln für beide Seiten)"""
+    word = word.lower().translate(UMLAUT_MAP)
+    for suffix in GERMAN_SUFFIXES:
+        if word.endswith(suffix) and len(word) - len(suffix) >= MIN_STEM_LEN:
+            return word[:-len(suffix)]
+    return word
+
+
+def tokenize(text: str) -> list:
+    """Zerlegt Text in normalisierte Terme (ohne Stoppwörter und Zahlen)"""
+    return [
+        normalize_token(word) for word in WORD_RE.findall(text)
+        if not word.isdigit() and word.lower() not in GERMAN_STOPWORDS
+    ]
+
+
+def bm25_idf(n_docs: int, doc_freq: int) -> float:
+    """IDF nach BM25 (mit +1, damit Terme in mehr als der Hälfte der Dateien nicht negativ werden)"""
+    return math.log(1.0 + (n_docs - doc_freq + 0.5) / (doc_freq + 0.5))
+
+
+def headline(text: str) -> str:
+    match = HEADLINE_RE.search(text)
+    return match.group(1) if match else None
+
+
+def document_entries(store: TranscriptStore, summary: bool) -> list:
+    """
+    Einträge eines Dokuments als (kind, start, segment, text): segment = Index im TranscriptStore
+    (für Snippets), bei Überschrift und Gesamtzusammenfassung -1 und der Text liegt im Index selbst
+    """
+    if not summary:
+        return [("segment", store.starts[i], i, store.text(i)) for i in range(len(store))]
+
+    entries = []
+    header = store.header
+    if SUMMARY_MARKER in header:
+        tail = header.split(SUMMARY_MARKER, 1)[1]
+        overall = HEADLINE_RE.split(tail, maxsplit=1)[0].strip()
+        if overall:
+            entries.append(("summary", 0.0, -1, " ".join(overall.split())))
+        header = tail
+    seen = set()
+    pending = headline(header)             # Überschrift des ersten Blocks steht noch im Header
+    for i in range(len(store)):
+        start, text = store.starts[i], store.text(i)
+        if pending:
+            entries.append(("headline", start, -1, pending))
+        if (start, text) not in seen:
+            seen.add((start, text))
+            entries.append(("segment", start, i, text))
+        pending = headline(store.between(i))
+    return entries
+
+
+class SearchIndex:
+    """Inkrementeller invertierter Index über alle *.txt-Dateien eines Verzeichnisses"""
+
+    def __init__(self, directory: str, index_path: str = None):
+        self.directory = directory
+        self.index_path = index_path
+        self.lock = threading.Lock()        # Suche und Austausch der Postings (nur kurz gehalten)
+        self.write_lock = threading.RLock() # Schreiber nacheinander: refresh, update_file, save
+        self.postings = defaultdict(dict)   # term → {doc_id: array('I') Eintrags-Indizes}
+        self.docs = {}                      # doc_id → {"filename", "mtime", "starts", "kinds", "segments", "texts", "terms"}
+        self.doc_ids = {}                   # filename → doc_id
+        self.next_doc_id = 0
+        self.last_refresh = 0.0
+        self._load()
+
+    # -------------------------------------------------------------------------
+    # Persistenz
+    # -------------------------------------------------------------------------
+    def _load(self):
+        if not self.index_path or not os.path.isfile(self.index_path):
+            return
+        try:
+            with open(self.index_path, "rb") as f:
+                data = pickle.load(f)
+            if data.get("version") != INDEX_VERSION or data.get("directory") != self.directory:
+                return
+            self.postings = defaultdict(dict, data["postings"])
+            self.docs = data["docs"]
+            self.doc_ids = {doc["filename"]: doc_id for doc_id, doc in self.docs.items()}
+            self.next_doc_id = data["next_doc_id"]
+        except Exception as e:
+            print(f"[SEARCH-INDEX] ⚠️ Index konnte nicht geladen werden, baue neu auf: {e}")
+
+    def save(self):
+        # Suchen verändern nichts → beim Schreiben genügt die Schreiber-Sperre
+        if not self.index_path:
+            return
+        with self.write_lock:
+            data = {
+                "version": INDEX_VERSION, "directory": self.directory,
+                "postings": dict(self.postings), "docs": self.docs, "next_doc_id": self.next_doc_id
+            }
+            tmp_path = self.index_path + ".tmp"
+            with open(tmp_path, "wb") as f:
+                pickle.dump(data, f, protocol=pickle.HIGHEST_PROTOCOL)
+            os.replace(tmp_path, self.index_path)
+
+    # -------------------------------------------------------------------------
+    # Indizierung (Hintergrund: Start-Thread, Timer in main.py, neue Ergebnisdateien)
+    # -------------------------------------------------------------------------
+    def run(self, interval: float):
+        """Endlosschleife für einen Hintergrund-Thread: abgleichen, warten, abgleichen …"""
+        while True:
+            try:
+                self.refresh()
+            except Exception as e:
+                print(f"[SEARCH-INDEX] ⚠️ Abgleich fehlgeschlagen: {e}")
+            time.sleep(max(1.0, interval))
+
+    def refresh(self) -> dict:
+        """Gleicht den Index mit dem Verzeichnis ab; gibt Anzahl neu/entfernter Dokumente zurück"""
+        added = removed = 0
+        if not os.path.isdir(self.directory):
+            return {"added": 0, "removed": 0}
+
+        with self.write_lock:
+            current = {}
+            for filename in os.listdir(self.directory):
+                lower = filename.lower()
+                # Profil-Zusammenfassungen (--profile) sind keine Transkripte
+                if lower.endswith(".txt") and "_temp" not in lower and not lower.endswith(PROFILE_SUMMARY_SUFFIX):
+                    try:
+                        current[filename] = os.stat(os.path.join(self.directory, filename)).st_mtime
+                    except OSError:
+                        pass            # Zwischen listdir und stat gelöscht
+
+            for filename in list(self.doc_ids):
+                if filename not in current:
+                    with self.lock:
+                        self._remove(filename)
+                    removed += 1
+            for filename, mtime in current.items():
+                doc_id = self.doc_ids.get(filename)
+                if doc_id is None or self.docs[doc_id]["mtime"] != mtime:
+                    self.update_file(filename)
+                    added += 1
+            self.last_refresh = time.time()
+
+            if added or removed:
+                self.save()
+        return {"added": added, "removed": removed}
+
+    def update_file(self, filename: str):
+        """(Re-)indiziert eine einzelne Datei – z. B. direkt nach Abschluss einer Transkription"""
+        path = os.path.join(self.directory, os.path.basename(filename))
+        filename = os.path.basename(path)
+        with self.write_lock:
+            if not os.path.isfile(path):
+                return
+            mtime = os.stat(path).st_mtime
+            with TranscriptStore.open(path) as store:
+                entries = document_entries(store, filename.lower().endswith(SUMMARY_SUFFIX))
+
+            doc_postings = defaultdict(lambda: array("I"))
+            for entry_index, (_, _, _, text) in enumerate(entries):
+                for term in set(tokenize(text)):
+                    doc_postings[term].append(entry_index)
+            doc = {
+                "filename": filename, "mtime": mtime,
+                "starts": array("d", (start for _, start, _, _ in entries)),
+                "kinds": bytes(KINDS.index(kind) for kind, _, _, _ in entries),
+                "segments": array("i", (segment for _, _, segment, _ in entries)),
+                "texts": {i: text for i, (kind, _, _, text) in enumerate(entries) if kind != "segment"},
+                "terms": list(doc_postings),
+            }
+
+            with self.lock:
+                self._remove(filename)
+                doc_id = self.next_doc_id
+                self.next_doc_id += 1
+                for term, positions in doc_postings.items():
+                    self.postings[term][doc_id] = positions
+                self.docs[doc_id] = doc
+                self.doc_ids[filename] = doc_id
+
+    def _remove(self, filename: str):
+        """Dokument aus Postings und Verzeichnis nehmen (mit gehaltener Such-Sperre)"""
+        doc_id = self.doc_ids.pop(filename, None)
+        if doc_id is None:
+            return
+        for term in self.docs.pop(doc_id)["terms"]:
+            term_postings = self.postings.get(term)
+            if term_postings is not None:
+                term_postings.pop(doc_id, None)
+                if not term_postings:
+                    del self.postings[term]
+
+    # -------------------------------------------------------------------------
+    # Suche
+    # -------------------------------------------------------------------------
+    def search(self, query: str, limit: int = 20, hits_per_file: int = 5) -> list:
+        """
+        UND-Suche über alle Terme der Anfrage (jede Datei enthält alle Terme, nicht unbedingt im selben Eintrag).
+        Ranking der Dateien: zuerst Dateien mit mindestens einem Eintrag, der ALLE Terme enthält, dann BM25.
+        Ranking der Einträge je Datei: Anzahl getroffener Terme, dann Summe der IDF (seltene Terme zählen mehr).
+        """
+        terms = list(dict.fromkeys(tokenize(query)))
+        if not terms:
+            return []
+
+        with self.lock:
+            term_postings = [self.postings.get(term, {}) for term in terms]
+            if any(not p for p in term_postings):
+                return []
+
+            n_docs = max(1, len(self.docs))
+            avg_entries = sum(len(doc["starts"]) for doc in self.docs.values()) / n_docs or 1.0
+            candidate_docs = set.intersection(*(set(p) for p in term_postings))
+            idfs = [bm25_idf(n_docs, len(postings)) for postings in term_postings]
+
+            results = []
+            for doc_id in candidate_docs:
+                doc = self.docs[doc_id]
+                length_norm = 1.0 - BM25_B + BM25_B * len(doc["starts"]) / avg_entries
+                score = 0.0
+                entry_scores = defaultdict(float)
+                entry_terms = defaultdict(int)
+                for postings, idf in zip(term_postings, idfs):
+                    entries = postings[doc_id]
+                    score += idf * len(entries) * (BM25_K1 + 1) / (len(entries) + BM25_K1 * length_norm)
+                    for entry_index in entries:
+                        entry_scores[entry_index] += idf
+                        entry_terms[entry_index] += 1
+
+                ranked = sorted(entry_scores, key=lambda i: (-entry_terms[i], -entry_scores[i], i))
+                results.append({
+                    "filename": doc["filename"],
+                    "score": round(score, 3),
+                    "hitCount": len(entry_scores),
+                    "completeHits": sum(1 for count in entry_terms.values() if count == len(terms)),
+                    "hits": [self._hit(doc, i, entry_scores[i], entry_terms[i]) for i in ranked[:hits_per_file]]
+                })
+
+        results.sort(key=lambda r: (not r["completeHits"], -r["score"], r["filename"]))
+        return results[:limit]
+
+    @staticmethod
+    def _hit(doc: dict, entry: int, score: float, matched: int) -> dict:
+        """Treffer: segment = Index im Transkript (None bei Überschrift/Gesamtzusammenfassung, dort gleich mit Text),
+        matched = Anzahl der Anfrage-Terme im Eintrag"""
+        kind = KINDS[doc["kinds"][entry]]
+        hit = {"kind": kind, "segment": doc["segments"][entry] if kind == "segment" else None,
+               "start": doc["starts"][entry], "timestamp": f"[{format_timestamp(doc['starts'][entry])}]",
+               "score": round(score, 3), "matched": matched}
+        if kind != "segment":
+            hit["text"] = doc["texts"][entry]
+        return hit
+
+    def stats(self) -> dict:
+        with self.lock:
+            return {"documents": len(self.docs), "terms": len(self.postings), "lastRefresh": self.last_refresh}
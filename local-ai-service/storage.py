@@ -0,0 +1,361 @@
+"""
+Speicherverwaltung für das Audio-Verzeichnis
+============================================================================
+Das Audio-Verzeichnis liegt auf /mnt/d und wächst sonst unbegrenzt; Temp-Dateien abgebrochener Aufträge
+(_temp.mp3, _temp.txt, _temp_s.txt, temp_<id>_transcription.txt) bleiben liegen, weil main.py sie nur am Ende
+eines erfolgreichen Laufs löscht.
+
+- Buchführung:  jede Datei, die der Service anlegt (Uploads, Temp-Eingaben, Ergebnisse, Run-Reports, Profile),
+                steht mit Art, Anlage- und letzter Zugriffszeit im Ledger (JSON, übersteht Neustarts)
+- Verwaiste:    Temp-Dateien (nach Namensmuster, auch ohne Ledger-Eintrag) älter als temp_max_age werden gelöscht,
+                sofern kein laufender Auftrag sie hält (using())
+- Kontingent:   übersteigt das Verzeichnis quota_mb oder fällt der freie Platz unter min_free_mb, werden vom
+                Service erzeugte, wiederherstellbare Artefakte nach LRU gelöscht – Run-Reports und Profile, mit
+                evict_results auch Transkripte/Summaries. Audio-Dateien und fremde Dateien werden nie gelöscht.
+- Zulassung:    ensure_space() vor Uploads und Aufträgen – lieber sofort ablehnen als mitten in der Transkription
+                mit vollem Datenträger abbrechen
+- Sperrdateien: solange ein Auftrag eine Datei hält (using()), liegt daneben <dateiname>.lock – der Watch-Folder-Daemon
+                (base-data/watch_folder.py) lässt solche Dateien aus; Reste nach einem Absturz räumt collect_orphans() ab
+- Im Speicher:  StagedUploads hält Uploads (HANDOFF_MODE=memory) bis zur Abholung – mit Obergrenze für alle
+                zusammen und Höchstalter; was zu alt ist, lagert die Aufräum-Schleife als _temp-Datei aus
+"""
+
+import json
+import os
+import re
+import shutil
+import threading
+import time
+from collections import Counter
+from contextlib import contextmanager
+
+from instrumentation import REPORT_SUFFIX
+from profiling import PROFILE_SUFFIXES
+
+LEDGER_VERSION = 1
+TEMP_RE = re.compile(r'(_temp|^temp_[0-9a-f]{8}_transcription)(_s)?(_run|_profile)?$')
+LOCK_SUFFIX = '.lock'                        # Muss zu watch_folder.LOCK_SUFFIX passen
+AUDIO_EXTENSIONS = ('.mp3', '.wav', '.m4a', '.ogg', '.opus', '.webm', '.flac')
+MB = 1024 * 1024
+
+
+def classify(filename: str) -> str:
+    """temp | cache (Run-Report, Profil) | result (Transkript, Summary) | audio | other"""
+    stem, ext = os.path.splitext(filename)
+    if TEMP_RE.search(stem):
+        return "temp"
+    if filename.endswith(REPORT_SUFFIX) or filename.endswith(PROFILE_SUFFIXES):
+        return "cache"
+    if ext.lower() == '.txt':
+        return "result"
+    if ext.lower() in AUDIO_EXTENSIONS:
+        return "audio"
+    return "other"
+
+
+class StorageManager:
+    """Ledger der vom Service angelegten Dateien, Aufräumen verwaister Temp-Dateien und LRU unter einem Kontingent"""
+
+    def __init__(self, directory: str, ledger_path: str = None, quota_mb: float = 0, min_free_mb: float = 2048,
+                 temp_max_age: float = 6 * 3600, evict_results: bool = False):
+        self.directory = directory
+        self.ledger_path = ledger_path
+        self.quota_bytes = quota_mb * MB            # 0 = kein Kontingent, nur min_free_mb
+        self.min_free_bytes = min_free_mb * MB
+        self.temp_max_age = temp_max_age
+        self.evictable = {"cache", "result"} if evict_results else {"cache"}
+        self.lock = threading.Lock()
+        self.ledger = {}                            # Dateiname → {kind, created, lastAccess, size}
+        self.in_use = Counter()                     # Dateiname → Anzahl laufender Aufträge, die ihn halten
+        self.stats = Counter()                      # orphansRemoved, evicted, evictedBytes, rejected
+        self.last_collect = None
+        self._load()
+
+    # -------------------------------------------------------------------------
+    # Persistenz
+    # -------------------------------------------------------------------------
+    def _load(self):
+        if not self.ledger_path or not os.path.isfile(self.ledger_path):
+            return
+        try:
+            with open(self.ledger_path, "r", encoding="utf-8") as f:
+                data = json.load(f)
+            if data.get("version") == LEDGER_VERSION:
+                self.ledger = data["files"]
+        except (OSError, ValueError, KeyError) as e:
+            print(f"[STORAGE] ⚠️ Ledger konnte nicht geladen werden: {e}")
+
+    def save(self):
+        if not self.ledger_path:
+            return
+        with self.lock:
+            data = {"version": LEDGER_VERSION, "files": dict(self.ledger)}
+        tmp_path = self.ledger_path + ".tmp"
+        try:
+            with open(tmp_path, "w", encoding="utf-8") as f:
+                json.dump(data, f, ensure_ascii=False)
+            os.replace(tmp_path, self.ledger_path)
+        except OSError as e:
+            print(f"[STORAGE] ⚠️ Ledger konnte nicht gespeichert werden: {e}")
+
+    # -------------------------------------------------------------------------
+    # Buchführung
+    # -------------------------------------------------------------------------
+    def track(self, *filenames: str):
+        """Vom Service angelegte Dateien eintragen (fehlende werden übersprungen)"""
+        now = time.time()
+        with self.lock:
+            for filename in map(os.path.basename, filenames):
+                path = os.path.join(self.directory, filename)
+                if not os.path.isfile(path):
+                    continue
+                entry = self.ledger.setdefault(filename, {"kind": classify(filename), "created": now})
+                entry.update(lastAccess=now, size=os.path.getsize(path))
+        self.save()
+
+    def touch(self, filename: str):
+        """Lesezugriff vermerken (LRU)"""
+        with self.lock:
+            entry = self.ledger.get(os.path.basename(filename))
+            if entry is not None:
+                entry["lastAccess"] = time.time()
+
+    def forget(self, *filenames: str):
+        with self.lock:
+            for filename in filenames:
+                self.ledger.pop(os.path.basename(filename), None)
+
+    @contextmanager
+    def using(self, *filenames: str):
+        """Dateien eines laufenden Auftrags vor Aufräumen und Verdrängung schützen"""
+        names = [os.path.basename(filename) for filename in filenames]
+        with self.lock:
+            for name in names:
+                if not self.in_use[name]:
+                    self._write_lock(name)
+            self.in_use.update(names)
+        try:
+            yield
+        finally:
+            with self.lock:
+                self.in_use.subtract(names)
+                self.in_use += Counter()            # Einträge mit 0 entfernen
+                for name in set(names):
+                    if not self.in_use[name]:
+                        self._remove_lock(name)
+
+    def _write_lock(self, filename: str):
+        """<dateiname>.lock für andere Prozesse im Audio-Verzeichnis (Watch-Folder-Daemon)"""
+        try:
+            with open(os.path.join(self.directory, filename + LOCK_SUFFIX), "w", encoding="utf-8") as f:
+                json.dump({"pid": os.getpid(), "since": time.time()}, f)
+        except OSError as e:
+            print(f"[STORAGE] ⚠️ Sperrdatei für {filename} konnte nicht angelegt werden: {e}")
+
+    def _remove_lock(self, filename: str):
+        try:
+            os.unlink(os.path.join(self.directory, filename + LOCK_SUFFIX))
+        except OSError:
+            pass
+
+    def _remove(self, filename: str) -> int:
+        path = os.path.join(self.directory, filename)
+        try:
+            size = os.path.getsize(path)
+            os.unlink(path)
+        except OSError:
+            size = 0
+        self.ledger.pop(filename, None)
+        return size
+
+    # -------------------------------------------------------------------------
+    # Aufräumen und Kontingent
+    # -------------------------------------------------------------------------
+    def _scan(self) -> list:
+        """[(Dateiname, Größe, mtime)] aller Dateien im Verzeichnis"""
+        try:
+            with os.scandir(self.directory) as entries:
+                return [(entry.name, entry.stat().st_size, entry.stat().st_mtime)
+                        for entry in entries if entry.is_file()]
+        except OSError:
+            return []
+
+    def collect_orphans(self) -> list:
+        """
+        Löscht Temp-Dateien älter als temp_max_age, die kein Auftrag hält, und Sperrdateien ohne laufenden Auftrag
+        (Absturz/Neustart); entfernt Ledger-Einträge gelöschter Dateien
+        """
+        now = time.time()
+        files = self._scan()
+        removed = []
+        with self.lock:
+            for filename, _, mtime in files:
+                if filename.endswith(LOCK_SUFFIX):
+                    if not self.in_use[filename[:-len(LOCK_SUFFIX)]]:
+                        self._remove_lock(filename[:-len(LOCK_SUFFIX)])
+                    continue
+                if classify(filename) == "temp" and now - mtime > self.temp_max_age and not self.in_use[filename]:
+                    self._remove(filename)
+                    removed.append(filename)
+            present = {filename for filename, _, _ in files}
+            for filename in [name for name in self.ledger if name not in present]:
+                del self.ledger[filename]
+            self.stats["orphansRemoved"] += len(removed)
+            self.last_collect = now
+        for filename in removed:
+            print(f"[STORAGE] ✓ Verwaiste Temp-Datei gelöscht: {filename}")
+        self.save()
+        return removed
+
+    def _shortfall(self, used: int, extra: int) -> int:
+        """Bytes, die fehlen, damit extra Bytes unter Kontingent und Mindest-Freiplatz passen"""
+        shortfall = 0
+        if self.quota_bytes:
+            shortfall = used + extra - self.quota_bytes
+        try:
+            free = shutil.disk_usage(self.directory).free
+            shortfall = max(shortfall, self.min_free_bytes + extra - free)
+        except OSError:
+            pass
+        return max(0, int(shortfall))
+
+    def ensure_space(self, extra_bytes: int = 0) -> bool:
+        """
+        Platz für extra_bytes schaffen: LRU-Verdrängung der verdrängbaren Artefakte, bis Kontingent und
+        Mindest-Freiplatz eingehalten sind. False = auch danach nicht genug Platz (Auftrag ablehnen).
+        """
+        used = sum(size for _, size, _ in self._scan())
+        with self.lock:
+            shortfall = self._shortfall(used, extra_bytes)
+            if shortfall:
+                candidates = sorted((entry["lastAccess"], filename) for filename, entry in self.ledger.items()
+                                    if entry["kind"] in self.evictable and not self.in_use[filename])
+                # Reicht selbst alles Verdrängbare nicht, nichts umsonst löschen
+                reclaimable = sum(self.ledger[filename].get("size", 0) for _, filename in candidates)
+                if reclaimable < shortfall:
+                    candidates = []
+                for _, filename in candidates:
+                    if shortfall <= 0:
+                        break
+                    size = self._remove(filename)
+                    shortfall -= size
+                    used -= size
+                    self.stats["evicted"] += 1
+                    self.stats["evictedBytes"] += size
+                    print(f"[STORAGE] ✓ Verdrängt (LRU): {filename} ({size / MB:.1f} MB)")
+            ok = shortfall <= 0
+            if not ok:
+                self.stats["rejected"] += 1
+        self.save()
+        return ok
+
+    def run(self, interval: float, staged: "StagedUploads" = None):
+        """Hintergrund-Schleife: zu alte Uploads im Speicher auslagern, verwaiste Temp-Dateien aufräumen, Kontingent einhalten"""
+        while True:
+            try:
+                if staged is not None:
+                    staged.expire()
+                self.collect_orphans()
+                self.ensure_space()
+            except Exception as e:
+                print(f"[STORAGE] ⚠️ Aufräumen fehlgeschlagen: {e}")
+            time.sleep(interval)
+
+    # -------------------------------------------------------------------------
+    # Statistik
+    # -------------------------------------------------------------------------
+    def usage(self) -> dict:
+        files = self._scan()
+        by_kind = {}
+        for filename, size, _ in files:
+            kind = by_kind.setdefault(classify(filename), {"files": 0, "mb": 0.0})
+            kind["files"] += 1
+            kind["mb"] += size / MB
+        for kind in by_kind.values():
+            kind["mb"] = round(kind["mb"], 1)
+        try:
+            disk = shutil.disk_usage(self.directory)
+            disk_info = {"totalMb": round(disk.total / MB), "freeMb": round(disk.free / MB)}
+        except OSError:
+            disk_info = None
+        with self.lock:
+            tracked = len(self.ledger)
+            tracked_mb = sum(entry.get("size", 0) for entry in self.ledger.values()) / MB
+            in_use = sorted(self.in_use)
+            stats = dict(self.stats)
+        return {
+            "directory": self.directory,
+            "usedMb": round(sum(size for _, size, _ in files) / MB, 1),
+            "quotaMb": round(self.quota_bytes / MB) if self.quota_bytes else None,
+            "minFreeMb": round(self.min_free_bytes / MB),
+            "disk": disk_info,
+            "byKind": by_kind,
+            "trackedFiles": tracked,
+            "trackedMb": round(tracked_mb, 1),
+            "evictable": sorted(self.evictable),
+            "inUse": in_use,
+            "lastCollect": self.last_collect,
+            "stats": {"orphansRemoved": 0, "evicted": 0, "evictedBytes": 0, "rejected": 0, **stats},
+        }
+
+
+class StagedUploads:
+    """
+    Uploads im Speicher (HANDOFF_MODE=memory): Dateiname → (Bytes, Zeitpunkt), bis /transcribe bzw. /process sie
+    abholt. put() lehnt ab, sobald max_bytes insgesamt überschritten würden (der Aufrufer schreibt dann eine
+    _temp-Datei); expire() übergibt Uploads älter als max_age an spill(filename, data) – danach gelten für sie
+    die Regeln verwaister Temp-Dateien.
+    """
+
+    def __init__(self, max_bytes: int, max_age: float, spill=None):
+        self.max_bytes = max_bytes
+        self.max_age = max_age
+        self.spill = spill
+        self.lock = threading.Lock()
+        self.uploads = {}                           # Dateiname → (bytes, created)
+        self.total = 0
+        self.stats = Counter()                      # staged, spilledFull, expired
+
+    def put(self, filename: str, data: bytes) -> bool:
+        with self.lock:
+            previous = self.uploads.pop(filename, None)
+            if previous is not None:
+                self.total -= len(previous[0])
+            if self.total + len(data) > self.max_bytes:
+                self.stats["spilledFull"] += 1
+                return False
+            self.uploads[filename] = (data, time.time())
+            self.total += len(data)
+            self.stats["staged"] += 1
+            return True
+
+    def get(self, filename: str) -> bytes:
+        with self.lock:
+            entry = self.uploads.get(filename)
+        return entry[0] if entry else None
+
+    def pop(self, filename: str) -> bytes:
+        with self.lock:
+            entry = self.uploads.pop(filename, None)
+            if entry is None:
+                return None
+            self.total -= len(entry[0])
+        return entry[0]
+
+    def expire(self) -> list:
+        now = time.time()
+        with self.lock:
+            expired = [filename for filename, (_, created) in self.uploads.items() if now - created > self.max_age]
+            entries = [(filename, self.uploads.pop(filename)[0]) for filename in expired]
+            self.total -= sum(len(data) for _, data in entries)
+            self.stats["expired"] += len(entries)
+        for filename, data in entries:
+            if self.spill is not None:
+                self.spill(filename, data)
+            print(f"[STORAGE] ✓ Upload {filename} lag über {self.max_age / 60:.0f} min im Speicher – ausgelagert")
+        return expired
+
+    def usage(self) -> dict:
+        with self.lock:
+            return {"uploads": len(self.uploads), "mb": round(self.total / MB, 1),
+                    "maxMb": round(self.max_bytes / MB), **self.stats}
@@ -0,0 +1,197 @@
+"""
+Trace-Export und Zeitleisten je Auftrag
+============================================================================
+Sammelt die Spans eines Auftrags (tracing.py) aus allen Ebenen – main.py selbst und die @@SPAN-Zeilen
+von transcribe.py/summarize.py – und gibt sie weiter:
+
+- Datei:      eine JSON-Zeile je Span (TRACE_LOG_PATH), bei max_mb wird nach <datei>.1 rotiert
+- Collector:  optional gebündelt per HTTP POST {"spans": [...]} an eine lokale Sammelstelle (collector_url),
+              im Hintergrund – ein langsamer oder fehlender Collector bremst keinen Auftrag
+- Speicher:   die letzten `history` Traces für GET /traces/{id}
+
+timeline() baut aus den Spans eines Traces die Zeitleiste (Versatz ab Trace-Beginn, Tiefe im Span-Baum).
+Auch als Kommandozeile für die JSONL-Datei:  python traces.py [--file traces.jsonl] <trace-id>
+"""
+
+import argparse
+import json
+import os
+import queue
+import threading
+import time
+import urllib.request
+from collections import OrderedDict
+
+COLLECTOR_BATCH = 100           # Spans je POST an den Collector
+COLLECTOR_FLUSH_SEC = 2.0       # Spätestens so oft wird gesendet
+
+
+def timeline(spans: list) -> dict:
+    """
+    Spans eines Traces → {traceId, start, durationMs, spans: [... offsetMs, depth]}: Baum in Tiefensuche,
+    Geschwister nach Beginn (Kind-Spans stehen unter ihrer Eltern-Span, auch bei leicht abweichenden Uhren)
+    """
+    if not spans:
+        return {"traceId": None, "start": None, "durationMs": 0, "spans": []}
+    by_id = {span["spanId"]: span for span in spans}
+    start = min(span["start"] for span in spans)
+    end = max(span["end"] for span in spans)
+
+    children = {}
+    for span in spans:
+        parent = span.get("parentId") if span.get("parentId") in by_id else None
+        children.setdefault(parent, []).append(span)
+    ordered = []
+
+    def visit(parent, depth):
+        for span in sorted(children.get(parent, []), key=lambda span: (span["start"], -span["end"])):
+            if len(ordered) < len(spans):          # Schutz gegen Zyklen in fehlerhaften parentIds
+                ordered.append({**span, "offsetMs": round((span["start"] - start) * 1000, 3), "depth": depth})
+                visit(span["spanId"], depth + 1)
+
+    visit(None, 0)
+    return {
+        "traceId": spans[0]["traceId"],
+        "start": start,
+        "durationMs": round((end - start) * 1000, 3),
+        "services": sorted({span.get("service") for span in spans if span.get("service")}),
+        "spans": ordered,
+    }
+
+
+def format_timeline(data: dict, width: int = 60) -> str:
+    """Zeitleiste als Text (Balken relativ zur Gesamtdauer)"""
+    total = data["durationMs"] or 1
+    lines = [f"Trace {data['traceId']}  {total / 1000:.2f} s  ({', '.join(data.get('services', []))})"]
+    for span in data["spans"]:
+        first = int(span["offsetMs"] / total * width)
+        length = max(1, int(span["durationMs"] / total * width))
+        label = f"{'  ' * span['depth']}{span.get('service', '')}:{span['name']}"
+        flags = " ✖" if span.get("attributes", {}).get("error") else ""
+        lines.append(f"{label:<40} {' ' * first}{'█' * length}{' ' * (width - first - length)} "
+                     f"{span['offsetMs'] / 1000:8.2f} s +{span['durationMs'] / 1000:.2f} s{flags}")
+    return "\n".join(lines)
+
+
+class TraceExporter:
+    """Nimmt Spans entgegen (export) und schreibt sie in Datei, Collector und Speicher"""
+
+    def __init__(self, path: str = None, collector_url: str = "", history: int = 100, max_mb: float = 50):
+        self.path = path
+        self.collector_url = collector_url
+        self.history = history
+        self.max_bytes = max_mb * 1024 * 1024
+        self.lock = threading.Lock()
+        self.traces = OrderedDict()               # traceId → [span, ...]
+        self.dropped = 0                          # Nicht an den Collector zugestellte Spans
+        self._queue = queue.Queue(maxsize=10000) if collector_url else None
+        if self._queue is not None:
+            threading.Thread(target=self._ship, daemon=True).start()
+
+    def export(self, span: dict):
+        line = json.dumps(span, ensure_ascii=False)
+        with self.lock:
+            spans = self.traces.get(span["traceId"])
+            if spans is None:
+                spans = self.traces[span["traceId"]] = []
+                while len(self.traces) > self.history:
+                    self.traces.popitem(last=False)
+            else:
+                self.traces.move_to_end(span["traceId"])
+            spans.append(span)
+            if self.path:
+                try:
+                    if os.path.isfile(self.path) and os.path.getsize(self.path) > self.max_bytes:
+                        os.replace(self.path, self.path + ".1")
+                    with open(self.path, "a", encoding="utf-8") as f:
+                        f.write(line + "\n")
+                except OSError as e:
+                    print(f"[TRACE] ⚠️ Span konnte nicht geschrieben werden: {e}")
+        if self._queue is not None:
+            try:
+                self._queue.put_nowait(span)
+            except queue.Full:
+                self.dropped += 1
+
+    def _ship(self):
+        """Hintergrund: Spans gebündelt an den Collector senden"""
+        while True:
+            batch = [self._queue.get()]
+            deadline = time.time() + COLLECTOR_FLUSH_SEC
+            while len(batch) < COLLECTOR_BATCH and time.time() < deadline:
+                try:
+                    batch.append(self._queue.get(timeout=max(0.0, deadline - time.time())))
+                except queue.Empty:
+                    break
+            request = urllib.request.Request(self.collector_url, data=json.dumps({"spans": batch}).encode("utf-8"),
+                                             method="POST", headers={"Content-Type": "application/json"})
+            try:
+                urllib.request.urlopen(request, timeout=5).close()
+            except OSError as e:
+                self.dropped += len(batch)
+                print(f"[TRACE] ⚠️ Collector nicht erreichbar ({e}) – {len(batch)} Spans verworfen")
+
+    # -------------------------------------------------------------------------
+    # Abfrage
+    # -------------------------------------------------------------------------
+    def spans(self, trace_id: str) -> list:
+        """Spans eines Traces aus dem Speicher, sonst aus der JSONL-Datei (auch rotiert)"""
+        with self.lock:
+            spans = list(self.traces.get(trace_id, []))
+        if spans or not self.path:
+            return spans
+        return read_spans([self.path + ".1", self.path], trace_id)
+
+    def recent(self) -> list:
+        with self.lock:
+            traces = [(trace_id, list(spans)) for trace_id, spans in self.traces.items()]
+        result = []
+        for trace_id, spans in reversed(traces):
+            roots = [span for span in spans if not span.get("parentId")] or spans
+            start = min(span["start"] for span in spans)
+            result.append({
+                "traceId": trace_id,
+                "name": max(roots, key=lambda span: span["durationMs"])["name"],   # Auftrag, nicht der Upload davor
+                "start": start,
+                "durationMs": round((max(span["end"] for span in spans) - start) * 1000, 3),
+                "spans": len(spans),
+                "error": any(span.get("attributes", {}).get("error") for span in spans),
+            })
+        return result
+
+
+def read_spans(paths: list, trace_id: str) -> list:
+    spans = []
+    for path in paths:
+        if not os.path.isfile(path):
+            continue
+        with open(path, "r", encoding="utf-8") as f:
+            for line in f:
+                if trace_id not in line:
+                    continue
+                try:
+                    span = json.loads(line)
+                except ValueError:
+                    continue
+                if span.get("traceId") == trace_id:
+                    spans.append(span)
+    return spans
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Zeitleiste eines Traces aus der JSONL-Datei des Trace-Exports")
+    parser.add_argument('trace_id', help="Trace-ID (X-Trace-Id des Auftrags)")
+    parser.add_argument('--file', default=os.environ.get('TRACE_LOG_PATH', 'traces.jsonl'),
+                        help="JSONL-Datei (default: TRACE_LOG_PATH bzw. traces.jsonl)")
+    parser.add_argument('--json', action='store_true', help="Zeitleiste als JSON statt als Text")
+    args = parser.parse_args()
+
+    data = timeline(read_spans([args.file + ".1", args.file], args.trace_id))
+    if not data["spans"]:
+        print(f"Keine Spans für {args.trace_id} in {args.file}")
+        raise SystemExit(1)
+    print(json.dumps(data, ensure_ascii=False, indent=2) if args.json else format_timeline(data))
+
+
+if __name__ == "__main__":
+    main()
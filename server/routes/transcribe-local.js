@@ -16,6 +16,9 @@ const VENV_ACTIVATE = '~/pyenv_1_transcode_durchgabe/bin/activate';
 // statt direkt WSL2 aufzurufen (notwendig für Railway-Deployment).
 const LOCAL_SERVICE_URL = process.env.LOCAL_TRANSCRIBE_SERVICE_URL;
 const LOCAL_SERVICE_API_KEY = process.env.LOCAL_SERVICE_API_KEY || '';
+// Kein fester Gesamt-Timeout mehr (lange Aufnahmen brauchen deutlich über 10 Minuten): abgebrochen wird erst,
+// wenn der Service so lange kein SSE-Event mehr geschickt hat
+const LOCAL_SERVICE_IDLE_TIMEOUT_MS = parseInt(process.env.LOCAL_SERVICE_IDLE_TIMEOUT_MS || '300000', 10);
 
 /**
  * POST /api/transcribe-local
@@ -43,8 +46,8 @@ router.post('/', async (req, res) => {
 
     const io = req.app.get('io');
 
-    const sendProgress = (step, message, progress = 0) => {
-      io.to(socketId).emit('transcribe:progress', { step, message, progress });
+    const sendProgress = (step, message, progress = 0, etaSeconds) => {
+      io.to(socketId).emit('transcribe:progress', { step, message, progress, ...(etaSeconds !== undefined && { etaSeconds }) });
       logger.debug('TRANSCRIBE_LOCAL', `${step}: ${message} (${progress}%)`);
     };
 
@@ -55,17 +58,30 @@ router.post('/', async (req, res) => {
       logger.log('TRANSCRIBE_LOCAL', `Cloud-Mode: Proxy-Request an ${LOCAL_SERVICE_URL}/transcribe`);
       sendProgress('init', 'Verbinde mit lokalem KI-Service...', 5);
 
+      // Idle-Timeout: jedes SSE-Event setzt ihn zurück
+      const abortController = new AbortController();
+      let idleTimer = null;
+      let idleTimedOut = false;
+      const resetIdleTimer = () => {
+        clearTimeout(idleTimer);
+        idleTimer = setTimeout(() => {
+          idleTimedOut = true;
+          abortController.abort();
+        }, LOCAL_SERVICE_IDLE_TIMEOUT_MS);
+      };
+      resetIdleTimer();
+
       try {
         const serviceResponse = await axios.post(
           `${LOCAL_SERVICE_URL}/transcribe`,
-          { filename },
+          { filename, inlineResult: false },
           {
             headers: {
               'Content-Type': 'application/json',
               ...(LOCAL_SERVICE_API_KEY && { 'x-api-key': LOCAL_SERVICE_API_KEY })
             },
             responseType: 'stream',
-            timeout: 600000 // 10 Minuten Timeout für lange Transkriptionen
+            signal: abortController.signal
           }
         );
 
@@ -74,6 +90,7 @@ router.post('/', async (req, res) => {
         let sseBuffer = '';
 
         serviceResponse.data.on('data', (chunk) => {
+          resetIdleTimer();
           sseBuffer += chunk.toString('utf8');
 
           // SSE-Events aus Buffer extrahieren (getrennt durch '\n\n')
@@ -87,8 +104,10 @@ router.post('/', async (req, res) => {
             try {
               const data = JSON.parse(line.slice(6));
 
-              if (data.type === 'progress' || data.type === 'warning') {
-                sendProgress(data.step || 'processing', data.message, data.progress || 0);
+              if (data.type === 'eta') {
+                sendProgress('eta', `Voraussichtlich fertig in ${formatEta(data.etaSeconds)}`, 5, data.etaSeconds);
+              } else if (data.type === 'progress' || data.type === 'warning') {
+                sendProgress(data.step || 'processing', data.message, data.progress || 0, data.etaSeconds);
               } else if (data.type === 'error') {
                 hasError = true;
                 sendProgress('error', data.message, 0);
@@ -102,7 +121,8 @@ router.post('/', async (req, res) => {
           }
         });
 
-        serviceResponse.data.on('end', () => {
+        serviceResponse.data.on('end', async () => {
+          clearTimeout(idleTimer);
           if (hasError) {
             return res.status(500).json({ error: 'Transkription fehlgeschlagen' });
           }
@@ -110,6 +130,23 @@ router.post('/', async (req, res) => {
             return res.status(500).json({ error: 'Kein Ergebnis vom lokalen Service erhalten' });
           }
 
+          // Text liegt in der Ergebnis-Ablage des Services (GET /results/{id}, gzip) statt im SSE-Event
+          const stored = finalResult.results && finalResult.results.transcription;
+          if (finalResult.transcription === undefined && stored) {
+            try {
+              const resultResponse = await axios.get(`${LOCAL_SERVICE_URL}${stored.url}`, {
+                headers: { ...(LOCAL_SERVICE_API_KEY && { 'x-api-key': LOCAL_SERVICE_API_KEY }) },
+                responseType: 'text',
+                transformResponse: (data) => data,
+                timeout: 120000
+              });
+              finalResult.transcription = resultResponse.data;
+            } catch (err) {
+              logger.error('TRANSCRIBE_LOCAL', 'Ergebnis konnte nicht vom lokalen Service geladen werden:', err.message);
+              return res.status(502).json({ error: 'Ergebnis vom lokalen KI-Service nicht abrufbar', details: err.message });
+            }
+          }
+
           // Ergebnis via Socket senden (identisch zum Local-Mode)
           io.to(socketId).emit('transcribe:result', {
             transcription: finalResult.transcription,
@@ -128,6 +165,10 @@ router.post('/', async (req, res) => {
         });
 
         serviceResponse.data.on('error', (err) => {
+          clearTimeout(idleTimer);
+          if (idleTimedOut) {
+            err.message = `Keine Rückmeldung seit ${LOCAL_SERVICE_IDLE_TIMEOUT_MS / 1000} s`;
+          }
           logger.error('TRANSCRIBE_LOCAL', 'Stream-Fehler vom lokalen Service:', err.message);
           sendProgress('error', `Verbindungsfehler zum lokalen Service: ${err.message}`, 0);
           if (!res.headersSent) {
@@ -139,6 +180,10 @@ router.post('/', async (req, res) => {
         });
 
       } catch (serviceErr) {
+        clearTimeout(idleTimer);
+        if (idleTimedOut) {
+          serviceErr.message = `Keine Rückmeldung seit ${LOCAL_SERVICE_IDLE_TIMEOUT_MS / 1000} s`;
+        }
         logger.error('TRANSCRIBE_LOCAL', 'Lokaler Service nicht erreichbar:', serviceErr.message);
         sendProgress('error', `Lokaler KI-Service nicht erreichbar: ${serviceErr.message}`, 0);
         return res.status(503).json({
@@ -305,6 +350,14 @@ router.post('/', async (req, res) => {
   }
 });
 
+// Hilfsfunktion: Restzeit aus dem 'eta'-Event lesbar machen
+function formatEta(seconds) {
+  const total = Math.max(0, Math.round(seconds || 0));
+  if (total < 60) return `${total} s`;
+  const minutes = Math.round(total / 60);
+  return minutes < 60 ? `${minutes} min` : `${Math.floor(minutes / 60)} h ${minutes % 60} min`;
+}
+
 // Hilfsfunktion: ANSI-Codes entfernen
 function stripAnsiCodes(str) {
   return str.replace(/\x1B\[[0-9;]*[mGKHf]/g, '');
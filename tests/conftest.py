@@ -0,0 +1,10 @@
+# Die Skripte in base-data/ und local-ai-service/ sind keine Pakete, sondern laufen mit ihrem Verzeichnis im
+# Suchpfad (WSL: neben den Skripten, Service: BASE_DATA_DIR) – die Tests importieren sie genauso.
+import os
+import sys
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+for directory in ("base-data", "local-ai-service"):
+    path = os.path.join(ROOT, directory)
+    if path not in sys.path:
+        sys.path.insert(0, path)
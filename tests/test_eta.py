@@ -0,0 +1,71 @@
+import time
+
+import pytest
+
+from eta import DEFAULTS, EtaModel, deadline_verdict
+
+
+def transcribe_report(model, rtf, audio=600.0, load=10.0):
+    return {"script": "transcribe", "meta": {"model": model, "mp3Duration": audio, "segments": 120},
+            "stages": [{"name": "load", "wallSeconds": load}], "total": {"wallSeconds": load + rtf * audio}}
+
+
+def test_warteschlange_hintereinander():
+    # Jeder Auftrag wartet auf den zuletzt fertigen – nicht auf die Summe aller Restzeiten
+    model = EtaModel()
+    queues = [model.start("transcribe", (100.0, 0)).queue for _ in range(4)]
+    assert queues == pytest.approx([0, 100, 200, 300], abs=0.5)
+
+
+def test_warteschlange_nach_finish():
+    model = EtaModel()
+    first = model.start("transcribe", (100.0, 0))
+    second = model.start("transcribe", (50.0, 0))
+    assert model.queue_seconds() == pytest.approx(150, abs=0.5)
+    model.finish(second)
+    assert model.queue_seconds() == pytest.approx(100, abs=0.5)
+    model.finish(first)
+    assert model.queue_seconds() == 0
+
+
+def test_restzeit_enthaelt_wartezeit():
+    model = EtaModel()
+    model.start("transcribe", (100.0, 0))
+    estimate = model.start("transcribe", (40.0, 0))
+    assert estimate.finish_at - time.time() == pytest.approx(140, abs=0.5)
+    assert estimate.fields()["etaSeconds"] == pytest.approx(140, abs=0.5)
+
+
+def test_ohne_historie_defaults():
+    predicted, basis = EtaModel().predict_transcribe(100)
+    assert basis == 0
+    assert predicted == pytest.approx(DEFAULTS["transcribeLoad"] + DEFAULTS["rtf"] * 100)
+
+
+def test_vorhersage_je_modell():
+    model = EtaModel()
+    for _ in range(5):
+        model.observe(transcribe_report("small", 0.05))
+    for _ in range(2):
+        model.observe(transcribe_report("large", 0.2))
+    # Zuletzt gemessen: large – nicht der Schlüssel mit den meisten Messungen
+    assert model.predict_transcribe(1000)[0] == pytest.approx(10 + 200)
+    assert model.predict_transcribe(1000, model="small")[0] == pytest.approx(10 + 50)
+    # Ohne Messungen für Modell/Gerät: Schlüssel mit den meisten Messungen
+    assert model.predict_transcribe(1000, model="medium")[0] == pytest.approx(10 + 50)
+    assert model.predict_transcribe(1000, model="large", device="cpu")[0] == pytest.approx(10 + 50)
+
+
+def test_summary_je_geraet():
+    model = EtaModel()
+    report = {"script": "summarize", "meta": {"blocks": 4, "device": "cpu (2 Replikat(e) × 4 Threads, int8)"},
+              "stages": [{"name": "load", "wallSeconds": 5}], "total": {"wallSeconds": 45}}
+    model.observe(report)
+    assert model.predict_summarize(40, device="cpu") == (pytest.approx(5 + 10 * 4), 1)
+
+
+def test_deadline_verdict():
+    assert deadline_verdict(100, 0, 200) is None
+    assert deadline_verdict(100, 150, 200) == "defer"
+    assert deadline_verdict(300, 0, 200) == "reject"
+    assert deadline_verdict(100, 0, 110, margin=1.2) == "reject"
@@ -0,0 +1,62 @@
+import pytest
+
+np = pytest.importorskip("numpy")
+
+from fingerprint import HOP, MAX_OFFSET_SEC, SAMPLE_RATE, compute, frame_seconds, match, position_table  # noqa: E402
+
+
+def random_fingerprint(frames, seed=1):
+    return np.random.default_rng(seed).integers(0, 2 ** 16, size=frames, dtype=np.uint16)
+
+
+def test_versatz_wird_ausgezaehlt():
+    candidate = random_fingerprint(20000)
+    query = candidate[750:750 + 15000].copy()
+    result = match(query, candidate)
+    assert result["offsetSeconds"] == pytest.approx(frame_seconds(750), abs=0.01)
+    assert result["similarity"] == 1.0
+    assert result["coverage"] == 1.0
+
+
+def test_negativer_versatz_und_bitfehler():
+    candidate = random_fingerprint(20000)
+    # query beginnt 200 Fenster vor candidate (fremder Vorspann) und ist neu kodiert (einzelne Bits gekippt)
+    query = np.concatenate([random_fingerprint(200, seed=2), candidate[:19000]])
+    flips = np.random.default_rng(3).random(len(query)) < 0.2
+    query[flips] ^= np.uint16(1 << 5)
+    result = match(query, candidate)
+    assert result["offsetSeconds"] == pytest.approx(frame_seconds(-200), abs=0.01)
+    assert 0.9 < result["similarity"] < 1.0
+
+
+def test_fremde_aufnahme_passt_nicht():
+    assert match(random_fingerprint(15000, seed=4), random_fingerprint(20000)) is None
+    assert match(np.zeros(0, dtype=np.uint16), random_fingerprint(100)) is None
+
+
+def test_versatz_ausserhalb_des_suchbereichs():
+    max_frames = int(MAX_OFFSET_SEC * SAMPLE_RATE / HOP)
+    candidate = random_fingerprint(max_frames + 12000)
+    assert match(candidate[max_frames + 500:].copy(), candidate) is None
+
+
+def test_haeufige_werte_zaehlen_nicht():
+    # Stille/Rauschen: ein Wert, der öfter als MAX_POSITIONS vorkommt, stimmt nicht über den Versatz ab
+    candidate = random_fingerprint(20000)
+    candidate[::2] = 7
+    query = candidate[300:15300].copy()
+    assert match(query, candidate)["offsetSeconds"] == pytest.approx(frame_seconds(300), abs=0.01)
+
+
+def test_positionstabelle_gleiches_ergebnis():
+    candidate = random_fingerprint(20000)
+    query = candidate[100:15100].copy()
+    assert match(query, candidate, position_table(candidate)) == match(query, candidate)
+
+
+def test_fingerabdruck_ueberlebt_verschnitt():
+    # Dieselbe Aufnahme, um 40 Fenster gekürzt und leiser: gleicher Versatz über compute()
+    samples = (np.random.default_rng(5).standard_normal(SAMPLE_RATE * 60) * 3000).astype(np.int16)
+    trimmed = (samples[40 * HOP:].astype(np.float32) * 0.5).astype(np.int16)
+    result = match(compute(trimmed), compute(samples))
+    assert result["offsetSeconds"] == pytest.approx(frame_seconds(40), abs=0.01)
@@ -0,0 +1,33 @@
+from results import accepted_encoding, parse_byte_range
+
+
+def test_parse_byte_range():
+    assert parse_byte_range("bytes=0-99", 1000) == (0, 99)
+    assert parse_byte_range("bytes=900-", 1000) == (900, 999)
+    assert parse_byte_range("bytes=-100", 1000) == (900, 999)
+    assert parse_byte_range("bytes=-5000", 1000) == (0, 999)
+    assert parse_byte_range("bytes=990-2000", 1000) == (990, 999)   # Ende wird auf die Größe gekürzt
+
+
+def test_parse_byte_range_nicht_erfuellbar():
+    # main.py antwortet darauf mit 416
+    assert parse_byte_range("bytes=1000-", 1000) is None
+    assert parse_byte_range("bytes=500-100", 1000) is None
+    assert parse_byte_range("bytes=-0", 1000) is None
+
+
+def test_parse_byte_range_ungueltig():
+    assert parse_byte_range(None, 1000) is None
+    assert parse_byte_range("items=0-10", 1000) is None
+    assert parse_byte_range("bytes=0-10,20-30", 1000) is None
+    assert parse_byte_range("bytes=a-b", 1000) is None
+
+
+def test_accepted_encoding():
+    assert accepted_encoding("gzip, deflate, br, zstd", ["gzip", "zstd"]) == "zstd"
+    assert accepted_encoding("gzip, deflate", ["gzip", "zstd"]) == "gzip"
+    assert accepted_encoding("zstd;q=0, gzip;q=0.5", ["gzip", "zstd"]) == "gzip"
+    assert accepted_encoding("*", ["gzip"]) == "gzip"
+    assert accepted_encoding("identity", ["gzip", "zstd"]) is None
+    assert accepted_encoding(None, ["gzip"]) is None
+    assert accepted_encoding("zstd", ["gzip"]) is None
@@ -0,0 +1,46 @@
+import pytest
+
+from search_index import SearchIndex, bm25_idf, tokenize
+
+
+def write(directory, name, lines):
+    text = "Kopf\n\n\n\n" + "".join(f"[00:00:{n * 10:02d}] {line}\n" for n, line in enumerate(lines))
+    (directory / name).write_text(text, encoding="utf-8")
+
+
+@pytest.fixture
+def index(tmp_path):
+    write(tmp_path, "a.txt", ["Der Engel spricht.", "Vertrauen im Herzen.", "Der Engel und das Vertrauen."])
+    write(tmp_path, "b.txt", ["Engel " * 3, "Vertrauen " * 3] + ["Anderes Thema."] * 6)
+    write(tmp_path, "c.txt", ["Nur der Engel."])
+    search_index = SearchIndex(str(tmp_path))
+    search_index.refresh()
+    return search_index
+
+
+def test_tokenize_normalizes():
+    assert tokenize("Die Engel gehen über Brücken 2024") == ["engel", "geh", "uber", "bruck"]
+
+
+def test_bm25_idf_rare_terms_weigh_more():
+    assert bm25_idf(10, 1) > bm25_idf(10, 5) > bm25_idf(10, 10) > 0
+
+
+def test_entries_with_all_terms_rank_first(index):
+    result = next(r for r in index.search("Engel Vertrauen") if r["filename"] == "a.txt")
+    # Danach die seltenere "Vertrauen"-Zeile (2 Dateien) vor "Engel" (3 Dateien)
+    assert [hit["segment"] for hit in result["hits"]] == [2, 1, 0]
+    assert [hit["matched"] for hit in result["hits"]] == [2, 1, 1]
+    assert result["completeHits"] == 1
+
+
+def test_files_with_complete_hit_rank_first(index):
+    results = index.search("Engel Vertrauen")
+    assert [r["filename"] for r in results] == ["a.txt", "b.txt"]
+    assert results[1]["completeHits"] == 0
+
+
+def test_and_search_and_unknown_terms(index):
+    assert [r["filename"] for r in index.search("Engel")] == ["a.txt", "c.txt", "b.txt"]
+    assert index.search("Engel Unbekannt") == []
+    assert index.search("der und") == []
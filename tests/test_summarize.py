@@ -0,0 +1,99 @@
+from types import SimpleNamespace
+
+import summarize
+from summarize import clean_summary, early_sentence_stop, generate_summaries
+
+SOFT_END = {"."}
+
+
+class FakeTokenizer:
+    """Ein Token je Wort bzw. Satzzeichen; Ids sind die Tokens selbst"""
+
+    eos_token = "</s>"
+
+    def apply_chat_template(self, messages, tokenize=False, add_generation_prompt=True):
+        return messages[-1]["content"]
+
+    def tokenize(self, text):
+        return text.replace(".", " . ").replace("!", " ! ").replace("?", " ? ").split()
+
+    def convert_ids_to_tokens(self, ids):
+        return list(ids)
+
+    def decode(self, ids):
+        return " ".join(ids).replace(" .", ".").replace(" !", "!")
+
+    def get_vocab(self):
+        return {"</s>": 0}
+
+
+class FakeGenerator:
+    """generate_batch wie CTranslate2: schreibt je Prompt die vorgegebene Antwort weiter bis zum ersten end_token"""
+
+    def __init__(self, answers):
+        self.answers = answers
+        self.calls = []
+
+    def generate_batch(self, prompts, max_length, end_token=(), **kwargs):
+        self.calls.append(len(prompts))
+        results = []
+        for prompt in prompts:
+            answer = self.answers[prompt[0]]
+            done = len(prompt) - 1  # Prompt = [Schlüssel] + bisher generierte Tokens
+            ids = []
+            for token in answer[done:done + max_length]:
+                ids.append(token)
+                if token in end_token:
+                    break
+            results.append(SimpleNamespace(sequences_ids=[ids]))
+        return results
+
+
+def run(answers, max_length=60):
+    generator = FakeGenerator(answers)
+    counts = []
+    summaries = generate_summaries(generator, FakeTokenizer(), "System", list(answers), max_length=max_length,
+                                   decode_mode="sentence", token_counts=counts)
+    return summaries, counts, generator.calls
+
+
+def setup_function():
+    summarize._stop_conditions_cache.clear()
+
+
+def test_early_sentence_stop():
+    assert early_sentence_stop(["am", "3", "."], SOFT_END)
+    assert early_sentence_stop(["z", "."], SOFT_END)
+    assert not early_sentence_stop(["Ende", "."], SOFT_END)
+    assert not early_sentence_stop(["Ende", "!"], SOFT_END)
+    assert not early_sentence_stop(["."], SOFT_END)
+
+
+def test_sentence_mode_batches_all_prompts():
+    summaries, counts, calls = run({
+        "a": "Der Engel spricht . Nachsatz .".split(),
+        "b": "Vertraue dir ! Mehr".split(),
+    })
+    assert summaries == ["Der Engel spricht.", "Vertraue dir!"]
+    assert counts == [4, 3]
+    assert calls == [2]
+
+
+def test_ordinal_continues_in_second_batch():
+    summaries, counts, calls = run({
+        "a": "Am 3 . Oktober kommt Licht . Rest".split(),
+        "b": "Alles gut . Rest".split(),
+    })
+    assert summaries == ["Am 3. Oktober kommt Licht.", "Alles gut."]
+    assert counts == [7, 3]
+    assert calls == [2, 1]
+
+
+def test_continuation_respects_max_length():
+    summaries, counts, calls = run({"a": "Am 3 . Oktober kommt Licht .".split()}, max_length=5)
+    assert counts == [5]
+    assert summaries == ["Am 3. Oktober kommt."]
+
+
+def test_clean_summary_keeps_ordinals():
+    assert clean_summary("Am 3. Oktober kommt Licht. Danach mehr.") == "Am 3. Oktober kommt Licht."
@@ -0,0 +1,130 @@
+from collections import namedtuple
+
+import pytest
+
+import transcribe
+from transcribe import collapse_repeats, guarded_segments, has_loop, resolve_ranges
+from transcript_store import TranscriptStore
+
+np = pytest.importorskip("numpy")
+
+Segment = namedtuple("Segment", "start end text compression_ratio avg_logprob no_speech_prob")
+
+TRANSCRIPT = (
+    "Kopf\n\n\n\n"
+    "[00:00:00] Eins.\n"
+    "[00:00:10] Zwei.\n"
+    "[00:00:20] Drei.\n"
+    "[00:00:30] Vier.\n"
+)
+
+
+def segment(start, end, text, compression_ratio=1.5):
+    return Segment(start, end, text, compression_ratio, -0.2, 0.01)
+
+
+class FakeModel:
+    """model.transcribe() wie faster-whisper; liefert für jedes Fenster dieselben Segmente (relativ zum Fenster)"""
+
+    def __init__(self, segments):
+        self.segments = segments
+        self.calls = 0
+
+    def transcribe(self, audio, **options):
+        self.calls += 1
+        return iter(self.segments), None
+
+
+def generate(segments):
+    # Wie model.transcribe(): ein Generator, den guarded_segments bei einer Schleife mit close() abbricht
+    yield from segments
+
+
+def run_guarded(segments, model=None, seconds=120):
+    audio = np.zeros(seconds * transcribe.SAMPLE_RATE, dtype=np.float32)
+    restarts = []
+
+    def restart(audio, offset):
+        restarts.append(offset)
+        return generate([s for s in segments if s.start >= offset])
+
+    stats = {}
+    output = list(guarded_segments(model or FakeModel([]), generate(segments), audio, restart, {}, stats))
+    return output, restarts, stats["loops"]
+
+
+# ---------------------------------------------------------------------------
+# resolve_ranges
+# ---------------------------------------------------------------------------
+def test_resolve_ranges_auf_segmentgrenzen():
+    store = TranscriptStore.from_text(TRANSCRIPT, 40)
+    assert resolve_ranges(store, [(12, 15)], 40) == [(1, 2, 10, 20)]
+    assert resolve_ranges(store, [(5, 25)], 40) == [(0, 3, 0, 30)]
+
+
+def test_resolve_ranges_fasst_ueberlappungen_zusammen():
+    store = TranscriptStore.from_text(TRANSCRIPT, 40)
+    assert resolve_ranges(store, [(22, 35), (12, 25)], 40) == [(1, 4, 10, 40)]
+    assert resolve_ranges(store, [(1, 2), (31, 32)], 40) == [(0, 1, 0, 10), (3, 4, 30, 40)]
+
+
+def test_resolve_ranges_begrenzt_auf_audiodauer():
+    store = TranscriptStore.from_text(TRANSCRIPT, 40)
+    assert resolve_ranges(store, [(35, 500)], 40) == [(3, 4, 30, 40)]
+
+
+def test_resolve_ranges_leeres_transkript():
+    store = TranscriptStore.from_text("Kopf\n\n\n\n", 40)
+    assert resolve_ranges(store, [(5, 10)], 40) == [(0, 0, 5, 10)]
+
+
+# ---------------------------------------------------------------------------
+# Schleifen
+# ---------------------------------------------------------------------------
+def test_collapse_repeats():
+    assert collapse_repeats("Halleluja Halleluja Halleluja Halleluja") == "Halleluja"
+    assert collapse_repeats("und dann sagte er, und dann sagte er, und dann sagte er, weiter") == "und dann sagte er, weiter"
+    assert collapse_repeats("Ein ganz normaler Satz ohne Wiederholung.") == "Ein ganz normaler Satz ohne Wiederholung."
+
+
+def test_kurze_wiederholungen_sind_keine_schleife():
+    segments = [segment(i, i + 1, text) for i, text in enumerate(["Amen.", "Amen.", "Amen.", "Ja.", "Ja.", "Ja."])]
+    assert not has_loop(segments)
+    output, restarts, loops = run_guarded(segments)
+    assert output == segments
+    assert loops["events"] == 0
+
+
+def test_wiederholte_segmente_werden_neu_dekodiert():
+    repeated = "Wir beten für den Frieden"
+    segments = [segment(0, 2, "Anfang hier ist Text")] + [segment(t, t + 2, repeated) for t in (2, 4, 6)]
+    assert has_loop(segments)
+    model = FakeModel([segment(0, 5, "Neu dekodierter Text")])
+    output, restarts, loops = run_guarded(segments, model)
+    assert [s.text for s in output] == ["Anfang hier ist Text", repeated, "Neu dekodierter Text"]
+    assert output[-1].start == 4          # Fenster ab dem ersten zurückgehaltenen Segment, globale Zeit
+    assert restarts == [4 + transcribe.LOOP_WINDOW_SEC]
+    assert loops["reseeded"] == 1 and loops["droppedSegments"] == 2
+
+
+def test_neu_dekodierung_haengt_original_bleibt():
+    repeated = "Wir beten für den Frieden"
+    segments = ([segment(0, 2, "Anfang hier ist Text")] + [segment(t, t + 2, repeated) for t in (2, 4, 6, 8)]
+                + [segment(10, 12, "Ende des Gottesdienstes heute")])
+    model = FakeModel(segments[1:4])      # Die Neu-Dekodierung wiederholt sich ebenfalls
+    output, restarts, loops = run_guarded(segments, model)
+    # Erstes Vorkommen bleibt, Wiederholungen fallen weg (auch nach dem Neustart), keine 30-s-Lücke
+    assert [(s.start, s.text) for s in output] == [(0, "Anfang hier ist Text"), (2, repeated),
+                                                   (10, "Ende des Gottesdienstes heute")]
+    assert restarts == [8]
+    assert loops["kept"] == 1 and loops["droppedSegments"] == 3
+
+
+def test_schleife_im_segment_wird_gekuerzt():
+    segments = [segment(0, 5, "Halleluja Halleluja Halleluja Halleluja Halleluja", compression_ratio=3.5),
+                segment(5, 8, "weiter geht es")]
+    model = FakeModel([segment(0, 5, "Halleluja " * 20, compression_ratio=3.5)])
+    output, restarts, loops = run_guarded(segments, model)
+    assert [s.text for s in output] == ["Halleluja", "weiter geht es"]
+    assert restarts == [5]
+    assert loops["kept"] == 1
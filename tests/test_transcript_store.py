@@ -0,0 +1,80 @@
+from transcript_store import CONTINUATION_INDENT, TranscriptStore, parse_timestamp, segment_text
+
+HEADER = "Datei:   test.mp3\nModell:  large-v3\n\n\n\n"
+TRANSCRIPT = (
+    HEADER
+    + "[00:00:00] Erster Satz.\n"
+    + "[00:00:05] Zweiter Satz, der so lang ist,\n"
+    + CONTINUATION_INDENT + "dass er umbricht.\n"
+    + "----------  Überschrift des Blocks\n"
+    + "[00:00:12] Dritter Satz.\n"
+    + "[00:01:00] Vierter Satz.\n"
+)
+
+
+def store(duration=90):
+    return TranscriptStore.from_text(TRANSCRIPT, duration)
+
+
+def test_parse_timestamp():
+    assert parse_timestamp("01:02:03") == 3723
+    assert parse_timestamp("[00:01:30]") == 90
+    assert parse_timestamp("02:30") == 150
+    assert parse_timestamp(12.5) == 12.5
+
+
+def test_segment_text_fuegt_nur_eingerueckte_folgezeilen_an():
+    raw = "[00:00:05] Anfang\n" + CONTINUATION_INDENT + "Fortsetzung\n----------  Überschrift\n"
+    assert segment_text(raw) == "Anfang Fortsetzung"
+
+
+def test_index_und_zeiten():
+    transcript = store()
+    assert len(transcript) == 4
+    assert transcript.header == HEADER
+    assert list(transcript.starts) == [0, 5, 12, 60]
+    assert list(transcript.ends) == [5, 12, 60, 90]
+    assert transcript.text(1) == "Zweiter Satz, der so lang ist, dass er umbricht."
+    assert transcript.between(1) == "----------  Überschrift des Blocks\n"
+    assert transcript.text(2) == "Dritter Satz."
+
+
+def test_letztes_segment_ohne_dauer_endet_bei_seinem_start():
+    assert store(None).ends[-1] == 60
+
+
+def test_binaersuche():
+    transcript = store()
+    assert transcript.index_at(0) == 0
+    assert transcript.index_at(11.9) == 1
+    assert transcript.index_at("00:00:12") == 2
+    assert transcript.index_at(3600) == 3
+    assert transcript.segment_at(30).text == "Dritter Satz."
+    assert list(transcript.indices_between(6, 13)) == [1, 2]
+    assert list(transcript.indices_between(61, 80)) == [3]
+    assert TranscriptStore.from_text("").index_at(5) == -1
+
+
+def test_splice_ersetzt_nur_die_bereiche():
+    transcript = store()
+    replaced = transcript.splice([(1, 3, "[00:00:05] Neu.\n")])
+    assert replaced == HEADER + "[00:00:00] Erster Satz.\n[00:00:05] Neu.\n[00:01:00] Vierter Satz.\n"
+    # first == last: Einfügen vor dem Segment, der Rest bleibt byte-genau
+    inserted = transcript.splice([(0, 0, "[00:00:00] Vorspann.\n")])
+    assert inserted == HEADER + "[00:00:00] Vorspann.\n" + TRANSCRIPT[len(HEADER):]
+    assert transcript.splice([]) == TRANSCRIPT
+
+
+def test_shifted_verschiebt_und_schneidet():
+    transcript = store()
+    shifted = TranscriptStore.from_text(transcript.shifted(6, duration=50, header="Kopf\n"))
+    assert shifted.header == "Kopf\n"
+    # Das bei 6 s laufende Segment beginnt jetzt bei 00:00:00, Segmente ab duration entfallen
+    assert list(shifted.starts) == [0, 6]
+    assert shifted.text(0) == "Zweiter Satz, der so lang ist, dass er umbricht."
+    assert "Überschrift" not in transcript.shifted(6)
+
+
+def test_shifted_negativer_versatz():
+    shifted = TranscriptStore.from_text(store().shifted(-10))
+    assert list(shifted.starts) == [10, 15, 22, 70]